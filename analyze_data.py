@@ -3,20 +3,30 @@ Stroop Test Veri Analizi
 Stroop Etkisi hesaplama ve görselleştirme
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+# pandas, matplotlib ve seaborn ilk kullanımda yüklenir (hızlı açılış)
+import argparse
 import os
 import glob
 from datetime import datetime
 
-# Türkçe karakter desteği için
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
-sns.set_palette("husl")
+
+def _plotting():
+    """Grafik kütüphanelerini ilk kullanımda yükle ve stili ayarla"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Türkçe karakter desteği için
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    sns.set_style("whitegrid")
+    sns.set_palette("husl")
+    return plt
 
 def load_stroop_data(data_dir='data'):
     """Stroop test verilerini yükle"""
+    import pandas as pd
+
+    from session_model import session_id_from_path
+
     csv_files = glob.glob(os.path.join(data_dir, 'stroop_*.csv'))
     
     if not csv_files:
@@ -27,6 +37,7 @@ def load_stroop_data(data_dir='data'):
     dfs = []
     for file in csv_files:
         df = pd.read_csv(file)
+        df['session'] = session_id_from_path(file)
         dfs.append(df)
     
     if not dfs:
@@ -73,6 +84,8 @@ def calculate_stroop_effect(data):
 
 def visualize_stroop_effect(data, stats, output_dir='results'):
     """Stroop Etkisini görselleştir"""
+    plt = _plotting()
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
@@ -201,12 +214,23 @@ def print_statistics(stats):
     
     print()
 
-def main():
+def main(argv=None):
     """Ana analiz fonksiyonu"""
+    from trial_cleaning import add_cleaning_arguments, clean_from_args
+    from trial_history import print_sequential_summary, sequential_effects
+
+    parser = argparse.ArgumentParser(description='Stroop etkisi analizi')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--history-output', help='Oturum başına deneme geçmişi etkileri tablosu (.csv)')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                        help='N yeniden örneklemle bootstrap güven aralıkları (0: kapalı)')
+    parser.add_argument('--seed', type=int, default=None, help='Bootstrap rastgele tohumu')
+    args = add_cleaning_arguments(parser).parse_args(argv)
+
     print("Stroop Test Veri Analizi Başlatılıyor...")
     
     # Veriyi yükle
-    data = load_stroop_data()
+    data = load_stroop_data(args.data_dir)
     
     if data is None or len(data) == 0:
         print("Analiz için yeterli veri bulunamadı!")
@@ -215,12 +239,28 @@ def main():
     
     print(f"Toplam {len(data)} deneme yüklendi.")
     
+    # Erken tepki, dikkat kopması ve oturum içi aykırı RT'leri çıkar
+    trials = data
+    data = clean_from_args(data, args)
+    
     # Stroop Etkisini hesapla
     stats = calculate_stroop_effect(data)
     
     # İstatistikleri yazdır
     print_statistics(stats)
     
+    if args.bootstrap:
+        from bootstrap_ci import bootstrap_stroop, print_bootstrap_summary
+
+        print_bootstrap_summary(bootstrap_stroop(data, n_boot=args.bootstrap, seed=args.seed))
+    
+    # Deneme sırası etkileri (tüm denemeler sırada kalır, çıkarılanlar ölçülmez)
+    history = sequential_effects(trials)
+    print_sequential_summary(history)
+    if args.history_output:
+        history.to_csv(args.history_output, index=False)
+        print(f"✓ Deneme geçmişi tablosu kaydedildi: {args.history_output}")
+    
     # Görselleştir
     visualize_stroop_effect(data, stats)
     
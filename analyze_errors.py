@@ -3,21 +3,33 @@ Hata Tipi Analizi - Stroop ve Go/No-Go Testleri
 Yanlış kelime, yanlış renk, false alarm, missed go gibi hata tiplerini analiz eder
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+# pandas, matplotlib ve seaborn ilk kullanımda yüklenir (hızlı açılış)
+import argparse
 import os
 import glob
 from datetime import datetime
-import numpy as np
 
-# Türkçe karakter desteği için
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
-sns.set_palette("husl")
+from profiling import profiled
 
+
+def _plotting():
+    """Grafik kütüphanelerini ilk kullanımda yükle ve stili ayarla"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Türkçe karakter desteği için
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    sns.set_style("whitegrid")
+    sns.set_palette("husl")
+    return plt
+
+@profiled('csv_load')
 def load_test_data(data_dir='data', test_type='stroop'):
     """Test verilerini yükle"""
+    import pandas as pd
+
+    from session_model import session_id_from_path
+
     csv_files = glob.glob(os.path.join(data_dir, f'{test_type}_*.csv'))
     
     if not csv_files:
@@ -29,6 +41,7 @@ def load_test_data(data_dir='data', test_type='stroop'):
     for file in csv_files:
         try:
             df = pd.read_csv(file)
+            df['session'] = session_id_from_path(file)
             dfs.append(df)
         except Exception as e:
             print(f"Uyarı: {file} yüklenemedi: {e}")
@@ -39,6 +52,7 @@ def load_test_data(data_dir='data', test_type='stroop'):
     data = pd.concat(dfs, ignore_index=True)
     return data
 
+@profiled('aggregation', test='stroop')
 def analyze_stroop_errors(data):
     """Stroop testi hata tiplerini analiz et"""
     if data is None or len(data) == 0:
@@ -88,44 +102,133 @@ def analyze_stroop_errors(data):
         'incorrect_trials': len(incorrect_trials)
     }
 
-def analyze_gonogo_errors(data):
-    """Go/No-Go testi hata tiplerini analiz et"""
+def gonogo_sdt_table(data, by='session'):
+    """Go/No-Go sinyal algılama tablosu: grup (oturum/katılımcı) başına tek satır
+
+    Tüm sayımlar, RT toplamları ve hata sonrası yavaşlama grup kodları üzerinde np.bincount ile
+    tek geçişte hesaplanır. Oranlar log-doğrusal düzeltmeyle ((x + 0.5) / (n + 1)) d′ ve
+    ölçüte (c) çevrilir; bu, isabet oranı 1 olan oturumlarda da sonlu d′ verir (test arayüzü
+    Go denemelerinde zaman aşımı olmadığı için kaçırılan Go kaydı pratikte oluşmaz).
+    Hata sonrası yavaşlama (pes): hatadan sonraki isabetlerin ortalama RT'si - doğru denemeden
+    sonraki isabetlerin ortalama RT'si (aynı grupta, dosya sırasıyla bir önceki deneme).
+    Temizleme (trial_cleaning) sonrası 'keep' sütunu varsa çıkarılan denemeler yalnızca RT
+    ortalamalarından ve pes ölçüm denemelerinden düşer; sayımlar, oranlar ve d′ tüm denemelerden.
+    by: grup sütun(lar)ı; tabloda olmayanlar yok sayılır (hiçbiri yoksa tek grup)
+    """
+    import numpy as np
+    import pandas as pd
+    from scipy.special import ndtri
+
+    from session_model import as_bool
+    from trial_cleaning import group_codes
+
+    keys = [by] if isinstance(by, str) else list(by)
+    keys = [key for key in keys if key in data.columns]
+    codes, n_groups = group_codes([data[key] for key in keys], len(data))
+
+    is_go = as_bool(data['isGo'])
+    correct = as_bool(data['correct'])
+    rt = pd.to_numeric(data['reactionTime'], errors='coerce').to_numpy(dtype=np.float64)
+    hit = is_go & correct
+    false_alarm = ~is_go & ~correct
+    keep = as_bool(data['keep']) if 'keep' in data.columns else np.ones(len(data), dtype=bool)
+    hit_rt = hit & np.isfinite(rt) & keep
+    fa_rt = false_alarm & np.isfinite(rt) & keep
+
+    # Bir önceki deneme (grup içinde, satır sırası korunarak)
+    order = np.argsort(codes, kind='stable')
+    prev = np.full(len(data), -1)
+    same = np.r_[False, codes[order][1:] == codes[order][:-1]]
+    prev[order[same]] = order[np.flatnonzero(same) - 1]
+    has_prev = prev >= 0
+    post_error = hit_rt & has_prev & ~correct[prev]
+    post_correct = hit_rt & has_prev & correct[prev]
+
+    def total(mask, weights=None):
+        w = mask if weights is None else np.where(mask, weights, 0.0)
+        return np.bincount(codes, w, n_groups)
+
+    rt0 = np.nan_to_num(rt)
+    counts = {
+        'n_trials': np.bincount(codes, minlength=n_groups),
+        'n_go': total(is_go), 'n_nogo': total(~is_go),
+        'hits': total(hit), 'misses': total(is_go & ~correct),
+        'false_alarms': total(false_alarm), 'correct_rejections': total(~is_go & correct),
+    }
+    table = pd.DataFrame({name: values.astype(np.int64) for name, values in counts.items()})
+    n_hit_rt, n_fa_rt = total(hit_rt), total(fa_rt)
+    hit_sum = total(hit_rt, rt0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table['hit_rate'] = table['hits'] / table['n_go']
+        table['fa_rate'] = table['false_alarms'] / table['n_nogo']
+        z_hit = ndtri((table['hits'] + 0.5) / (table['n_go'] + 1))
+        z_fa = ndtri((table['false_alarms'] + 0.5) / (table['n_nogo'] + 1))
+        table['d_prime'] = z_hit - z_fa
+        table['criterion'] = -(z_hit + z_fa) / 2
+        table['accuracy'] = (table['hits'] + table['correct_rejections']) / table['n_trials']
+        table['hit_rt_mean'] = hit_sum / n_hit_rt
+        table['hit_rt_sd'] = np.sqrt((total(hit_rt, rt0 ** 2) - hit_sum ** 2 / n_hit_rt) / (n_hit_rt - 1))
+        table['fa_rt_mean'] = total(fa_rt, rt0) / n_fa_rt
+        table['pes'] = total(post_error, rt0) / total(post_error) - total(post_correct, rt0) / total(post_correct)
+    table['hit_rt_sum'] = hit_sum
+    table['n_hit_rt'] = n_hit_rt.astype(np.int64)
+
+    # Grup anahtarları: her grubun ilk satırından
+    present = table['n_trials'].to_numpy() > 0
+    _, first = np.unique(codes, return_index=True)
+    labels = data[keys].iloc[first].reset_index(drop=True) if keys else pd.DataFrame(index=range(len(first)))
+    return pd.concat([labels, table[present].reset_index(drop=True)], axis=1)
+
+
+@profiled('aggregation', test='gonogo')
+def analyze_gonogo_errors(data, by='session'):
+    """Go/No-Go testi hata tiplerini analiz et (sayımlar oturum başına SDT tablosundan türetilir)"""
+    import pandas as pd
+
     if data is None or len(data) == 0:
         return None
     
-    # Hata tipi dağılımı
-    error_counts = data['errorType'].value_counts()
+    sdt = gonogo_sdt_table(data, by=by)
+    totals = sdt[['n_trials', 'n_go', 'n_nogo', 'hits', 'misses', 'false_alarms',
+                  'correct_rejections', 'hit_rt_sum', 'n_hit_rt']].sum()
+    n = totals['n_trials']
     
-    # Hata tiplerine göre analiz
+    # Hata tiplerine göre analiz (tepki verilmeyen denemelerin RT'si yoktur)
+    counts = {
+        'correct': int(totals['hits'] + totals['correct_rejections']),
+        'missed_go': int(totals['misses']),
+        'false_alarm': int(totals['false_alarms']),
+    }
     error_analysis = {}
-    for error_type in ['correct', 'missed_go', 'false_alarm']:
-        error_data = data[data['errorType'] == error_type]
-        if len(error_data) > 0:
+    for error_type, count in counts.items():
+        if count > 0:
             error_analysis[error_type] = {
-                'count': len(error_data),
-                'percentage': len(error_data) / len(data) * 100,
-                'mean_rt': error_data['reactionTime'].mean() if error_type != 'false_alarm' else None
+                'count': count,
+                'percentage': count / n * 100,
+                'mean_rt': totals['hit_rt_sum'] / totals['n_hit_rt']
+                if error_type == 'correct' and totals['n_hit_rt'] > 0 else None
             }
-    
-    # Go ve No-Go denemelerine göre hata dağılımı
-    go_trials = data[data['isGo'] == True]
-    nogo_trials = data[data['isGo'] == False]
-    
-    go_errors = go_trials[go_trials['correct'] == False]
-    nogo_errors = nogo_trials[nogo_trials['correct'] == False]
+    error_counts = pd.Series(counts).sort_values(ascending=False)
+    error_counts = error_counts[error_counts > 0]
     
     return {
         'error_analysis': error_analysis,
         'error_counts': error_counts,
-        'go_errors': len(go_errors),
-        'nogo_errors': len(nogo_errors),
-        'total_trials': len(data),
-        'go_trials': len(go_trials),
-        'nogo_trials': len(nogo_trials)
+        'go_errors': int(totals['misses']),
+        'nogo_errors': int(totals['false_alarms']),
+        'total_trials': int(n),
+        'go_trials': int(totals['n_go']),
+        'nogo_trials': int(totals['n_nogo']),
+        'correct_trials': counts['correct'],
+        'incorrect_trials': int(totals['misses'] + totals['false_alarms']),
+        'sdt': sdt,
     }
 
+@profiled('plotting', test='stroop')
 def visualize_stroop_errors(data, analysis, output_dir='results'):
     """Stroop hata analizini görselleştir"""
+    plt = _plotting()
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
@@ -224,8 +327,11 @@ def visualize_stroop_errors(data, analysis, output_dir='results'):
     
     return output_file
 
+@profiled('plotting', test='gonogo')
 def visualize_gonogo_errors(data, analysis, output_dir='results'):
     """Go/No-Go hata analizini görselleştir"""
+    plt = _plotting()
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
@@ -270,8 +376,9 @@ def visualize_gonogo_errors(data, analysis, output_dir='results'):
     
     # Grafik 3: Hata Tipine Göre RT (sadece Go denemeleri için)
     ax3 = axes[1, 0]
-    go_correct = data[(data['isGo'] == True) & (data['correct'] == True)]
-    go_missed = data[(data['isGo'] == True) & (data['correct'] == False)]
+    rt_data = data[data['keep']] if 'keep' in data.columns else data
+    go_correct = rt_data[(rt_data['isGo'] == True) & (rt_data['correct'] == True)]
+    go_missed = rt_data[(rt_data['isGo'] == True) & (rt_data['correct'] == False)]
     
     if len(go_correct) > 0 or len(go_missed) > 0:
         categories_rt = []
@@ -367,28 +474,48 @@ def print_error_statistics(analysis, test_type='stroop'):
         print(f"\n📊 GO/NO-GO HATA KARŞILAŞTIRMASI:")
         print(f"   Go Denemelerinde Hata: {analysis['go_errors']} / {analysis['go_trials']}")
         print(f"   No-Go Denemelerinde Hata: {analysis['nogo_errors']} / {analysis['nogo_trials']}")
+        
+        sdt = analysis.get('sdt')
+        if sdt is not None and len(sdt):
+            print(f"\n📊 SİNYAL ALGILAMA ({len(sdt)} oturum, medyan):")
+            med = sdt[['hit_rate', 'fa_rate', 'd_prime', 'criterion', 'hit_rt_mean', 'pes']].median()
+            print(f"   İsabet Oranı: {med['hit_rate']:.3f}   Yanlış Alarm Oranı: {med['fa_rate']:.3f}")
+            print(f"   d′: {med['d_prime']:.2f}   Ölçüt (c): {med['criterion']:.2f}")
+            print(f"   İsabet RT: {med['hit_rt_mean']:.1f} ms   Hata Sonrası Yavaşlama: {med['pes']:.1f} ms")
     
     print(f"\n📊 GENEL İSTATİSTİKLER:")
     print(f"   Toplam Deneme: {analysis['total_trials']}")
     print(f"   Doğru Cevap: {analysis['correct_trials'] if 'correct_trials' in analysis else 'N/A'}")
     print(f"   Yanlış Cevap: {analysis['incorrect_trials'] if 'incorrect_trials' in analysis else 'N/A'}")
-    print(f"   Genel Doğruluk: {(analysis['correct_trials'] / analysis['total_trials'] * 100) if 'correct_trials' in analysis and analysis['total_trials'] > 0 else 'N/A':.2f}%")
+    if 'correct_trials' in analysis and analysis['total_trials'] > 0:
+        print(f"   Genel Doğruluk: {analysis['correct_trials'] / analysis['total_trials'] * 100:.2f}%")
+    else:
+        print("   Genel Doğruluk: N/A")
     
     print("="*60)
     print()
 
-def main():
+@profiled('main', script='analyze_errors')
+def main(argv=None):
     """Ana analiz fonksiyonu"""
+    from trial_cleaning import add_cleaning_arguments, clean_from_args
+
+    parser = argparse.ArgumentParser(description='Stroop ve Go/No-Go hata tipi analizi')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--sdt-output', help='Go/No-Go oturum başına SDT tablosu (.csv)')
+    args = add_cleaning_arguments(parser).parse_args(argv)
+
     print("Hata Tipi Analizi Başlatılıyor...")
     
     # Stroop testi analizi
     print("\n" + "="*60)
     print("STROOP TESTİ ANALİZİ")
     print("="*60)
-    stroop_data = load_test_data(test_type='stroop')
+    stroop_data = load_test_data(args.data_dir, test_type='stroop')
     
     if stroop_data is not None and len(stroop_data) > 0:
         print(f"Toplam {len(stroop_data)} Stroop denemesi yüklendi.")
+        stroop_data = clean_from_args(stroop_data, args)
         stroop_analysis = analyze_stroop_errors(stroop_data)
         if stroop_analysis:
             print_error_statistics(stroop_analysis, 'stroop')
@@ -400,13 +527,18 @@ def main():
     print("\n" + "="*60)
     print("GO/NO-GO TESTİ ANALİZİ")
     print("="*60)
-    gonogo_data = load_test_data(test_type='gonogo')
+    gonogo_data = load_test_data(args.data_dir, test_type='gonogo')
     
     if gonogo_data is not None and len(gonogo_data) > 0:
         print(f"Toplam {len(gonogo_data)} Go/No-Go denemesi yüklendi.")
+        # Temizleme yalnızca işaretler: sayımlar ve oranlar tüm denemelerden, RT'ler tutulanlardan
+        clean_from_args(gonogo_data, args)
         gonogo_analysis = analyze_gonogo_errors(gonogo_data)
         if gonogo_analysis:
             print_error_statistics(gonogo_analysis, 'gonogo')
+            if args.sdt_output:
+                gonogo_analysis['sdt'].to_csv(args.sdt_output, index=False)
+                print(f"✓ SDT tablosu kaydedildi: {args.sdt_output}")
             visualize_gonogo_errors(gonogo_data, gonogo_analysis)
     else:
         print("Go/No-Go test verisi bulunamadı veya yeterli değil.")
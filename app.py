@@ -1,7 +1,11 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import csv
+import math
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 import json
 
@@ -13,6 +17,177 @@ DATA_DIR = 'data'
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
+# A session counts as running if a trial arrived within this many seconds
+LIVE_ACTIVE_SECONDS = 120
+# Idle SSE connections get a keep-alive comment this often (seconds)
+LIVE_HEARTBEAT_SECONDS = 15
+# Reaction times outside [0, LIVE_MAX_RT_MS] are left out of the live RT means
+LIVE_MAX_RT_MS = 600000
+# Sessions without a trial for this many seconds are dropped from the live aggregates
+LIVE_SESSION_TTL_SECONDS = 6 * 3600
+
+
+def _as_bool(value):
+    """JSON booleans, 'true'/'false' strings and 1/0 from the test page"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1')
+    return bool(value)
+
+
+class LiveAggregates:
+    """In-memory running aggregates per (testType, sessionId), updated in O(1) per trial
+
+    Each session keeps counters and running RT sums by condition (Stroop: congruent /
+    incongruent, Go/No-Go: go / nogo), so means are sums / counts and nothing is re-read
+    from CSV. Every update bumps a global version; readers block on a condition variable
+    until the version moves and then fetch only the sessions changed since their last version.
+    Sessions are kept in update order, so a snapshot walks back from the newest update and
+    stops at the reader's version, and sessions idle past LIVE_SESSION_TTL_SECONDS are evicted
+    from the old end.
+    """
+
+    def __init__(self):
+        self._sessions = OrderedDict()  # (testType, sessionId) → session, oldest update first
+        self._version = 0
+        self._changed = threading.Condition()
+
+    def _new_session(self, test_type, session_id):
+        return {
+            'sessionId': session_id, 'testType': test_type, 'trials': 0, 'correct': 0,
+            'rt': {}, 'errors': {}, 'started': time.time(), 'lastUpdate': time.time(), 'version': 0,
+        }
+
+    @staticmethod
+    def _condition(test_type, trial):
+        if test_type == 'stroop':
+            return 'congruent' if _as_bool(trial.get('congruent')) else 'incongruent'
+        if test_type == 'gonogo':
+            return 'go' if _as_bool(trial.get('isGo')) else 'nogo'
+        return 'all'
+
+    @staticmethod
+    def _reaction_time(value):
+        """Finite RT in [0, LIVE_MAX_RT_MS] or None (missing or malformed values, e.g. "x", "NaN")"""
+        if isinstance(value, bool):
+            return None
+        try:
+            rt = float(value)
+        except (TypeError, ValueError):
+            return None
+        return rt if math.isfinite(rt) and 0 <= rt <= LIVE_MAX_RT_MS else None
+
+    @classmethod
+    def parse_trial(cls, test_type, trial):
+        """Validate a trial payload into (correct, condition, rt, error type)
+
+        Done before anything is written, so a malformed payload cannot leave a session
+        half-updated or the CSV and the aggregate out of step. Like the offline analyses
+        (pd.to_numeric(errors='coerce')), an unusable RT only drops the trial from the RT means.
+        """
+        correct = _as_bool(trial.get('correct'))
+        error_type = str(trial.get('errorType') or ('correct' if correct else 'error'))
+        rt = cls._reaction_time(trial.get('reactionTime')) if correct else None
+        return correct, cls._condition(test_type, trial), rt, error_type
+
+    @staticmethod
+    def _add(session, entry):
+        correct, condition, rt, error_type = entry
+        session['trials'] += 1
+        session['correct'] += correct
+        session['errors'][error_type] = session['errors'].get(error_type, 0) + 1
+
+        # Running mean RT of correct responses by condition
+        if rt is not None:
+            cell = session['rt'].setdefault(condition, [0.0, 0])
+            cell[0] += rt
+            cell[1] += 1
+
+    def add_trial(self, test_type, session_id, entry):
+        """Fold one parsed trial (parse_trial) into its session aggregate"""
+        with self._changed:
+            key = (test_type, session_id)
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._new_session(test_type, session_id)
+            self._add(session, entry)
+            self._touch(key, session)
+
+    def replace_session(self, test_type, session_id, entries):
+        """Rebuild a session from a complete upload (/api/save-session overwrites the CSV)"""
+        with self._changed:
+            key = (test_type, session_id)
+            session = self._sessions[key] = self._new_session(test_type, session_id)
+            for entry in entries:
+                self._add(session, entry)
+            self._touch(key, session)
+
+    def _touch(self, key, session):
+        self._version += 1
+        session['version'] = self._version
+        session['lastUpdate'] = time.time()
+        self._sessions.move_to_end(key)
+        self._evict(session['lastUpdate'])
+        self._changed.notify_all()
+
+    def _evict(self, now):
+        """Drop sessions idle for LIVE_SESSION_TTL_SECONDS (oldest first; stops at the first live one)"""
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if now - session['lastUpdate'] < LIVE_SESSION_TTL_SECONDS:
+                break
+            del self._sessions[key]
+
+    @staticmethod
+    def _active(session, now):
+        return now - session['lastUpdate'] < LIVE_ACTIVE_SECONDS
+
+    def _summary(self, session, now):
+        rt = {name: {'meanRt': total / n, 'n': n} for name, (total, n) in session['rt'].items()}
+        summary = {
+            'sessionId': session['sessionId'],
+            'testType': session['testType'],
+            'trials': session['trials'],
+            'accuracy': session['correct'] / session['trials'] if session['trials'] else None,
+            'rt': rt,
+            'errors': dict(session['errors']),
+            'lastUpdate': datetime.fromtimestamp(session['lastUpdate']).isoformat(),
+            'active': self._active(session, now),
+        }
+        if 'congruent' in rt and 'incongruent' in rt:
+            summary['stroopEffect'] = rt['incongruent']['meanRt'] - rt['congruent']['meanRt']
+        return summary
+
+    def snapshot(self, since=0, shown_active=None):
+        """(version, summaries of sessions changed after `since`)
+
+        shown_active: keys the reader currently shows as running; those that have since gone
+        idle are included even without new trials. Only the changed sessions and the shown keys
+        are visited, not every session.
+        """
+        with self._changed:
+            now = time.time()
+            self._evict(now)
+            changed = []
+            for key in reversed(self._sessions):
+                if self._sessions[key]['version'] <= since:
+                    break
+                changed.append(key)
+            changed.reverse()
+            if shown_active:
+                seen = set(changed)
+                changed += [key for key in shown_active if key not in seen and key in self._sessions
+                            and not self._active(self._sessions[key], now)]
+            return self._version, [self._summary(self._sessions[key], now) for key in changed]
+
+    def wait(self, since, timeout):
+        """Block until the version moves past `since` (or timeout); returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version > since, timeout=timeout)
+            return self._version
+
+
+live = LiveAggregates()
+
 @app.route('/api/save-trial', methods=['POST'])
 def save_trial():
     """Save a single trial data"""
@@ -24,6 +199,9 @@ def save_trial():
         # Create CSV file path
         csv_file = os.path.join(DATA_DIR, f'{test_type}_{session_id}.csv')
         
+        # Validate for the live view before writing, so the CSV and the aggregate stay in step
+        entry = live.parse_trial(test_type, data)
+        
         # Check if file exists to determine if we need headers
         file_exists = os.path.isfile(csv_file)
         
@@ -84,6 +262,8 @@ def save_trial():
             
             writer.writerow(row)
         
+        live.add_trial(test_type, session_id, entry)
+        
         return jsonify({'success': True, 'message': 'Trial saved'}), 200
     
     except Exception as e:
@@ -104,6 +284,8 @@ def save_session():
         # Create CSV file path
         csv_file = os.path.join(DATA_DIR, f'{test_type}_{session_id}.csv')
         
+        entries = [live.parse_trial(test_type, trial) for trial in trials]
+        
         # Write all trials to CSV
         with open(csv_file, 'w', newline='', encoding='utf-8') as f:
             fieldnames = ['timestamp', 'trial', 'testType', 'word', 'color', 'userAnswer', 
@@ -156,6 +338,8 @@ def save_session():
                 
                 writer.writerow(row)
         
+        live.replace_session(test_type, session_id, entries)
+        
         return jsonify({
             'success': True, 
             'message': 'Session saved',
@@ -198,8 +382,46 @@ def download_csv(filename):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/live/snapshot', methods=['GET'])
+def live_snapshot():
+    """Current aggregates of every session updated within LIVE_SESSION_TTL_SECONDS"""
+    version, sessions = live.snapshot()
+    return jsonify({'success': True, 'version': version, 'sessions': sessions}), 200
+
+@app.route('/api/live', methods=['GET'])
+def live_stream():
+    """Server-Sent Events stream of session aggregates
+
+    The first event carries every session; later events carry only sessions that changed,
+    including sessions that went idle (checked at least every LIVE_HEARTBEAT_SECONDS).
+    """
+    def events():
+        version, shown_active = 0, set()
+        while True:
+            version, sessions = live.snapshot(since=version, shown_active=shown_active)
+            if sessions:
+                for session in sessions:
+                    key = (session['testType'], session['sessionId'])
+                    if session['active']:
+                        shown_active.add(key)
+                    else:
+                        shown_active.discard(key)
+                payload = json.dumps({'version': version, 'sessions': sessions})
+                yield f"event: sessions\nid: {version}\ndata: {payload}\n\n"
+            elif live.wait(version, LIVE_HEARTBEAT_SECONDS) == version:
+                yield ": keep-alive\n\n"
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers=headers)
+
+@app.route('/live', methods=['GET'])
+def live_dashboard():
+    """Supervisor page showing every running session"""
+    return send_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'live_dashboard.html'))
+
 if __name__ == '__main__':
     print("Starting Flask server...")
     print("Data will be saved to:", os.path.abspath(DATA_DIR))
+    print("Live dashboard: http://localhost:5000/live")
     app.run(debug=True, port=5000)
 
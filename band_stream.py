@@ -0,0 +1,351 @@
+"""
+Kayan Pencereli Bant Gücü ve Theta/Beta Akışı
+Uzun oturumlarda bant güçlerini, theta/beta oranını ve alfa tepe frekansını pencere başına
+(örn. 2 s pencere, %50 örtüşme) kanal grupları için hesaplar.
+
+Her pencere, sabit bir ızgaradaki örtüşen alt bölütlerin (Welch bölütleri) ortalamasıdır;
+bir bölütün spektrumu bir kez hesaplanır ve onu içeren tüm pencerelerde yeniden kullanılır.
+Bölüt spektrumları hemen kanal gruplarına indirgenir, böylece bellek kullanımı kayıt
+süresinden bağımsızdır. Aynı motor dosyalar üzerinde (parça parça okuma) ve canlı bir
+kaynaktan gelen bloklarla (push) çalışır; iki yol aynı sonucu verir.
+
+Kötü veri (dosyada bad_* açıklamaları, canlı blokta NaN örnekler) içeren bölütlere dokunan
+pencereler NaN olarak yazılır; pencere zamanları ve sayısı değişmez.
+
+Kullanım:
+    series = band_power_file('data/eeg/sub01_raw.fif', window=2.0, step=1.0)
+    series.save('results/sub01_bandpower.npz')
+
+    stream = BandPowerStream(sfreq, ch_names)
+    for block in source:                     # (kanal, örnek) bloklar
+        for record in stream.push(block):    # tamamlanan pencereler
+            print(record['time'], record['all']['theta_beta'])
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+# extract_features ile aynı bantlar
+BANDS = {
+    'delta': (0.5, 4),
+    'theta': (4, 8),
+    'alpha': (8, 13),
+    'beta': (13, 30),
+    'gamma': (30, 40),
+}
+
+# Bant güçlerinin ardından yazılan türetilmiş metrikler
+DERIVED = ['theta_beta', 'alpha_peak']
+
+
+def default_groups(ch_names):
+    """extract_features'taki kanal seçimleriyle gruplar: tümü, frontal, merkezi, parietal"""
+    eeg = [ch for ch in ch_names if 'EEG' in ch] or list(ch_names)
+    groups = {
+        'all': eeg,
+        'frontal': [ch for ch in eeg if any(x in ch for x in ['Fp', 'Fz', 'F3', 'F4'])],
+        'central': [ch for ch in eeg if any(x in ch for x in ['Cz', 'C3', 'C4'])],
+        'parietal': [ch for ch in eeg if any(x in ch for x in ['Pz', 'P3', 'P4'])],
+    }
+    return {name: chs for name, chs in groups.items() if chs}
+
+
+def _alpha_peak(spectra, freqs, band=(8, 13)):
+    """Alfa bandında en büyük bileşenin frekansı (parabolik ara değerleme ile bin altı)
+
+    spectra: (..., frekans) → (...)
+    """
+    idx = np.flatnonzero((freqs >= band[0]) & (freqs <= band[1]))
+    sub = spectra[..., idx]
+    k = np.argmax(sub, axis=-1)
+    peak = freqs[idx][k]
+    inner = (k > 0) & (k < len(idx) - 1)
+    if inner.any():
+        take = lambda offset: np.take_along_axis(sub, np.clip(k + offset, 0, len(idx) - 1)[..., None], -1)[..., 0]
+        left, center, right = take(-1), take(0), take(1)
+        denom = left - 2 * center + right
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shift = np.where(inner & (denom != 0), 0.5 * (left - right) / denom, 0.0)
+        peak = peak + shift * (freqs[1] - freqs[0])
+    return peak
+
+
+class BandPowerSeries:
+    """Pencere zamanları × grup × metrik (float32) zaman serisi"""
+
+    def __init__(self, times, values, groups, metrics, meta=None):
+        self.times = np.asarray(times, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.groups = list(groups)
+        self.metrics = list(metrics)
+        self.meta = dict(meta or {})
+
+    def __len__(self):
+        return len(self.times)
+
+    def get(self, group, metric):
+        """Tek bir grup/metrik zaman serisi"""
+        return self.values[:, self.groups.index(group), self.metrics.index(metric)]
+
+    def to_dataframe(self):
+        """Geniş tablo: time, <grup>_<metrik> sütunları"""
+        import pandas as pd
+
+        columns = {'time': self.times}
+        for g, group in enumerate(self.groups):
+            for m, metric in enumerate(self.metrics):
+                columns[f'{group}_{metric}'] = self.values[:, g, m]
+        return pd.DataFrame(columns)
+
+    def save(self, path):
+        """Sıkıştırılmış NPZ (zamanlar, değerler, grup/metrik adları, parametreler)"""
+        import json
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, times=self.times, values=self.values,
+                            groups=np.array(self.groups), metrics=np.array(self.metrics),
+                            meta=np.array(json.dumps(self.meta)))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        import json
+
+        with np.load(path) as f:
+            return cls(f['times'], f['values'], f['groups'].tolist(), f['metrics'].tolist(),
+                       json.loads(str(f['meta'])))
+
+    @classmethod
+    def concatenate(cls, parts, groups, metrics, meta=None):
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls(np.empty(0), np.empty((0, len(groups), len(metrics))), groups, metrics, meta)
+        return cls(np.concatenate([p.times for p in parts]),
+                   np.concatenate([p.values for p in parts]), groups, metrics, meta)
+
+
+class BandPowerStream:
+    """Bloklar geldikçe tamamlanan pencerelerin bant güçlerini üreten artımlı motor
+
+    window / step: pencere uzunluğu ve kayması (s)
+    segment: pencere içindeki Welch bölütü (s, varsayılan window/2); bölütler segment/2 kayar
+    Pencere kayması ve (window - segment) bölüt kaymasının katı olmalıdır.
+    """
+
+    def __init__(self, sfreq, ch_names, groups=None, window=2.0, step=1.0, segment=None,
+                 bands=None, fmax=None, dtype=np.float64, start_time=0.0):
+        self.sfreq = float(sfreq)
+        self.ch_names = list(ch_names)
+        self.bands = dict(bands or BANDS)
+        self.groups = groups if groups is not None else default_groups(self.ch_names)
+        self.metrics = list(self.bands) + DERIVED
+        self.dtype = np.dtype(dtype)
+        self.start_time = start_time
+
+        segment = window / 2 if segment is None else segment
+        self.n_seg = int(round(segment * self.sfreq))
+        self.seg_hop = max(1, self.n_seg // 2)
+        win = int(round(window * self.sfreq))
+        step_samples = int(round(step * self.sfreq))
+        if step_samples % self.seg_hop or (win - self.n_seg) % self.seg_hop or win < self.n_seg:
+            raise ValueError(f"Pencere ({window} s) ve kayma ({step} s), bölüt kaymasının "
+                             f"({self.seg_hop / self.sfreq} s) katı olmalı")
+        self.window, self.step = window, step
+        self.segs_per_window = (win - self.n_seg) // self.seg_hop + 1
+        self.segs_per_step = step_samples // self.seg_hop
+
+        # Grup ortalaması için (grup, kanal) ağırlık matrisi
+        missing = [ch for chs in self.groups.values() for ch in chs if ch not in self.ch_names]
+        if missing:
+            raise ValueError(f"Grup kanalları kayıtta yok: {missing}")
+        self.weights = np.zeros((len(self.groups), len(self.ch_names)), dtype=self.dtype)
+        for g, chs in enumerate(self.groups.values()):
+            self.weights[g, [self.ch_names.index(ch) for ch in chs]] = 1.0 / len(chs)
+
+        self.freqs = np.fft.rfftfreq(self.n_seg, 1.0 / self.sfreq)
+        fmax = max(f for _, f in self.bands.values()) if fmax is None else fmax
+        self.freq_mask = self.freqs <= fmax
+        self.freqs = self.freqs[self.freq_mask]
+        self.band_masks = np.array([(self.freqs >= lo) & (self.freqs <= hi)
+                                    for lo, hi in self.bands.values()], dtype=self.dtype)
+        self.band_masks /= self.band_masks.sum(axis=1, keepdims=True)
+
+        self._buffer = np.empty((len(self.ch_names), 0), dtype=self.dtype)
+        self._next_segment = 0        # bir sonraki bölütün küresel indeksi
+        self._segments = []           # henüz kullanılmış olabilecek (grup, frekans) bölüt spektrumları
+        self._bad = []                # bölüt NaN örnek içeriyorsa True (_segments ile hizalı)
+        self._first_segment = 0       # _segments[0]'ın küresel indeksi
+        self._next_window = 0
+
+    def meta(self):
+        return {'sfreq': self.sfreq, 'window': self.window, 'step': self.step,
+                'segment': self.n_seg / self.sfreq, 'bands': self.bands,
+                'groups': self.groups}
+
+    def _segment_spectra(self, data):
+        """Tampondaki tamamlanmış bölütlerin grup spektrumları: (bölüt, grup, frekans)"""
+        from spectral import stft_power
+
+        power, _, _ = stft_power(data, self.sfreq, n_fft=self.n_seg, step=self.seg_hop,
+                                 window='hamming', fmax=self.freqs[-1], dtype=self.dtype)
+        # (kanal, frekans, bölüt) → (bölüt, grup, frekans)
+        return np.einsum('gc,cfs->sgf', self.weights, power, optimize=True)
+
+    def _window_values(self, spectra):
+        """Pencere spektrumlarından (pencere, grup, metrik) değerleri"""
+        bands = spectra @ self.band_masks.T
+        names = list(self.bands)
+        theta, beta = bands[..., names.index('theta')], bands[..., names.index('beta')]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(beta > 0, theta / beta, 0.0)
+        peak = _alpha_peak(spectra, self.freqs, self.bands.get('alpha', (8, 13)))
+        return np.concatenate([bands, ratio[..., None], peak[..., None]], axis=-1)
+
+    def push(self, block):
+        """(kanal, örnek) blok ekle; tamamlanan pencereleri BandPowerSeries olarak döndür"""
+        block = np.asarray(block, dtype=self.dtype)
+        if block.ndim != 2 or block.shape[0] != len(self.ch_names):
+            raise ValueError(f"Blok (kanal={len(self.ch_names)}, örnek) biçiminde olmalı: {block.shape}")
+        self._buffer = np.concatenate([self._buffer, block], axis=1)
+
+        n_new = 0
+        if self._buffer.shape[1] >= self.n_seg:
+            n_new = 1 + (self._buffer.shape[1] - self.n_seg) // self.seg_hop
+            data = self._buffer[:, :(n_new - 1) * self.seg_hop + self.n_seg]
+            # Kötü örnekli bölütler işaretlenir; spektrumları sıfır tutulur ki kümülatif toplam
+            # sonraki pencerelere NaN taşımasın
+            bad_samples = np.isnan(data).any(axis=0)
+            if bad_samples.any():
+                counts = np.r_[0, np.cumsum(bad_samples)]
+                starts = np.arange(n_new) * self.seg_hop
+                bad = counts[starts + self.n_seg] > counts[starts]
+                spectra = self._segment_spectra(np.nan_to_num(data))
+                spectra[bad] = 0
+                self._bad.extend(bad)
+            else:
+                spectra = self._segment_spectra(data)
+                self._bad.extend([False] * n_new)
+            self._segments.extend(spectra)
+            self._next_segment += n_new
+            self._buffer = self._buffer[:, n_new * self.seg_hop:]
+
+        # Tamamlanan pencereler: bölüt toplamları kümülatif toplamla O(1)
+        first = self._next_window * self.segs_per_step
+        n_windows = 0
+        while first + n_windows * self.segs_per_step + self.segs_per_window <= self._next_segment:
+            n_windows += 1
+        if n_windows == 0:
+            return self._empty()
+
+        seg = np.asarray(self._segments)
+        offset = first - self._first_segment
+        csum = np.concatenate([np.zeros((1,) + seg.shape[1:], dtype=seg.dtype), np.cumsum(seg, axis=0)])
+        starts = offset + np.arange(n_windows) * self.segs_per_step
+        spectra = (csum[starts + self.segs_per_window] - csum[starts]) / self.segs_per_window
+        bad_sum = np.r_[0, np.cumsum(self._bad)]
+        bad = bad_sum[starts + self.segs_per_window] > bad_sum[starts]
+
+        win_index = self._next_window + np.arange(n_windows)
+        times = self.start_time + (win_index * self.step + self.window / 2)
+        self._next_window += n_windows
+
+        # Artık hiçbir pencerenin kullanmayacağı bölütleri bırak; kayma pencereden uzunsa sonraki
+        # pencere henüz gelmemiş bölütlerden başlar, o durumda yalnızca eldekiler bırakılır
+        # (_first_segment her zaman _segments[0]'ın küresel indeksi kalır)
+        drop = min(self._next_window * self.segs_per_step - self._first_segment, len(self._segments))
+        self._segments = self._segments[drop:]
+        self._bad = self._bad[drop:]
+        self._first_segment += drop
+        values = self._window_values(spectra)
+        values[bad] = np.nan
+        return BandPowerSeries(times, values, self.groups, self.metrics)
+
+    def _empty(self):
+        return BandPowerSeries(np.empty(0), np.empty((0, len(self.groups), len(self.metrics))),
+                               self.groups, self.metrics)
+
+    def records(self, series):
+        """BandPowerSeries → pencere başına {'time', grup: {metrik: değer}} sözlükleri"""
+        for t, values in zip(series.times, series.values):
+            record = {'time': float(t)}
+            for g, group in enumerate(self.groups):
+                record[group] = {m: float(values[g, i]) for i, m in enumerate(self.metrics)}
+            yield record
+
+    def run(self, blocks):
+        """Canlı kaynak: blok yineleyicisinden tamamlanan pencere kayıtlarını üret"""
+        for block in blocks:
+            yield from self.records(self.push(block))
+
+
+def band_power_timeseries(raw, picks='eeg', chunk_seconds=60.0, reject_by_annotation=True, **kwargs):
+    """Kaydı parça parça okuyarak pencere bazlı bant gücü zaman serisi (tüm kayıt belleğe alınmaz)
+
+    reject_by_annotation: bad_* açıklamalı aralıklara dokunan pencereler NaN olur
+    """
+    import mne
+
+    idx = mne.pick_types(raw.info, **{picks: True}, exclude='bads') if isinstance(picks, str) \
+        else [raw.ch_names.index(ch) for ch in picks]
+    ch_names = [raw.ch_names[i] for i in idx]
+    stream = BandPowerStream(raw.info['sfreq'], ch_names, **kwargs)
+
+    chunk = int(chunk_seconds * raw.info['sfreq'])
+    reject = 'NaN' if reject_by_annotation else None
+    parts = [stream.push(raw.get_data(picks=idx, start=start, stop=min(start + chunk, raw.n_times),
+                                      reject_by_annotation=reject))
+             for start in range(0, raw.n_times, chunk)]
+    return BandPowerSeries.concatenate(parts, stream.groups, stream.metrics, stream.meta())
+
+
+def band_power_file(fname, **kwargs):
+    """FIF dosyası üzerinde (preload olmadan) pencere bazlı bant gücü"""
+    import mne
+
+    raw = mne.io.read_raw_fif(fname, preload=False, verbose=False)
+    return band_power_timeseries(raw, **kwargs)
+
+
+def print_summary(series):
+    print("\n" + "=" * 60)
+    print("PENCERE BAZLI BANT GÜCÜ ÖZETİ")
+    print("=" * 60)
+    n_bad = int(np.isnan(series.values).any(axis=(1, 2)).sum())
+    print(f"{len(series)} pencere ({series.meta.get('window')} s, kayma {series.meta.get('step')} s), "
+          f"{n_bad} pencere kötü veri nedeniyle boş")
+    for group in series.groups:
+        tbr = series.get(group, 'theta_beta')
+        peak = series.get(group, 'alpha_peak')
+        print(f"  {group:<10} theta/beta: ort {np.nanmean(tbr):.3f} (min {np.nanmin(tbr):.3f}, "
+              f"maks {np.nanmax(tbr):.3f}) | alfa tepe: ort {np.nanmean(peak):.2f} Hz")
+
+
+def main(argv=None):
+    """Komut satırı: FIF kaydı → <çıktı>.npz (ve isteğe bağlı CSV)"""
+    parser = argparse.ArgumentParser(description='Kayan pencereli bant gücü ve theta/beta zaman serisi')
+    parser.add_argument('input', help='FIF kaydı')
+    parser.add_argument('--window', type=float, default=2.0, help='Pencere uzunluğu (s)')
+    parser.add_argument('--step', type=float, default=1.0, help='Pencere kayması (s)')
+    parser.add_argument('--segment', type=float, help='Welch bölütü (s, varsayılan pencere/2)')
+    parser.add_argument('--float32', action='store_true', help='float32 hesap (yarı bellek)')
+    parser.add_argument('--output', help='Çıktı .npz (varsayılan: results/<kayıt>_bandpower.npz)')
+    parser.add_argument('--csv', action='store_true', help='Ayrıca CSV olarak yaz')
+    args = parser.parse_args(argv)
+
+    name = os.path.splitext(os.path.basename(args.input))[0]
+    output = args.output or os.path.join('results', f'{name}_bandpower.npz')
+    series = band_power_file(args.input, window=args.window, step=args.step, segment=args.segment,
+                             dtype=np.float32 if args.float32 else np.float64)
+    series.save(output)
+    print_summary(series)
+    print(f"\n✓ Kaydedildi: {output}")
+    if args.csv:
+        csv_path = os.path.splitext(output)[0] + '.csv'
+        series.to_dataframe().to_csv(csv_path, index=False)
+        print(f"✓ Kaydedildi: {csv_path}")
+
+
+if __name__ == '__main__':
+    main()
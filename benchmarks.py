@@ -0,0 +1,586 @@
+"""
+Performans Benchmark Paketi
+Sentetik verilerle uygulamanın sıcak noktalarını ölçer:
+  - app.py deneme kaydı (eşzamanlı istemciler)
+  - CSV yükleme, calculate_stroop_effect, analyze_stroop_errors, analyze_gonogo_errors (1k/100k/10M deneme)
+  - apply_filters, compute_psd (mne ve spectral.py), epoklama, ERP, extract_features
+    (artan kanal sayısı ve süre)
+  - EEGDiagnosticAI model eğitimi/tahmini: çekirdek sayısı × grup boyutu × dtype matrisi
+Sonuçlar makine bilgileriyle birlikte JSON olarak yazılır; compare komutu kayıtlı bir temel
+ölçüme göre gerilemeleri işaretler (gerileme veya hata
+veren benchmark varsa çıkış kodu 1).
+
+Kullanım:
+    python benchmarks.py run --scale quick --output bench/current.json
+    python benchmarks.py run --only csv_load,stroop_effect --trials 1000 100000 10000000
+    python benchmarks.py run --only model_fit,model_predict --cores 1 2 4 8 --batches 1 1000 100000
+    python benchmarks.py compare bench/baseline.json bench/current.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Ölçek ön ayarları: deneme sayıları, kanal sayıları, süreler (s), istemci sayıları,
+# model için çekirdek sayıları ve grup (satır) boyutları
+SCALES = {
+    'quick': {'trials': [1_000, 100_000], 'channels': [16, 64], 'durations': [60, 300],
+              'clients': [1, 4], 'requests': 400, 'cores': [1, 2, 4], 'batches': [1, 1_000, 20_000]},
+    'full': {'trials': [1_000, 100_000, 10_000_000], 'channels': [16, 64, 128],
+             'durations': [60, 600, 1800], 'clients': [1, 4, 16], 'requests': 2000,
+             'cores': [1, 2, 4, 8, 16], 'batches': [1, 100, 10_000, 200_000]},
+}
+
+# Tahmin benchmarkında modelin eğitildiği satır sayısı (tüm grup boyutlarında aynı model)
+MODEL_TRAIN_ROWS = 5_000
+
+# Çok büyük veri setlerinde CSV dosya sayısı sınırı (oturumlar bu kadar dosyaya dağıtılır)
+MAX_CSV_FILES = 200
+
+
+class Metrics(dict):
+    """Bir benchmark çalıştırmasının süre dışı ek ölçüleri (örn. istek/s, gecikme yüzdelikleri)"""
+
+
+# --- Deneme (davranışsal veri) benchmarkları ---
+
+def trials_data(n_trials):
+    """n deneme için Stroop/Go-No-Go tabloları ve CSV klasörü"""
+    from synthetic_data import gonogo_trials, stroop_trials, write_session_csvs
+
+    data = {'stroop': stroop_trials(n_trials, seed=1), 'gonogo': gonogo_trials(n_trials, seed=2)}
+    data['dir'] = tempfile.mkdtemp(prefix='cogl_bench_csv_')
+    write_session_csvs(data['stroop'], data['dir'], max_files=MAX_CSV_FILES)
+    return data
+
+
+def bench_csv_load(data):
+    from analyze_data import load_stroop_data
+    return lambda: load_stroop_data(data['dir'])
+
+
+def bench_stroop_effect(data):
+    from analyze_data import calculate_stroop_effect
+    return lambda: calculate_stroop_effect(data['stroop'])
+
+
+def bench_stroop_errors(data):
+    from analyze_errors import analyze_stroop_errors
+    return lambda: analyze_stroop_errors(data['stroop'])
+
+
+def bench_gonogo_errors(data):
+    from analyze_errors import analyze_gonogo_errors
+    return lambda: analyze_gonogo_errors(data['gonogo'])
+
+
+def bench_trial_cleaning(data):
+    """100 denemelik oturumlarda erken tepki, dikkat kopması ve MAD/SD işaretleri"""
+    from trial_cleaning import flag_trials
+
+    trials = data['stroop'].assign(session=np.arange(len(data['stroop'])) // 100)
+    return lambda: flag_trials(trials, sd_k=3.0)
+
+
+def bench_bootstrap(data):
+    """100 denemelik oturumlarda 100 tabakalı yeniden örneklem (süre deneme × örneklemle doğrusal)"""
+    from bootstrap_ci import bootstrap_stroop
+
+    trials = data['stroop'].assign(session=np.arange(len(data['stroop'])) // 100)
+    return lambda: bootstrap_stroop(trials, n_boot=100, seed=0)
+
+
+def bench_rt_models(data):
+    """100 denemelik katılımcılar × koşullar için ex-Gaussian + EZ-difüzyon uydurma"""
+    from rt_models import fit_rt_models
+
+    trials = data['stroop'].assign(session=np.arange(len(data['stroop'])) // 100)
+    return lambda: fit_rt_models(trials)
+
+
+# --- EEG benchmarkları ---
+
+def eeg_data(n_channels, duration):
+    """Sentetik çok kanallı kayıt ve olayları"""
+    import mne
+    from synthetic_data import synthetic_raw
+
+    mne.set_log_level('WARNING')
+    raw = synthetic_raw(n_channels=n_channels, duration=duration, seed=3)
+    return {'raw': raw, 'events': mne.find_events(raw, stim_channel='STI 014', verbose=False)}
+
+
+def bench_apply_filters(data):
+    from eeg_filtering_analysis import apply_filters
+    return lambda: apply_filters(data['raw'])
+
+
+def bench_compute_psd(data):
+    return lambda: data['raw'].compute_psd(method='welch', fmin=0.5, fmax=40, n_fft=2048,
+                                           n_overlap=512, verbose=False)
+
+
+def bench_spectral_psd(data):
+    from spectral import compute_psd
+    return lambda: compute_psd(data['raw'], fmin=0.5, fmax=40, n_fft=2048, n_overlap=512)
+
+
+def bench_spectral_psd_f32(data):
+    from spectral import compute_psd
+    return lambda: compute_psd(data['raw'], fmin=0.5, fmax=40, n_fft=2048, n_overlap=512,
+                               dtype=np.float32)
+
+
+def bench_band_stream(data):
+    """Canlı akış: 0.5 s bloklar (kayma > pencere); sonuç tek blokluk hesapla aynı olmalı"""
+    import mne
+    from band_stream import BandPowerStream
+
+    raw = data['raw']
+    picks = mne.pick_types(raw.info, eeg=True)
+    signal = raw.get_data(picks=picks)
+    ch_names = [raw.ch_names[i] for i in picks]
+    block = int(0.5 * raw.info['sfreq'])
+    expected = BandPowerStream(raw.info['sfreq'], ch_names, window=2.0, step=3.0).push(signal)
+
+    def run():
+        stream = BandPowerStream(raw.info['sfreq'], ch_names, window=2.0, step=3.0)
+        parts = [stream.push(signal[:, i:i + block]) for i in range(0, signal.shape[1], block)]
+        values = np.concatenate([p.values for p in parts])
+        if values.shape != expected.values.shape or not np.allclose(values, expected.values, rtol=1e-5):
+            raise RuntimeError('Blok boyutu band_stream sonucunu değiştirdi')
+        return values
+    return run
+
+
+def bench_epochs(data):
+    import mne
+    from erp_engine import ODDBALL_EVENTS
+
+    def run():
+        epochs = mne.Epochs(data['raw'], data['events'], ODDBALL_EVENTS, tmin=-0.2, tmax=0.8,
+                            baseline=(None, 0), preload=True, verbose=False)
+        return {cond: epochs[cond].average() for cond in ODDBALL_EVENTS}
+    return run
+
+
+def bench_erp_fast(data):
+    from erp_engine import ODDBALL_EVENTS, compute_erp_fast
+    return lambda: compute_erp_fast(data['raw'], data['events'], ODDBALL_EVENTS)
+
+
+def bench_extract_features(data):
+    from eeg_ai_diagnosis import EEGDiagnosticAI
+
+    ai_system = EEGDiagnosticAI()
+    return lambda: ai_system.extract_features(data['raw'])
+
+
+# --- EEGDiagnosticAI model eğitimi/tahmini ---
+
+def model_data(n_jobs, batch_size, dtype):
+    """Sentetik özellik satırları ve çekirdek/dtype ayarlı, önceden eğitilmiş model"""
+    from eeg_ai_diagnosis import FEATURE_NAMES, SYNTHETIC_PROFILES, EEGDiagnosticAI
+
+    rng = np.random.default_rng(5)
+    n_rows = max(batch_size, MODEL_TRAIN_ROWS)
+    y = rng.integers(0, 2, n_rows)
+    mu, sd = (np.array([[SYNTHETIC_PROFILES[label][name][k] for name in FEATURE_NAMES]
+                        for label in (0, 1)]) for k in (0, 1))
+    X = rng.normal(mu[y], sd[y])
+
+    ai_system = EEGDiagnosticAI(n_jobs=n_jobs, dtype=dtype, blas_threads=n_jobs)
+    ai_system.fit(X[:MODEL_TRAIN_ROWS], y[:MODEL_TRAIN_ROWS])
+    return {'ai': ai_system, 'X': X[:batch_size], 'y': y[:batch_size]}
+
+
+def bench_model_fit(data):
+    """Grup boyutu kadar satırla tam eğitim (ölçekleyici + orman)
+
+    Eğitim bir kopya üzerinde yapılır; paylaşılan önceden eğitilmiş model model_predict için
+    değişmeden kalır.
+    """
+    ai_system = copy.deepcopy(data['ai'])
+    return lambda: ai_system.fit(data['X'], data['y'])
+
+
+def bench_model_predict(data):
+    """Grup boyutu kadar satırın ölçeklenmesi ve sınıf olasılıkları"""
+    return lambda: data['ai'].predict_proba(data['X'])
+
+
+# --- app.py deneme kaydı ---
+
+def app_data(n_clients, n_requests):
+    """Geçici veri klasörüyle arka planda çok iş parçacıklı Flask sunucusu"""
+    import logging
+
+    from werkzeug.serving import make_server
+
+    import app as app_module
+    from synthetic_data import trial_payloads
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    data_dir = tempfile.mkdtemp(prefix='cogl_bench_app_')
+    app_module.DATA_DIR = data_dir
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return {'server': server, 'port': server.server_port, 'dir': data_dir,
+            'clients': n_clients, 'payloads': trial_payloads(n_requests, seed=4), 'round': 0}
+
+
+def bench_app_ingest(data):
+    """Her istemci kendi oturumuna kalıcı bağlantı üzerinden deneme gönderir"""
+    import http.client
+
+    def client(payloads, session_id, latencies):
+        conn = http.client.HTTPConnection('127.0.0.1', data['port'], timeout=30)
+        try:
+            for payload in payloads:
+                body = json.dumps({**payload, 'sessionId': session_id})
+                start = time.perf_counter()
+                conn.request('POST', '/api/save-trial', body, {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                latencies.append(time.perf_counter() - start)
+                if response.status != 200:
+                    raise RuntimeError(f'save-trial HTTP {response.status}')
+        finally:
+            conn.close()
+
+    def run():
+        data['round'] += 1
+        n_clients = data['clients']
+        chunks = [data['payloads'][i::n_clients] for i in range(n_clients)]
+        latencies = [[] for _ in range(n_clients)]
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(chunk, f"bench{data['round']}_{i}", lat))
+                   for i, (chunk, lat) in enumerate(zip(chunks, latencies))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        all_lat = np.concatenate([np.asarray(lat) for lat in latencies]) * 1000
+        if len(all_lat) != len(data['payloads']):
+            raise RuntimeError(f"{len(data['payloads']) - len(all_lat)} istek başarısız")
+        return Metrics(requests_per_s=round(len(all_lat) / elapsed, 1),
+                       latency_p50_ms=round(float(np.percentile(all_lat, 50)), 3),
+                       latency_p95_ms=round(float(np.percentile(all_lat, 95)), 3))
+    return run
+
+
+def _cleanup(data):
+    if 'server' in data:
+        data['server'].shutdown()
+    if 'dir' in data:
+        shutil.rmtree(data['dir'], ignore_errors=True)
+
+
+# Grup → (veri kurulum fonksiyonu, {benchmark adı: kurulum fonksiyonu})
+GROUPS = {
+    'trials': (trials_data, {
+        'csv_load': bench_csv_load,
+        'stroop_effect': bench_stroop_effect,
+        'stroop_errors': bench_stroop_errors,
+        'gonogo_errors': bench_gonogo_errors,
+        'trial_cleaning': bench_trial_cleaning,
+        'bootstrap': bench_bootstrap,
+        'rt_models': bench_rt_models,
+    }),
+    'eeg': (eeg_data, {
+        'apply_filters': bench_apply_filters,
+        'compute_psd': bench_compute_psd,
+        'spectral_psd': bench_spectral_psd,
+        'spectral_psd_f32': bench_spectral_psd_f32,
+        'band_stream': bench_band_stream,
+        'epochs': bench_epochs,
+        'erp_fast': bench_erp_fast,
+        'extract_features': bench_extract_features,
+    }),
+    'app': (app_data, {
+        'app_ingest': bench_app_ingest,
+    }),
+    'model': (model_data, {
+        'model_fit': bench_model_fit,
+        'model_predict': bench_model_predict,
+    }),
+}
+
+
+def _grid(group, config):
+    """Grubun parametre ızgarası"""
+    if group == 'trials':
+        return [{'n_trials': n} for n in config['trials']]
+    if group == 'eeg':
+        return [{'n_channels': c, 'duration': d} for c in config['channels'] for d in config['durations']]
+    if group == 'model':
+        # Makinedeki çekirdek sayısını aşan ayarlar ölçülmez
+        cores = [c for c in config['cores'] if c <= (os.cpu_count() or 1)] or [1]
+        return [{'n_jobs': c, 'batch_size': b, 'dtype': d} for c in cores for b in config['batches']
+                for d in ('float64', 'float32')]
+    return [{'n_clients': c, 'n_requests': config['requests']} for c in config['clients']]
+
+
+def measure(run, repeat):
+    """Çalıştırmayı tekrar et; stdout bastırılır, süre istatistikleri ve ek ölçüler döner"""
+    times, metrics = [], {}
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - start)
+        if isinstance(result, Metrics):
+            metrics = dict(result)
+    return {
+        'repeat': repeat,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.fmean(times),
+        'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0,
+        **({'metrics': metrics} if metrics else {}),
+    }
+
+
+def machine_metadata():
+    """Sonuçların karşılaştırılabilirliği için makine ve kütüphane bilgileri"""
+    from importlib import metadata
+
+    versions = {}
+    for name in ('numpy', 'scipy', 'pandas', 'mne', 'scikit-learn', 'matplotlib', 'flask'):
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+
+    try:
+        memory_gb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 3
+    except (ValueError, OSError, AttributeError):
+        memory_gb = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'memory_gb': None if memory_gb is None else round(memory_gb, 1),
+        'python': platform.python_version(),
+        'git_commit': commit,
+        'versions': versions,
+    }
+
+
+def run_benchmarks(config, only=None, repeat=3, output=None):
+    """Seçilen benchmarkları ızgara üzerinde çalıştır ve sonuçları JSON'a yaz"""
+    results = []
+    print("=" * 60)
+    print("BENCHMARK")
+    print("=" * 60)
+    for group, (make_data, benches) in GROUPS.items():
+        selected = {name: setup for name, setup in benches.items() if not only or name in only}
+        if not selected:
+            continue
+        for params in _grid(group, config):
+            try:
+                data = make_data(*params.values())
+            except Exception as e:
+                # Veri üretimi başarısızsa (eksik bağımlılık, MemoryError) yalnızca bu ızgara
+                # noktasındaki benchmarklar hatalı kaydedilir; çalıştırma ve JSON çıktısı sürer
+                error = f'{type(e).__name__}: {e}'
+                for name in selected:
+                    results.append({'name': name, 'group': group, 'params': params, 'error': error})
+                    print(f"  {name:<18} {_format_params(params):<32} HATA: {error}")
+                continue
+            try:
+                for name, setup in selected.items():
+                    entry = {'name': name, 'group': group, 'params': params}
+                    try:
+                        entry.update(measure(setup(data), repeat))
+                        extra = ''.join(f", {k}={v}" for k, v in entry.get('metrics', {}).items())
+                        print(f"  {name:<18} {_format_params(params):<32} "
+                              f"medyan {entry['median_s'] * 1000:10.2f} ms{extra}")
+                    except Exception as e:
+                        entry['error'] = f'{type(e).__name__}: {e}'
+                        print(f"  {name:<18} {_format_params(params):<32} HATA: {entry['error']}")
+                    results.append(entry)
+            finally:
+                _cleanup(data)
+
+    print_model_matrix(results)
+    report = {'metadata': {**machine_metadata(), 'config': config, 'repeat': repeat},
+              'results': results}
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Sonuçlar kaydedildi: {output}")
+    return report
+
+
+def print_model_matrix(results):
+    """Model benchmarkları için grup boyutu × çekirdek medyan süre tablosu (dağıtım ayarı seçimi)"""
+    entries = [e for e in results if e['group'] == 'model' and 'error' not in e]
+    if not entries:
+        return
+    cores = sorted({e['params']['n_jobs'] for e in entries})
+    for name in sorted({e['name'] for e in entries}):
+        for dtype in ('float64', 'float32'):
+            cells = {(e['params']['batch_size'], e['params']['n_jobs']): e['median_s'] for e in entries
+                     if e['name'] == name and e['params']['dtype'] == dtype}
+            if not cells:
+                continue
+            print(f"\n{name} ({dtype}), medyan ms — satır: grup boyutu, sütun: çekirdek")
+            print(f"{'':>10}" + ''.join(f"{c:>12}" for c in cores))
+            for batch in sorted({b for b, _ in cells}):
+                print(f"{batch:>10}" + ''.join(f"{cells[batch, c] * 1000:12.2f}" if (batch, c) in cells
+                                               else f"{'-':>12}" for c in cores))
+
+
+def _format_params(params):
+    return ', '.join(f'{k}={v}' for k, v in params.items())
+
+
+def _result_key(entry):
+    return entry['name'], json.dumps(entry['params'], sort_keys=True)
+
+
+def compare(baseline, current, threshold=0.10, min_delta=0.001):
+    """Medyan süreleri karşılaştır
+
+    Gerileme: mevcut > temel × (1 + threshold) ve fark min_delta saniyeden büyük.
+    Dönen liste her benchmark için durum içerir: regression, improvement, ok, new, missing, error.
+    Mevcut ölçümde hata veren benchmark 'error' olur; temel kaydı 'missing' olarak tekrarlanmaz.
+    """
+    base = {_result_key(e): e for e in baseline['results'] if 'error' not in e}
+    rows = []
+    for entry in current['results']:
+        key = _result_key(entry)
+        row = {'name': entry['name'], 'params': entry['params']}
+        if 'error' in entry:
+            base.pop(key, None)
+            row.update(status='error', error=entry['error'])
+        elif key not in base:
+            row.update(status='new', current_s=entry['median_s'])
+        else:
+            b, c = base.pop(key)['median_s'], entry['median_s']
+            ratio = c / b if b > 0 else float('inf')
+            if ratio > 1 + threshold and c - b > min_delta:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold) and b - c > min_delta:
+                status = 'improvement'
+            else:
+                status = 'ok'
+            row.update(status=status, baseline_s=b, current_s=c, ratio=ratio)
+        rows.append(row)
+    for entry in base.values():
+        rows.append({'name': entry['name'], 'params': entry['params'], 'status': 'missing'})
+    return rows
+
+
+def print_comparison(rows, baseline, current, threshold):
+    print("=" * 60)
+    print(f"BENCHMARK KARŞILAŞTIRMASI (eşik: %{threshold * 100:.0f})")
+    print("=" * 60)
+    b_meta, c_meta = baseline['metadata'], current['metadata']
+    for field in ('processor', 'cpu_count', 'machine', 'python'):
+        if b_meta.get(field) != c_meta.get(field):
+            print(f"⚠️  Makine farkı ({field}): {b_meta.get(field)} → {c_meta.get(field)}")
+    print(f"Temel: {b_meta.get('git_commit')} ({b_meta.get('timestamp')}), "
+          f"mevcut: {c_meta.get('git_commit')} ({c_meta.get('timestamp')})\n")
+
+    marks = {'regression': '✗', 'improvement': '✓', 'ok': ' ', 'new': '+', 'missing': '-', 'error': '!'}
+    for row in rows:
+        label = f"{row['name']:<18} {_format_params(row['params']):<32}"
+        if 'ratio' in row:
+            print(f"{marks[row['status']]} {label} {row['baseline_s'] * 1000:10.2f} → "
+                  f"{row['current_s'] * 1000:10.2f} ms  ×{row['ratio']:.2f}  {row['status']}")
+        else:
+            print(f"{marks[row['status']]} {label} {row['status']} {row.get('error', '')}")
+
+    n_reg = sum(r['status'] == 'regression' for r in rows)
+    n_err = sum(r['status'] == 'error' for r in rows)
+    print(f"\n{n_reg} gerileme, {sum(r['status'] == 'improvement' for r in rows)} iyileşme, "
+          f"{n_err} hata")
+    # Hata veren benchmarklar da gerileme gibi başarısız çıkış koduna yol açar
+    return n_reg + n_err
+
+
+def main(argv=None):
+    """Komut satırı giriş noktası"""
+    parser = argparse.ArgumentParser(description='Computational Cognitive Lab benchmark paketi')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='Benchmarkları çalıştır')
+    run.add_argument('--scale', choices=sorted(SCALES), default='quick')
+    run.add_argument('--only', help='Virgülle ayrılmış benchmark adları')
+    run.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--trials', type=int, nargs='+', help='Deneme sayıları (ölçeği geçersiz kılar)')
+    run.add_argument('--channels', type=int, nargs='+', help='Kanal sayıları')
+    run.add_argument('--durations', type=int, nargs='+', help='Kayıt süreleri (s)')
+    run.add_argument('--clients', type=int, nargs='+', help='Eşzamanlı istemci sayıları')
+    run.add_argument('--requests', type=int, help='app_ingest için toplam istek sayısı')
+    run.add_argument('--cores', type=int, nargs='+', help='Model benchmarkları için çekirdek sayıları')
+    run.add_argument('--batches', type=int, nargs='+', help='Model benchmarkları için grup (satır) boyutları')
+    run.add_argument('--output', default=os.path.join('bench', 'results.json'))
+
+    cmp = sub.add_parser('compare', help='Sonuçları temel ölçümle karşılaştır')
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=0.10, help='Gerileme eşiği (0.10 = %%10)')
+    cmp.add_argument('--min-delta', type=float, default=0.001, help='Yok sayılan mutlak fark (s)')
+
+    sub.add_parser('list', help='Benchmark adlarını listele')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for group, (_, benches) in GROUPS.items():
+            print(f"{group}: {', '.join(benches)}")
+        return 0
+
+    if args.command == 'run':
+        config = dict(SCALES[args.scale])
+        for key in ('trials', 'channels', 'durations', 'clients', 'requests', 'cores', 'batches'):
+            if getattr(args, key) is not None:
+                config[key] = getattr(args, key)
+        only = set(args.only.split(',')) if args.only else None
+        known = {name for _, benches in GROUPS.values() for name in benches}
+        if only and only - known:
+            parser.error(f"bilinmeyen benchmark: {', '.join(sorted(only - known))}")
+        run_benchmarks(config, only=only, repeat=args.repeat, output=args.output)
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    rows = compare(baseline, current, threshold=args.threshold, min_delta=args.min_delta)
+    return 1 if print_comparison(rows, baseline, current, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
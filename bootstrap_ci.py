@@ -0,0 +1,226 @@
+"""
+Stroop Bootstrap Güven Aralıkları
+Stroop etkisi, doğruluk ve hata tipi oranları için oturum başına ve havuzlanmış yüzdelik
+bootstrap güven aralıkları.
+
+Yeniden örnekleme (oturum × koşul) hücreleri içinde tabakalıdır: her yeniden örneklemde her
+deneme kendi hücresinden yerine koyarak çekilir. Çekimler bloklar halinde (blok × deneme)
+indeks matrisi olarak üretilir; hücre toplamları np.add.reduceat ile matris indirgemesiyle
+alınır. Havuzlanmış istatistik aynı yeniden örneklemlerin oturum toplamlarından (deneme
+düzeyi, calculate_stroop_effect ile aynı tanım) veya pooled='sessions' ile oturumların yeniden
+örneklenmesinden (küme bootstrap, çok terimli ağırlık matrisi × oturum toplamları) hesaplanır.
+
+Her blok SeedSequence(seed) çocuğundan kendi üretecini alır; sonuçlar n_jobs'tan bağımsızdır.
+Maliyet yeniden örneklem × deneme ile doğrusaldır (tek çekirdekte ~16 ns): 2000 denemede
+10.000 yeniden örneklem ~0.3 s, 100k denemede ~16 s / çekirdek.
+
+Kullanım:
+    table = bootstrap_stroop(data, n_boot=10000, seed=0)
+    python bootstrap_ci.py --n-boot 10000 --seed 0 --jobs 4
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+STATISTICS = ('stroop_effect', 'accuracy', 'word_error_rate', 'color_error_rate')
+
+# Hücre başına toplamlar: [doğru RT toplamı, doğru RT sayısı, doğru, kelime hatası, renk hatası, deneme]
+_SUMS = ('rt_sum', 'rt_n', 'correct', 'word_error', 'color_error', 'n')
+
+# Sayımlar tek int64 sütununda 16 bitlik alanlar olarak paketlenir (hücre < 65536 deneme)
+_COUNT_BITS = 16
+
+# Blok başına indeks matrisinin yaklaşık en büyük eleman sayısı (bellek sınırı)
+BLOCK_ELEMENTS = 4_000_000
+
+
+def _trial_columns(data, by='session'):
+    """Hücreye göre sıralı deneme sütunları ve hücre/oturum yapısı"""
+    import pandas as pd
+
+    from session_model import as_bool
+    from trial_cleaning import group_codes
+
+    keys = [by] if isinstance(by, str) else list(by)
+    keys = [key for key in keys if key in data.columns]
+    session = pd.factorize(group_codes([data[key] for key in keys], len(data))[0])[0]
+    n_sessions = session.max() + 1 if len(session) else 0
+    congruent = as_bool(data['congruent'])
+    cell = session * 2 + congruent
+    order = np.argsort(cell, kind='stable')
+    cell = cell[order]
+
+    rt = pd.to_numeric(data['reactionTime'], errors='coerce').to_numpy(dtype=np.float64)[order]
+    correct = as_bool(data['correct'])[order]
+    error_type = np.asarray(data['errorType']).astype(str)[order] if 'errorType' in data.columns \
+        else np.full(len(data), '')
+    rt_ok = correct & np.isfinite(rt)
+    counts = np.column_stack([rt_ok, correct, error_type == 'word_error', error_type == 'color_error'])
+
+    starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])
+    sizes = np.diff(np.r_[starts, len(cell)])
+    if len(sizes) and sizes.max() >= 1 << _COUNT_BITS:
+        raise ValueError(f"Hücre başına en çok {(1 << _COUNT_BITS) - 1} deneme desteklenir")
+    packed = (counts.astype(np.int64) << (_COUNT_BITS * np.arange(counts.shape[1]))).sum(axis=1)
+    first = np.unique(session, return_index=True)[1]
+    labels = data[keys].iloc[first].reset_index(drop=True) if keys else None
+    return np.where(rt_ok, rt, 0.0), packed, starts, sizes, cell[starts], n_sessions, labels
+
+
+def _unpack_sums(rt_sums, packed_sums, sizes):
+    """Hücre toplamları (..., hücre) → (..., hücre, _SUMS)"""
+    mask = (1 << _COUNT_BITS) - 1
+    fields = [(packed_sums >> (_COUNT_BITS * k)) & mask for k in range(4)]
+    return np.stack([rt_sums, *fields, np.broadcast_to(sizes, rt_sums.shape)], axis=-1).astype(np.float64)
+
+
+def _cell_to_session(cell_sums, cells, n_sessions):
+    """(..., hücre, toplam) → (..., oturum, koşul, toplam); eksik hücreler sıfır"""
+    out = np.zeros(cell_sums.shape[:-2] + (n_sessions * 2, cell_sums.shape[-1]))
+    out[..., cells, :] = cell_sums
+    return out.reshape(cell_sums.shape[:-2] + (n_sessions, 2, cell_sums.shape[-1]))
+
+
+def statistics_from_sums(sums):
+    """(..., koşul[uyumsuz=0, uyumlu=1], toplam) → (..., istatistik)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rt_mean = sums[..., 0] / sums[..., 1]
+        total = sums.sum(axis=-2)
+        return np.stack([rt_mean[..., 0] - rt_mean[..., 1],
+                         total[..., 2] / total[..., 5],
+                         total[..., 3] / total[..., 5],
+                         total[..., 4] / total[..., 5]], axis=-1)
+
+
+def _draw_indices(rng, starts, sizes, n_boot):
+    """(n_boot, deneme) indeks matrisi: her konum kendi hücresinden eşit olasılıkla çekilir
+
+    Ham 64 bitlik sayıların üst 32 biti hücre boyutuyla çarpılıp kaydırılır (çarp-kaydır yöntemi);
+    tüm işlemler tek matris üzerinde yerinde yapılır.
+    """
+    n = int(sizes.sum())
+    idx = rng.bit_generator.random_raw(n_boot * n).reshape(n_boot, n)
+    idx >>= np.uint64(32)
+    idx *= np.repeat(sizes, sizes).astype(np.uint64)
+    idx >>= np.uint64(32)
+    idx += np.repeat(starts, sizes).astype(np.uint64)
+    return idx.view(np.int64)
+
+
+def _resample_block(args):
+    """Bir blok yeniden örneklem: (b, oturum, istatistik) ve havuz için (b, koşul, toplam)"""
+    rt, packed, starts, sizes, cells, n_sessions, n_boot, seed = args
+    idx = _draw_indices(np.random.default_rng(seed), starts, sizes, n_boot)
+    sums = _cell_to_session(_unpack_sums(np.add.reduceat(rt[idx], starts, axis=1),
+                                         np.add.reduceat(packed[idx], starts, axis=1), sizes),
+                            cells, n_sessions)
+    return statistics_from_sums(sums), sums.sum(axis=1)
+
+
+def bootstrap_stroop(data, n_boot=10_000, seed=None, by='session', alpha=0.05, pooled='trials',
+                     n_jobs=1, block_size=None):
+    """Oturum başına ve havuzlanmış bootstrap güven aralıkları tablosu
+
+    data: Stroop denemeleri (app.py CSV şeması; temizlemeden sonra tutulan denemeler)
+    pooled: 'trials' (deneme düzeyi havuz) veya 'sessions' (oturumları yeniden örnekleyen küme bootstrap)
+    Dönen tablo: oturum (havuz için 'pooled'), istatistik, estimate, ci_low, ci_high, se, n_boot
+    """
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+
+    from profiling import stage
+
+    rt, packed, starts, sizes, cells, n_sessions, labels = _trial_columns(data, by=by)
+    if len(rt) == 0:
+        raise ValueError("Bootstrap için deneme yok")
+    observed = _cell_to_session(_unpack_sums(np.add.reduceat(rt, starts), np.add.reduceat(packed, starts), sizes),
+                                cells, n_sessions)
+
+    block_size = block_size or max(1, min(n_boot, BLOCK_ELEMENTS // len(rt)))
+    blocks = [min(block_size, n_boot - i) for i in range(0, n_boot, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks) + 1)
+    tasks = [(rt, packed, starts, sizes, cells, n_sessions, b, s) for b, s in zip(blocks, seeds)]
+
+    with stage('bootstrap', fields={'resamples': n_boot, 'trials': len(rt), 'jobs': n_jobs}):
+        n_workers = min(n_jobs or os.cpu_count() or 1, len(tasks))
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                parts = list(executor.map(_resample_block, tasks))
+        else:
+            parts = [_resample_block(task) for task in tasks]
+        session_boot = np.concatenate([part[0] for part in parts])
+        if pooled == 'sessions':
+            rng = np.random.default_rng(seeds[-1])
+            weights = rng.multinomial(n_sessions, np.full(n_sessions, 1 / n_sessions), size=n_boot)
+            pooled_sums = np.einsum('bs,sck->bck', weights.astype(np.float64), observed)
+        else:
+            pooled_sums = np.concatenate([part[1] for part in parts])
+        pooled_boot = statistics_from_sums(pooled_sums)
+
+    estimates = np.vstack([statistics_from_sums(observed), statistics_from_sums(observed.sum(axis=0))[None]])
+    samples = np.concatenate([session_boot, pooled_boot[:, None]], axis=1)
+    with np.errstate(invalid='ignore'):
+        low, high = np.nanpercentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+        se = np.nanstd(samples, axis=0, ddof=1)
+
+    names = (labels.astype(str).agg('/'.join, axis=1).tolist() if labels is not None else ['all'] * n_sessions) \
+        + ['pooled']
+    table = pd.DataFrame({
+        'session': np.repeat(names, len(STATISTICS)),
+        'statistic': np.tile(STATISTICS, n_sessions + 1),
+        'estimate': estimates.ravel(), 'ci_low': low.ravel(), 'ci_high': high.ravel(),
+        'se': se.ravel(), 'n_boot': n_boot,
+    })
+    return table
+
+
+def print_bootstrap_summary(table, alpha=0.05):
+    """Havuzlanmış aralıklar ve oturum aralıklarının özeti"""
+    print("\n" + "=" * 60)
+    print(f"BOOTSTRAP GÜVEN ARALIKLARI (%{100 * (1 - alpha):.0f}, {int(table['n_boot'].iloc[0])} yeniden örneklem)")
+    print("=" * 60)
+    labels = {'stroop_effect': ('Stroop Etkisi', 'ms', 1), 'accuracy': ('Doğruluk', '%', 100),
+              'word_error_rate': ('Kelime Hatası Oranı', '%', 100), 'color_error_rate': ('Renk Hatası Oranı', '%', 100)}
+    pooled = table[table['session'] == 'pooled'].set_index('statistic')
+    for stat, (label, unit, scale) in labels.items():
+        row = pooled.loc[stat]
+        print(f"   {label:<22}{row['estimate'] * scale:9.2f} {unit:<3}"
+              f"[{row['ci_low'] * scale:.2f}, {row['ci_high'] * scale:.2f}]")
+
+    effect = table[(table['session'] != 'pooled') & (table['statistic'] == 'stroop_effect')]
+    if len(effect):
+        excludes_zero = ((effect['ci_low'] > 0) | (effect['ci_high'] < 0)).sum()
+        print(f"\n   Oturum: {len(effect)}, Stroop etkisi aralığı sıfırı dışlayan: {excludes_zero}")
+
+
+def main(argv=None):
+    """Komut satırı: Stroop CSV'leri için bootstrap güven aralıkları"""
+    from analyze_data import load_stroop_data
+    from trial_cleaning import add_cleaning_arguments, clean_from_args
+
+    parser = argparse.ArgumentParser(description='Stroop etkisi, doğruluk ve hata oranları için bootstrap GA')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--n-boot', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--pooled', choices=['trials', 'sessions'], default='trials')
+    parser.add_argument('--jobs', type=int, default=1, help='Süreç sayısı (-1: tüm çekirdekler)')
+    parser.add_argument('--output', help='Tablo (.csv)')
+    args = add_cleaning_arguments(parser).parse_args(argv)
+
+    data = load_stroop_data(args.data_dir)
+    if data is None:
+        return
+    data = clean_from_args(data, args)
+    table = bootstrap_stroop(data, n_boot=args.n_boot, seed=args.seed, alpha=args.alpha, pooled=args.pooled,
+                             n_jobs=None if args.jobs == -1 else args.jobs)
+    print_bootstrap_summary(table, alpha=args.alpha)
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"\n✓ Tablo kaydedildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Computational Cognitive Lab - Tek Komut Satırı Arayüzü
+Mevcut analiz scriptlerinin main() fonksiyonlarını alt komutlar olarak sunar.
+Analiz modülü yalnızca seçilen alt komut çalışırken yüklenir; mne, matplotlib, seaborn,
+pandas ve sklearn gibi ağır kütüphaneler `cogl --help` veya başka bir alt komut için yüklenmez.
+
+Kullanım:
+    python cogl.py stroop
+    python cogl.py errors
+    python cogl.py erp-batch "data/eeg/*.fif" --jobs 4
+    python cogl.py bench-imports --repeat 5
+    python cogl.py bench run --scale quick --output bench/current.json
+"""
+
+import argparse
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Alt komut → (modül, giriş fonksiyonu, açıklama)
+COMMANDS = {
+    'stroop': ('analyze_data', 'main', 'Stroop etkisi analizi ve grafikleri'),
+    'errors': ('analyze_errors', 'main', 'Stroop ve Go/No-Go hata tipi analizi'),
+    'filter': ('eeg_filtering_analysis', 'main', 'EEG filtreleme karşılaştırması'),
+    'erp': ('eeg_epoching_erp', 'main', 'Oddball epoklama, ERP ve P300 analizi'),
+    'diagnose': ('eeg_ai_diagnosis', 'main', 'Yapay zeka destekli EEG teşhis demosu'),
+    'eeg-example': ('eeg_analysis_example', 'main', 'Örnek EEG analizleri'),
+    'erp-batch': ('erp_batch', 'main', 'Çok denekli toplu ERP analizi'),
+    'band-stream': ('band_stream', 'main', 'Kayan pencereli bant gücü ve theta/beta zaman serisi'),
+    'bench': ('benchmarks', 'main', 'Sentetik veriyle performans benchmarkları ve karşılaştırma'),
+    'session': ('session_model', 'main', 'Davranışsal denemeleri EEG epoklarıyla eşleyen oturum modeli'),
+    'history': ('trial_history', 'main', 'Gratton etkisi, hata sonrası yavaşlama ve RT otokorelasyonu'),
+    'bootstrap': ('bootstrap_ci', 'main', 'Stroop etkisi, doğruluk ve hata oranları için bootstrap güven aralıkları'),
+    'rt-models': ('rt_models', 'main', 'Katılımcı × koşul başına ex-Gaussian ve EZ-difüzyon RT modelleri'),
+}
+
+# Kendi argümanlarını ayrıştıran alt komutlar (kalan argümanlar olduğu gibi iletilir)
+FORWARD_ARGS = {'stroop', 'errors', 'filter', 'erp', 'diagnose', 'erp-batch', 'band-stream', 'bench', 'session', 'history', 'bootstrap', 'rt-models'}
+
+
+def run_command(name, argv=()):
+    """Alt komutun modülünü şimdi yükle ve giriş fonksiyonunu çağır"""
+    module_name, func_name, _ = COMMANDS[name]
+    entry = getattr(importlib.import_module(module_name), func_name)
+    if name in FORWARD_ARGS:
+        return entry(list(argv))
+    return entry()
+
+
+def _cold_import_time(module_name, python=sys.executable):
+    """Yeni bir yorumlayıcıda modül içe aktarma süresini ölç (saniye)"""
+    code = ('import time; t = time.perf_counter(); '
+            f'import {module_name}; print(time.perf_counter() - t)') if module_name else 'print(0.0)'
+    start = time.perf_counter()
+    out = subprocess.run([python, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    total = time.perf_counter() - start
+    return float(out.stdout.strip().splitlines()[-1]), total
+
+
+def bench_imports(names=None, repeat=3):
+    """Her alt komut için soğuk başlangıç süresini ölç
+
+    import: yalnızca modülün içe aktarılması; startup: yorumlayıcı açılışı dahil toplam süre.
+    Ölçüler medyandır; ilk çalıştırma disk önbelleğini ısıtmak için atılır.
+    """
+    names = list(COMMANDS) if not names else names
+    targets = [('(python)', None)] + [(n, COMMANDS[n][0]) for n in names]
+
+    results = []
+    for name, module_name in targets:
+        _cold_import_time(module_name)
+        samples = [_cold_import_time(module_name) for _ in range(repeat)]
+        results.append({
+            'command': name,
+            'module': module_name or '-',
+            'import_s': statistics.median(s[0] for s in samples),
+            'startup_s': statistics.median(s[1] for s in samples),
+        })
+
+    print("=" * 60)
+    print(f"ALT KOMUT SOĞUK BAŞLANGIÇ SÜRELERİ (medyan, {repeat} tekrar)")
+    print("=" * 60)
+    print(f"{'Komut':<14} {'Modül':<24} {'import (s)':>10} {'toplam (s)':>11}")
+    for row in results:
+        print(f"{row['command']:<14} {row['module']:<24} {row['import_s']:>10.3f} {row['startup_s']:>11.3f}")
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cogl', description='Computational Cognitive Lab analiz araçları')
+    sub = parser.add_subparsers(dest='command', metavar='KOMUT')
+    sub.required = True
+
+    for name, (_, _, help_text) in COMMANDS.items():
+        sub.add_parser(name, help=help_text, add_help=name not in FORWARD_ARGS)
+
+    bench = sub.add_parser('bench-imports', help='Alt komutların soğuk başlangıç sürelerini ölç')
+    bench.add_argument('names', nargs='*', metavar='KOMUT',
+                       help='Ölçülecek alt komutlar (varsayılan: tümü)')
+    bench.add_argument('--repeat', type=int, default=3, help='Tekrar sayısı (varsayılan: 3)')
+    return parser
+
+
+def main(argv=None):
+    """Komut satırı giriş noktası"""
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if rest and args.command not in FORWARD_ARGS:
+        parser.error(f"tanınmayan argümanlar: {' '.join(rest)}")
+    if args.command == 'bench-imports':
+        unknown = [n for n in args.names if n not in COMMANDS]
+        if unknown:
+            parser.error(f"bilinmeyen alt komut: {', '.join(unknown)}")
+        bench_imports(args.names, repeat=args.repeat)
+        return 0
+    # Alt komutun çıkış kodu iletilir (ör. `bench compare` gerilemede, headless analizler
+    # başarısız analizde 1); yalnızca None (etkileşimli menüler) başarı sayılır
+    status = run_command(args.command, rest)
+    return 0 if status is None else status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
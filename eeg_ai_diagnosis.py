@@ -6,32 +6,196 @@ DEHB (Dikkat Eksikliği ve Hiperaktivite Bozukluğu) Teşhisi
 Gerçek tıbbi teşhis için kullanılamaz!
 """
 
+import contextlib
 import mne
 import os
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
 import warnings
+from profiling import profiled, stage, unpack_worker, worker_call
+from spectral import compute_psd
 warnings.filterwarnings('ignore')
 
-# Türkçe karakter desteği
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
+# sklearn, matplotlib ve seaborn kullanıldıkları metotlarda yüklenir (hızlı açılış)
+
+# Özellik isimleri (model girdisinin sütun sırası)
+FEATURE_NAMES = [
+    'power_delta', 'power_theta', 'power_alpha', 'power_beta', 'power_gamma',
+    'theta_beta_ratio', 'alpha_peak_freq', 'total_power',
+    'frontal_alpha', 'central_beta', 'parietal_alpha',
+    'signal_variance', 'signal_mean', 'frontal_asymmetry'
+]
+
+# Özellik tanımları değiştiğinde artırılır; özellik deposu eski sürümün satırlarını kullanmaz
+FEATURE_SET_VERSION = 'v1'
+
+# Sentetik veri dağılımları: etiket → {özellik: (ortalama, standart sapma)}
+SYNTHETIC_PROFILES = {
+    # Sağlıklı kontrol grubu: normal EEG özellikleri
+    0: {
+        'power_delta': (2.5, 0.5),
+        'power_theta': (3.0, 0.6),
+        'power_alpha': (4.5, 0.8),
+        'power_beta': (3.5, 0.7),
+        'power_gamma': (2.0, 0.4),
+        'theta_beta_ratio': (0.85, 0.15),  # Normal oran
+        'alpha_peak_freq': (10.5, 1.0),
+        'total_power': (15.5, 2.0),
+        'frontal_alpha': (4.0, 0.7),
+        'central_beta': (3.2, 0.6),
+        'parietal_alpha': (5.0, 0.9),
+        'signal_variance': (0.5, 0.1),
+        'signal_mean': (2.0, 0.3),
+        'frontal_asymmetry': (0.0, 0.1),  # Simetrik
+    },
+    # DEHB grubu: karakteristik özellikler
+    1: {
+        'power_delta': (2.8, 0.6),
+        'power_theta': (4.5, 0.8),  # Artmış theta
+        'power_alpha': (3.5, 0.7),  # Azalmış alpha
+        'power_beta': (2.8, 0.6),  # Azalmış beta
+        'power_gamma': (2.2, 0.5),
+        'theta_beta_ratio': (1.6, 0.3),  # Yüksek oran (DEHB işareti)
+        'alpha_peak_freq': (9.5, 1.2),  # Düşük peak
+        'total_power': (16.8, 2.5),
+        'frontal_alpha': (3.0, 0.6),  # Azalmış
+        'central_beta': (2.5, 0.5),  # Azalmış
+        'parietal_alpha': (4.0, 0.8),
+        'signal_variance': (0.7, 0.15),  # Artmış değişkenlik
+        'signal_mean': (2.3, 0.4),
+        'frontal_asymmetry': (0.15, 0.2),  # Asimetri
+    },
+}
+
+def aggregate_probabilities(probabilities, groups):
+    """Epok olasılıklarını denek başına ortalama (olasılık ortalaması ile birleştirme)
+
+    Dönen değer: (denekler, (denek × sınıf) ortalama olasılıklar)
+    """
+    subjects, inverse = np.unique(groups, return_inverse=True)
+    sums = np.zeros((len(subjects), probabilities.shape[1]))
+    np.add.at(sums, inverse, probabilities)
+    return subjects, sums / np.bincount(inverse)[:, np.newaxis]
+
+
+# BLAS/OpenMP iş parçacığı sayısını belirleyen ortam değişkenleri
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+
+def pin_threads(n_threads=1):
+    """Bu süreçte BLAS/OpenMP iş parçacıklarını sınırla (süreç havuzunda aşırı abonelik olmasın)
+
+    Zaten yüklenmiş kütüphaneler threadpoolctl ile, bu süreçten başlatılacak süreçler ortam
+    değişkenleriyle sınırlanır. Süreç havuzlarında initializer olarak kullanılır.
+    """
+    from threadpoolctl import threadpool_limits
+
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(n_threads)
+    return threadpool_limits(limits=n_threads)
+
+
+def default_model(n_jobs=None):
+    """Tam eğitimde kullanılan sınıflandırıcı"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10, n_jobs=n_jobs)
+
+
+def rescale_forest(forest, old_mean, old_scale, new_mean, new_scale):
+    """Ağaç eşiklerini eski ölçekten yeni ölçeğe taşı (yerinde)
+
+    Ölçekleyici güncellendiğinde eski ağaçlar ham özellik uzayında aynı kararları vermeye devam
+    eder: eşik → ham değer (eski ölçek) → yeni ölçek.
+    """
+    for tree in forest.estimators_:
+        nodes = tree.tree_
+        internal = nodes.feature >= 0
+        feature = nodes.feature[internal]
+        raw = nodes.threshold[internal] * old_scale[feature] + old_mean[feature]
+        nodes.threshold[internal] = (raw - new_mean[feature]) / new_scale[feature]
+
+
+def open_feature_store(root=None):
+    """EEGDiagnosticAI özellik seti için kalıcı özellik deposu"""
+    from feature_store import DEFAULT_STORE_DIR, FeatureStore
+
+    return FeatureStore(root or DEFAULT_STORE_DIR, FEATURE_NAMES, version=FEATURE_SET_VERSION)
+
+
+def raw_fingerprint(raw):
+    """Dosyası olmayan kayıtlar için içerik özeti (veri, örnekleme frekansı, kanal adları)"""
+    import hashlib
+
+    digest = hashlib.sha256()
+    digest.update(repr((raw.info['sfreq'], raw.ch_names, raw.info['bads'])).encode('utf-8'))
+    digest.update(np.ascontiguousarray(raw.get_data()).tobytes())
+    return digest.hexdigest()
+
+
+# İşçi süreçte bir kez kurulan özellik çıkarıcı (store_features_many)
+_WORKER_STATE = {}
+
+
+def _init_extract_worker(threads_per_job, epoch_length, overlap):
+    """İşçi başlangıcı: BLAS/OpenMP iş parçacıklarını sabitle, çıkarıcıyı hazırla"""
+    _WORKER_STATE.update(limits=pin_threads(threads_per_job), epoch_length=epoch_length,
+                         overlap=overlap, ai=EEGDiagnosticAI())
+
+
+def _extract_file(fname):
+    """Tek dosyanın özellik satırları (işçi süreçte; ilerleme çıktısı bastırılır)"""
+    import io
+
+    state = _WORKER_STATE
+    with contextlib.redirect_stdout(io.StringIO()):
+        return state['ai'].feature_rows(fname=fname, epoch_length=state['epoch_length'],
+                                        overlap=state['overlap'])
+
 
 class EEGDiagnosticAI:
-    """EEG Teşhis Yapay Zekası"""
+    """EEG Teşhis Yapay Zekası
+
+    Performans ayarları:
+        n_jobs: model eğitimi ve tahmininde iş parçacığı sayısı (None: 1, -1: tüm çekirdekler)
+        dtype: özelliklerin ölçekleme/model dtype'ı; np.float32 ormanın her çağrıda yaptığı
+            float32 kopyasını ve bellek kullanımını ortadan kaldırır
+        blas_threads: eğitim/tahmin süresince BLAS/OpenMP iş parçacığı sınırı (None: dokunulmaz)
+    """
     
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
+    def __init__(self, n_jobs=None, dtype=np.float64, blas_threads=None):
+        from sklearn.preprocessing import StandardScaler
+
+        self.n_jobs = n_jobs
+        self.dtype = np.dtype(dtype)
+        self.blas_threads = blas_threads
+        self.model = default_model(n_jobs)
         self.scaler = StandardScaler()
         self.is_trained = False
         self.feature_names = []
-        
+        # Artımlı eğitim durumu: tek sınıflı gruplar bekletilir, depo imleci kayıt sayısıdır
+        self.pending = None
+        self.store_cursor = {}
+
+    def threads(self):
+        """Eğitim/tahmin süresince BLAS/OpenMP sınırı (blas_threads verilmediyse etkisiz)"""
+        if self.blas_threads is None:
+            return contextlib.nullcontext()
+        from threadpoolctl import threadpool_limits
+
+        return threadpool_limits(limits=self.blas_threads)
+
+    def scale(self, X, fit=False):
+        """Özellikleri yapılandırılan dtype'a çevirip ölçekle (fit=True: ölçekleyiciyi de öğren)"""
+        X = np.asarray(X, dtype=self.dtype)
+        return self.scaler.fit_transform(X) if fit else self.scaler.transform(X)
+
+    def predict_proba(self, X):
+        """Ham özellik satırları için sınıf olasılıkları"""
+        with self.threads():
+            return self.model.predict_proba(self.scale(X))
+
+    @profiled('feature_extraction')
     def extract_features(self, raw):
         """EEG verisinden özellikler çıkar"""
         print("  → Özellikler çıkarılıyor...")
@@ -48,7 +212,8 @@ class EEGDiagnosticAI:
         }
         
         # Güç spektral yoğunluğu hesapla
-        spectrum = raw.compute_psd(fmin=0.5, fmax=40, method='welch', 
+        with stage('psd'):
+            spectrum = compute_psd(raw, fmin=0.5, fmax=40, method='welch',
                                    n_fft=2048, n_overlap=512)
         
         # Her frekans bandı için ortalama güç
@@ -89,22 +254,19 @@ class EEGDiagnosticAI:
             
             try:
                 if frontal_chs:
-                    frontal_spectrum = spectrum.copy().pick(frontal_chs[:3])
-                    features['frontal_alpha'] = frontal_spectrum.get_data(fmin=8, fmax=13).mean()
+                    features['frontal_alpha'] = spectrum.get_data(picks=frontal_chs[:3], fmin=8, fmax=13).mean()
             except:
                 features['frontal_alpha'] = features['power_alpha'] * 0.8  # Fallback
             
             try:
                 if central_chs:
-                    central_spectrum = spectrum.copy().pick(central_chs[:3])
-                    features['central_beta'] = central_spectrum.get_data(fmin=13, fmax=30).mean()
+                    features['central_beta'] = spectrum.get_data(picks=central_chs[:3], fmin=13, fmax=30).mean()
             except:
                 features['central_beta'] = features['power_beta'] * 0.8  # Fallback
             
             try:
                 if parietal_chs:
-                    parietal_spectrum = spectrum.copy().pick(parietal_chs[:3])
-                    features['parietal_alpha'] = parietal_spectrum.get_data(fmin=8, fmax=13).mean()
+                    features['parietal_alpha'] = spectrum.get_data(picks=parietal_chs[:3], fmin=8, fmax=13).mean()
             except:
                 features['parietal_alpha'] = features['power_alpha'] * 0.9  # Fallback
         
@@ -120,16 +282,101 @@ class EEGDiagnosticAI:
             right_chs = [ch for ch in eeg_channels if '4' in ch or 'Fp2' in ch]
             if left_chs and right_chs:
                 try:
-                    left_spectrum = spectrum.copy().pick(left_chs[:2])
-                    right_spectrum = spectrum.copy().pick(right_chs[:2])
-                    left_alpha = left_spectrum.get_data(fmin=8, fmax=13).mean()
-                    right_alpha = right_spectrum.get_data(fmin=8, fmax=13).mean()
+                    left_alpha = spectrum.get_data(picks=left_chs[:2], fmin=8, fmax=13).mean()
+                    right_alpha = spectrum.get_data(picks=right_chs[:2], fmin=8, fmax=13).mean()
                     features['frontal_asymmetry'] = (right_alpha - left_alpha) / (right_alpha + left_alpha + 1e-10)
                 except:
                     features['frontal_asymmetry'] = 0.0  # Fallback
         
         return features
     
+    @profiled('feature_extraction', level='epoch')
+    def extract_epoch_features(self, raw, epoch_length=4.0, overlap=0.0, n_fft=2048, n_overlap=512):
+        """Kaydı sabit uzunluklu epoklara bölüp tüm epokların özelliklerini tek seferde çıkar
+
+        Özellikler extract_features ile aynı tanımlıdır (tek epok tüm kaydı kapsarsa aynı sonuç).
+        Tüm epokların spektrumları tek bir toplu Welch çağrısıyla hesaplanır; 'bad' açıklamalı
+        bölümlerle örtüşen epoklar atlanır.
+        Dönen değer: ((epok × özellik) matris, FEATURE_NAMES sırasında; epok başlangıçları (s))
+        """
+        from spectral import welch_psd
+
+        sfreq = raw.info['sfreq']
+        length = int(round(epoch_length * sfreq))
+        step = length - int(round(overlap * sfreq))
+        if step <= 0:
+            raise ValueError("overlap epok uzunluğundan küçük olmalı")
+
+        # Tüm kanallar (signal_variance / signal_mean extract_features'ta da tüm kanallardan)
+        data = raw.get_data(reject_by_annotation='NaN')
+        if data.shape[1] < length:
+            raise ValueError(f"Kayıt ({raw.times[-1]:.1f} s) bir epoktan kısa ({epoch_length} s)")
+        starts = np.arange(0, data.shape[1] - length + 1, step)
+        bad_cum = np.r_[0, np.cumsum(np.isnan(data[0]))]
+        starts = starts[bad_cum[starts + length] == bad_cum[starts]]
+        if len(starts) == 0:
+            raise ValueError("'bad' açıklamalarıyla örtüşmeyen epok yok")
+        epochs = np.lib.stride_tricks.sliding_window_view(data, length, axis=1)[:, starts]
+
+        # Spektrum: 'bad' olmayan veri kanalları, (kanal × epok) satırlar tek çağrıda
+        picks = mne.pick_types(raw.info, meg=True, eeg=True, seeg=True, ecog=True, dbs=True,
+                               fnirs=True, exclude='bads')
+        ch_names = [raw.ch_names[i] for i in picks]
+        n_fft = min(n_fft, length)
+        psd, freqs = welch_psd(epochs[picks].reshape(-1, length), sfreq, fmin=0.5, fmax=40,
+                               n_fft=n_fft, n_overlap=min(n_overlap, n_fft // 2))
+        psd = psd.reshape(len(picks), len(starts), -1)
+
+        def band(fmin, fmax, channels=None):
+            rows = psd if channels is None else psd[[ch_names.index(ch) for ch in channels]]
+            return rows[:, :, (freqs >= fmin) & (freqs <= fmax)].mean(axis=(0, 2))
+
+        features = {}
+        bands = {'delta': (0.5, 4), 'theta': (4, 8), 'alpha': (8, 13), 'beta': (13, 30), 'gamma': (30, 40)}
+        for band_name, (fmin, fmax) in bands.items():
+            features[f'power_{band_name}'] = band(fmin, fmax)
+        theta, beta = features['power_theta'], features['power_beta']
+        features['theta_beta_ratio'] = np.divide(theta, beta, out=np.zeros_like(theta), where=beta > 0)
+
+        alpha_mask = (freqs >= 8) & (freqs <= 13)
+        if alpha_mask.any():
+            alpha_idx = np.argmax(psd[:, :, alpha_mask].mean(axis=0), axis=1)
+            features['alpha_peak_freq'] = freqs[alpha_mask][alpha_idx]
+        else:
+            features['alpha_peak_freq'] = np.full(len(starts), 10.5)  # Varsayılan
+        features['total_power'] = band(0.5, 40)
+
+        # Bölgesel özellikler: extract_features'taki kanal seçimleri ('bad' kanallar hariç)
+        eeg_channels = [ch for ch in raw.ch_names if 'EEG' in ch]
+        good = lambda chs: [ch for ch in chs if ch in ch_names]
+        zeros = np.zeros(len(starts))
+        features['frontal_alpha'] = features['central_beta'] = features['parietal_alpha'] = zeros
+        if len(eeg_channels) >= 3:
+            regions = [('frontal_alpha', ['Fp', 'Fz', 'F3', 'F4'], (8, 13)),
+                       ('central_beta', ['Cz', 'C3', 'C4'], (13, 30)),
+                       ('parietal_alpha', ['Pz', 'P3', 'P4'], (8, 13))]
+            for name, patterns, (fmin, fmax) in regions:
+                chs = [ch for ch in eeg_channels if any(x in ch for x in patterns)]
+                if chs:
+                    features[name] = band(fmin, fmax, good(chs[:3]))
+
+        features['signal_variance'] = epochs.var(axis=(0, 2))
+        features['signal_mean'] = np.abs(epochs).mean(axis=(0, 2))
+
+        features['frontal_asymmetry'] = zeros
+        if len(eeg_channels) >= 2:
+            left_chs = [ch for ch in eeg_channels if '3' in ch or 'Fp1' in ch]
+            right_chs = [ch for ch in eeg_channels if '4' in ch or 'Fp2' in ch]
+            if left_chs and right_chs:
+                left_alpha = band(8, 13, good(left_chs[:2]))
+                right_alpha = band(8, 13, good(right_chs[:2]))
+                features['frontal_asymmetry'] = (right_alpha - left_alpha) / (right_alpha + left_alpha + 1e-10)
+
+        X = np.column_stack([features[name] for name in FEATURE_NAMES])
+        print(f"  → {len(starts)} epok × {X.shape[1]} özellik çıkarıldı ({epoch_length} s epoklar)")
+        return X, starts / sfreq
+
+    @profiled('synthetic_data')
     def generate_synthetic_data(self, n_samples=200):
         """Sentetik eğitim verisi oluştur (demo amaçlı)"""
         print("\n" + "="*60)
@@ -142,63 +389,19 @@ class EEGDiagnosticAI:
         features_list = []
         labels = []
         
-        # Özellik isimleri
-        feature_names = [
-            'power_delta', 'power_theta', 'power_alpha', 'power_beta', 'power_gamma',
-            'theta_beta_ratio', 'alpha_peak_freq', 'total_power',
-            'frontal_alpha', 'central_beta', 'parietal_alpha',
-            'signal_variance', 'signal_mean', 'frontal_asymmetry'
-        ]
-        
         for i in range(n_samples):
-            # Sağlıklı kontrol grubu (%50)
-            if i < n_samples // 2:
-                label = 0  # Sağlıklı
-                # Normal EEG özellikleri
-                features = {
-                    'power_delta': np.random.normal(2.5, 0.5),
-                    'power_theta': np.random.normal(3.0, 0.6),
-                    'power_alpha': np.random.normal(4.5, 0.8),
-                    'power_beta': np.random.normal(3.5, 0.7),
-                    'power_gamma': np.random.normal(2.0, 0.4),
-                    'theta_beta_ratio': np.random.normal(0.85, 0.15),  # Normal oran
-                    'alpha_peak_freq': np.random.normal(10.5, 1.0),
-                    'total_power': np.random.normal(15.5, 2.0),
-                    'frontal_alpha': np.random.normal(4.0, 0.7),
-                    'central_beta': np.random.normal(3.2, 0.6),
-                    'parietal_alpha': np.random.normal(5.0, 0.9),
-                    'signal_variance': np.random.normal(0.5, 0.1),
-                    'signal_mean': np.random.normal(2.0, 0.3),
-                    'frontal_asymmetry': np.random.normal(0.0, 0.1)  # Simetrik
-                }
-            else:
-                # DEHB grubu (%50)
-                label = 1  # DEHB
-                # DEHB karakteristik özellikleri
-                features = {
-                    'power_delta': np.random.normal(2.8, 0.6),
-                    'power_theta': np.random.normal(4.5, 0.8),  # Artmış theta
-                    'power_alpha': np.random.normal(3.5, 0.7),   # Azalmış alpha
-                    'power_beta': np.random.normal(2.8, 0.6),   # Azalmış beta
-                    'power_gamma': np.random.normal(2.2, 0.5),
-                    'theta_beta_ratio': np.random.normal(1.6, 0.3),  # Yüksek oran (DEHB işareti)
-                    'alpha_peak_freq': np.random.normal(9.5, 1.2),   # Düşük peak
-                    'total_power': np.random.normal(16.8, 2.5),
-                    'frontal_alpha': np.random.normal(3.0, 0.6),      # Azalmış
-                    'central_beta': np.random.normal(2.5, 0.5),     # Azalmış
-                    'parietal_alpha': np.random.normal(4.0, 0.8),
-                    'signal_variance': np.random.normal(0.7, 0.15),  # Artmış değişkenlik
-                    'signal_mean': np.random.normal(2.3, 0.4),
-                    'frontal_asymmetry': np.random.normal(0.15, 0.2)  # Asimetri
-                }
+            # İlk yarı sağlıklı kontrol grubu (0), ikinci yarı DEHB (1)
+            label = 0 if i < n_samples // 2 else 1
+            profile = SYNTHETIC_PROFILES[label]
+            features = {name: np.random.normal(*profile[name]) for name in FEATURE_NAMES}
             
-            features_list.append([features[name] for name in feature_names])
+            features_list.append([features[name] for name in FEATURE_NAMES])
             labels.append(label)
         
         X = np.array(features_list)
         y = np.array(labels)
         
-        self.feature_names = feature_names
+        self.feature_names = list(FEATURE_NAMES)
         
         print(f"✓ {n_samples} sentetik örnek oluşturuldu")
         print(f"  - Sağlıklı: {np.sum(y == 0)} örnek")
@@ -206,27 +409,58 @@ class EEGDiagnosticAI:
         
         return X, y
     
+    @profiled('synthetic_data', level='epoch')
+    def generate_synthetic_epoch_data(self, n_subjects=40, epochs_per_subject=30, epoch_noise=0.5, seed=42):
+        """Epok düzeyinde sentetik eğitim verisi (demo amaçlı)
+
+        Her denek için özellik ortalamaları SYNTHETIC_PROFILES'tan çekilir; epoklar bu ortalama
+        etrafında epoch_noise × standart sapma kadar dağılır.
+        Dönen değer: (X (epok × özellik), y (epok etiketi), groups (denek kimliği))
+        """
+        rng = np.random.default_rng(seed)
+        labels = np.arange(n_subjects) >= n_subjects // 2  # İlk yarı sağlıklı, ikinci yarı DEHB
+        X, y, groups = [], [], []
+        for subject, label in enumerate(labels.astype(int)):
+            profile = SYNTHETIC_PROFILES[label]
+            mean = np.array([profile[name][0] for name in FEATURE_NAMES])
+            std = np.array([profile[name][1] for name in FEATURE_NAMES])
+            subject_mean = rng.normal(mean, std)
+            X.append(rng.normal(subject_mean, epoch_noise * std, (epochs_per_subject, len(FEATURE_NAMES))))
+            y.append(np.full(epochs_per_subject, label))
+            groups.append(np.full(epochs_per_subject, subject))
+
+        self.feature_names = list(FEATURE_NAMES)
+        X, y, groups = np.vstack(X), np.concatenate(y), np.concatenate(groups)
+        print(f"✓ {n_subjects} denek × {epochs_per_subject} epok = {len(X)} sentetik epok oluşturuldu")
+        return X, y, groups
+
     def train(self, X, y):
         """Modeli eğit"""
         print("\n" + "="*60)
         print("MODEL EĞİTİMİ")
         print("="*60)
         
+        from sklearn.metrics import accuracy_score, classification_report
+        from sklearn.model_selection import train_test_split
+        
         # Veriyi böl
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42, stratify=y
         )
         
         # Ölçeklendir
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Modeli eğit
-        print("\n1. Model eğitiliyor...")
-        self.model.fit(X_train_scaled, y_train)
+        with stage('model_fit'):
+            X_train_scaled = self.scale(X_train, fit=True)
+            X_test_scaled = self.scale(X_test)
+            
+            # Modeli eğit
+            print("\n1. Model eğitiliyor...")
+            with self.threads():
+                self.model.fit(X_train_scaled, y_train)
         
         # Test
-        y_pred = self.model.predict(X_test_scaled)
+        with stage('model_predict', split='test'), self.threads():
+            y_pred = self.model.predict(X_test_scaled)
         accuracy = accuracy_score(y_test, y_pred)
         
         print(f"\n✓ Model eğitildi!")
@@ -242,12 +476,64 @@ class EEGDiagnosticAI:
         
         return accuracy
     
+    def train_epochs(self, X, y, groups, test_size=0.2, plot=True):
+        """Epok düzeyinde eğit; test denekleri eğitimde hiç görülmez
+
+        Test, epok doğruluğu ve denek doğruluğu (epok olasılıklarının ortalaması) olarak raporlanır.
+        """
+        print("\n" + "="*60)
+        print("EPOK DÜZEYİNDE MODEL EĞİTİMİ")
+        print("="*60)
+
+        from sklearn.metrics import accuracy_score
+        from sklearn.model_selection import StratifiedGroupKFold
+
+        # Denek bazlı, etiket oranını koruyan ayırma (aynı deneğin epokları tek tarafta kalır)
+        splitter = StratifiedGroupKFold(n_splits=max(2, round(1 / test_size)), shuffle=True,
+                                        random_state=42)
+        train_idx, test_idx = next(splitter.split(X, y, groups))
+
+        with stage('model_fit', level='epoch'):
+            X_train_scaled = self.scale(X[train_idx], fit=True)
+            with self.threads():
+                self.model.fit(X_train_scaled, y[train_idx])
+        with stage('model_predict', split='test', level='epoch'):
+            probabilities = self.predict_proba(X[test_idx])
+
+        epoch_accuracy = accuracy_score(y[test_idx], self.model.classes_[probabilities.argmax(axis=1)])
+        subjects, subject_proba = aggregate_probabilities(probabilities, groups[test_idx])
+        subject_labels = np.array([y[test_idx][groups[test_idx] == s][0] for s in subjects])
+        subject_accuracy = accuracy_score(subject_labels, self.model.classes_[subject_proba.argmax(axis=1)])
+
+        self.is_trained = True
+        print(f"\n✓ Model eğitildi! ({len(train_idx)} eğitim epoğu, "
+              f"{len(np.unique(groups[train_idx]))} denek)")
+        print(f"  - Test epok doğruluğu: {epoch_accuracy*100:.2f}% ({len(test_idx)} epok)")
+        print(f"  - Test denek doğruluğu: {subject_accuracy*100:.2f}% ({len(subjects)} denek, "
+              f"olasılık ortalaması)")
+
+        if plot:
+            self.plot_feature_importance()
+        return {'epoch_accuracy': epoch_accuracy, 'subject_accuracy': subject_accuracy,
+                'n_train_epochs': len(train_idx), 'n_test_epochs': len(test_idx),
+                'n_test_subjects': len(subjects)}
+
+    @profiled('plotting', figure='feature_importance')
     def plot_feature_importance(self):
         """Özellik önemini görselleştir"""
         if not self.is_trained:
             return
         
-        importances = self.model.feature_importances_
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
+        # Türkçe karakter desteği
+        plt.rcParams['font.family'] = 'DejaVu Sans'
+        sns.set_style("whitegrid")
+        
+        importances = getattr(self.model, 'feature_importances_', None)
+        if importances is None:  # doğrusal model (artımlı 'sgd' modu): katsayı büyüklükleri
+            importances = np.abs(self.model.coef_[0])
         indices = np.argsort(importances)[::-1]
         
         plt.figure(figsize=(12, 8))
@@ -274,12 +560,10 @@ class EEGDiagnosticAI:
         # DataFrame'e dönüştür
         feature_vector = np.array([[features[name] for name in self.feature_names]])
         
-        # Ölçeklendir
-        feature_vector_scaled = self.scaler.transform(feature_vector)
-        
-        # Tahmin yap
-        prediction = self.model.predict(feature_vector_scaled)[0]
-        probabilities = self.model.predict_proba(feature_vector_scaled)[0]
+        # Ölçeklendir ve tahmin yap
+        with stage('model_predict', split='diagnose'):
+            probabilities = self.predict_proba(feature_vector)[0]
+            prediction = self.model.classes_[np.argmax(probabilities)]
         
         # Sonuçları göster
         print("\n" + "="*60)
@@ -325,6 +609,371 @@ class EEGDiagnosticAI:
             'features': features
         }
 
+    def store_features(self, store, fname=None, raw=None, epoch_length=None, overlap=0.0,
+                       label=None, subject=None):
+        """Kaydın özelliklerini depodan getir; yoksa çıkarıp depoya ekle
+
+        fname verilirse kayıt eeg_pipeline adımlarıyla (pick_types + 0.1-40 Hz filtre) yüklenir;
+        epoch_length verilirse epok satırları, verilmezse kayıt başına tek satır saklanır.
+        Dönen değer: depodaki kayıt tablosu satırı
+        """
+        fingerprint = store.fingerprint(fname) if fname is not None else raw_fingerprint(raw)
+        params = ({'epoch_length': epoch_length, 'overlap': overlap} if epoch_length
+                  else {'mode': 'recording'})
+        if fname is not None:
+            params.update(l_freq=0.1, h_freq=40)
+        record = store.lookup(fingerprint, params)
+        if record is not None:
+            return record
+
+        X = self.feature_rows(fname=fname, raw=raw, epoch_length=epoch_length, overlap=overlap)
+        return store.append(fingerprint, X, params=params, label=label, subject=subject,
+                            source=None if fname is None else os.path.abspath(fname))
+
+    def feature_rows(self, fname=None, raw=None, epoch_length=None, overlap=0.0):
+        """Kaydın özellik satırları (epoch_length verilirse epok başına, yoksa tek satır)"""
+        if raw is None:
+            from eeg_pipeline import filter_raw, load_raw
+            raw = filter_raw(load_raw(fname), l_freq=0.1, h_freq=40)
+        if epoch_length:
+            X, _ = self.extract_epoch_features(raw, epoch_length=epoch_length, overlap=overlap)
+            return X
+        features = self.extract_features(raw)
+        return np.array([[features[name] for name in FEATURE_NAMES]])
+
+    def store_features_many(self, store, items, epoch_length=None, overlap=0.0, n_jobs=None,
+                            threads_per_job=1):
+        """Çok sayıda dosyanın özelliklerini süreç havuzunda çıkarıp depoya ekle
+
+        items: (dosya, etiket, denek) üçlüleri. Depoda olanlar atlanır; eksikler n_jobs süreçte
+        çıkarılır ve depoya yalnızca bu süreç yazar. Her işçide BLAS/OpenMP threads_per_job
+        iş parçacığına sabitlenir (n_jobs × çekirdek sayısı kadar iş parçacığı oluşmaz).
+        Dönen değer: items sırasıyla kayıt tablosu satırları
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        items = list(items)
+        params = ({'epoch_length': epoch_length, 'overlap': overlap} if epoch_length
+                  else {'mode': 'recording'})
+        params.update(l_freq=0.1, h_freq=40)
+        fingerprints = [store.fingerprint(fname) for fname, _, _ in items]
+        records = [store.lookup(fp, params) for fp in fingerprints]
+        missing = [i for i, record in enumerate(records) if record is None]
+
+        n_workers = min(len(missing), n_jobs or os.cpu_count() or 1)
+        if n_workers <= 1:
+            rows = (self.feature_rows(fname=items[i][0], epoch_length=epoch_length, overlap=overlap)
+                    for i in missing)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_extract_worker,
+                                           initargs=(threads_per_job, epoch_length, overlap))
+            files = [items[i][0] for i in missing]
+            rows = map(unpack_worker, executor.map(worker_call, [_extract_file] * len(files), files))
+        try:
+            with stage('feature_extraction', fields={'jobs': n_workers, 'files': len(missing)}):
+                for i, X in zip(missing, rows):
+                    fname, label, subject = items[i]
+                    records[i] = store.append(fingerprints[i], X, params=params, label=label,
+                                              subject=subject, source=os.path.abspath(fname))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return records
+
+    def train_from_store(self, store, holdout=0.2, chunk_rows=65536, plot=False):
+        """Depodaki etiketli satırlarla eğit (bellekten büyük kohortlar için)
+
+        Ölçekleyici parça parça (partial_fit) öğrenilir; ölçeklenmiş eğitim matrisi diskte float32
+        memmap olarak oluşturulur ve model bu dosya üzerinde eğitilir. Kayıtlar denek bazında
+        ayrılır; test denek doğruluğu epok olasılıklarının ortalamasıyla hesaplanır.
+        """
+        import shutil
+        import tempfile
+
+        from sklearn.model_selection import StratifiedGroupKFold
+
+        print("\n" + "="*60)
+        print("ÖZELLİK DEPOSUNDAN EĞİTİM")
+        print("="*60)
+
+        labeled = [i for i, r in enumerate(store.recordings) if r['label'] is not None]
+        if not labeled:
+            raise ValueError("Depoda etiketli kayıt yok")
+        rec_labels = np.array([store.recordings[i]['label'] for i in labeled])
+        rec_groups = np.array([str(store.recordings[i]['subject'] or store.recordings[i]['fingerprint'])
+                               for i in labeled])
+        train_recs, test_recs = labeled, []
+        n_splits = round(1 / holdout) if holdout else 0
+        if n_splits >= 2 and min(len(np.unique(rec_groups[rec_labels == c])) for c in np.unique(rec_labels)) >= n_splits:
+            splitter = StratifiedGroupKFold(n_splits=n_splits, shuffle=True, random_state=42)
+            train_idx, test_idx = next(splitter.split(rec_labels, rec_labels, rec_groups))
+            train_recs, test_recs = [labeled[i] for i in train_idx], [labeled[i] for i in test_idx]
+
+        train_rows = store.select_rows(train_recs)
+        with stage('model_fit', source='store'):
+            self.scaler = type(self.scaler)()
+            for X, _ in store.iter_chunks(chunk_rows=chunk_rows, rows=train_rows):
+                self.scaler.partial_fit(X)
+
+            scratch = tempfile.mkdtemp(prefix='train-', dir=store.path)
+            try:
+                X_train = np.lib.format.open_memmap(os.path.join(scratch, 'X.npy'), mode='w+',
+                                                    dtype=np.float32, shape=(len(train_rows), len(FEATURE_NAMES)))
+                y_train = np.empty(len(train_rows), dtype=int)
+                pos = 0
+                for X, meta in store.iter_chunks(chunk_rows=chunk_rows, rows=train_rows):
+                    X_train[pos:pos + len(X)] = self.scaler.transform(X)
+                    y_train[pos:pos + len(X)] = meta['label']
+                    pos += len(X)
+                X_train.flush()
+                with self.threads():
+                    self.model.fit(X_train, y_train)
+                del X_train
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+
+        self.feature_names = list(FEATURE_NAMES)
+        self.is_trained = True
+        self.pending = None
+        self.store_cursor[store.path] = len(store.recordings)
+        result = {'n_train_rows': len(train_rows), 'n_train_recordings': len(train_recs),
+                  'n_test_recordings': len(test_recs)}
+        print(f"\n✓ Model eğitildi! ({len(train_rows)} satır, {len(train_recs)} kayıt)")
+
+        if test_recs:
+            predictions = self.predict_store(store, recordings=test_recs, chunk_rows=chunk_rows)
+            rows = store.select_rows(test_recs)
+            row_labels = store.row_meta(rows)['label']
+            correct_rows = sum(p['row_correct'] for p in predictions)
+            correct_recs = sum(p['prediction'] == p['label'] for p in predictions)
+            result.update(row_accuracy=correct_rows / len(rows),
+                          recording_accuracy=correct_recs / len(predictions))
+            print(f"  - Test satır doğruluğu: {result['row_accuracy']*100:.2f}% ({len(row_labels)} satır)")
+            print(f"  - Test kayıt doğruluğu: {result['recording_accuracy']*100:.2f}% "
+                  f"({len(predictions)} kayıt, olasılık ortalaması)")
+        if plot:
+            self.plot_feature_importance()
+        return result
+
+    def predict_store(self, store, recordings=None, chunk_rows=65536):
+        """Depodaki kayıtlar için toplu tahmin: kayıt başına ortalama olasılık ve karar
+
+        Satırlar parça parça okunur; olasılıklar kayıt bazında toplanır.
+        """
+        if not self.is_trained:
+            raise ValueError("Model henüz eğitilmedi!")
+        recordings = list(range(len(store.recordings))) if recordings is None else list(recordings)
+        position = {rec: i for i, rec in enumerate(recordings)}
+        sums = np.zeros((len(recordings), len(self.model.classes_)))
+        counts = np.zeros(len(recordings))
+        row_correct = np.zeros(len(recordings))
+
+        with stage('model_predict', split='store'):
+            for X, meta in store.iter_chunks(chunk_rows=chunk_rows, rows=store.select_rows(recordings)):
+                proba = self.predict_proba(X)
+                idx = np.array([position[r] for r in meta['recording']])
+                np.add.at(sums, idx, proba)
+                np.add.at(counts, idx, 1)
+                np.add.at(row_correct, idx, self.model.classes_[proba.argmax(axis=1)] == meta['label'])
+
+        results = []
+        for i, rec in enumerate(recordings):
+            record = store.recordings[rec]
+            probabilities = sums[i] / max(counts[i], 1)
+            results.append({'recording': rec, 'source': record.get('source'), 'subject': record['subject'],
+                            'label': record['label'], 'n_rows': int(counts[i]),
+                            'prediction': int(self.model.classes_[np.argmax(probabilities)]),
+                            'probabilities': probabilities, 'row_correct': int(row_correct[i])})
+        return results
+
+    def fit(self, X, y):
+        """Tüm veriyle sessiz tam eğitim (bölme, rapor ve grafik olmadan; artımlı durumu sıfırlar)"""
+        from sklearn.preprocessing import StandardScaler
+
+        self.scaler = StandardScaler()
+        self.model = default_model(self.n_jobs)
+        with stage('model_fit', level='full'):
+            X_scaled = self.scale(X, fit=True)
+            with self.threads():
+                self.model.fit(X_scaled, y)
+        self.feature_names = list(FEATURE_NAMES)
+        self.is_trained = True
+        self.pending = None
+        return self
+
+    def score(self, X, y):
+        """Satır düzeyinde doğruluk"""
+        with stage('model_predict', split='score'):
+            probabilities = self.predict_proba(X)
+        return float(np.mean(self.model.classes_[probabilities.argmax(axis=1)] == np.asarray(y)))
+
+    def partial_train(self, X, y, mode='forest', trees_per_batch=10, max_trees=None):
+        """Yeni etiketli grubu modele ekle (artımlı eğitim); süre grup boyutuyla orantılıdır
+
+        Ölçekleyici akan ortalama/varyans ile güncellenir (partial_fit).
+        mode='forest': ormana yalnızca bu grupla eğitilen trees_per_batch ağaç eklenir (warm_start);
+        eski ağaçların eşikleri yeni ölçeğe taşınır, max_trees aşılırsa en eski ağaçlar atılır.
+        Tek sınıflı gruplar iki sınıf birikene dek bekletilir. train() ile eğitilmiş ormandan
+        devam edilebilir.
+        mode='sgd': lojistik regresyon SGD ile (partial_fit) güncellenir.
+        """
+        import time
+
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.preprocessing import StandardScaler
+
+        if mode not in ('forest', 'sgd'):
+            raise ValueError(f"Bilinmeyen artımlı mod: {mode} (forest/sgd)")
+        X, y = np.asarray(X, dtype=self.dtype), np.asarray(y)
+        if self.pending is not None:
+            X, y = np.vstack([self.pending[0], X]), np.concatenate([self.pending[1], y])
+            self.pending = None
+
+        sgd = isinstance(self.model, SGDClassifier)
+        if not self.is_trained or sgd != (mode == 'sgd'):
+            # Model türü değişti veya ilk grup: sıfırdan başla
+            self.scaler = StandardScaler()
+            self.model = (SGDClassifier(loss='log_loss', random_state=42) if mode == 'sgd'
+                          else default_model(self.n_jobs))
+            self.is_trained = False
+        if mode == 'forest' and len(np.unique(y)) < 2:
+            self.pending = (X, y)
+            return {'n_rows': 0, 'n_pending': len(X), 'n_seen': int(getattr(self.scaler, 'n_samples_seen_', 0)),
+                    'n_trees': len(self.model.estimators_) if self.is_trained else 0, 'seconds': 0.0}
+
+        start = time.perf_counter()
+        with stage('model_fit', level='incremental', mode=mode), self.threads():
+            previous = (self.scaler.mean_.copy(), self.scaler.scale_.copy()) if self.is_trained else None
+            self.scaler.partial_fit(X)
+            X_scaled = self.scale(X)
+            if mode == 'sgd':
+                self.model.partial_fit(X_scaled, y, classes=np.array(sorted(SYNTHETIC_PROFILES)))
+            else:
+                n_trees = 0
+                if previous is not None:
+                    rescale_forest(self.model, *previous, self.scaler.mean_, self.scaler.scale_)
+                    n_trees = len(self.model.estimators_)
+                self.model.set_params(warm_start=n_trees > 0, n_estimators=n_trees + trees_per_batch)
+                self.model.fit(X_scaled, y)
+                # Sonraki fit() çağrıları (tam eğitim) yine sıfırdan eğitsin
+                self.model.set_params(warm_start=False)
+                if max_trees and len(self.model.estimators_) > max_trees:
+                    del self.model.estimators_[:-max_trees]
+                    self.model.set_params(n_estimators=max_trees)
+
+        self.feature_names = list(FEATURE_NAMES)
+        self.is_trained = True
+        return {'n_rows': len(X), 'n_pending': 0, 'n_seen': int(self.scaler.n_samples_seen_),
+                'n_trees': None if mode == 'sgd' else len(self.model.estimators_),
+                'seconds': time.perf_counter() - start}
+
+    def update_from_store(self, store, mode='forest', **kwargs):
+        """Depoya son güncellemeden bu yana eklenen etiketli kayıtları artımlı olarak öğren
+
+        Yalnızca yeni kayıtların satırları okunur; etiketsiz eklenen kayıtlar atlanır.
+        Dönen değer: partial_train sonucu (yeni satır yoksa None)
+        """
+        cursor = self.store_cursor.get(store.path, 0)
+        new = [i for i in range(cursor, len(store.recordings)) if store.recordings[i]['label'] is not None]
+        self.store_cursor[store.path] = len(store.recordings)
+        rows = store.select_rows(new)
+        if not len(rows):
+            return None
+        return self.partial_train(store.read(rows=rows), store.row_meta(rows)['label'], mode=mode, **kwargs)
+
+    def diagnose_epochs(self, raw, epoch_length=4.0, overlap=0.0):
+        """Epok bazlı teşhis: her epok sınıflandırılır, olasılıklar kayıt düzeyinde ortalanır"""
+        if not self.is_trained:
+            raise ValueError("Model henüz eğitilmedi! Önce train_epochs() metodunu çağırın.")
+
+        print("\n" + "="*60)
+        print("EPOK BAZLI TEŞHİS ANALİZİ")
+        print("="*60)
+
+        X, epoch_times = self.extract_epoch_features(raw, epoch_length=epoch_length, overlap=overlap)
+        with stage('model_predict', split='diagnose', level='epoch'):
+            epoch_probabilities = self.predict_proba(X)
+        probabilities = epoch_probabilities.mean(axis=0)  # olasılık ortalaması
+        prediction = self.model.classes_[np.argmax(probabilities)]
+
+        if prediction == 1:
+            diagnosis = "Dikkat Eksikliği ve Hiperaktivite Bozukluğu (DEHB)"
+        else:
+            diagnosis = "Sağlıklı (Normal EEG Paterni)"
+        probability = probabilities.max() * 100
+        adhd_column = list(self.model.classes_).index(1)
+        adhd_epochs = np.mean(epoch_probabilities[:, adhd_column] > 0.5)
+        tbr = X[:, FEATURE_NAMES.index('theta_beta_ratio')]
+
+        print(f"\n🔍 Teşhis: {diagnosis}")
+        print(f"📊 Olasılık (epok ortalaması): %{probability:.2f}")
+        print(f"\n📈 Detaylı Olasılıklar:")
+        print(f"  - Sağlıklı: %{probabilities[1 - adhd_column]*100:.2f}")
+        print(f"  - DEHB: %{probabilities[adhd_column]*100:.2f}")
+        print(f"  - DEHB olarak sınıflanan epoklar: %{adhd_epochs*100:.1f} ({len(X)} epok)")
+        print(f"\n🔬 Theta/Beta Oranı (epoklar): medyan {np.median(tbr):.3f}, "
+              f"aralık {tbr.min():.3f}-{tbr.max():.3f}")
+        print("\n⚠️  Bu sistem sadece eğitim ve demo amaçlıdır; tıbbi teşhis için kullanılamaz!")
+
+        return {
+            'diagnosis': diagnosis,
+            'probability': probability,
+            'probabilities': probabilities,
+            'epoch_probabilities': epoch_probabilities,
+            'epoch_times': epoch_times,
+            'features': X,
+        }
+
+def incremental_drift_report(batches, X_test, y_test, retrain_every=5, mode='forest',
+                             trees_per_batch=10, max_trees=None, ai=None):
+    """Artımlı eğitimi periyodik tam yeniden eğitimle karşılaştır
+
+    Her grup artımlı modele eklenir ve test doğruluğu ölçülür; her retrain_every grupta bir
+    (ve sonda) o ana kadarki tüm verilerle sıfırdan eğitilen referans modelin doğruluğu ve süresi
+    ölçülür. Sapma = artımlı doğruluk - tam eğitim doğruluğu.
+    Dönen değer: grup başına sözlük listesi
+    """
+    import time
+
+    batches = list(batches)
+    ai = ai or EEGDiagnosticAI()
+    reference = EEGDiagnosticAI()
+    seen_X, seen_y, report = [], [], []
+
+    print("\n" + "="*60)
+    print(f"ARTIMLI EĞİTİM SAPMA RAPORU (mod: {mode})")
+    print("="*60)
+    print(f"{'grup':>4} {'satır':>6} {'toplam':>7} {'güncelleme':>11} {'artımlı':>8} "
+          f"{'tam eğitim':>11} {'tam doğr.':>9} {'sapma':>7}")
+    for i, (X, y) in enumerate(batches, 1):
+        seen_X.append(X)
+        seen_y.append(y)
+        update = ai.partial_train(X, y, mode=mode, trees_per_batch=trees_per_batch, max_trees=max_trees)
+        row = {'batch': i, 'n_rows': len(X), 'n_seen': sum(len(b) for b in seen_y),
+               'update_seconds': update['seconds'], 'n_pending': update['n_pending'],
+               'incremental_accuracy': ai.score(X_test, y_test) if ai.is_trained else float('nan')}
+        if i % retrain_every == 0 or i == len(batches):
+            start = time.perf_counter()
+            reference.fit(np.vstack(seen_X), np.concatenate(seen_y))
+            row['retrain_seconds'] = time.perf_counter() - start
+            row['full_accuracy'] = reference.score(X_test, y_test)
+            row['drift'] = row['incremental_accuracy'] - row['full_accuracy']
+        report.append(row)
+
+        full = (f"{row['retrain_seconds']*1000:9.1f}ms {row['full_accuracy']*100:8.1f}% "
+                f"{row['drift']*100:+6.1f}%") if 'drift' in row else f"{'-':>11} {'-':>9} {'-':>7}"
+        print(f"{i:>4} {len(X):>6} {row['n_seen']:>7} {row['update_seconds']*1000:9.1f}ms "
+              f"{row['incremental_accuracy']*100:7.1f}% {full}")
+
+    drifts = [r['drift'] for r in report if 'drift' in r]
+    if drifts:
+        print(f"\n✓ Son sapma: {drifts[-1]*100:+.2f}% (en kötü {min(drifts)*100:+.2f}%); "
+              f"toplam güncelleme {sum(r['update_seconds'] for r in report):.2f} s, "
+              f"toplam tam eğitim {sum(r.get('retrain_seconds', 0) for r in report):.2f} s")
+    return report
+
+
 def load_sample_eeg():
     """Örnek EEG verisini yükle"""
     print("="*60)
@@ -335,9 +984,12 @@ def load_sample_eeg():
     data_path = os.path.join(sample_data_folder, 'MEG', 'sample')
     raw_fname = os.path.join(data_path, 'sample_audvis_raw.fif')
     
-    raw = mne.io.read_raw_fif(raw_fname, preload=True)
-    raw.pick_types(eeg=True, stim=True)
-    raw.filter(l_freq=0.1, h_freq=40, method='iir', picks='eeg', verbose=False)
+    with stage('load'):
+        raw = mne.io.read_raw_fif(raw_fname, preload=True)
+    with stage('pick'):
+        raw.pick_types(eeg=True, stim=True)
+    with stage('filter'):
+        raw.filter(l_freq=0.1, h_freq=40, method='iir', picks='eeg', verbose=False)
     
     print(f"\n✓ Veri yüklendi!")
     print(f"  - Kanal sayısı: {len(raw.ch_names)}")
@@ -346,8 +998,23 @@ def load_sample_eeg():
     
     return raw
 
-def main():
+@profiled('main', script='eeg_ai_diagnosis')
+def main(argv=None):
     """Ana fonksiyon"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Yapay zeka destekli EEG teşhis demosu')
+    parser.add_argument('--epoch-length', type=float,
+                        help='Epok düzeyinde mod: epok uzunluğu (s); verilmezse kayıt başına tek özellik vektörü')
+    parser.add_argument('--overlap', type=float, default=0.0, help='Epok örtüşmesi (s)')
+    parser.add_argument('--incremental', choices=['forest', 'sgd'],
+                        help='Artımlı eğitim: sentetik denekler gruplar halinde eklenir ve '
+                             'periyodik tam eğitime göre sapma raporlanır (epok düzeyinde mod)')
+    parser.add_argument('--batches', type=int, default=8, help='Artımlı modda grup sayısı')
+    parser.add_argument('--retrain-every', type=int, default=2,
+                        help='Artımlı modda kaç grupta bir tam eğitimle karşılaştırılacağı')
+    args = parser.parse_args(argv)
+
     print("\n" + "="*70)
     print("YAPAY ZEKA DESTEKLİ EEG TEŞHİS SİSTEMİ (DEMO)")
     print("="*70)
@@ -357,15 +1024,35 @@ def main():
         ai_system = EEGDiagnosticAI()
         
         # Sentetik veri oluştur ve modeli eğit
-        X, y = ai_system.generate_synthetic_data(n_samples=200)
-        accuracy = ai_system.train(X, y)
+        if args.incremental:
+            from sklearn.model_selection import StratifiedGroupKFold
+
+            args.epoch_length = args.epoch_length or 4.0
+            X, y, groups = ai_system.generate_synthetic_epoch_data()
+            train_idx, test_idx = next(StratifiedGroupKFold(n_splits=5, shuffle=True, random_state=42)
+                                       .split(X, y, groups))
+            # Yeni kayıtlar denek denek gelir: eğitim denekleri karıştırılıp gruplara bölünür
+            subjects = np.random.default_rng(42).permutation(np.unique(groups[train_idx]))
+            batches = [(X[np.isin(groups, part)], y[np.isin(groups, part)])
+                       for part in np.array_split(subjects, args.batches) if len(part)]
+            incremental_drift_report(batches, X[test_idx], y[test_idx], retrain_every=args.retrain_every,
+                                     mode=args.incremental, ai=ai_system)
+        elif args.epoch_length:
+            X, y, groups = ai_system.generate_synthetic_epoch_data()
+            ai_system.train_epochs(X, y, groups)
+        else:
+            X, y = ai_system.generate_synthetic_data(n_samples=200)
+            accuracy = ai_system.train(X, y)
         
         # Örnek EEG verisini yükle
         print("\n" + "="*60)
         raw = load_sample_eeg()
         
         # Teşhis yap
-        result = ai_system.diagnose(raw)
+        if args.epoch_length:
+            result = ai_system.diagnose_epochs(raw, epoch_length=args.epoch_length, overlap=args.overlap)
+        else:
+            result = ai_system.diagnose(raw)
         
         print("\n✅ Analiz tamamlandı!")
         
@@ -6,30 +6,40 @@ P300 dalgası tespiti
 
 import mne
 import os
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
+from erp_engine import ODDBALL_EVENTS, StreamingP300, compute_erp_fast, projector_matrix
+from erp_peaks import compute_peak_metrics, peak_arrays
+from event_index import get_event_index
+from profiling import profiled, stage
+from topo_render import TopoRenderer, plot_topomap_row
 
-def load_and_filter_data():
-    """EEG verisini yükle ve filtrele"""
+def load_and_filter_data(raw_fname=None):
+    """EEG verisini yükle ve filtrele (dosya verilmezse MNE örnek veri seti)"""
     print("="*60)
     print("VERİ YÜKLEME VE FİLTRELEME")
     print("="*60)
     
-    # Örnek veri setini yükle
-    print("\n1. Örnek veri seti yükleniyor...")
-    sample_data_folder = mne.datasets.sample.data_path()
-    data_path = os.path.join(sample_data_folder, 'MEG', 'sample')
-    raw_fname = os.path.join(data_path, 'sample_audvis_raw.fif')
+    if raw_fname is None:
+        # Örnek veri setini yükle
+        print("\n1. Örnek veri seti yükleniyor...")
+        sample_data_folder = mne.datasets.sample.data_path()
+        data_path = os.path.join(sample_data_folder, 'MEG', 'sample')
+        raw_fname = os.path.join(data_path, 'sample_audvis_raw.fif')
     
-    raw = mne.io.read_raw_fif(raw_fname, preload=True)
+    with stage('load'):
+        raw = mne.io.read_raw_fif(raw_fname, preload=True)
     
     # Sadece EEG kanallarını seç
     print("2. EEG kanalları seçiliyor...")
-    raw.pick_types(eeg=True, stim=True)
+    with stage('pick'):
+        raw.pick_types(eeg=True, stim=True)
     
     # Filtreleme uygula
     print("3. Filtreleme uygulanıyor (0.1-40 Hz)...")
-    raw.filter(l_freq=0.1, h_freq=40, method='iir', picks='eeg', verbose=False)
+    with stage('filter'):
+        raw.filter(l_freq=0.1, h_freq=40, method='iir', picks='eeg', verbose=False)
     
     print("\n✓ Veri hazır!")
     print(f"  - Kanal sayısı: {len(raw.ch_names)}")
@@ -38,15 +48,17 @@ def load_and_filter_data():
     
     return raw
 
+@profiled('events')
 def find_events(raw):
     """Uyaran işaretlerini (events) bul"""
     print("\n" + "="*60)
     print("OLAY TESPİTİ (Event Detection)")
     print("="*60)
     
-    # Events bul
+    # Events bul (tek geçişte kenar tespiti; indeks kayıtla birlikte önbelleğe alınır)
     print("\n1. Uyaran işaretleri aranıyor...")
-    events = mne.find_events(raw, stim_channel='STI 014', min_duration=0.002)
+    event_index = get_event_index(raw, stim_channel='STI 014', min_duration=0.002)
+    events = event_index.events
     
     print(f"\n✓ {len(events)} olay bulundu!")
     print(f"\nİlk 10 olay:")
@@ -54,7 +66,7 @@ def find_events(raw):
     
     # Event ID'leri göster
     print(f"\n2. Olay tipleri analiz ediliyor...")
-    event_ids = np.unique(events[:, 2])
+    event_ids = event_index.event_ids
     print(f"  - Bulunan olay tipleri: {event_ids}")
     
     # Olay tiplerini açıkla
@@ -68,15 +80,15 @@ def find_events(raw):
     
     print(f"\n3. Olay tipi açıklamaları:")
     for event_id in event_ids:
+        count = event_index.count(event_id)
         if event_id in event_dict:
-            count = len(events[events[:, 2] == event_id])
             print(f"  - Event ID {event_id}: {event_dict[event_id]} ({count} kez)")
         else:
-            count = len(events[events[:, 2] == event_id])
             print(f"  - Event ID {event_id}: Bilinmeyen ({count} kez)")
     
     return events, event_dict
 
+@profiled('epoching')
 def create_epochs(raw, events, event_dict, tmin=-0.2, tmax=0.8):
     """Epoklar oluştur"""
     print("\n" + "="*60)
@@ -85,7 +97,7 @@ def create_epochs(raw, events, event_dict, tmin=-0.2, tmax=0.8):
     
     # Event ID'leri seç (sesli uyaranlar: 1 ve 2)
     # MNE-Python'da event_id dictionary'sinde key'ler string, value'lar integer olmalı
-    selected_events = {'Standart Ses': 1, 'Oddball Ses': 2}
+    selected_events = ODDBALL_EVENTS
     
     print(f"\n1. Epoklar oluşturuluyor...")
     print(f"   - Zaman penceresi: {tmin} saniye ile {tmax} saniye arası")
@@ -107,6 +119,7 @@ def create_epochs(raw, events, event_dict, tmin=-0.2, tmax=0.8):
     
     return epochs
 
+@profiled('erp')
 def compute_erp(epochs):
     """ERP (Event-Related Potential) hesapla"""
     print("\n" + "="*60)
@@ -125,6 +138,109 @@ def compute_erp(epochs):
     
     return evoked_standard, evoked_oddball
 
+@profiled('erp', method='vectorized')
+def compute_erp_vectorized(raw, events, tmin=-0.2, tmax=0.8):
+    """ERP'yi epokları saklamadan hesapla (uzun oturumlar için hızlı yol)
+
+    events: (olay, 3) dizisi veya EventIndex; ERP yalnızca bu olaylardan hesaplanır
+    """
+    print("\n" + "="*60)
+    print("VEKTÖREL ERP HESAPLAMA")
+    print("="*60)
+    
+    selected_events = ODDBALL_EVENTS
+    
+    print(f"\n1. Olay pencereleri kopyasız görünümle çıkarılıyor ({tmin} - {tmax} saniye)...")
+    print("2. Baseline düzeltmesi ve koşul bazlı toplamlar hesaplanıyor...")
+    
+    evokeds, accumulator, times = compute_erp_fast(raw, events, selected_events,
+                                                   tmin=tmin, tmax=tmax, baseline=(None, 0))
+    evoked_standard = evokeds['Standart Ses']
+    evoked_oddball = evokeds['Oddball Ses']
+    
+    print("\n✓ ERP hesaplandı!")
+    print(f"  - Standart Ses: {evoked_standard.nave} epok")
+    print(f"  - Oddball Ses: {evoked_oddball.nave} epok")
+    print(f"  - Ortalama standart hata (Oddball): {accumulator.sem('Oddball Ses').mean()*1e6:.2f} µV")
+    
+    return evoked_standard, evoked_oddball
+
+@profiled('live_p300')
+def simulate_live_p300(raw, events, tmin=-0.2, tmax=0.8, report_every=25):
+    """Kaydı olay olay oynatarak canlı P300 tahmininin yakınsamasını göster"""
+    print("\n" + "="*60)
+    print("CANLI P300 TAHMİNİ (Olay Olay Güncelleme)")
+    print("="*60)
+    
+    sfreq = raw.info['sfreq']
+    start = int(round(tmin * sfreq))
+    times = np.arange(start, int(round(tmax * sfreq)) + 1) / sfreq
+    
+    picks = mne.pick_types(raw.info, eeg=True, exclude=[])
+    data = raw.get_data(picks=picks)
+    proj = projector_matrix(mne.pick_info(raw.info, picks), [raw.ch_names[i] for i in picks])
+    if proj is not None:
+        data = proj @ data
+    
+    stream = StreamingP300(times, len(picks))
+    code_to_condition = {code: cond for cond, code in ODDBALL_EVENTS.items()}
+    converged_at = None
+    
+    for sample, _, code in events:
+        sample -= raw.first_samp
+        if code not in code_to_condition:
+            continue
+        if sample + start < 0 or sample + start + len(times) > data.shape[1]:
+            continue
+        latency, amplitude = stream.update_from_signal(data, sample, start, code_to_condition[code])
+        n_events = sum(stream.accumulator.counts.values())
+        
+        if latency is not None and n_events % report_every == 0:
+            print(f"  - {n_events:4d} olay: P300 {latency*1000:.0f} ms, {amplitude*1e6:.2f} µV")
+        if converged_at is None and stream.has_converged():
+            converged_at = n_events
+    
+    snapshot = stream.snapshot()
+    if snapshot['p300_latency'] is None:
+        # Yalnızca bir koşul görüldüyse fark dalgası (ve tahmin) yoktur
+        print("\n✓ Son tahmin: - ms, - µV")
+    else:
+        print(f"\n✓ Son tahmin: {snapshot['p300_latency']*1000:.0f} ms, {snapshot['p300_amplitude']*1e6:.2f} µV")
+    if converged_at is not None:
+        print(f"  - Tahmin {converged_at}. olayda yakınsadı; oturum bu noktada durdurulabilirdi.")
+    else:
+        print("  - Tahmin henüz yakınsamadı.")
+    
+    return snapshot
+
+@profiled('permutation_test')
+def p300_significance(raw, events, n_permutations=1000, n_jobs=1):
+    """Oddball - Standart farkı için küme tabanlı permütasyon testi"""
+    # scipy tabanlı test modülü yalnızca bu seçenekte yüklenir
+    from erp_permutation import oddball_vs_standard_test
+
+    print("\n" + "="*60)
+    print("KÜME TABANLI PERMÜTASYON TESTİ (Oddball vs Standart)")
+    print("="*60)
+    
+    print(f"\n1. Epok dizileri çıkarılıyor ve {n_permutations} permütasyon çalıştırılıyor...")
+    result = oddball_vs_standard_test(raw, events, n_permutations=n_permutations,
+                                      n_jobs=n_jobs, seed=42)
+    times = result['times']
+    
+    significant = [i for i, p in enumerate(result['cluster_p_values']) if p < 0.05]
+    print(f"\n✓ {len(result['clusters'])} küme bulundu, {len(significant)} tanesi anlamlı (p < 0.05)")
+    
+    for i in significant:
+        mask = result['clusters'][i]
+        ch_idx, t_idx = np.nonzero(mask)
+        print(f"  - Küme {i+1}: {times[t_idx.min()]*1000:.0f}-{times[t_idx.max()]*1000:.0f} ms, "
+              f"{len(np.unique(ch_idx))} kanal, kütle={result['cluster_stats'][i]:.1f}, "
+              f"p={result['cluster_p_values'][i]:.4f}")
+    
+    return result
+
+@profiled('plotting', figure='erp_timeseries')
 def visualize_erp_comparison(evoked_standard, evoked_oddball):
     """ERP'leri ayrı grafiklerde görselleştir (detaylı)"""
     print("\n" + "="*60)
@@ -165,6 +281,7 @@ def visualize_erp_comparison(evoked_standard, evoked_oddball):
     
     return evoked_diff
 
+@profiled('plotting', figure='erp_combined')
 def plot_combined_erp_comparison(evoked_standard, evoked_oddball):
     """Oddball ve Standart ERP'lerini tek grafikte karşılaştır (P300 kanıtı)"""
     print("\n" + "="*60)
@@ -213,8 +330,9 @@ def plot_combined_erp_comparison(evoked_standard, evoked_oddball):
     
     # Veriyi çıkar
     times = evoked_standard.times
-    standard_data = evoked_standard.copy().pick('eeg').get_data().mean(axis=0)
-    oddball_data = evoked_oddball.copy().pick('eeg').get_data().mean(axis=0)
+    # Veri volt cinsinden; eksen etiketi ve açıklama konumu µV olduğundan ölçeklenir
+    standard_data = evoked_standard.copy().pick('eeg').get_data().mean(axis=0) * 1e6
+    oddball_data = evoked_oddball.copy().pick('eeg').get_data().mean(axis=0) * 1e6
     
     # Çiz
     ax.plot(times, standard_data, 'b-', linewidth=2, label='Standart Ses', alpha=0.8)
@@ -239,14 +357,14 @@ def plot_combined_erp_comparison(evoked_standard, evoked_oddball):
     ax.grid(True, alpha=0.3)
     ax.legend(loc='upper right', fontsize=10)
     
-    # P300 bölgesini vurgula
-    p300_max_idx = np.argmax(diff[(times >= 0.25) & (times <= 0.4)])
-    p300_time = times[(times >= 0.25) & (times <= 0.4)][p300_max_idx]
-    p300_amplitude = diff[(times >= 0.25) & (times <= 0.4)][p300_max_idx]
+    # P300 bölgesini vurgula (indeks tabanlı tepe araması)
+    p300_idx = peak_arrays(diff[np.newaxis], times, {'P300': (0.25, 0.4)})['peak_index'][0, 0]
+    p300_time = times[p300_idx]
+    p300_amplitude = diff[p300_idx]
     
     ax.annotate(f'P300\n({p300_time*1000:.0f}ms, {p300_amplitude:.2f}µV)',
-                xy=(p300_time, oddball_data[times == p300_time][0]),
-                xytext=(p300_time + 0.1, oddball_data[times == p300_time][0] + 2),
+                xy=(p300_time, oddball_data[p300_idx]),
+                xytext=(60, 40), textcoords='offset points',
                 arrowprops=dict(arrowstyle='->', color='red', lw=2),
                 fontsize=11, fontweight='bold', color='red',
                 bbox=dict(boxstyle='round,pad=0.5', facecolor='yellow', alpha=0.7))
@@ -258,35 +376,37 @@ def plot_combined_erp_comparison(evoked_standard, evoked_oddball):
     print(f"\n📊 P300 Analizi:")
     print(f"  - P300 Zamanı: {p300_time*1000:.0f} ms")
     print(f"  - P300 Genliği (Fark): {p300_amplitude:.2f} µV")
-    print(f"  - Standart Genlik (300ms): {standard_data[times == p300_time][0]:.2f} µV")
-    print(f"  - Oddball Genlik (300ms): {oddball_data[times == p300_time][0]:.2f} µV")
-    print(f"  - Fark: {oddball_data[times == p300_time][0] - standard_data[times == p300_time][0]:.2f} µV")
+    print(f"  - Standart Genlik (300ms): {standard_data[p300_idx]:.2f} µV")
+    print(f"  - Oddball Genlik (300ms): {oddball_data[p300_idx]:.2f} µV")
+    print(f"  - Fark: {oddball_data[p300_idx] - standard_data[p300_idx]:.2f} µV")
 
+@profiled('plotting', figure='topomaps')
 def plot_topomaps(evoked_standard, evoked_oddball, times=[0.1, 0.2, 0.3, 0.4, 0.5]):
-    """Topografik haritalar çiz"""
+    """Topografik haritalar çiz (interpolasyon matrisi montaj başına bir kez kurulur)"""
     print("\n3. Topografik haritalar çiziliyor...")
     
+    # Üç harita seti de aynı montajı kullanır: tek renderer, tek interpolasyon matrisi
+    renderer = TopoRenderer(evoked_standard.info)
+    
     # Standart için topomap
     print("  → Standart Ses topomap'leri...")
-    fig = evoked_standard.plot_topomap(times=times, show=False)
-    fig.suptitle('Standart Ses - Topografik Harita', fontsize=14, fontweight='bold')
+    plot_topomap_row(renderer, evoked_standard, times, 'Standart Ses - Topografik Harita')
     plt.show()
     
     # Oddball için topomap
     print("  → Oddball Ses topomap'leri...")
-    fig = evoked_oddball.plot_topomap(times=times, show=False)
-    fig.suptitle('Oddball Ses - Topografik Harita', fontsize=14, fontweight='bold')
+    plot_topomap_row(renderer, evoked_oddball, times, 'Oddball Ses - Topografik Harita')
     plt.show()
     
     # Fark için topomap
     print("  → Fark dalgası topomap'leri...")
     evoked_diff = mne.combine_evoked([evoked_oddball, evoked_standard], 
                                      weights=[1, -1])
-    fig = evoked_diff.plot_topomap(times=times, show=False)
-    fig.suptitle('Fark Dalgası (Oddball - Standart) - Topografik Harita', 
-                 fontsize=14, fontweight='bold')
+    plot_topomap_row(renderer, evoked_diff, times,
+                     'Fark Dalgası (Oddball - Standart) - Topografik Harita')
     plt.show()
 
+@profiled('plotting', figure='joint')
 def plot_joint_comparison(evoked_standard, evoked_oddball):
     """Joint plot (zaman serisi + topomap) karşılaştırması"""
     print("\n4. Joint plot karşılaştırması çiziliyor...")
@@ -312,6 +432,7 @@ def plot_joint_comparison(evoked_standard, evoked_oddball):
                  fontsize=14, fontweight='bold')
     plt.show()
 
+@profiled('p300')
 def analyze_p300(evoked_standard, evoked_oddball):
     """P300 dalgasını analiz et"""
     print("\n" + "="*60)
@@ -328,25 +449,29 @@ def analyze_p300(evoked_standard, evoked_oddball):
     
     print(f"\n1. P300 zaman penceresi: {p300_tmin*1000:.0f}-{p300_tmax*1000:.0f} ms")
     
-    # P300 zaman penceresindeki ortalama genlik
-    p300_window = evoked_diff.copy().crop(tmin=p300_tmin, tmax=p300_tmax)
-    p300_amplitude = p300_window.data.mean(axis=0).max()
+    # Tüm kanallar ve kanal ortalaması için tepe metrikleri (tek vektörel geçiş)
+    peaks = compute_peak_metrics(evoked_diff.data[np.newaxis], evoked_diff.times,
+                                 evoked_diff.ch_names, ['Fark'],
+                                 windows={'P300': (p300_tmin, p300_tmax)})
     
-    # P300 zamanı (maksimum genlik zamanı)
-    p300_time_idx = np.argmax(p300_window.data.mean(axis=0))
-    p300_time = p300_window.times[p300_time_idx]
+    # P300 zamanı ve genliği: kanal ortalamasının pencere içi maksimumu
+    mean_peak = peaks[peaks['channel'] == 'mean'].iloc[0]
+    p300_amplitude = mean_peak['peak_amplitude']
+    p300_time = mean_peak['peak_latency']
     
     print(f"\n2. P300 Özellikleri:")
     print(f"  - Maksimum genlik: {p300_amplitude:.2f} µV")
     print(f"  - P300 zamanı: {p300_time*1000:.0f} ms")
+    print(f"  - Ortalama genlik (pencere): {mean_peak['mean_amplitude']:.2f} µV")
+    print(f"  - %50 alan gecikmesi: {mean_peak['frac_area_latency']*1000:.0f} ms")
     
     # En güçlü P300 kanalı
-    channel_amplitudes = p300_window.data.max(axis=1)
-    max_channel_idx = np.argmax(channel_amplitudes)
-    max_channel = evoked_diff.ch_names[max_channel_idx]
+    channel_peaks = peaks[peaks['channel'] != 'mean']
+    strongest = channel_peaks.loc[channel_peaks['peak_amplitude'].idxmax()]
+    max_channel = strongest['channel']
     
     print(f"  - En güçlü kanal: {max_channel}")
-    print(f"  - Bu kanaldaki genlik: {channel_amplitudes[max_channel_idx]:.2f} µV")
+    print(f"  - Bu kanaldaki genlik: {strongest['peak_amplitude']:.2f} µV")
     
     # P300 görselleştirmesi
     print(f"\n3. P300 görselleştirmesi çiziliyor...")
@@ -375,17 +500,18 @@ def analyze_p300(evoked_standard, evoked_oddball):
         'window': (p300_tmin, p300_tmax)
     }
 
-def print_summary(epochs, evoked_standard, evoked_oddball, p300_info):
+def print_summary(evoked_standard, evoked_oddball, p300_info):
     """Analiz özetini yazdır"""
     print("\n" + "="*60)
     print("ANALİZ ÖZETİ")
     print("="*60)
     
+    # Epok sayıları ortalamaya giren epok sayısından (nave) okunur
     print(f"\n📊 Epok İstatistikleri:")
-    print(f"  - Toplam epok: {len(epochs)}")
-    print(f"  - Standart Ses: {len(epochs['Standart Ses'])} epok")
-    print(f"  - Oddball Ses: {len(epochs['Oddball Ses'])} epok")
-    print(f"  - Epok oranı: {len(epochs['Oddball Ses'])/len(epochs['Standart Ses']):.2%}")
+    print(f"  - Toplam epok: {evoked_standard.nave + evoked_oddball.nave}")
+    print(f"  - Standart Ses: {evoked_standard.nave} epok")
+    print(f"  - Oddball Ses: {evoked_oddball.nave} epok")
+    print(f"  - Epok oranı: {evoked_oddball.nave/evoked_standard.nave:.2%}")
     
     print(f"\n📈 ERP Özellikleri:")
     print(f"  - Standart Ses ortalama genlik: {evoked_standard.data.mean():.2f} µV")
@@ -400,8 +526,108 @@ def print_summary(epochs, evoked_standard, evoked_oddball, p300_info):
     
     print("\n" + "="*60)
 
-def main():
-    """Ana fonksiyon"""
+def headless_erp(context):
+    """Headless: karşılaştırmalı ERP grafikleri ve ERP dizileri"""
+    evoked_standard, evoked_oddball = context['evoked_standard'], context['evoked_oddball']
+    plot_combined_erp_comparison(evoked_standard, evoked_oddball)
+    return {
+        'times': evoked_standard.times,
+        'ch_names': np.array(evoked_standard.ch_names),
+        'standard': evoked_standard.data,
+        'oddball': evoked_oddball.data,
+        'n_standard': evoked_standard.nave,
+        'n_oddball': evoked_oddball.nave,
+    }
+
+def headless_timeseries(context):
+    """Headless: koşul bazlı zaman serileri ve fark dalgası"""
+    evoked_diff = visualize_erp_comparison(context['evoked_standard'], context['evoked_oddball'])
+    return {'times': evoked_diff.times, 'difference': evoked_diff.data}
+
+def headless_topomap(context, times=(0.1, 0.2, 0.3, 0.4, 0.5)):
+    """Headless: topografik haritalar ve harita zamanlarındaki kanal değerleri"""
+    evoked_standard, evoked_oddball = context['evoked_standard'], context['evoked_oddball']
+    plot_topomaps(evoked_standard, evoked_oddball, times=list(times))
+    idx = np.searchsorted(evoked_standard.times, times)
+    return {
+        'times': evoked_standard.times[idx],
+        'ch_names': np.array(evoked_standard.ch_names),
+        'standard': evoked_standard.data[:, idx],
+        'oddball': evoked_oddball.data[:, idx],
+    }
+
+def headless_joint(context):
+    """Headless: joint plot karşılaştırması"""
+    plot_joint_comparison(context['evoked_standard'], context['evoked_oddball'])
+
+def headless_p300(context):
+    """Headless: P300 analizi ve özet"""
+    evoked_standard, evoked_oddball = context['evoked_standard'], context['evoked_oddball']
+    p300_info = analyze_p300(evoked_standard, evoked_oddball)
+    print_summary(evoked_standard, evoked_oddball, p300_info)
+    return p300_info
+
+def headless_live(context):
+    """Headless: canlı P300 tahmini simülasyonu"""
+    snapshot = simulate_live_p300(context['raw'], context['events'],
+                                  tmin=context['params'].get('tmin', -0.2),
+                                  tmax=context['params'].get('tmax', 0.8))
+    snapshot['counts'] = {cond: int(n) for cond, n in snapshot['counts'].items()}
+    return snapshot
+
+def headless_significance(context):
+    """Headless: küme tabanlı permütasyon testi (işçi süreç içinde tek çekirdek)"""
+    result = p300_significance(context['raw'], context['events'],
+                                    n_permutations=context['params'].get('n_permutations', 1000))
+    clusters = result.pop('clusters')
+    result['cluster_masks'] = (np.array(clusters) if clusters
+                               else np.zeros((0,) + result['t_obs'].shape, dtype=bool))
+    result['ch_names'] = np.array(result['ch_names'])
+    return result
+
+# Headless modda seçilebilen analizler (ad → fonksiyon(bağlam))
+HEADLESS_ANALYSES = {
+    'erp': headless_erp,
+    'timeseries': headless_timeseries,
+    'topomap': headless_topomap,
+    'joint': headless_joint,
+    'p300': headless_p300,
+    'live': headless_live,
+    'significance': headless_significance,
+}
+
+def run_headless(config):
+    """Kaydı bir kez yükleyip ERP'leri hesapla, seçilen analizleri eşzamanlı çalıştır"""
+    import headless
+    
+    headless.use_headless_backend()
+    params = config['params']
+    tmin, tmax = params.get('tmin', -0.2), params.get('tmax', 0.8)
+    
+    raw = load_and_filter_data(config['input'])
+    events, _ = find_events(raw)
+    evoked_standard, evoked_oddball = compute_erp_vectorized(raw, events, tmin=tmin, tmax=tmax)
+    
+    print("\n" + "="*60)
+    print(f"HEADLESS ANALİZLER: {', '.join(config['analyses'])}")
+    print("="*60)
+    context = {'raw': raw, 'events': events, 'evoked_standard': evoked_standard,
+               'evoked_oddball': evoked_oddball, 'params': params}
+    manifest = headless.run_analyses('eeg_epoching_erp', config['analyses'], context,
+                                     config['output'], n_jobs=config['jobs'], dpi=config['dpi'])
+    # Başarısız analiz varsa çıkış kodu 1 (ayrıntılar diskteki manifest.json'da)
+    return 1 if any(e['status'] != 'ok' for e in manifest['analyses']) else 0
+
+@profiled('main', script='eeg_epoching_erp')
+def main(argv=None):
+    """Ana fonksiyon (argümansız: etkileşimli menü, --headless/--config: etkileşimsiz)"""
+    import headless
+    
+    config = headless.parse_args(argv, HEADLESS_ANALYSES, 'EEG epoklama ve ERP analizi',
+                                 default_output=os.path.join('results', 'erp'))
+    if config is not None:
+        return run_headless(config)
+    
     print("\n" + "="*70)
     print("EEG EPOKLAMA VE ERP ANALİZİ - ODDBALL PARADİGMASI")
     print("="*70)
@@ -413,11 +639,8 @@ def main():
         # 2. Olayları bul
         events, event_dict = find_events(raw)
         
-        # 3. Epoklar oluştur
-        epochs = create_epochs(raw, events, event_dict, tmin=-0.2, tmax=0.8)
-        
-        # 4. ERP hesapla
-        evoked_standard, evoked_oddball = compute_erp(epochs)
+        # 3-4. Epoklama ve ERP (epoklar belleğe kopyalanmadan)
+        evoked_standard, evoked_oddball = compute_erp_vectorized(raw, events, tmin=-0.2, tmax=0.8)
         
         # 5. Menü
         while True:
@@ -429,10 +652,12 @@ def main():
             print("4. Joint plot (zaman serisi + topomap)")
             print("5. P300 dalgası analizi")
             print("6. Tüm görselleştirmeleri çalıştır")
+            print("7. Canlı P300 tahmini (olay olay simülasyon)")
+            print("8. Oddball - Standart anlamlılık testi (küme permütasyonu)")
             print("0. Çıkış")
             print("="*60)
             
-            choice = input("Seçiminiz (0-6): ").strip()
+            choice = input("Seçiminiz (0-8): ").strip()
             
             if choice == '0':
                 print("\nÇıkılıyor...")
@@ -449,7 +674,7 @@ def main():
                 plot_joint_comparison(evoked_standard, evoked_oddball)
             elif choice == '5':
                 p300_info = analyze_p300(evoked_standard, evoked_oddball)
-                print_summary(epochs, evoked_standard, evoked_oddball, p300_info)
+                print_summary(evoked_standard, evoked_oddball, p300_info)
             elif choice == '6':
                 # Tüm görselleştirmeler
                 plot_combined_erp_comparison(evoked_standard, evoked_oddball)
@@ -457,9 +682,13 @@ def main():
                 plot_topomaps(evoked_standard, evoked_oddball)
                 plot_joint_comparison(evoked_standard, evoked_oddball)
                 p300_info = analyze_p300(evoked_standard, evoked_oddball)
-                print_summary(epochs, evoked_standard, evoked_oddball, p300_info)
+                print_summary(evoked_standard, evoked_oddball, p300_info)
+            elif choice == '7':
+                simulate_live_p300(raw, events)
+            elif choice == '8':
+                p300_significance(raw, events)
             else:
-                print("Geçersiz seçim! Lütfen 0-5 arası bir sayı girin.")
+                print("Geçersiz seçim! Lütfen 0-8 arası bir sayı girin.")
     
     except Exception as e:
         print(f"\n❌ Hata oluştu: {e}")
@@ -471,5 +700,5 @@ def main():
         print("3. Yeterli bellek olduğundan emin olun")
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
 
@@ -5,20 +5,22 @@ Ham veri ve filtrelenmiş veriyi yan yana karşılaştırır
 
 import mne
 import os
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
 
-def load_eeg_data():
-    """EEG verisini yükle"""
+def load_eeg_data(raw_fname=None):
+    """EEG verisini yükle (dosya verilmezse MNE örnek veri seti)"""
     print("="*60)
     print("EEG VERİSİ YÜKLEME")
     print("="*60)
     
-    # Örnek veri setini indir ve yükle
-    print("\n1. Örnek veri seti indiriliyor...")
-    sample_data_folder = mne.datasets.sample.data_path()
-    data_path = os.path.join(sample_data_folder, 'MEG', 'sample')
-    raw_fname = os.path.join(data_path, 'sample_audvis_raw.fif')
+    if raw_fname is None:
+        # Örnek veri setini indir ve yükle
+        print("\n1. Örnek veri seti indiriliyor...")
+        sample_data_folder = mne.datasets.sample.data_path()
+        data_path = os.path.join(sample_data_folder, 'MEG', 'sample')
+        raw_fname = os.path.join(data_path, 'sample_audvis_raw.fif')
     
     print("2. Veri dosyası okunuyor...")
     raw = mne.io.read_raw_fif(raw_fname, preload=True)
@@ -170,6 +172,8 @@ def plot_frequency_comparison(raw, raw_filtered, fmin=0.1, fmax=50):
     
     plt.tight_layout()
     plt.show()
+    
+    return spectrum_raw, spectrum_filtered
 
 def print_filter_info(highpass, lowpass):
     """Filtre bilgilerini yazdır"""
@@ -190,8 +194,71 @@ def print_filter_info(highpass, lowpass):
     print("  → Bu aralık EEG analizi için standarttır")
     print("  → Delta (0.5-4 Hz), Theta (4-8 Hz), Alpha (8-13 Hz), Beta (13-30 Hz) bantları korunur")
 
-def main():
-    """Ana fonksiyon"""
+def headless_comparison(context):
+    """Headless: ham ve filtrelenmiş kayıt görünümleri"""
+    visualize_comparison(context['raw'], context['raw_filtered'], duration=10, n_channels=20)
+
+def headless_channels(context):
+    """Headless: kanal bazlı karşılaştırma ve filtrenin kaldırdığı güç oranı"""
+    raw, raw_filtered = context['raw'], context['raw_filtered']
+    plot_side_by_side_comparison(raw, raw_filtered, duration=5)
+    
+    picks = mne.pick_types(raw.info, eeg=True)
+    rms_raw = np.sqrt(np.mean(raw.get_data(picks=picks) ** 2, axis=1))
+    rms_filtered = np.sqrt(np.mean(raw_filtered.get_data(picks=picks) ** 2, axis=1))
+    return {
+        'ch_names': np.array([raw.ch_names[i] for i in picks]),
+        'rms_raw': rms_raw,
+        'rms_filtered': rms_filtered,
+        'mean_power_ratio': float(np.mean((rms_filtered / rms_raw) ** 2)),
+    }
+
+def headless_psd(context):
+    """Headless: güç spektrumu karşılaştırması (kanal ortalaması PSD'ler)"""
+    spectrum_raw, spectrum_filtered = plot_frequency_comparison(context['raw'], context['raw_filtered'])
+    return {
+        'freqs': spectrum_raw.freqs,
+        'psd_raw': spectrum_raw.get_data(picks='eeg').mean(axis=0),
+        'psd_filtered': spectrum_filtered.get_data(picks='eeg').mean(axis=0),
+    }
+
+# Headless modda seçilebilen analizler (ad → fonksiyon(bağlam))
+HEADLESS_ANALYSES = {
+    'comparison': headless_comparison,
+    'channels': headless_channels,
+    'psd': headless_psd,
+}
+
+def run_headless(config):
+    """Kaydı bir kez yükleyip filtrele, seçilen analizleri eşzamanlı çalıştır"""
+    import headless
+    
+    headless.use_headless_backend()
+    params = config['params']
+    highpass = params.get('highpass', 0.1)
+    lowpass = params.get('lowpass', 40)
+    
+    raw = load_eeg_data(config['input'])
+    raw_filtered = apply_filters(raw, highpass=highpass, lowpass=lowpass)
+    
+    print("\n" + "="*60)
+    print(f"HEADLESS ANALİZLER: {', '.join(config['analyses'])}")
+    print("="*60)
+    context = {'raw': raw, 'raw_filtered': raw_filtered, 'params': params}
+    manifest = headless.run_analyses('eeg_filtering_analysis', config['analyses'], context,
+                                     config['output'], n_jobs=config['jobs'], dpi=config['dpi'])
+    # Başarısız analiz varsa çıkış kodu 1 (ayrıntılar diskteki manifest.json'da)
+    return 1 if any(e['status'] != 'ok' for e in manifest['analyses']) else 0
+
+def main(argv=None):
+    """Ana fonksiyon (argümansız: etkileşimli menü, --headless/--config: etkileşimsiz)"""
+    import headless
+    
+    config = headless.parse_args(argv, HEADLESS_ANALYSES, 'EEG filtreleme ve görselleştirme',
+                                 default_output=os.path.join('results', 'filtering'))
+    if config is not None:
+        return run_headless(config)
+    
     print("\n" + "="*70)
     print("MNE-PYTHON İLE EEG VERİSİ FİLTRELEME VE ANALİZİ")
     print("="*70)
@@ -247,5 +314,5 @@ def main():
         print("3. Yeterli disk alanı olduğundan emin olun (~100 MB)")
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
 
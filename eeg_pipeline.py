@@ -0,0 +1,288 @@
+"""
+Bildirimsel EEG Ön İşleme Hattı (Disk Önbellekli)
+Her adım parametrelerini bildirir; adım çıktısı (girdi özeti, adım adı, parametreler, bağımlı
+adımların anahtarları) özetiyle adlandırılan bir pickle dosyasında saklanır.
+Epok penceresini değiştirmek önbellekteki filtrelenmiş sinyali yeniden kullanır; filtreyi
+değiştirmek yalnızca ona bağlı adımları geçersiz kılar. Önbellek boyutu LRU ile sınırlanır.
+
+Kullanım:
+    pipeline = oddball_pipeline(cache_dir='.cache/eeg_pipeline')
+    outputs = pipeline.run('data/eeg/sub01_raw.fif')
+    pipeline.set_params('erp', tmax=0.6)   # filtre ve olaylar önbellekten gelir
+    outputs = pipeline.run('data/eeg/sub01_raw.fif')
+    pipeline.print_report()
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'eeg_pipeline')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+
+class Step:
+    """Hattın bir adımı: fonksiyon(*bağımlı çıktılar, **parametreler)
+
+    inputs: bağımlı adım adları; None ise bir önceki adım (ilk adım kaynak dosyayı alır)
+    """
+
+    def __init__(self, name, func, inputs=None, **params):
+        self.name = name
+        self.func = func
+        self.inputs = None if inputs is None else tuple(inputs)
+        self.params = params
+
+    def key(self, input_keys):
+        """(bağımlı anahtarlar, adım adı, parametreler) özetinden önbellek anahtarı"""
+        payload = json.dumps({'inputs': list(input_keys), 'step': self.name,
+                              'func': f'{self.func.__module__}.{self.func.__qualname__}',
+                              'params': self.params}, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def __repr__(self):
+        params = ', '.join(f'{k}={v!r}' for k, v in self.params.items())
+        return f'Step({self.name}: {params})'
+
+
+def file_digest(fname, chunk_size=1 << 20):
+    """Dosya içeriğinin SHA-256 özeti"""
+    digest = hashlib.sha256()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Pipeline:
+    """İçerik adresli disk önbelleği olan adım zinciri"""
+
+    def __init__(self, steps, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.steps = {}
+        previous = None
+        for step in steps:
+            if step.inputs is None:
+                step.inputs = () if previous is None else (previous,)
+            missing = [name for name in step.inputs if name not in self.steps]
+            if missing:
+                raise ValueError(f"'{step.name}' adımı tanımsız adımlara bağlı: {missing}")
+            self.steps[step.name] = step
+            previous = step.name
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.records = []
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def set_params(self, step_name, **params):
+        """Bir adımın parametrelerini güncelle (yalnızca bu adım ve sonrakiler yeniden hesaplanır)"""
+        self.steps[step_name].params.update(params)
+
+    def input_key(self, source):
+        """Kaynak dosyanın içerik özeti; (boyut, değişim zamanı) değişmedikçe yeniden okunmaz
+
+        Önbellek kapalıyken anahtarlar yalnızca rapor etiketidir; dosya okunmaz,
+        yol ve (boyut, değişim zamanı) özetlenir.
+        """
+        stat = os.stat(source)
+        memo_name = hashlib.sha1(os.path.abspath(source).encode('utf-8')).hexdigest()
+        if self.cache_dir is None:
+            return hashlib.sha256(f'{memo_name}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8')).hexdigest()
+
+        memo_path = os.path.join(self.cache_dir, f'input-{memo_name}.json')
+        signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if os.path.isfile(memo_path):
+            with open(memo_path, encoding='utf-8') as f:
+                memo = json.load(f)
+            if memo['signature'] == signature:
+                return memo['digest']
+
+        digest = file_digest(source)
+        tmp_path = f'{memo_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': os.path.abspath(source), 'signature': signature, 'digest': digest}, f)
+        os.replace(tmp_path, memo_path)
+        return digest
+
+    def keys(self, source):
+        """Tüm adımların önbellek anahtarları (hiçbir adım çalıştırılmadan)"""
+        keys = {'__source__': self.input_key(source)}
+        for name, step in self.steps.items():
+            deps = step.inputs if step.inputs else ('__source__',)
+            keys[name] = step.key([keys[d] for d in deps])
+        del keys['__source__']
+        return keys
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def _load(self, key):
+        """Önbellekten oku; (değer, dosya boyutu) ya da dosya yoksa veya bozuksa None
+
+        Aynı önbellek klasörünü paylaşan başka bir süreç dosyayı okuma sonrasında silebilir
+        (evict); boyut açık dosyadan alınır ve erişim zamanı güncellenemezse isabet geçerli kalır.
+        """
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                value = pickle.load(f)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+        try:
+            os.utime(path)  # LRU: son erişim zamanı
+        except OSError:
+            pass
+        return value, size
+
+    def _store(self, key, value):
+        """Çıktıyı yarım kalmayacak şekilde önbelleğe yaz; dosya boyutunu döndür"""
+        if self.cache_dir is None:
+            return 0
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        os.replace(tmp_path, path)
+        return size
+
+    def evict(self, protect=()):
+        """Önbellek boyut sınırını aşıyorsa en uzun süredir kullanılmayan çıktıları sil"""
+        if self.cache_dir is None or self.max_bytes is None:
+            return []
+        entries = []
+        for fname in os.listdir(self.cache_dir):
+            if fname.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.cache_dir, fname))
+                entries.append((stat.st_mtime_ns, stat.st_size, fname))
+
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, fname in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if fname[:-4] in protect:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, fname))
+            except FileNotFoundError:
+                pass  # başka bir süreç zaten sildi
+            total -= size
+            removed.append(fname[:-4])
+        return removed
+
+    def run(self, source, targets=None):
+        """Hedef adımların çıktılarını döndür (varsayılan: son adım)
+
+        Önbellekte bulunan bir adımın bağımlılıkları hiç yüklenmez; eksik adımlar
+        bağımlılık sırasıyla hesaplanır. Dönen sözlük yalnızca çözülen adımları içerir.
+        """
+        targets = [list(self.steps)[-1]] if targets is None else list(targets)
+        keys = self.keys(source)
+        outputs = {}
+        self.records = []
+
+        def resolve(name):
+            if name in outputs:
+                return outputs[name]
+            step = self.steps[name]
+            start = time.perf_counter()
+            cached = self._load(keys[name])
+            if cached is not None:
+                outputs[name], size = cached
+                self._record(step, keys[name], 'hit', time.perf_counter() - start, size)
+                return outputs[name]
+
+            args = [resolve(dep) for dep in step.inputs] if step.inputs else [source]
+            start = time.perf_counter()
+            outputs[name] = step.func(*args, **step.params)
+            elapsed = time.perf_counter() - start
+            size = self._store(keys[name], outputs[name])
+            self._record(step, keys[name], 'miss', elapsed, size)
+            return outputs[name]
+
+        for name in targets:
+            resolve(name)
+
+        self.evict(protect=set(keys.values()))
+        return outputs
+
+    def _record(self, step, key, status, seconds, size):
+        self.records.append({'step': step.name, 'status': status, 'seconds': seconds,
+                             'bytes': size, 'key': key[:12]})
+
+    def print_report(self):
+        """Son çalıştırmanın adım bazlı süre ve önbellek isabet raporu"""
+        print("\n" + "="*60)
+        print("ÖN İŞLEME HATTI RAPORU")
+        print("="*60)
+        print(f"{'Adım':<12} {'Durum':<6} {'Süre (s)':>9} {'Boyut (MB)':>11}  Anahtar")
+        for r in self.records:
+            print(f"{r['step']:<12} {r['status']:<6} {r['seconds']:>9.3f} "
+                  f"{r['bytes'] / 1e6:>11.2f}  {r['key']}")
+        hits = sum(r['status'] == 'hit' for r in self.records)
+        print(f"\nİsabet: {hits}/{len(self.records)}, "
+              f"toplam süre: {sum(r['seconds'] for r in self.records):.3f} s")
+        return self.records
+
+
+# --- Oddball hattının varsayılan adımları ---
+
+def load_raw(fname, eeg=True, stim=True):
+    """FIF kaydını yükle ve kanal tiplerini seç"""
+    import mne
+
+    raw = mne.io.read_raw_fif(fname, preload=True, verbose=False)
+    raw.pick_types(eeg=eeg, stim=stim)
+    return raw
+
+
+def filter_raw(raw, l_freq=0.1, h_freq=40, method='iir'):
+    """Bant geçiren filtre (girdi kaydı değiştirilmez)"""
+    return raw.copy().filter(l_freq=l_freq, h_freq=h_freq, method=method, picks='eeg', verbose=False)
+
+
+def find_events(raw, stim_channel='STI 014', min_duration=0.002):
+    """Stim kanalından olay dizisi"""
+    from event_index import EventIndex
+
+    return EventIndex.from_raw(raw, stim_channel=stim_channel, min_duration=min_duration).events
+
+
+def make_epochs(raw, events, event_id=None, tmin=-0.2, tmax=0.8, baseline=(None, 0)):
+    """mne.Epochs nesnesi (belleğe yüklenmiş)"""
+    import mne
+    from erp_engine import ODDBALL_EVENTS
+
+    return mne.Epochs(raw, events, event_id=event_id or ODDBALL_EVENTS, tmin=tmin, tmax=tmax,
+                      baseline=baseline, preload=True, verbose=False)
+
+
+def compute_erp(raw, events, event_id=None, tmin=-0.2, tmax=0.8, baseline=(None, 0)):
+    """Epokları saklamadan koşul bazlı ERP'ler: ({koşul: Evoked}, ERPAccumulator)"""
+    from erp_engine import ODDBALL_EVENTS, compute_erp_fast
+
+    evokeds, accumulator, _ = compute_erp_fast(raw, events, event_id or ODDBALL_EVENTS,
+                                               tmin=tmin, tmax=tmax, baseline=baseline)
+    return evokeds, accumulator
+
+
+def oddball_pipeline(tmin=-0.2, tmax=0.8, l_freq=0.1, h_freq=40, cache_dir=DEFAULT_CACHE_DIR,
+                     max_bytes=DEFAULT_MAX_BYTES):
+    """Scriptlerdeki zincir: pick_types → filter → find_events → ERP (ve isteğe bağlı Epochs)
+
+    Olaylar filtrelenmemiş kayıttan bulunur; filtre değişince olay tespiti yeniden yapılmaz.
+    """
+    return Pipeline([
+        Step('load', load_raw, eeg=True, stim=True),
+        Step('filter', filter_raw, l_freq=l_freq, h_freq=h_freq, method='iir'),
+        Step('events', find_events, inputs=('load',), stim_channel='STI 014', min_duration=0.002),
+        Step('epochs', make_epochs, inputs=('filter', 'events'), tmin=tmin, tmax=tmax),
+        Step('erp', compute_erp, inputs=('filter', 'events'), tmin=tmin, tmax=tmax),
+    ], cache_dir=cache_dir, max_bytes=max_bytes)
@@ -0,0 +1,286 @@
+"""
+Çok Denekli Toplu ERP Analizi
+FIF kayıtlarını paralel süreçlerde işler: yükleme → filtreleme → olay tespiti → epoklama → ERP → P300
+Her denek için ERP dizileri, özet tablo ve tepe metrikleri tablosu yazılır; tamamlanan denekler yeniden çalıştırmada atlanır
+
+Kullanım:
+    python erp_batch.py "data/eeg/*.fif" --output results/erp_batch --jobs 4
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from profiling import profiled, worker_call, worker_result
+
+P300_WINDOW = (0.25, 0.40)
+CONDITIONS = ['standard', 'oddball']
+
+
+def subject_name(fname):
+    """Dosya yolundan denek kimliği üret (a/sub01_raw.fif → sub01_raw-3f2a9c1e)
+
+    Kimlik dosya adına üst klasörün kısa özeti eklenerek yalnızca dosyanın kendi yolundan
+    türetilir: farklı klasörlerdeki aynı adlı kayıtlar ayrışır ve sonradan eklenen girdiler
+    mevcut deneklerin kimliğini (ve yeniden başlatmada atlanmalarını) değiştirmez.
+    """
+    stem = os.path.splitext(os.path.basename(fname))[0]
+    parent = os.path.dirname(os.path.abspath(fname))
+    return f"{stem}-{hashlib.sha1(parent.encode('utf-8')).hexdigest()[:8]}"
+
+
+def expand_inputs(inputs):
+    """Dosya listesi ve glob kalıplarını sıralı, tekrarsız dosya listesine çevir"""
+    files = []
+    for pattern in inputs:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(matches)
+    return list(dict.fromkeys(files))
+
+
+def run_params(tmin=-0.2, tmax=0.8, l_freq=0.1, h_freq=40):
+    """metrics.json'a yazılan ve yeniden kullanım için eşleşmesi gereken çalıştırma parametreleri"""
+    return {'tmin': tmin, 'tmax': tmax, 'l_freq': l_freq, 'h_freq': h_freq}
+
+
+def is_completed(out_dir, subject, params=None):
+    """Denek daha önce başarıyla işlendiyse True (metrics.json en son yazılır)
+
+    params verilirse yalnızca aynı parametrelerle üretilmiş sonuçlar tamamlanmış sayılır.
+    """
+    path = os.path.join(out_dir, subject, 'metrics.json')
+    if not os.path.isfile(path):
+        return False
+    if params is None:
+        return True
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('params') == params
+
+
+def clear_results(out_dir, subject):
+    """Deneğin önceki metrics.json ve error.txt dosyalarını sil (eski sonuç yeni hatayı örtmesin)"""
+    for name in ('metrics.json', 'error.txt'):
+        path = os.path.join(out_dir, subject, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def p300_metrics(standard, oddball, times, ch_names, window=P300_WINDOW):
+    """Fark dalgasından P300 gecikmesi, genliği ve en güçlü kanalı hesapla"""
+    from erp_peaks import compute_peak_metrics
+
+    peaks = compute_peak_metrics((oddball - standard)[np.newaxis], times, ch_names, ['Fark'],
+                                 windows={'P300': window})
+    mean_peak = peaks[peaks['channel'] == 'mean'].iloc[0]
+    channel_peaks = peaks[peaks['channel'] != 'mean']
+    strongest = channel_peaks.loc[channel_peaks['peak_amplitude'].idxmax()]
+
+    return {
+        'p300_latency': float(mean_peak['peak_latency']),
+        'p300_amplitude': float(mean_peak['peak_amplitude']),
+        'p300_mean_amplitude': float(mean_peak['mean_amplitude']),
+        'p300_frac_area_latency': float(mean_peak['frac_area_latency']),
+        'p300_channel': strongest['channel'],
+        'p300_channel_amplitude': float(strongest['peak_amplitude']),
+    }
+
+
+def _write_json_atomic(path, payload):
+    """JSON dosyasını yarım kalmayacak şekilde yaz (geçici dosya + yeniden adlandırma)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+@profiled('subject', script='erp_batch')
+def process_subject(fname, out_dir, tmin=-0.2, tmax=0.8, l_freq=0.1, h_freq=40, cache_dir=None,
+                    subject=None):
+    """Tek bir kaydı uçtan uca işle ve sonuçları denek klasörüne yaz
+
+    cache_dir verilirse ara adımlar (filtrelenmiş sinyal, olaylar) diskte önbelleğe alınır;
+    yalnızca epok penceresi değişen yeniden çalıştırmalar filtrelemeyi atlar.
+    subject: denek kimliği (varsayılan: subject_name(fname))
+    """
+    # Ağır kütüphaneler işçi süreç içinde yüklenir
+    from erp_engine import ODDBALL_EVENTS
+    from eeg_pipeline import oddball_pipeline
+
+    subject = subject or subject_name(fname)
+    subject_dir = os.path.join(out_dir, subject)
+    os.makedirs(subject_dir, exist_ok=True)
+    clear_results(out_dir, subject)
+
+    pipeline = oddball_pipeline(tmin=tmin, tmax=tmax, l_freq=l_freq, h_freq=h_freq,
+                                cache_dir=cache_dir)
+    evokeds, accumulator = pipeline.run(fname, targets=['erp'])['erp']
+    missing = [cond for cond in ODDBALL_EVENTS if cond not in evokeds]
+    if missing:
+        raise ValueError(f"{subject}: şu koşullar için epok yok: {missing}")
+
+    standard = evokeds['Standart Ses'].data
+    oddball = evokeds['Oddball Ses'].data
+    ch_names = evokeds['Standart Ses'].ch_names
+    times = evokeds['Standart Ses'].times
+
+    np.savez(os.path.join(subject_dir, 'evoked.npz'),
+             standard=standard, oddball=oddball,
+             standard_sem=accumulator.sem('Standart Ses'),
+             oddball_sem=accumulator.sem('Oddball Ses'),
+             times=times, ch_names=np.array(ch_names))
+
+    metrics = {
+        'subject': subject,
+        'file': os.path.abspath(fname),
+        'n_standard': int(evokeds['Standart Ses'].nave),
+        'n_oddball': int(evokeds['Oddball Ses'].nave),
+        'sfreq': float(evokeds['Standart Ses'].info['sfreq']),
+        **p300_metrics(standard, oddball, times, ch_names),
+        'params': run_params(tmin, tmax, l_freq, h_freq),
+    }
+    _write_json_atomic(os.path.join(subject_dir, 'metrics.json'), metrics)
+
+    return metrics
+
+
+def load_subject_arrays(out_dir, subjects):
+    """Deneklerin ERP'lerini ortak kanallarda (denek, koşul, kanal, zaman) dizisine yığ
+
+    Zaman ekseni (örnekleme hızı, örnek sayısı) en çok denekte görülen eksenden farklı olan
+    denekler yığına alınmaz. Dönen excluded sözlüğü denek → neden.
+    """
+    arrays = {s: np.load(os.path.join(out_dir, s, 'evoked.npz')) for s in subjects}
+    grids = [tuple(np.round(a['times'], 9)) for a in arrays.values()]
+    reference = max(grids, key=grids.count)
+    excluded = {}
+    for s, grid in zip(subjects, grids):
+        if grid != reference:
+            excluded[s] = (f"zaman ekseni ortak eksenden farklı ({len(grid)} örnek, "
+                           f"{grid[0]:.3f}-{grid[-1]:.3f} s; beklenen {len(reference)} örnek)")
+    included = [s for s in subjects if s not in excluded]
+
+    first = arrays[included[0]]
+    common = [ch for ch in first['ch_names'] if all(ch in arrays[s]['ch_names'] for s in included[1:])]
+    if not common:
+        raise ValueError('Denekler arasında ortak kanal yok; grand average hesaplanamaz')
+    stacked = []
+    for s in included:
+        index = {ch: i for i, ch in enumerate(arrays[s]['ch_names'])}
+        sel = [index[ch] for ch in common]
+        stacked.append([arrays[s][cond][sel] for cond in CONDITIONS])
+    return np.array(stacked), first['times'], common, excluded
+
+
+def grand_average(stacked, times, common, out_dir):
+    """Deneklerin ERP'lerini ortak kanallar üzerinden eşit ağırlıkla ortala"""
+    grand = dict(zip(CONDITIONS, stacked.mean(axis=0)))
+    np.savez(os.path.join(out_dir, 'grand_average.npz'),
+             times=times, ch_names=np.array(common), n_subjects=len(stacked), **grand)
+    return grand
+
+
+def run_batch(inputs, out_dir, n_jobs=None, tmin=-0.2, tmax=0.8, resume=True, cache_dir=None):
+    """Tüm kayıtları süreç havuzunda işle, özet tablo ve grand average yaz"""
+    import pandas as pd
+
+    os.makedirs(out_dir, exist_ok=True)
+    files = expand_inputs(inputs)
+    names = {f: subject_name(f) for f in files}
+
+    params = run_params(tmin, tmax)
+    pending = [f for f in files if not (resume and is_completed(out_dir, names[f], params))]
+    print(f"Toplam {len(files)} kayıt, {len(files) - len(pending)} tanesi aynı parametrelerle daha önce tamamlanmış.")
+
+    failures = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = {executor.submit(worker_call, process_subject, f, out_dir, tmin, tmax,
+                                       cache_dir=cache_dir, subject=names[f]): f for f in pending}
+            for future in as_completed(futures):
+                fname = futures[future]
+                subject = names[fname]
+                try:
+                    metrics = worker_result(future)
+                    print(f"  ✓ {subject}: P300 {metrics['p300_latency']*1000:.0f} ms")
+                except Exception as e:
+                    # Başarısız denek çalıştırmayı durdurmaz; hata kaydedilir
+                    failures[subject] = str(e)
+                    subject_dir = os.path.join(out_dir, subject)
+                    os.makedirs(subject_dir, exist_ok=True)
+                    clear_results(out_dir, subject)
+                    with open(os.path.join(subject_dir, 'error.txt'), 'w', encoding='utf-8') as f:
+                        f.write(''.join(traceback.format_exception(type(e), e, e.__traceback__)))
+                    print(f"  ✗ {subject}: {e}")
+
+    # Özet tablo: bu çalıştırmada ve önceki çalıştırmalarda tamamlanan tüm denekler
+    rows = []
+    for fname in files:
+        subject = names[fname]
+        if is_completed(out_dir, subject, params):
+            with open(os.path.join(out_dir, subject, 'metrics.json'), encoding='utf-8') as f:
+                metrics = json.load(f)
+            metrics.pop('params')
+            rows.append({**metrics, 'status': 'ok', 'error': ''})
+        else:
+            rows.append({'subject': subject, 'file': os.path.abspath(fname),
+                         'status': 'failed', 'error': failures.get(subject, '')})
+
+    summary = pd.DataFrame(rows)
+
+    completed = summary.loc[summary['status'] == 'ok', 'subject'].tolist()
+    if completed:
+        from erp_peaks import compute_peak_metrics
+
+        # Zaman ekseni uyuşmayan denekler grand average ve tepe tablosuna alınmaz, özette işaretlenir
+        stacked, times, common, excluded = load_subject_arrays(out_dir, completed)
+        for subject, reason in excluded.items():
+            summary.loc[summary['subject'] == subject, ['status', 'error']] = ['excluded', reason]
+            print(f"  ⚠️  {subject}: grand average dışında bırakıldı - {reason}")
+        completed = [s for s in completed if s not in excluded]
+        grand_average(stacked, times, common, out_dir)
+
+        # Tüm denek × koşul × kanal × pencere için tepe metrikleri tek geçişte
+        with_diff = np.concatenate([stacked, stacked[:, 1:2] - stacked[:, 0:1]], axis=1)
+        peaks = compute_peak_metrics(with_diff, times, common, CONDITIONS + ['difference'],
+                                     windows={'P300': P300_WINDOW}, subjects=completed)
+        peaks.to_csv(os.path.join(out_dir, 'peaks.csv'), index=False)
+    summary.to_csv(os.path.join(out_dir, 'summary.csv'), index=False)
+
+    n_excluded = int((summary['status'] == 'excluded').sum())
+    print(f"\n✓ {len(completed)} denek tamamlandı, {len(files) - len(completed) - n_excluded} başarısız, "
+          f"{n_excluded} dışarıda bırakıldı.")
+    print(f"  - Özet tablo: {os.path.join(out_dir, 'summary.csv')}")
+    print(f"  - Tepe metrikleri: {os.path.join(out_dir, 'peaks.csv')}")
+    return summary
+
+
+def main(argv=None):
+    """Komut satırı giriş noktası"""
+    parser = argparse.ArgumentParser(description='Çok denekli toplu ERP / P300 analizi')
+    parser.add_argument('inputs', nargs='+', help='FIF dosyaları veya glob kalıpları')
+    parser.add_argument('--output', default=os.path.join('results', 'erp_batch'),
+                        help='Çıktı klasörü (varsayılan: results/erp_batch)')
+    parser.add_argument('--jobs', type=int, default=None, help='Paralel süreç sayısı')
+    parser.add_argument('--tmin', type=float, default=-0.2)
+    parser.add_argument('--tmax', type=float, default=0.8)
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Tamamlanmış denekleri de yeniden işle')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Ara adımlar için disk önbelleği (örn. .cache/eeg_pipeline)')
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.inputs, args.output, n_jobs=args.jobs, tmin=args.tmin, tmax=args.tmax,
+                        resume=not args.no_resume, cache_dir=args.cache_dir)
+    # Başarısız denek varsa sıfırdan farklı çıkış kodu (headless ve benchmarks ile aynı)
+    return 1 if (summary['status'] == 'failed').any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""
+Vektörel Epoklama ve ERP Ortalama Motoru
+Epokları belleğe kopyalamadan (strided görünüm) koşul bazlı ERP ve standart hata hesaplar
+Sonuçlar mne.Epochs(...)[koşul].average() ile aynıdır
+"""
+
+from collections import deque
+
+import numpy as np
+import mne
+from numpy.lib.stride_tricks import sliding_window_view
+
+from event_index import EventIndex
+
+
+# Oddball paradigmasındaki koşul ayrımı (eeg_epoching_erp.create_epochs ile aynı)
+ODDBALL_EVENTS = {'Standart Ses': 1, 'Oddball Ses': 2}
+
+
+def projector_matrix(info, ch_names):
+    """info içindeki SSP projeksiyonlarından (örn. ortalama referans) projeksiyon matrisi oluştur"""
+    n_channels = len(ch_names)
+    bads = set(info['bads'])
+    vectors = []
+
+    for proj in info['projs']:
+        col_idx = {name: i for i, name in enumerate(proj['data']['col_names'])}
+        sel = [c for c, name in enumerate(ch_names) if name not in bads and name in col_idx]
+        vecsel = [col_idx[ch_names[c]] for c in sel]
+        if not sel:
+            continue
+
+        vecs = np.zeros((n_channels, proj['data']['nrow']))
+        vecs[sel] = proj['data']['data'][:, vecsel].T
+        norms = np.linalg.norm(vecs, axis=0)
+        vectors.append(vecs[:, norms > 0] / norms[norms > 0])
+
+    if not vectors:
+        return None
+
+    # MNE ile aynı: vektörleri yeniden ortogonalize et, bağımlı olanları at
+    U, S, _ = np.linalg.svd(np.concatenate(vectors, axis=1), full_matrices=False)
+    U = U[:, (S / S[0]) > 1e-2]
+
+    return np.eye(n_channels) - U @ U.T
+
+
+def epoch_windows(data, event_samples, start, n_times):
+    """Olay örnekleri etrafındaki pencereleri döndür
+
+    data: (kanal, örnek) sürekli sinyal
+    Dönen dizi (epok, kanal, zaman) şeklindedir; yalnızca istenen olaylar kopyalanır,
+    kaydırmalı pencere görünümünün kendisi bellek kopyası yapmaz.
+    """
+    windows = sliding_window_view(data, n_times, axis=1)  # (kanal, pencere, zaman) - kopyasız
+    return windows[:, np.asarray(event_samples) + start, :].transpose(1, 0, 2)
+
+
+def baseline_slice(times, baseline):
+    """Baseline aralığını indeks dilimine çevir (MNE rescale ile aynı kural)"""
+    if baseline is None:
+        return None
+    bmin, bmax = baseline
+    bmin = times[0] if bmin is None else bmin
+    bmax = times[-1] if bmax is None else bmax
+    imin = np.where(times >= bmin)[0][0]
+    imax = np.where(times <= bmax)[0][-1] + 1
+    return slice(imin, imax)
+
+
+def apply_baseline(block, bslice):
+    """(epok, kanal, zaman) bloğuna vektörel baseline düzeltmesi uygula"""
+    if bslice is None:
+        return block
+    return block - block[..., bslice].mean(axis=-1, keepdims=True)
+
+
+class ERPAccumulator:
+    """Koşul bazlı toplam ve kareler toplamı tutan ERP biriktiricisi"""
+
+    def __init__(self, n_channels, n_times):
+        self.n_channels = n_channels
+        self.n_times = n_times
+        self.sums = {}
+        self.sumsq = {}
+        self.counts = {}
+
+    def add(self, condition, block):
+        """(epok, kanal, zaman) ya da (kanal, zaman) bloğunu koşula ekle"""
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim == 2:
+            block = block[np.newaxis]
+
+        if condition not in self.sums:
+            self.sums[condition] = np.zeros((self.n_channels, self.n_times))
+            self.sumsq[condition] = np.zeros((self.n_channels, self.n_times))
+            self.counts[condition] = 0
+
+        self.sums[condition] += block.sum(axis=0)
+        self.sumsq[condition] += np.einsum('ect,ect->ct', block, block)
+        self.counts[condition] += len(block)
+
+    def mean(self, condition):
+        """Koşulun ortalama ERP'si (kanal, zaman)"""
+        return self.sums[condition] / self.counts[condition]
+
+    def sem(self, condition):
+        """Koşulun standart hatası (kanal, zaman)
+
+        mne Epochs.standard_error() ile aynı tanım: popülasyon std'si (ddof=0) / sqrt(n).
+        """
+        n = self.counts[condition]
+        if n < 2:
+            return np.zeros((self.n_channels, self.n_times))
+        mean = self.mean(condition)
+        var = self.sumsq[condition] / n - mean ** 2
+        return np.sqrt(np.clip(var, 0, None) / n)
+
+
+def _bad_annotation_mask(raw):
+    """'bad' ile başlayan anotasyonların kapsadığı örnekleri işaretle"""
+    mask = np.zeros(raw.n_times, dtype=bool)
+    annotations = raw.annotations
+    if len(annotations) == 0:
+        return mask
+
+    is_bad = np.array([desc.upper().startswith('BAD') for desc in annotations.description])
+    if not is_bad.any():
+        return mask
+
+    # Anotasyon başlangıçları ilk örneğe göre değil kayıt başlangıcına göredir
+    onsets = annotations.onset[is_bad] - raw.first_time
+    ends = onsets + annotations.duration[is_bad]
+    for onset, end in zip(raw.time_as_index(onsets, use_rounding=True),
+                          raw.time_as_index(ends, use_rounding=True)):
+        # Süresi sıfır olan anotasyonlar da tek örneği işaretler (MNE ile aynı)
+        mask[max(onset, 0):max(end, onset + 1, 0)] = True
+    return mask
+
+
+def _pick_indices(raw, picks):
+    """MNE pick ifadesi ('data', kanal tipi, ad listesi, indeks dizisi) → indeksler
+
+    Seçim MNE'nin kendi kurallarıyla yapılır (Epochs.average ile aynı: kötü kanallar dahil).
+    """
+    try:
+        from mne._fiff.pick import _picks_to_idx
+    except ImportError:  # mne < 1.6
+        from mne.io.pick import _picks_to_idx
+
+    if picks is not None and not isinstance(picks, str):
+        picks = np.atleast_1d(picks)
+        if picks.dtype == bool:
+            picks = np.flatnonzero(picks)
+    return _picks_to_idx(raw.info, picks, none='data', exclude=())
+
+
+def _epoch_setup(raw, events, tmin, tmax, baseline, picks, reject_by_annotation):
+    """Epoklama için ortak hazırlık: zaman ızgarası, projeksiyonlu veri ve geçerlilik maskesi"""
+    if not isinstance(events, EventIndex):
+        events = EventIndex(events, raw.info['sfreq'], raw.first_samp)
+
+    sfreq = raw.info['sfreq']
+    start = int(round(tmin * sfreq))
+    stop = int(round(tmax * sfreq))
+    times = np.arange(start, stop + 1) / sfreq
+
+    pick_idx = _pick_indices(raw, picks)
+    info = mne.pick_info(raw.info, pick_idx)
+    data = raw.get_data(picks=pick_idx)
+
+    # SSP projeksiyonları doğrusal ve zamandan bağımsızdır: sürekli veriye bir kez uygula
+    proj = projector_matrix(info, info['ch_names'])
+    if proj is not None:
+        data = proj @ data
+
+    bad = np.concatenate([[0], np.cumsum(_bad_annotation_mask(raw))]) if reject_by_annotation else None
+
+    return {
+        'events': events, 'data': data, 'info': info, 'times': times,
+        'start': start, 'stop': stop, 'bad': bad, 'first_samp': raw.first_samp,
+        'bslice': baseline_slice(times, baseline),
+    }
+
+
+def _valid_samples(setup, samples):
+    """Penceresi kayıt içinde kalan ve kötü anotasyona değmeyen örneklerin maskesi"""
+    n_samples = setup['data'].shape[1]
+    start, stop, bad = setup['start'], setup['stop'], setup['bad']
+
+    valid = (samples + start >= 0) & (samples + stop < n_samples)
+    if bad is not None:
+        lo = np.clip(samples + start, 0, n_samples)
+        hi = np.clip(samples + stop + 1, 0, n_samples)
+        valid &= (bad[hi] - bad[lo]) == 0
+    return valid
+
+
+def _condition_samples(setup, code):
+    """Koşulun geçerli olay örnekleri (sınır dışı ve kötü anotasyonlu olanlar elenir)"""
+    samples = setup['events'].samples(code) - setup['first_samp']
+    return samples[_valid_samples(setup, samples)]
+
+
+def _condition_blocks(setup, code, chunk_size):
+    """Koşulun baseline düzeltilmiş epoklarını (epok, kanal, zaman) bloklar halinde üret"""
+    samples = _condition_samples(setup, code)
+    n_times = len(setup['times'])
+    for i in range(0, len(samples), chunk_size):
+        block = epoch_windows(setup['data'], samples[i:i + chunk_size], setup['start'], n_times)
+        yield apply_baseline(block, setup['bslice'])
+
+
+def compute_erp_fast(raw, events, event_id, tmin=-0.2, tmax=0.8, baseline=(None, 0),
+                     picks='data', chunk_size=256, reject_by_annotation=True):
+    """Epokları saklamadan koşul bazlı ERP hesapla
+
+    events: (olay, 3) dizisi veya EventIndex (koşul örnekleri yeniden taranmadan alınır)
+    Dönen değer: ({koşul: mne.EvokedArray}, ERPAccumulator, zamanlar)
+    Standart hata için accumulator.sem(koşul) kullanılabilir.
+    """
+    setup = _epoch_setup(raw, events, tmin, tmax, baseline, picks, reject_by_annotation)
+    info, times = setup['info'], setup['times']
+
+    accumulator = ERPAccumulator(len(info['ch_names']), len(times))
+    for condition, code in event_id.items():
+        for block in _condition_blocks(setup, code, chunk_size):
+            accumulator.add(condition, block)
+
+    evokeds = {}
+    for condition in event_id:
+        if accumulator.counts.get(condition, 0) == 0:
+            continue
+        evoked = mne.EvokedArray(accumulator.mean(condition), info, tmin=times[0],
+                                 nave=accumulator.counts[condition], comment=condition,
+                                 baseline=baseline, verbose=False)
+        # Veri zaten projeksiyonlu; apply_proj idempotenttir ve projeksiyonları aktif işaretler
+        evokeds[condition] = evoked.apply_proj(verbose=False)
+
+    return evokeds, accumulator, times
+
+
+def extract_epochs_array(raw, events, event_id, tmin=-0.2, tmax=0.8, baseline=(None, 0),
+                         picks='data', chunk_size=256, reject_by_annotation=True,
+                         dtype=np.float32):
+    """İstatistik testleri için koşul bazlı epok dizilerini bir kez çıkar
+
+    Dönen değer: ({koşul: (epok, kanal, zaman) dizisi}, info, zamanlar)
+    Diziler doğrudan hedef dtype ile doldurulur (float32 varsayılan, belleği yarıya indirir).
+    """
+    setup = _epoch_setup(raw, events, tmin, tmax, baseline, picks, reject_by_annotation)
+    n_channels, n_times = len(setup['info']['ch_names']), len(setup['times'])
+
+    arrays = {}
+    for condition, code in event_id.items():
+        n_epochs = len(_condition_samples(setup, code))
+        out = np.empty((n_epochs, n_channels, n_times), dtype=dtype)
+        pos = 0
+        for block in _condition_blocks(setup, code, chunk_size):
+            out[pos:pos + len(block)] = block
+            pos += len(block)
+        arrays[condition] = out
+
+    return arrays, setup['info'], setup['times']
+
+
+def epochs_at(raw, samples, tmin=-0.2, tmax=0.8, baseline=(None, 0), picks='data',
+              chunk_size=256, reject_by_annotation=True, dtype=np.float32):
+    """Verilen olay örneklerinin (first_samp dahil) epokları, girdi sırasıyla
+
+    Koşul kodundan bağımsızdır; denemelere hizalanmış olaylar için kullanılır.
+    Dönen değer: ((geçerli epok, kanal, zaman) dizisi, geçerlilik maskesi, info, zamanlar)
+    """
+    setup = _epoch_setup(raw, np.empty((0, 3), dtype=np.int64), tmin, tmax, baseline, picks,
+                         reject_by_annotation)
+    samples = np.asarray(samples, dtype=np.int64) - setup['first_samp']
+    valid = _valid_samples(setup, samples)
+    samples = samples[valid]
+    n_times = len(setup['times'])
+
+    out = np.empty((len(samples), len(setup['info']['ch_names']), n_times), dtype=dtype)
+    for i in range(0, len(samples), chunk_size):
+        block = epoch_windows(setup['data'], samples[i:i + chunk_size], setup['start'], n_times)
+        out[i:i + len(block)] = apply_baseline(block, setup['bslice'])
+    return out, valid, setup['info'], setup['times']
+
+
+class StreamingP300:
+    """Olay geldikçe güncellenen ERP, fark dalgası ve canlı P300 tahmini
+
+    Her yeni epok O(kanal x zaman) maliyetle eklenir; snapshot() ile herhangi bir
+    anda o ana kadarki ortalamalar ve P300 tahmini alınabilir.
+    """
+
+    def __init__(self, times, n_channels, window=(0.25, 0.40), baseline=(None, 0),
+                 standard='Standart Ses', oddball='Oddball Ses', history_size=256):
+        self.times = np.asarray(times)
+        self.window = window
+        self.standard = standard
+        self.oddball = oddball
+        self.bslice = baseline_slice(self.times, baseline)
+        self.accumulator = ERPAccumulator(n_channels, len(self.times))
+
+        # P300 penceresi indeksleri (float eşitlik karşılaştırması yerine)
+        self.win_start, self.win_stop = np.searchsorted(self.times, window[0]), \
+            np.searchsorted(self.times, window[1], side='right')
+        # (olay sayısı, gecikme, genlik); yakınsama için yalnızca son tahminler gerekir
+        self.history = deque(maxlen=history_size)
+
+    def update(self, epoch, condition):
+        """Tek epok (kanal, zaman) ekle ve P300 tahminini güncelle"""
+        self.accumulator.add(condition, apply_baseline(np.asarray(epoch), self.bslice))
+
+        latency, amplitude = self.p300_estimate()
+        if latency is not None:
+            self.history.append((sum(self.accumulator.counts.values()), latency, amplitude))
+        return latency, amplitude
+
+    def update_from_signal(self, data, sample, start, condition):
+        """Sürekli sinyal tamponundan olay etrafındaki pencereyi alıp ekle
+
+        Penceresi tamponun dışına taşan olaylar için ValueError verilir.
+        """
+        lo, hi = sample + start, sample + start + len(self.times)
+        if lo < 0 or hi > data.shape[1]:
+            raise ValueError(f"{sample} örneğindeki olayın penceresi [{lo}, {hi}) "
+                             f"tamponun dışında (0-{data.shape[1]})")
+        epoch = data[:, lo:hi]
+        return self.update(epoch, condition)
+
+    def difference(self):
+        """Fark dalgası (Oddball - Standart), iki koşul da yoksa None"""
+        counts = self.accumulator.counts
+        if counts.get(self.standard, 0) == 0 or counts.get(self.oddball, 0) == 0:
+            return None
+        return self.accumulator.mean(self.oddball) - self.accumulator.mean(self.standard)
+
+    def p300_estimate(self):
+        """Kanal ortalamalı fark dalgasında pencere içi maksimumun gecikmesi ve genliği"""
+        diff = self.difference()
+        if diff is None:
+            return None, None
+        window_mean = diff[:, self.win_start:self.win_stop].mean(axis=0)
+        peak_idx = np.argmax(window_mean)
+        return self.times[self.win_start + peak_idx], window_mean[peak_idx]
+
+    def has_converged(self, latency_tol=0.010, amplitude_tol=0.5e-6, n_stable=20):
+        """Son n_stable tahmin belirtilen toleranslar içinde kaldıysa True"""
+        if len(self.history) < n_stable:
+            return False
+        recent = np.array(list(self.history)[-n_stable:])
+        return (np.ptp(recent[:, 1]) <= latency_tol) and (np.ptp(recent[:, 2]) <= amplitude_tol)
+
+    def snapshot(self):
+        """O ana kadarki ortalamaların, fark dalgasının ve P300 tahmininin kopyası"""
+        latency, amplitude = self.p300_estimate()
+        counts = dict(self.accumulator.counts)
+        return {
+            'counts': counts,
+            'means': {cond: self.accumulator.mean(cond) for cond in counts},
+            'sems': {cond: self.accumulator.sem(cond) for cond in counts},
+            'difference': self.difference(),
+            'p300_latency': latency,
+            'p300_amplitude': amplitude,
+            'converged': self.has_converged(),
+        }
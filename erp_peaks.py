@@ -0,0 +1,119 @@
+"""
+Vektörel ERP Tepe (Peak) Metrikleri
+Tüm kanal × koşul × pencere (× denek) kombinasyonları için tek geçişte:
+tepe gecikmesi, tepe genliği, ortalama genlik ve kesirli alan gecikmesi
+Zaman aralıkları indeks tabanlıdır (float eşitlik karşılaştırması yapılmaz)
+"""
+
+import numpy as np
+
+# Pencere tanımı: isim → (tmin, tmax) veya (tmin, tmax, 'positive' | 'negative')
+DEFAULT_WINDOWS = {'P300': (0.25, 0.40)}
+
+
+def window_bounds(times, windows):
+    """Pencereleri [başlangıç, bitiş) indekslerine ve polariteye çevir; boş pencere ValueError"""
+    names, starts, stops, signs = [], [], [], []
+    for name, spec in windows.items():
+        tmin, tmax = spec[0], spec[1]
+        polarity = spec[2] if len(spec) > 2 else 'positive'
+        start, stop = np.searchsorted(times, tmin), np.searchsorted(times, tmax, side='right')
+        if stop <= start:
+            # Boş pencerede tepe tanımsızdır (argmax sessizce times[0] döndürürdü)
+            raise ValueError(f"'{name}' penceresi ({tmin}-{tmax} s) hiç örnek içermiyor "
+                             f"(zaman aralığı: {times[0]:.3f}-{times[-1]:.3f} s)")
+        names.append(name)
+        starts.append(start)
+        stops.append(stop)
+        signs.append(-1.0 if polarity == 'negative' else 1.0)
+    return names, np.array(starts), np.array(stops), np.array(signs)
+
+
+def peak_arrays(data, times, windows=None, fraction=0.5):
+    """Ham metrik dizilerini hesapla
+
+    data: (..., kanal, zaman) dizisi
+    Dönen sözlükteki her dizi (..., kanal, pencere) şeklindedir.
+    """
+    windows = DEFAULT_WINDOWS if windows is None else windows
+    data = np.asarray(data)
+    names, starts, stops, signs = window_bounds(times, windows)
+
+    # Her pencere yalnızca kendi örnek aralığı üzerinden işlenir: (..., kanal, pencere, zaman)
+    # boyutlu ara diziler oluşturulmaz, bellek pencere sayısıyla çarpılmaz
+    shape = data.shape[:-1] + (len(names),)
+    peak_idx = np.empty(shape, dtype=np.int64)
+    peak_amplitude = np.empty(shape, dtype=data.dtype)
+    mean_amplitude = np.empty(shape)
+    frac_latency = np.empty(shape)
+    for w, (start, stop, sign) in enumerate(zip(starts, stops, signs)):
+        segment = data[..., start:stop]
+        signed = segment * sign
+
+        # Tepe: polariteye göre işaretlenmiş argmax
+        local = signed.argmax(axis=-1)
+        peak_idx[..., w] = start + local
+        peak_amplitude[..., w] = np.take_along_axis(segment, local[..., np.newaxis], axis=-1)[..., 0]
+        mean_amplitude[..., w] = segment.mean(axis=-1)
+
+        # Kesirli alan gecikmesi: pozitif (polariteye göre) alanın belirtilen kesrine ulaşılan ilk an
+        area = np.cumsum(np.clip(signed, 0, None), axis=-1)
+        total = area[..., -1:]
+        frac_idx = start + (area >= fraction * total).argmax(axis=-1)
+        frac_latency[..., w] = np.where(total[..., 0] > 0, times[frac_idx], np.nan)
+
+    return {
+        'windows': names,
+        'peak_index': peak_idx,
+        'peak_latency': times[peak_idx],
+        'peak_amplitude': peak_amplitude,
+        'mean_amplitude': mean_amplitude,
+        'frac_area_latency': frac_latency,
+    }
+
+
+def compute_peak_metrics(data, times, ch_names, conditions, windows=None, subjects=None,
+                         fraction=0.5, include_mean=True):
+    """Tepe metriklerini düzenli (tidy) tablo olarak döndür
+
+    data: (koşul, kanal, zaman) veya (denek, koşul, kanal, zaman)
+    include_mean: kanal ortalaması 'mean' adlı ek kanal olarak eklenir
+    """
+    import pandas as pd
+
+    data = np.asarray(data)
+    single_subject = subjects is None
+    if single_subject:
+        data = data[np.newaxis]
+        subjects = [None]
+    ch_names = list(ch_names)
+    if include_mean:
+        data = np.concatenate([data, data.mean(axis=-2, keepdims=True)], axis=-2)
+        ch_names = ch_names + ['mean']
+
+    metrics = peak_arrays(data, times, windows=windows, fraction=fraction)
+    n_subj, n_cond, n_ch, n_win = metrics['peak_latency'].shape
+
+    s_idx, c_idx, ch_idx, w_idx = (ix.ravel() for ix in np.indices((n_subj, n_cond, n_ch, n_win)))
+    table = pd.DataFrame({
+        'subject': np.asarray(subjects, dtype=object)[s_idx],
+        'condition': np.asarray(conditions, dtype=object)[c_idx],
+        'channel': np.asarray(ch_names, dtype=object)[ch_idx],
+        'window': np.asarray(metrics['windows'], dtype=object)[w_idx],
+        'peak_latency': metrics['peak_latency'].ravel(),
+        'peak_amplitude': metrics['peak_amplitude'].ravel(),
+        'mean_amplitude': metrics['mean_amplitude'].ravel(),
+        'frac_area_latency': metrics['frac_area_latency'].ravel(),
+    })
+    if single_subject:
+        table = table.drop(columns='subject')
+    return table
+
+
+def evoked_peak_metrics(evokeds, windows=None, fraction=0.5, include_mean=True):
+    """{koşul: mne.Evoked} sözlüğü için tepe metrikleri tablosu"""
+    conditions = list(evokeds)
+    first = evokeds[conditions[0]]
+    data = np.stack([evokeds[cond].data for cond in conditions])
+    return compute_peak_metrics(data, first.times, first.ch_names, conditions,
+                                windows=windows, fraction=fraction, include_mean=include_mean)
@@ -0,0 +1,179 @@
+"""
+Küme Tabanlı Permütasyon Testi (Oddball vs Standart)
+Önceden çıkarılmış epok dizileri üzerinde, permütasyonları vektörel bloklar halinde üretir,
+t-haritalarını matris çarpımlarıyla hesaplar ve kümeleri önbellekteki kanal komşuluk grafı
+üzerinde bulur. Bloklar çekirdeklere dağıtılabilir; aynı tohum her zaman aynı sonucu verir.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse, stats
+from scipy.sparse.csgraph import connected_components
+
+# Kanal düzeni → komşuluk matrisi önbelleği
+_ADJACENCY_CACHE = {}
+
+# İşçi süreçlerde bir kez kurulan paylaşılan durum (her blokta yeniden gönderilmez)
+_WORKER_STATE = {}
+
+
+def channel_adjacency(info, ch_type='eeg'):
+    """Kanal komşuluk grafını döndür; aynı kanal düzeni için bir kez hesaplanır"""
+    import mne
+
+    positions = np.array([ch['loc'][:3] for ch in info['chs']])
+    key = (tuple(info['ch_names']), positions.tobytes(), ch_type)
+    if key not in _ADJACENCY_CACHE:
+        adjacency, _ = mne.channels.find_ch_adjacency(info, ch_type)
+        _ADJACENCY_CACHE[key] = sparse.csr_matrix(adjacency, dtype=bool)
+    return _ADJACENCY_CACHE[key]
+
+
+def spatiotemporal_adjacency(ch_adjacency, n_times):
+    """(kanal × zaman) düzlemi için komşuluk: aynı anda komşu kanal veya aynı kanalda komşu an
+
+    Düzleştirme sırası kanal-öncelikli: indeks = kanal * n_times + zaman
+    """
+    n_channels = ch_adjacency.shape[0]
+    time_adj = sparse.diags([np.ones(n_times - 1), np.ones(n_times - 1)], [-1, 1])
+    spatial = sparse.kron(ch_adjacency.astype(float), sparse.identity(n_times))
+    temporal = sparse.kron(sparse.identity(n_channels), time_adj)
+    adjacency = (spatial + temporal).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return adjacency
+
+
+def _t_from_sums(sum_a, ssq_a, total, total_sq, n_a, n_b):
+    """Grup toplamlarından birleşik varyanslı bağımsız örneklem t değerleri"""
+    sum_b = total - sum_a
+    ssq_b = total_sq - ssq_a
+    mean_a, mean_b = sum_a / n_a, sum_b / n_b
+    var_a = (ssq_a - n_a * mean_a ** 2) / (n_a - 1)
+    var_b = (ssq_b - n_b * mean_b ** 2) / (n_b - 1)
+    pooled = ((n_a - 1) * var_a + (n_b - 1) * var_b) / (n_a + n_b - 2)
+    return (mean_a - mean_b) / np.sqrt(np.clip(pooled, 1e-30, None) * (1 / n_a + 1 / n_b))
+
+
+def find_clusters(t_map, threshold, adjacency, tail=0):
+    """Eşik üstü kümeleri bul; (küme indeksleri listesi, küme kütleleri) döndür"""
+    clusters, masses = [], []
+    signs = {0: (1, -1), 1: (1,), -1: (-1,)}[tail]
+    for sign in signs:
+        supra = np.flatnonzero(sign * t_map > threshold)
+        if len(supra) == 0:
+            continue
+        sub = adjacency[supra][:, supra]
+        n_comp, labels = connected_components(sub, directed=False)
+        mass = np.bincount(labels, weights=t_map[supra], minlength=n_comp)
+        order = np.argsort(labels, kind='stable')
+        splits = np.cumsum(np.bincount(labels, minlength=n_comp))[:-1]
+        clusters.extend(np.split(supra[order], splits))
+        masses.extend(mass)
+    return clusters, np.array(masses)
+
+
+def _init_worker(X, X_sq, labels, adjacency, threshold, tail):
+    """İşçi süreç başlangıcında büyük dizileri bir kez al"""
+    _WORKER_STATE.update(X=X, X_sq=X_sq, labels=labels, adjacency=adjacency,
+                         threshold=threshold, tail=tail,
+                         total=X.sum(axis=0, dtype=np.float64),
+                         total_sq=X_sq.sum(axis=0, dtype=np.float64))
+
+
+def _run_block(seed, n_perm):
+    """Bir permütasyon bloğu: etiket matrisi → matris çarpımıyla t-haritaları → maksimum küme kütlesi"""
+    state = _WORKER_STATE
+    labels = state['labels']
+    n_a = int(labels.sum())
+    n_b = len(labels) - n_a
+
+    rng = np.random.default_rng(seed)
+    L = rng.permuted(np.tile(labels, (n_perm, 1)), axis=1).astype(state['X'].dtype)
+
+    sum_a = (L @ state['X']).astype(np.float64)
+    ssq_a = (L @ state['X_sq']).astype(np.float64)
+    t_maps = _t_from_sums(sum_a, ssq_a, state['total'], state['total_sq'], n_a, n_b)
+
+    max_mass = np.zeros(n_perm)
+    for i, t_map in enumerate(t_maps):
+        _, masses = find_clusters(t_map, state['threshold'], state['adjacency'], state['tail'])
+        if len(masses):
+            max_mass[i] = np.abs(masses).max()
+    return max_mass
+
+
+def permutation_cluster_test(X_a, X_b, adjacency, n_permutations=1000, p_threshold=0.05,
+                             threshold=None, tail=0, block_size=64, n_jobs=1, seed=42):
+    """İki koşul arasında uzay-zamansal küme permütasyon testi
+
+    X_a, X_b: (epok, kanal, zaman) dizileri (örn. Oddball ve Standart)
+    adjacency: kanal komşuluk matrisi (channel_adjacency ile önbellekten)
+    Sonuç (seed, block_size) ikilisine bağlıdır; n_jobs değiştiğinde değişmez.
+    Dönen sözlük: t_obs, clusters (kanal × zaman maskeleri), cluster_stats, cluster_p_values, h0
+    """
+    n_a, n_b = len(X_a), len(X_b)
+    _, n_channels, n_times = X_a.shape
+    dtype = np.result_type(X_a.dtype, X_b.dtype)
+
+    X = np.concatenate([X_a.reshape(n_a, -1), X_b.reshape(n_b, -1)]).astype(dtype, copy=False)
+    X_sq = X * X
+    labels = np.r_[np.ones(n_a), np.zeros(n_b)].astype(dtype)
+    st_adjacency = spatiotemporal_adjacency(sparse.csr_matrix(adjacency), n_times)
+
+    if threshold is None:
+        q = 1 - p_threshold / 2 if tail == 0 else 1 - p_threshold
+        threshold = stats.t.ppf(q, n_a + n_b - 2)
+
+    # Gözlenen istatistik
+    _init_worker(X, X_sq, labels, st_adjacency, threshold, tail)
+    t_obs = _t_from_sums(labels @ X.astype(np.float64), labels @ X_sq.astype(np.float64),
+                         _WORKER_STATE['total'], _WORKER_STATE['total_sq'], n_a, n_b)
+    clusters, cluster_stats = find_clusters(t_obs, threshold, st_adjacency, tail)
+
+    # Permütasyon blokları: her bloğun tohumu blok sırasına bağlıdır (işçi sayısından bağımsız)
+    sizes = [min(block_size, n_permutations - i) for i in range(0, n_permutations, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if n_jobs == 1:
+        h0 = [_run_block(s, n) for s, n in zip(seeds, sizes)]
+    else:
+        n_workers = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(X, X_sq, labels, st_adjacency, threshold, tail)) as executor:
+            h0 = list(executor.map(_run_block, seeds, sizes))
+    h0 = np.concatenate(h0)
+
+    p_values = (np.sum(h0[None, :] >= np.abs(cluster_stats)[:, None], axis=1) + 1) / (n_permutations + 1)
+
+    masks = []
+    for idx in clusters:
+        mask = np.zeros(n_channels * n_times, dtype=bool)
+        mask[idx] = True
+        masks.append(mask.reshape(n_channels, n_times))
+
+    _WORKER_STATE.clear()
+    return {
+        't_obs': t_obs.reshape(n_channels, n_times),
+        'clusters': masks,
+        'cluster_stats': cluster_stats,
+        'cluster_p_values': p_values,
+        'h0': h0,
+        'threshold': threshold,
+    }
+
+
+def oddball_vs_standard_test(raw, events, tmin=-0.2, tmax=0.8, n_permutations=1000,
+                             n_jobs=1, seed=42, **kwargs):
+    """Kayıttan epok dizilerini bir kez çıkarıp Oddball - Standart küme testini çalıştır"""
+    from erp_engine import ODDBALL_EVENTS, extract_epochs_array
+
+    arrays, info, times = extract_epochs_array(raw, events, ODDBALL_EVENTS, tmin=tmin, tmax=tmax)
+    result = permutation_cluster_test(arrays['Oddball Ses'], arrays['Standart Ses'],
+                                      channel_adjacency(info), n_permutations=n_permutations,
+                                      n_jobs=n_jobs, seed=seed, **kwargs)
+    result['times'] = times
+    result['ch_names'] = info['ch_names']
+    return result
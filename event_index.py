@@ -0,0 +1,161 @@
+"""
+Hızlı Olay Tespiti ve Olay İndeksi
+Stim kanalında tek vektörel kenar tespiti geçişiyle olayları bulur (mne.find_events ile aynı sonuç)
+Olay sayıları np.bincount ile, zaman penceresi ve "uyarandan sonraki ilk tepki" sorguları searchsorted ile yapılır
+"""
+
+import weakref
+
+import numpy as np
+
+# Ön işlenmiş kayıt nesnesi yaşadığı sürece olay indeksi önbellekte tutulur
+_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+
+def detect_events(stim, first_samp=0, min_samples=0):
+    """Stim kanalındaki artan basamakları olay olarak bul
+
+    mne.find_events(consecutive='increasing', output='onset') ile aynı kuralları uygular.
+    Dönen dizi (olay, 3): [örnek, önceki değer, olay kodu]
+    """
+    stim = np.abs(np.asarray(stim).ravel().astype(np.int64))
+
+    # Tüm değer değişimleri tek geçişte bulunur
+    idx = np.flatnonzero(stim[1:] != stim[:-1])
+    steps = np.c_[idx + 1 + first_samp, stim[idx], stim[idx + 1]]
+    # Kayıt sonunda açık kalan tetik kapatılır (pad_stop=0)
+    if len(steps) and steps[-1, 2] != 0:
+        steps = np.vstack([steps, [len(stim) + first_samp, steps[-1, 2], 0]])
+    if len(steps) == 0:
+        return np.empty((0, 3), dtype=np.int64)
+
+    # min_duration'dan kısa basamaklar bir sonrakiyle birleştirilir
+    merge = int(min_samples // 1)
+    if min_samples > 0 and merge == min_samples:
+        merge -= 1
+    if merge > 0:
+        short = np.diff(steps[:, 0]) <= merge
+        if short.any():
+            where = np.flatnonzero(short)
+            steps[where + 1, 1] = steps[where, 1]
+            keep = np.append(~short, True) & (steps[:, 1] != steps[:, 2])
+            steps = steps[keep]
+
+    onsets = steps[:, 2] > steps[:, 1]
+    offsets = (onsets | (steps[:, 2] == 0)) & (steps[:, 1] > 0)
+    onset_idx, offset_idx = np.flatnonzero(onsets), np.flatnonzero(offsets)
+    if len(onset_idx) == 0 or len(offset_idx) == 0:
+        return np.empty((0, 3), dtype=np.int64)
+
+    # Eşi olmayan son başlangıç atılır
+    if onset_idx[-1] > offset_idx[-1]:
+        onset_idx = onset_idx[:-1]
+
+    return steps[onset_idx]
+
+
+class EventIndex:
+    """Olay dizisi üzerinde hızlı sayım ve sorgu indeksi"""
+
+    def __init__(self, events, sfreq, first_samp=0):
+        self.events = np.asarray(events, dtype=np.int64).reshape(-1, 3)
+        self.sfreq = float(sfreq)
+        self.first_samp = int(first_samp)
+
+        codes = self.events[:, 2]
+        self.counts = np.bincount(codes) if len(codes) else np.zeros(0, dtype=np.int64)
+
+        # Olay kodu, sonra örnek sırasına göre tek sıralama; her kod ardışık bir dilimdir
+        order = np.lexsort((self.events[:, 0], codes))
+        self._sorted = self.events[order]
+        self._offsets = np.concatenate([[0], np.cumsum(self.counts)])
+
+    @classmethod
+    def from_raw(cls, raw, stim_channel='STI 014', min_duration=0.002, shortest_event=2):
+        """Kayıttaki stim kanalından indeks oluştur"""
+        stim = raw.get_data(picks=[stim_channel])[0]
+        events = detect_events(stim, raw.first_samp, min_samples=min_duration * raw.info['sfreq'])
+
+        # mne.find_events ile aynı güvenlik kontrolü: sahte kısa olaylar
+        n_short = np.sum(np.diff(events[:, 0]) < shortest_event)
+        if n_short > 0:
+            raise ValueError(f"{n_short} olay shortest_event={shortest_event} örnekten kısa; "
+                             "min_duration değerini artırmayı deneyin.")
+
+        return cls(events, raw.info['sfreq'], raw.first_samp)
+
+    @property
+    def event_ids(self):
+        """Kayıtta bulunan olay kodları"""
+        return np.flatnonzero(self.counts)
+
+    def count(self, event_id):
+        """Verilen koddaki olay sayısı"""
+        return int(self.counts[event_id]) if 0 <= event_id < len(self.counts) else 0
+
+    def of_type(self, event_id):
+        """Verilen koddaki olaylar (örnek sırasına göre, kopyasız dilim)"""
+        if not 0 <= event_id < len(self.counts):
+            return self._sorted[:0]
+        return self._sorted[self._offsets[event_id]:self._offsets[event_id + 1]]
+
+    def samples(self, event_id):
+        """Verilen koddaki olayların örnek indeksleri (first_samp dahil)"""
+        return self.of_type(event_id)[:, 0]
+
+    def select(self, event_ids):
+        """Birden fazla koddaki olayları zaman sırasıyla döndür"""
+        mask = np.isin(self.events[:, 2], list(event_ids))
+        return self.events[mask]
+
+    def in_window(self, event_id, tmin, tmax):
+        """Kayıt başlangıcına göre [tmin, tmax] saniye aralığındaki olaylar"""
+        samples = self.samples(event_id)
+        lo = np.searchsorted(samples, self.first_samp + int(np.ceil(tmin * self.sfreq)))
+        hi = np.searchsorted(samples, self.first_samp + int(np.floor(tmax * self.sfreq)), side='right')
+        return self.of_type(event_id)[lo:hi]
+
+    def next_after(self, stim_samples, response_id, max_lag=None):
+        """Her uyaran örneğinden sonraki ilk tepki olayını bul
+
+        Dönen değer: (tepki örnekleri, gecikmeler saniye cinsinden); tepki yoksa -1 ve NaN
+        """
+        stim_samples = np.asarray(stim_samples)
+        responses = self.samples(response_id)
+        pos = np.searchsorted(responses, stim_samples, side='right')
+
+        found = pos < len(responses)
+        response_samples = np.full(len(stim_samples), -1, dtype=np.int64)
+        response_samples[found] = responses[pos[found]]
+        lags = np.where(found, (response_samples - stim_samples) / self.sfreq, np.nan)
+
+        if max_lag is not None:
+            too_late = found & (lags > max_lag)
+            response_samples[too_late] = -1
+            lags[too_late] = np.nan
+        return response_samples, lags
+
+    def save(self, fname):
+        """İndeksi npz olarak kaydet"""
+        np.savez(fname, events=self.events, sfreq=self.sfreq, first_samp=self.first_samp)
+
+    @classmethod
+    def load(cls, fname):
+        """npz dosyasından indeksi yükle"""
+        with np.load(fname) as f:
+            return cls(f['events'], float(f['sfreq']), int(f['first_samp']))
+
+
+def get_event_index(raw, stim_channel='STI 014', min_duration=0.002):
+    """Kayıt için olay indeksini döndür; aynı kayıt için stim kanalı yeniden taranmaz
+
+    Önbellek anahtarı kaydın örnek aralığını, örnekleme hızını ve anotasyon sayısını da içerir:
+    yerinde crop(), resample() veya anotasyon değişikliğinden sonra olaylar yeniden taranır.
+    """
+    key = (stim_channel, min_duration)
+    state = (raw.first_samp, raw.last_samp, raw.info['sfreq'], len(raw.annotations))
+    cached = _INDEX_CACHE.setdefault(raw, {})
+    if key not in cached or cached[key][0] != state:
+        cached[key] = (state, EventIndex.from_raw(raw, stim_channel=stim_channel,
+                                                  min_duration=min_duration))
+    return cached[key][1]
@@ -0,0 +1,228 @@
+"""
+Kalıcı Özellik Deposu (Disk Üzerinde, Sütunlu)
+EEG kayıtlarından çıkarılan özellik satırlarını (kayıt başına bir veya epok başına birden çok
+satır) kayıt parmak izi + özellik seti sürümü + çıkarma parametreleri anahtarıyla saklar;
+yeniden eğitim özellikleri yeniden çıkarmadan depodan okur.
+
+Yerleşim (<kök>/<özellik seti>/):
+    meta.json          sütun adları, dtype, özellik seti sürümü
+    col_000.bin ...    sütun başına yalnızca sona eklenen ham ikili dosya (np.memmap ile okunur)
+    recordings.jsonl   kayıt tablosu; bir satır yazıldığında kayıt kesinleşir (commit)
+
+Sütun dosyaları önce, kayıt tablosu satırı en son yazılır; yarıda kalan bir ekleme açılışta
+kesilerek geri alınır. Tek yazıcı varsayılır. Okumada yalnızca istenen sütunlar açılır ve
+satırlar parça parça dolaşılır; bellek kullanımı depo boyutundan bağımsızdır.
+
+Kullanım:
+    store = FeatureStore('.cache/features', FEATURE_NAMES, version='v1')
+    if store.lookup(fingerprint, params) is None:
+        store.append(fingerprint, X, params=params, label=1, subject='sub01')
+    for X, meta in store.iter_chunks(columns=['power_theta', 'power_beta']):
+        ...
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+DEFAULT_STORE_DIR = os.path.join('.cache', 'features')
+
+
+def feature_set_id(columns, version):
+    """Özellik seti kimliği: sürüm + sütun adlarının özeti (sütun değişince yeni depo)"""
+    digest = hashlib.sha1(json.dumps(list(columns)).encode('utf-8')).hexdigest()[:8]
+    return f'{version}-{digest}'
+
+
+class FeatureStore:
+    """Sona eklemeli, sütunlu, memmap ile okunan özellik deposu"""
+
+    def __init__(self, root=DEFAULT_STORE_DIR, columns=(), version='v1', dtype=np.float32):
+        self.columns = list(columns)
+        self.version = version
+        self.dtype = np.dtype(dtype)
+        self.path = os.path.join(root, feature_set_id(self.columns, version))
+        os.makedirs(self.path, exist_ok=True)
+
+        meta_path = os.path.join(self.path, 'meta.json')
+        meta = {'columns': self.columns, 'version': version, 'dtype': self.dtype.name}
+        if os.path.isfile(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored['columns'] != self.columns or stored['dtype'] != self.dtype.name:
+                raise ValueError(f"Depo farklı sütunlar/dtype ile oluşturulmuş: {self.path}")
+        else:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        self.recordings = self._load_recordings()
+        self._index = {self._key(r['fingerprint'], r['params']): i for i, r in enumerate(self.recordings)}
+        self._recover()
+
+    # --- Kayıt tablosu ---
+
+    def _recordings_path(self):
+        return os.path.join(self.path, 'recordings.jsonl')
+
+    def _load_recordings(self):
+        """Kesinleşmiş kayıtlar; yarım yazılmış son satır atılır ve dosyadan kesilir"""
+        path = self._recordings_path()
+        if not os.path.isfile(path):
+            return []
+        records, valid_bytes = [], 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+        if valid_bytes < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return records
+
+    @staticmethod
+    def _key(fingerprint, params):
+        return fingerprint, json.dumps(params or {}, sort_keys=True)
+
+    def __len__(self):
+        if not self.recordings:
+            return 0
+        last = self.recordings[-1]
+        return last['row_start'] + last['n_rows']
+
+    def lookup(self, fingerprint, params=None):
+        """Kayıt tablosu satırı (yoksa None)"""
+        i = self._index.get(self._key(fingerprint, params))
+        return None if i is None else self.recordings[i]
+
+    def fingerprint(self, fname):
+        """Dosya içeriğinin SHA-256 özeti; (boyut, değişim zamanı) değişmedikçe yeniden okunmaz"""
+        from eeg_pipeline import file_digest
+
+        stat = os.stat(fname)
+        memo_path = os.path.join(self.path, 'fingerprints.json')
+        memo = {}
+        if os.path.isfile(memo_path):
+            with open(memo_path, encoding='utf-8') as f:
+                memo = json.load(f)
+        key = os.path.abspath(fname)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        if key in memo and memo[key]['signature'] == signature:
+            return memo[key]['digest']
+
+        memo[key] = {'signature': signature, 'digest': file_digest(fname)}
+        tmp_path = f'{memo_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(memo, f, indent=1)
+        os.replace(tmp_path, memo_path)
+        return memo[key]['digest']
+
+    # --- Sütun dosyaları ---
+
+    def _column_path(self, i):
+        return os.path.join(self.path, f'col_{i:03d}.bin')
+
+    def _recover(self):
+        """Kesinleşmemiş eklemelerden kalan fazla baytları kes"""
+        n_bytes = len(self) * self.dtype.itemsize
+        for i in range(len(self.columns)):
+            path = self._column_path(i)
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+            elif os.path.getsize(path) > n_bytes:
+                with open(path, 'r+b') as f:
+                    f.truncate(n_bytes)
+
+    def append(self, fingerprint, X, params=None, label=None, subject=None, source=None, **info):
+        """(satır × sütun) özellik matrisini ekle; aynı anahtar varsa mevcut kaydı döndür"""
+        existing = self.lookup(fingerprint, params)
+        if existing is not None:
+            return existing
+        X = np.asarray(X, dtype=self.dtype)
+        if X.ndim == 1:
+            X = X[np.newaxis]
+        if X.shape[1] != len(self.columns):
+            raise ValueError(f"{X.shape[1]} sütun verildi, depo {len(self.columns)} sütunlu")
+
+        for i in range(len(self.columns)):
+            with open(self._column_path(i), 'ab') as f:
+                f.write(np.ascontiguousarray(X[:, i]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        record = {'fingerprint': fingerprint, 'params': params or {}, 'row_start': len(self),
+                  'n_rows': len(X), 'label': label, 'subject': subject, 'source': source, **info}
+        with open(self._recordings_path(), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=_to_json) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.recordings.append(record)
+        self._index[self._key(fingerprint, params)] = len(self.recordings) - 1
+        return record
+
+    def column(self, name):
+        """Tek sütunun salt okunur memmap görünümü"""
+        i = self.columns.index(name)
+        if len(self) == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self._column_path(i), dtype=self.dtype, mode='r', shape=(len(self),))
+
+    def read(self, columns=None, rows=None):
+        """Seçilen sütunlar (ve satırlar) için (satır × sütun) dizi; yalnızca bu sütunlar okunur"""
+        columns = self.columns if columns is None else list(columns)
+        rows = slice(None) if rows is None else rows
+        return np.column_stack([self.column(name)[rows] for name in columns]) if columns else \
+            np.empty((len(self), 0), dtype=self.dtype)
+
+    def row_meta(self, rows=None):
+        """Satır başına kayıt indeksi, etiket ve denek (kayıt tablosundan, sütun okumadan)"""
+        rows = np.arange(len(self)) if rows is None else np.arange(len(self))[rows] \
+            if isinstance(rows, slice) else np.asarray(rows)
+        starts = np.array([r['row_start'] for r in self.recordings], dtype=np.int64)
+        labels = np.array([-1 if r['label'] is None else r['label'] for r in self.recordings])
+        subjects = np.array([str(r['subject']) if r['subject'] is not None else r['fingerprint'][:12]
+                             for r in self.recordings], dtype=object)
+        recording = np.searchsorted(starts, rows, side='right') - 1
+        return {'recording': recording, 'label': labels[recording], 'subject': subjects[recording]}
+
+    def select_rows(self, recordings=None, labeled=False):
+        """Kayıt indekslerinin (veya tümünün) satır indeksleri"""
+        indices = range(len(self.recordings)) if recordings is None else recordings
+        ranges = [np.arange(self.recordings[i]['row_start'],
+                            self.recordings[i]['row_start'] + self.recordings[i]['n_rows'])
+                  for i in indices if not (labeled and self.recordings[i]['label'] is None)]
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=int)
+
+    def iter_chunks(self, columns=None, chunk_rows=65536, rows=None):
+        """(X parçası, satır meta verisi) çiftleri; rows verilirse yalnızca o satırlar (sıralı)"""
+        columns = self.columns if columns is None else list(columns)
+        maps = [self.column(name) for name in columns]
+        n_rows = len(self) if rows is None else len(rows)
+        for start in range(0, n_rows, chunk_rows):
+            if rows is None:
+                idx = np.arange(start, min(start + chunk_rows, n_rows))
+            else:
+                idx = np.asarray(rows[start:start + chunk_rows])
+            # Ardışık satırlar dilimle okunur (sıralı memmap erişimi)
+            sel = slice(idx[0], idx[-1] + 1) if idx[-1] - idx[0] + 1 == len(idx) else idx
+            X = np.column_stack([m[sel] for m in maps]) if maps else np.empty((len(idx), 0), self.dtype)
+            yield X, self.row_meta(idx)
+
+    def nbytes(self):
+        return len(self) * len(self.columns) * self.dtype.itemsize
+
+    def __repr__(self):
+        return (f'FeatureStore({self.path}, {len(self.recordings)} kayıt, {len(self)} satır, '
+                f'{len(self.columns)} sütun)')
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
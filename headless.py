@@ -0,0 +1,237 @@
+"""
+Etkileşimsiz (Headless) Analiz Çalıştırıcı
+Menülü scriptlerin analizlerini argümanlar veya bir JSON yapılandırma dosyasıyla seçip
+GUI olmadan (Agg) çalıştırır. plt.show() çağrıları açık şekilleri çıktı klasörüne kaydeder;
+analizlerin döndürdüğü sayısal sonuçlar JSON (skalerler) ve NPZ (diziler) olarak yazılır.
+
+Aynı kayıt üzerindeki bağımsız analizler ayrı süreçlerde eşzamanlı çalışır; her sürecin
+kendi pyplot durumu olduğu için şekiller birbirine karışmaz ve toplam süre en yavaş analize yaklaşır.
+
+Yapılandırma dosyası örneği (config.json):
+    {"analyses": ["erp", "topomap", "p300"], "output": "results/erp_headless",
+     "input": "data/eeg/sub01_raw.fif", "jobs": 3, "params": {"tmin": -0.2, "tmax": 0.8}}
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from profiling import worker_call, worker_result
+
+# İşçi süreçte bir kez kurulan paylaşılan durum (yüklenmiş kayıt her analiz için yeniden gönderilmez)
+_WORKER_STATE = {}
+
+# Linux'ta işçiler varsayılan başlatma yönteminden bağımsız olarak fork ile başlatılır: bağlam
+# (ön yüklenmiş kayıt dahil) ana süreçten yazma-anında-kopya bellekle devralınır, hiçbir işçiye
+# serileştirilip gönderilmez. fork'un güvenli olmadığı platformlarda bağlam initargs ile gider.
+_INHERIT_CONTEXT = sys.platform.startswith('linux')
+
+
+def use_headless_backend():
+    """GUI'siz Agg arka ucuna geç; plt.show() şekilleri kaydedip kapatsın"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+    plt.show = save_open_figures
+
+
+def save_open_figures(*args, **kwargs):
+    """plt.show yerine: açık şekilleri o anki analizin adıyla kaydet ve kapat"""
+    import matplotlib.pyplot as plt
+
+    state = _WORKER_STATE
+    for num in plt.get_fignums():
+        state['n_figures'] += 1
+        path = os.path.join(state['out_dir'], f"{state['analysis']}_{state['n_figures']:02d}.png")
+        plt.figure(num).savefig(path, dpi=state['dpi'])
+        state['figures'].append(os.path.basename(path))
+    plt.close('all')
+
+
+def _flatten(result, prefix=''):
+    """İç içe sonuç sözlüğünü 'a.b' anahtarlı düz sözlüğe çevir"""
+    flat = {}
+    for key, value in result.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix=name + '.'))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _to_json(value):
+    """numpy skalerleri ve demetleri JSON'a uygun tiplere çevir"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (tuple, set)):
+        return list(value)
+    return str(value)
+
+
+def save_outputs(out_dir, analysis, result):
+    """Sayısal sonuçları yaz: diziler <analiz>.npz, diğerleri <analiz>.json"""
+    if not result:
+        return []
+    flat = _flatten(result)
+    arrays = {k: v for k, v in flat.items() if isinstance(v, np.ndarray)}
+    scalars = {k: v for k, v in flat.items() if k not in arrays}
+
+    written = []
+    if arrays:
+        np.savez(os.path.join(out_dir, f'{analysis}.npz'), **arrays)
+        written.append(f'{analysis}.npz')
+    if scalars:
+        with open(os.path.join(out_dir, f'{analysis}.json'), 'w', encoding='utf-8') as f:
+            json.dump(scalars, f, indent=2, ensure_ascii=False, default=_to_json)
+        written.append(f'{analysis}.json')
+    return written
+
+
+def _init_worker(module_name, context, out_dir, dpi):
+    """İşçi süreç başlangıcında arka ucu ayarla ve paylaşılan bağlamı al
+
+    context None ise fork ile ana süreçten devralınmış bağlam kullanılır.
+    """
+    use_headless_backend()
+    if context is not None:
+        _WORKER_STATE['context'] = context
+    _WORKER_STATE.update(module=module_name, out_dir=out_dir, dpi=dpi)
+
+
+def _run_analysis(name):
+    """Tek bir analizi çalıştır; çıktısı <analiz>.log dosyasına yönlendirilir"""
+    state = _WORKER_STATE
+    state.update(analysis=name, n_figures=0, figures=[])
+    analysis = importlib.import_module(state['module']).HEADLESS_ANALYSES[name]
+
+    entry = {'analysis': name, 'status': 'ok', 'error': ''}
+    start = time.perf_counter()
+    log_path = os.path.join(state['out_dir'], f'{name}.log')
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        try:
+            result = analysis(state['context'])
+            save_open_figures()
+            entry['outputs'] = save_outputs(state['out_dir'], name, result)
+        except Exception as e:
+            # Başarısız analiz diğerlerini durdurmaz; hata günlüğe yazılır
+            traceback.print_exc(file=log)
+            entry.update(status='failed', error=str(e), outputs=[])
+        finally:
+            # Yarım kalan şekiller aynı süreçteki sonraki analize taşınmaz
+            import matplotlib.pyplot as plt
+            plt.close('all')
+    entry['seconds'] = round(time.perf_counter() - start, 3)
+    entry['figures'] = list(state['figures'])
+    return entry
+
+
+def run_analyses(module_name, analyses, context, out_dir, n_jobs=None, dpi=100):
+    """Seçilen analizleri (paralel) çalıştır ve manifest.json yaz
+
+    module_name: HEADLESS_ANALYSES sözlüğünü tanımlayan script modülü
+    context: tüm analizlerin paylaştığı, bir kez yüklenmiş veri (kayıt, ERP'ler, parametreler)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    n_workers = min(len(analyses), n_jobs or os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    entries = []
+    if n_workers <= 1:
+        _init_worker(module_name, context, out_dir, dpi)
+        for name in analyses:
+            entries.append(_run_analysis(name))
+            _report(entries[-1])
+    else:
+        if _INHERIT_CONTEXT:
+            _WORKER_STATE['context'] = context
+            mp_context, shipped = multiprocessing.get_context('fork'), None
+        else:
+            mp_context, shipped = None, context
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context, initializer=_init_worker,
+                                     initargs=(module_name, shipped, out_dir, dpi)) as executor:
+                futures = [executor.submit(worker_call, _run_analysis, name) for name in analyses]
+                for future in as_completed(futures):
+                    entries.append(worker_result(future))
+                    _report(entries[-1])
+        finally:
+            _WORKER_STATE.pop('context', None)
+    total = time.perf_counter() - start
+
+    # Manifest istenen sırayla yazılır
+    order = {name: i for i, name in enumerate(analyses)}
+    entries.sort(key=lambda e: order[e['analysis']])
+    manifest = {'module': module_name, 'jobs': n_workers, 'total_seconds': round(total, 3),
+                'analyses': entries}
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    n_failed = sum(e['status'] != 'ok' for e in entries)
+    print(f"\n✓ {len(entries) - n_failed} analiz tamamlandı, {n_failed} başarısız "
+          f"({total:.1f} s, {n_workers} süreç).")
+    print(f"  - Çıktılar: {out_dir}")
+    return manifest
+
+
+def _report(entry):
+    if entry['status'] == 'ok':
+        print(f"  ✓ {entry['analysis']}: {entry['seconds']:.1f} s, {len(entry['figures'])} şekil")
+    else:
+        print(f"  ✗ {entry['analysis']}: {entry['error']}")
+
+
+def parse_args(argv, analyses, description, default_output):
+    """Headless argümanlarını ayrıştır; headless istenmediyse None döndür
+
+    Öncelik: komut satırı > yapılandırma dosyası > varsayılanlar
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--headless', action='store_true',
+                        help='Menü ve pencere açmadan çalıştır, çıktıları klasöre yaz')
+    parser.add_argument('--config', help='JSON yapılandırma dosyası (headless modu açar)')
+    parser.add_argument('--analyses', help=f"Virgülle ayrılmış analizler ({','.join(analyses)}) "
+                                           "veya 'all'")
+    parser.add_argument('--output', help=f'Çıktı klasörü (varsayılan: {default_output})')
+    parser.add_argument('--input', help='FIF kaydı (varsayılan: MNE örnek veri seti)')
+    parser.add_argument('--jobs', type=int, help='Paralel süreç sayısı (varsayılan: çekirdek sayısı)')
+    parser.add_argument('--dpi', type=int, help='Şekil çözünürlüğü (varsayılan: 100)')
+    parser.add_argument('--param', action='append', default=[], metavar='AD=DEĞER',
+                        help='Analiz parametresi, örn. --param tmax=0.6 (tekrarlanabilir)')
+    args = parser.parse_args(argv)
+
+    if not (args.headless or args.config):
+        return None
+
+    config = {'analyses': 'all', 'output': default_output, 'input': None, 'jobs': None,
+              'dpi': 100, 'params': {}}
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config.update(json.load(f))
+    for key in ('analyses', 'output', 'input', 'jobs', 'dpi'):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    for item in args.param:
+        key, _, value = item.partition('=')
+        try:
+            config['params'][key] = json.loads(value)
+        except ValueError:
+            config['params'][key] = value
+
+    selected = config['analyses']
+    if isinstance(selected, str):
+        selected = list(analyses) if selected == 'all' else [a.strip() for a in selected.split(',')]
+    unknown = [a for a in selected if a not in analyses]
+    if unknown:
+        parser.error(f"bilinmeyen analiz: {', '.join(unknown)} (seçenekler: {', '.join(analyses)})")
+    config['analyses'] = list(dict.fromkeys(selected))
+    return config
@@ -0,0 +1,309 @@
+"""
+Aşama Bazlı Ölçüm (Profiling)
+Her aşama (yükleme, filtreleme, PSD, özellik çıkarma, epoklama, model eğitimi, çizim...) için
+duvar saati süresi, CPU süresi ve tepe bellek (tracemalloc) kaydeder.
+
+COGL_PROFILE ortam değişkeniyle açılır; kapalıyken her aşama tek bir sözlük okumasına iner:
+    COGL_PROFILE=json python eeg_ai_diagnosis.py      # JSON satırları (stderr)
+    COGL_PROFILE=prom python analyze_errors.py        # Prometheus metin biçimi (çıkışta yazılır)
+    COGL_PROFILE_FILE=profile.jsonl                    # Çıktı dosyası (isteğe bağlı)
+    COGL_PROFILE_MEMORY=0                              # tracemalloc'u kapat (daha düşük ek yük)
+
+tracemalloc (varsayılan açık) her bellek ayırmayı izler ve ayırma yoğun aşamaları (pandas, mne)
+belirgin biçimde yavaşlatır; süreleri karşılaştırırken COGL_PROFILE_MEMORY=0 kullanın.
+tracemalloc tepesi süreç geneli tek bir sayaçtır: iç içe aşamalar aynı iş parçacığında doğru
+ölçülür, ancak farklı iş parçacıklarında zaman olarak çakışan aşamaların tepesi ayrıştırılamaz
+ve bu aşamalar peak_mb=None ile yazılır. Aşama dışındaki iş parçacıklarının ayırmaları ise
+o sırada ölçülen aşamanın tepesine karışır.
+
+Etiketler (stage('fit', model='exgauss')) Prometheus serilerini ayırır ve küçük, kapalı bir
+kümeden gelmelidir; deneme, dosya veya işçi sayısı gibi çağrıya özgü büyüklükler etiket değil
+JSON kaydına eklenen alanlardır: stage('bootstrap', fields={'trials': len(rt)}).
+
+Prometheus toplamları çıkışta (atexit) yazılır; ProcessPoolExecutor işçilerinde atexit çalışmadığı
+için süreç havuzuna gönderilen görevler worker_call ile sarılır ve işçinin toplamları sonuçla
+birlikte ana sürece taşınır:
+    future = executor.submit(worker_call, process_subject, fname)
+    result = worker_result(future)
+
+Kullanım:
+    with stage('filter'):
+        raw.filter(...)
+
+    @profiled('feature_extraction')
+    def extract_features(raw): ...
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+ENV_VAR = 'COGL_PROFILE'
+
+# Etkin yapılandırma; mode None iken ölçüm yapılmaz
+_STATE = {'mode': None, 'output': None, 'memory': True, 'stream': None}
+
+# Prometheus biçimi için aşama bazlı toplamlar: (aşama, etiketler) → sayaçlar
+_TOTALS = {}
+
+# Aşaması açık iş parçacıkları (kimlik → açık aşama sayısı) ve çakışma sayacı: başka bir iş
+# parçacığında aşama açıkken başlayan her aşama sayacı artırır, o sırada açık olan tüm
+# aşamaların tracemalloc tepesi geçersiz sayılır
+_ACTIVE = {}
+_OVERLAPS = [0]
+
+_local = threading.local()
+_lock = threading.Lock()
+
+
+def _parse_mode(value):
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'off', 'false', 'no'):
+        return None
+    if value in ('prom', 'prometheus'):
+        return 'prom'
+    return 'json'
+
+
+def configure(mode=None, output=None, memory=True):
+    """Ölçümü kod içinden aç/kapat (mode: None, 'json' veya 'prom')"""
+    if _STATE['stream'] not in (None, sys.stderr):
+        _STATE['stream'].close()
+    _STATE.update(mode=mode, output=output, memory=memory, stream=None)
+    _TOTALS.clear()
+    if mode is not None and memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def enabled():
+    return _STATE['mode'] is not None
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+class stage:
+    """Bir aşamayı ölçen bağlam yöneticisi; kapalıyken hiçbir şey yapmaz
+
+    labels: Prometheus serisini ayıran, küçük kapalı kümeden değerler
+    fields: yalnızca JSON kaydına yazılan çağrıya özgü değerler (boyutlar, sayılar)
+    """
+
+    __slots__ = ('name', 'labels', 'fields', '_frame')
+
+    def __init__(self, name, fields=None, **labels):
+        self.name = name
+        self.labels = labels
+        self.fields = fields
+        self._frame = None
+
+    def __enter__(self):
+        if _STATE['mode'] is None:
+            return self
+
+        stack = _stack()
+        frame = {'peak': 0, 'start_mem': 0}
+        thread = threading.get_ident()
+        with _lock:
+            frame['overlaps'] = _OVERLAPS[0]
+            if any(t != thread for t in _ACTIVE):
+                _OVERLAPS[0] += 1  # bu aşama dahil o an açık olan tüm aşamalar
+            _ACTIVE[thread] = _ACTIVE.get(thread, 0) + 1
+        if _STATE['memory'] and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Üst aşamanın o ana kadarki tepesi sıfırlamadan önce saklanır
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_mem'] = current
+        frame['path'] = '/'.join([f['name'] for f in stack] + [self.name])
+        frame['name'] = self.name
+        frame['wall'] = time.perf_counter()
+        frame['cpu'] = time.process_time()
+        stack.append(frame)
+        self._frame = frame
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        frame = self._frame
+        if frame is None:
+            return False
+        self._frame = None
+
+        wall = time.perf_counter() - frame['wall']
+        cpu = time.process_time() - frame['cpu']
+        stack = _stack()
+        stack.pop()
+
+        thread = threading.get_ident()
+        with _lock:
+            overlapped = _OVERLAPS[0] != frame['overlaps']
+            _ACTIVE[thread] -= 1
+            if not _ACTIVE[thread]:
+                del _ACTIVE[thread]
+
+        peak = None
+        if _STATE['memory'] and tracemalloc.is_tracing():
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            # Başka bir iş parçacığının aşaması tepeyi sıfırlamış veya şişirmiş olabilir
+            peak = None if overlapped else peak - frame['start_mem']
+
+        _emit({
+            'ts': round(time.time(), 6),
+            'pid': os.getpid(),
+            'stage': self.name,
+            'path': frame['path'],
+            'depth': len(stack),
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_mb': None if peak is None else round(peak / 1e6, 3),
+            'status': 'ok' if exc_type is None else 'error',
+            **({'labels': self.labels} if self.labels else {}),
+            **({'fields': self.fields} if self.fields else {}),
+        })
+        return False
+
+
+def profiled(name=None, **labels):
+    """Fonksiyonu bir aşama olarak ölçen dekoratör (varsayılan aşama adı: fonksiyon adı)"""
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _STATE['mode'] is None:
+                return func(*args, **kwargs)
+            with stage(stage_name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _emit(record):
+    with _lock:
+        if _STATE['mode'] == 'json':
+            stream = _STATE['stream']
+            if stream is None:
+                output = _STATE['output']
+                stream = open(output, 'a', encoding='utf-8', buffering=1) if output else sys.stderr
+                _STATE['stream'] = stream
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            key = (record['stage'], tuple(sorted(record.get('labels', {}).items())))
+            totals = _TOTALS.setdefault(key, {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': 0.0})
+            totals['count'] += 1
+            totals['wall'] += record['wall_s']
+            totals['cpu'] += record['cpu_s']
+            if record['peak_mb'] is not None:
+                totals['peak'] = max(totals['peak'], record['peak_mb'] * 1e6)
+
+
+def merge_totals(totals):
+    """Başka bir süreçte toplanan aşama toplamlarını bu sürecinkilere ekle"""
+    with _lock:
+        for key, other in (totals or {}).items():
+            mine = _TOTALS.setdefault(key, {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': 0.0})
+            mine['count'] += other['count']
+            mine['wall'] += other['wall']
+            mine['cpu'] += other['cpu']
+            mine['peak'] = max(mine['peak'], other['peak'])
+
+
+def _drain_totals():
+    with _lock:
+        totals = {key: dict(values) for key, values in _TOTALS.items()}
+        _TOTALS.clear()
+    return totals
+
+
+def worker_call(func, *args, **kwargs):
+    """İşçi süreçte func'u çalıştır ve (sonuç, aşama toplamları) döndür
+
+    Yalnızca prom modunda toplam taşınır. Hata durumunda toplamlar istisnanın profile_totals
+    özniteliğiyle ana sürece gider.
+    """
+    if _STATE['mode'] != 'prom':
+        return func(*args, **kwargs), None
+    # fork ile işçiye kopyalanan ana süreç toplamları iki kez sayılmasın
+    _drain_totals()
+    try:
+        result = func(*args, **kwargs)
+    except BaseException as e:
+        e.profile_totals = _drain_totals()
+        raise
+    return result, _drain_totals()
+
+
+def unpack_worker(value):
+    """worker_call dönüşünü aç: işçinin toplamlarını ekle ve sonucu döndür"""
+    result, totals = value
+    merge_totals(totals)
+    return result
+
+
+def worker_result(future):
+    """worker_call ile gönderilen görevin sonucu; görev hata verse de toplamları eklenir"""
+    try:
+        value = future.result()
+    except BaseException as e:
+        merge_totals(getattr(e, 'profile_totals', None))
+        raise
+    return unpack_worker(value)
+
+
+def prometheus_text():
+    """Toplanan aşama metriklerini Prometheus metin biçiminde döndür"""
+    def escape(value):
+        # Metin biçiminin etiket değeri kaçışları: ters bölü, çift tırnak, satır sonu
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def label_str(stage_name, labels):
+        pairs = [('stage', stage_name)] + list(labels)
+        return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in pairs) + '}'
+
+    lines = []
+    metrics = [
+        ('cogl_stage_wall_seconds', 'summary', 'Aşama duvar saati süresi', 'wall'),
+        ('cogl_stage_cpu_seconds', 'summary', 'Aşama CPU süresi', 'cpu'),
+    ]
+    for metric, kind, help_text, field in metrics:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        for (stage_name, labels), totals in _TOTALS.items():
+            lbl = label_str(stage_name, labels)
+            lines.append(f'{metric}_sum{lbl} {totals[field]:.6f}')
+            lines.append(f'{metric}_count{lbl} {totals["count"]}')
+    lines += ['# HELP cogl_stage_peak_bytes Aşama içindeki en yüksek ek bellek (tracemalloc)',
+              '# TYPE cogl_stage_peak_bytes gauge']
+    for (stage_name, labels), totals in _TOTALS.items():
+        lines.append(f'cogl_stage_peak_bytes{label_str(stage_name, labels)} {totals["peak"]:.0f}')
+    return '\n'.join(lines) + '\n'
+
+
+def _flush():
+    """Çıkışta: Prometheus metinlerini yaz, JSON dosyasını kapat"""
+    if _STATE['mode'] == 'prom' and _TOTALS:
+        output = _STATE['output'] or 'cogl_metrics.prom'
+        tmp_path = f'{output}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(prometheus_text())
+        os.replace(tmp_path, output)
+    if _STATE['stream'] not in (None, sys.stderr):
+        _STATE['stream'].close()
+        _STATE['stream'] = None
+
+
+atexit.register(_flush)
+
+configure(_parse_mode(os.environ.get(ENV_VAR)),
+          output=os.environ.get('COGL_PROFILE_FILE') or None,
+          memory=os.environ.get('COGL_PROFILE_MEMORY', '1') != '0')
@@ -0,0 +1,437 @@
+"""
+Tepki Süresi (RT) Dağılım Modelleri
+Katılımcı (oturum) × koşul hücreleri için ex-Gaussian ve EZ-difüzyon parametreleri.
+
+Koşul ayrımı mevcut analizlerle aynıdır: Stroop'ta uyumlu/uyumsuz (analyze_data), Go/No-Go'da
+Go/No-Go (analyze_errors); RT dağılımları doğru cevaplardan kurulur.
+
+Ex-Gaussian: tüm hücreler tek seferde, hücre başına bağımsız en çok olabilirlik kestirimiyle
+uydurulur. Veri düz dizilerde (RT, hücre indeksi) tutulur; log-olabilirlik ve analitik
+gradyanlar np.bincount ile hücre bazında toplanır. Adımlar Newton (Hessian gradyan farklarından;
+negatif tanımlı değilse BHHH, gradyanların dış çarpımı) yöntemiyle hücre başına 3×3 sistem olarak
+toplu çözülür; her hücrenin kendi adım boyu vardır. σ ve τ hücre RT ölçeğine göre sınırlıdır
+(SCALE_BOUNDS). Hücreler n_jobs süreç arasında bölünebilir.
+
+EZ-difüzyon (Wagenmakers ve ark., 2007): doğruluk oranı, doğru RT ortalaması ve varyansından
+kapalı formda sürüklenme hızı (v), sınır ayrımı (a) ve karar dışı süre (Ter).
+
+Kullanım:
+    table = fit_rt_models(data)          # data: 'session' sütunlu deneme tablosu
+    python rt_models.py --data-dir data --output results/rt_models.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+# Hücre başına gereken en az doğru RT sayısı (daha azında parametreler NaN)
+MIN_TRIALS = 10
+
+# σ ve τ hücrenin RT standart sapmasının [1e-3, 10] katıyla sınırlanır (log ölçekte);
+# sınırsız τ → 0 / σ → 0 yönünde dejenere (normal / kaydırılmış üstel) uçlara kayılır
+SCALE_BOUNDS = (1e-3, 10.0)
+
+# EZ-difüzyon ölçek parametresi (geleneksel s = 0.1)
+EZ_SCALE = 0.1
+
+
+CONDITIONS = ('congruent', 'incongruent', 'go', 'nogo')
+
+
+def condition_index(data):
+    """Deneme başına koşul indeksi (CONDITIONS içinde; Stroop/Go-No-Go dışı: -1)"""
+    import pandas as pd
+
+    from session_model import as_bool
+
+    test, tests = pd.factorize(data['testType'])
+    tests = np.append(np.asarray(tests).astype(str), '')
+    stroop, gonogo = (tests == 'stroop')[test], (tests == 'gonogo')[test]
+    congruent = as_bool(data['congruent'])
+    is_go = as_bool(data['isGo'])
+    return np.select([stroop & congruent, stroop, gonogo & is_go, gonogo], [0, 1, 2, 3], default=-1).astype(np.int8)
+
+
+def condition_labels(data):
+    """Deneme başına koşul etiketi: stroop → congruent/incongruent, gonogo → go/nogo"""
+    return np.array(CONDITIONS + ('',), dtype=object)[condition_index(data)]
+
+
+# --- Ex-Gaussian ---
+
+def exgauss_loglik(x, groups, theta, gradient=False):
+    """Gözlem başına ex-Gaussian log-olabilirliği (ve θ'ya göre analitik gradyanı)
+
+    theta: (hücre, 3) = [μ, log σ, log τ]; groups: gözlem başına hücre indeksi
+    Dönen değer: log-olabilirlikler (N,) veya (log-olabilirlikler, (N, 3) gradyanlar)
+
+    σ²/2τ² - d/τ + log Φ(z) biçimi z çok negatifken (σ/τ büyük) yıkıcı biçimde sadeleşir;
+    z < 0 için eşdeğer kararlı biçim -d²/2σ² + log(½·erfcx(-z/√2)) kullanılır.
+    """
+    from scipy.special import erfcx, log_ndtr
+
+    mu = theta[groups, 0]
+    sigma = np.exp(theta[groups, 1])
+    tau = np.exp(theta[groups, 2])
+    d = x - mu
+    z = d / sigma - sigma / tau
+    scaled = erfcx(-z / np.sqrt(2))
+    loglik = -np.log(tau) + np.where(
+        z < 0,
+        -d ** 2 / (2 * sigma ** 2) + np.log(0.5 * scaled),
+        sigma ** 2 / (2 * tau ** 2) - d / tau + log_ndtr(z))
+    if not gradient:
+        return loglik
+
+    # φ(z)/Φ(z) = √(2/π) / erfcx(-z/√2) (z → +∞'da erfcx taşar, oran doğru biçimde 0'a gider)
+    mills = np.sqrt(2 / np.pi) / scaled
+    d_mu = 1 / tau - mills / sigma
+    d_sigma = sigma / tau ** 2 - mills * (d / sigma ** 2 + 1 / tau)
+    d_tau = -1 / tau - sigma ** 2 / tau ** 3 + d / tau ** 2 + mills * sigma / tau ** 2
+    # log σ ve log τ parametrizasyonu: zincir kuralı
+    return loglik, np.column_stack([d_mu, d_sigma * sigma, d_tau * tau])
+
+
+def exgauss_moments(x, groups, n_groups):
+    """Momentler yöntemiyle başlangıç değerleri: (hücre, 3) = [μ, log σ, log τ]"""
+    n = np.bincount(groups, minlength=n_groups).astype(float)
+    mean = np.bincount(groups, x, n_groups) / n
+    dev = x - mean[groups]
+    var = np.bincount(groups, dev ** 2, n_groups) / n
+    skew = np.bincount(groups, dev ** 3, n_groups) / n / var ** 1.5
+    sd = np.sqrt(var)
+    # Ex-Gaussian çarpıklığı (0, 2) aralığındadır
+    tau = sd * (np.clip(skew, 0.1, 1.8) / 2) ** (1 / 3)
+    sigma = np.sqrt(np.maximum(var - tau ** 2, (0.1 * sd) ** 2))
+    return np.column_stack([mean - tau, np.log(sigma), np.log(tau)])
+
+
+def _pair_sums(values, groups, n_groups):
+    """(N, 3) gözlem gradyanlarından hücre başına toplam gradyan ve BHHH matrisi"""
+    grad = np.column_stack([np.bincount(groups, values[:, k], n_groups) for k in range(3)])
+    outer = np.empty((n_groups, 3, 3))
+    for i in range(3):
+        for j in range(i, 3):
+            outer[:, i, j] = outer[:, j, i] = np.bincount(groups, values[:, i] * values[:, j], n_groups)
+    return grad, outer
+
+
+@np.errstate(over='ignore', invalid='ignore', divide='ignore')
+def _optimize(x, groups, n_groups, theta, lower, upper, active, max_iter, tol):
+    """Etkin hücrelerde θ'yu sınırlar içinde iyileştir: (θ, log-olabilirlik, etkin kalan, iterasyon)"""
+    theta = theta.copy()
+    loglik = np.bincount(groups, exgauss_loglik(x, groups, theta), n_groups)
+    active = active.copy()
+    n_iter = np.zeros(n_groups, dtype=int)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        # Yalnızca henüz yakınsamamış hücrelerin gözlemleri işlenir
+        obs = active[groups]
+        xa, ga = x[obs], groups[obs]
+        _, scores = exgauss_loglik(xa, ga, theta, gradient=True)
+        grad, outer = _pair_sums(scores, ga, n_groups)
+        # Newton adımı: Hessian analitik gradyanın ileri farklarından; negatif tanımlı değilse
+        # (veya sayısal olarak bozuksa) BHHH matrisi kullanılır (σ → 0 yakınındaki kötü koşullu
+        # bölgede yalnız BHHH sürünür ve erken durur)
+        h = 1e-6 * np.maximum(1.0, np.abs(theta))
+        hessian = np.empty((n_groups, 3, 3))
+        for k in range(3):
+            shifted = theta.copy()
+            shifted[:, k] += h[:, k]
+            _, shifted_scores = exgauss_loglik(xa, ga, shifted, gradient=True)
+            hessian[:, :, k] = (np.column_stack([np.bincount(ga, shifted_scores[:, j], n_groups)
+                                                 for j in range(3)]) - grad) / h[:, k, None]
+        curvature = -(hessian + hessian.transpose(0, 2, 1)) / 2
+        finite = np.isfinite(curvature).all(axis=(1, 2))
+        curvature[~finite] = np.eye(3)
+        newton = finite & (np.linalg.eigvalsh(curvature)[:, 0] > 0)
+        outer = np.where(newton[:, None, None], curvature, outer)
+        outer[~active] = np.eye(3)
+        outer += 1e-9 * np.eye(3) * np.trace(outer, axis1=1, axis2=2)[:, None, None]
+        step = np.linalg.solve(outer, grad[..., np.newaxis])[..., 0]
+        # Sınırdaki ve dışarı doğru itilen log σ / log τ sabitlenir, adım kalan koordinatlarda
+        # yeniden çözülür (izdüşümlü Newton; kırpılmış adım μ'yü yanlış yöne taşır)
+        fixed = np.zeros((n_groups, 3), dtype=bool)
+        fixed[:, 1:] = ((theta[:, 1:] <= lower) & (step[:, 1:] < 0)) | ((theta[:, 1:] >= upper) & (step[:, 1:] > 0))
+        if fixed.any():
+            both = fixed[:, :, None] | fixed[:, None, :]
+            outer = np.where(both, np.eye(3), outer)
+            step = np.linalg.solve(outer, np.where(fixed, 0.0, grad)[..., np.newaxis])[..., 0]
+        step[~active] = 0
+
+        # Hücre başına geri izleme: iyileşmeyen hücrelerde adım yarılanır
+        scale = np.ones(n_groups)
+        pending = active.copy()
+        previous, start = loglik.copy(), theta.copy()
+        for _ in range(30):
+            trial = theta + scale[:, None] * step
+            trial[:, 1:] = np.clip(trial[:, 1:], lower, upper)
+            sel = pending[ga]
+            new = np.bincount(ga[sel], exgauss_loglik(xa[sel], ga[sel], trial), n_groups)
+            improved = pending & np.isfinite(new) & (new >= loglik - 1e-12)
+            theta[improved] = trial[improved]
+            loglik[improved] = new[improved]
+            pending &= ~improved
+            if not pending.any():
+                break
+            scale[pending] *= 0.5
+
+        n_iter[active] += 1
+        moved = np.abs(theta - start).max(axis=1)
+        gain = loglik - previous
+        done = (moved < tol) | (gain < tol * (1 + np.abs(loglik))) | pending
+        active &= ~done
+
+    return theta, loglik, active, n_iter
+
+
+@np.errstate(over='ignore', invalid='ignore', divide='ignore')
+def fit_exgauss_groups(x, groups, n_groups, max_iter=200, tol=1e-7):
+    """Tüm hücreler için ex-Gaussian MLE (Newton/BHHH + hücre başına geri izlemeli adım)
+
+    Dönen değer: parametre sözlüğü (μ, σ, τ, standart hatalar, log-olabilirlik, yakınsama, iterasyon)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    theta = exgauss_moments(x, groups, n_groups)
+    n = np.bincount(groups, minlength=n_groups)
+    sd = np.sqrt(np.bincount(groups, (x - (np.bincount(groups, x, n_groups) / n)[groups]) ** 2, n_groups) / n)
+    lower, upper = np.log(SCALE_BOUNDS[0] * sd)[:, None], np.log(SCALE_BOUNDS[1] * sd)[:, None]
+    theta[:, 1:] = np.clip(theta[:, 1:], lower, upper)
+    theta, loglik, active, n_iter = _optimize(x, groups, n_groups, theta, lower, upper,
+                                              np.ones(n_groups, dtype=bool), max_iter, tol)
+
+    # σ alt sınırdaki kaydırılmış üstel uç (μ ≈ en küçük RT, τ = ortalama - μ). Optimum bu uca
+    # yakınsa en küçük RT'deki uçurum Newton'u da yavaşlatır; uçtan başlatılan uydurma daha iyi
+    # log-olabilirlik verirse o alınır
+    smallest = np.full(n_groups, np.inf)
+    np.minimum.at(smallest, groups, x)
+    edge_mu = smallest - 3 * np.exp(lower[:, 0])
+    edge_tau = np.clip(np.bincount(groups, x, n_groups) / n - edge_mu, np.exp(lower[:, 0]), np.exp(upper[:, 0]))
+    edge = np.column_stack([edge_mu, lower[:, 0], np.log(edge_tau)])
+    edge_loglik = np.bincount(groups, exgauss_loglik(x, groups, edge), n_groups)
+    retry = np.flatnonzero(np.isfinite(edge_loglik) & (edge_loglik > loglik))
+    if len(retry):
+        remap = np.full(n_groups, -1)
+        remap[retry] = np.arange(len(retry))
+        obs = remap[groups] >= 0
+        e_theta, e_loglik, e_active, e_iter = _optimize(
+            x[obs], remap[groups[obs]], len(retry), edge[retry], lower[retry], upper[retry],
+            np.ones(len(retry), dtype=bool), max_iter, tol)
+        won = e_loglik > loglik[retry]
+        cells = retry[won]
+        theta[cells], loglik[cells], active[cells] = e_theta[won], e_loglik[won], e_active[won]
+        n_iter[cells] += e_iter[won]
+
+    # Standart hatalar: BHHH matrisinin tersi (θ ölçeğinde), σ ve τ için delta yöntemi
+    _, scores = exgauss_loglik(x, groups, theta, gradient=True)
+    _, outer = _pair_sums(scores, groups, n_groups)
+    det_ok = np.linalg.det(outer) > 0
+    outer[~det_ok] = np.eye(3)
+    se = np.sqrt(np.diagonal(np.linalg.inv(outer), axis1=1, axis2=2))
+    se[~det_ok] = np.nan
+    sigma, tau = np.exp(theta[:, 1]), np.exp(theta[:, 2])
+    return {
+        'mu': theta[:, 0], 'sigma': sigma, 'tau': tau,
+        'mu_se': se[:, 0], 'sigma_se': sigma * se[:, 1], 'tau_se': tau * se[:, 2],
+        # Sonlu olmayan veya negatif olmayan log-olabilirlik sayısal çöküş işaretidir
+        'loglik': loglik, 'converged': ~active & np.isfinite(loglik) & (loglik < 0), 'n_iter': n_iter,
+    }
+
+
+def _fit_chunk(args):
+    x, groups, n_groups = args
+    return fit_exgauss_groups(x, groups, n_groups)
+
+
+def fit_exgauss(x, groups, n_groups, n_jobs=1, chunk_groups=5000):
+    """Ex-Gaussian uydurma; n_jobs > 1 ise hücreler süreçlere bölünür (hücreler bağımsızdır)"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    x = np.asarray(x, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    n_workers = min(n_jobs or os.cpu_count() or 1, max(1, n_groups // 100))
+    if n_workers <= 1:
+        return fit_exgauss_groups(x, groups, n_groups)
+
+    # Gözlemler hücreye göre sıralanıp ardışık hücre bloklarına bölünür
+    order = np.argsort(groups, kind='stable')
+    x, groups = x[order], groups[order]
+    size = min(chunk_groups, -(-n_groups // n_workers))
+    edges = np.arange(0, n_groups + size, size).clip(max=n_groups)
+    bounds = np.searchsorted(groups, edges)
+    tasks = [(x[lo:hi], groups[lo:hi] - g0, g1 - g0)
+             for g0, g1, lo, hi in zip(edges[:-1], edges[1:], bounds[:-1], bounds[1:]) if g1 > g0]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        parts = list(executor.map(_fit_chunk, tasks))
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+# --- EZ-difüzyon ---
+
+def ez_diffusion(accuracy, mean_rt, var_rt, n_trials, s=EZ_SCALE):
+    """EZ-difüzyon parametreleri (vektörel)
+
+    accuracy: doğruluk oranı; mean_rt, var_rt: doğru RT ortalaması ve varyansı (saniye)
+    Doğruluk 0.5 veya 1 ise yarım deneme düzeltmesi uygulanır (1 - 1/(2n), 0.5 + 1/(2n)).
+    Dönen değer: (v, a, Ter saniye); şans düzeyinin altında v negatiftir.
+    """
+    pc = np.asarray(accuracy, dtype=float).copy()
+    n_trials = np.asarray(n_trials, dtype=float)
+    pc = np.where(pc >= 1, 1 - 1 / (2 * n_trials), pc)
+    pc = np.where(pc <= 0, 1 / (2 * n_trials), pc)
+    pc = np.where(pc == 0.5, 0.5 + 1 / (2 * n_trials), pc)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logit = np.log(pc / (1 - pc))
+        x = logit * (logit * pc ** 2 - logit * pc + pc - 0.5) / var_rt
+        v = np.sign(pc - 0.5) * s * np.abs(x) ** 0.25
+        a = s ** 2 * logit / v
+        y = -v * a / s ** 2
+        mdt = (a / (2 * v)) * (1 - np.exp(y)) / (1 + np.exp(y))
+        ter = mean_rt - mdt
+    return v, a, ter
+
+
+# --- Kohort tablosu ---
+
+def fit_rt_models(data, by='session', min_trials=MIN_TRIALS, n_jobs=1):
+    """Katılımcı/oturum × koşul başına ex-Gaussian ve EZ-difüzyon parametre tablosu
+
+    data: app.py CSV şemasında denemeler (yükleyiciler 'session' sütunu ekler)
+    by: hücreyi tanımlayan sütun(lar); koşul sütunları (testType, condition) otomatik eklenir
+    Dönen tablo: hücre başına n_trials, n_rt, accuracy, mean_rt, sd_rt (ms), mu, sigma, tau (ms)
+    ve standart hataları, loglik, converged, v, a, ter (ms)
+    """
+    import pandas as pd
+
+    from profiling import stage
+    from session_model import as_bool
+
+    by = [by] if isinstance(by, str) else list(by)
+    frame = data[by + ['testType']].copy()
+    frame['condition'] = condition_labels(data)
+    frame['correct'] = as_bool(data['correct'])
+    frame['rt'] = pd.to_numeric(data['reactionTime'], errors='coerce').to_numpy(dtype=float)
+    frame = frame[frame['condition'] != '']
+    keys = by + ['testType', 'condition']
+
+    cell = frame.groupby(keys, sort=True).ngroup().to_numpy()
+    cells = frame.groupby(keys, sort=True).size().reset_index(name='n_trials')
+    n_cells = len(cells)
+
+    usable = frame['correct'].to_numpy() & np.isfinite(frame['rt'].to_numpy()) & (frame['rt'].to_numpy() > 0)
+    rt, rt_cell = frame['rt'].to_numpy()[usable], cell[usable]
+    n_rt = np.bincount(rt_cell, minlength=n_cells)
+    cells['n_rt'] = n_rt
+    cells['accuracy'] = np.bincount(cell, frame['correct'].to_numpy(), n_cells) / cells['n_trials'].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_rt = np.bincount(rt_cell, rt, n_cells) / n_rt
+        var_rt = np.where(n_rt > 1, np.bincount(rt_cell, (rt - mean_rt[rt_cell]) ** 2, n_cells) / (n_rt - 1),
+                          np.nan)
+    cells['mean_rt'] = mean_rt
+    cells['sd_rt'] = np.sqrt(var_rt)
+
+    # Ex-Gaussian yalnızca yeterli RT'si olan hücrelerde
+    fit_cells = np.flatnonzero(n_rt >= min_trials)
+    remap = np.full(n_cells, -1)
+    remap[fit_cells] = np.arange(len(fit_cells))
+    keep = remap[rt_cell] >= 0
+    with stage('rt_model_fit', fields={'cells': len(fit_cells)}, model='exgauss'):
+        params = fit_exgauss(rt[keep], remap[rt_cell[keep]], len(fit_cells), n_jobs=n_jobs)
+    for name, values in params.items():
+        column = np.full(n_cells, np.nan) if values.dtype.kind == 'f' else \
+            np.zeros(n_cells, dtype=values.dtype)
+        column[fit_cells] = values
+        cells[name] = column
+
+    v, a, ter = ez_diffusion(cells['accuracy'].to_numpy(), mean_rt / 1000, var_rt / 1e6, cells['n_trials'].to_numpy())
+    usable_ez = n_rt >= min_trials
+    cells['v'] = np.where(usable_ez, v, np.nan)
+    cells['a'] = np.where(usable_ez, a, np.nan)
+    cells['ter'] = np.where(usable_ez, ter * 1000, np.nan)
+    return cells
+
+
+def condition_effects(table, by='session'):
+    """Koşul farkları (Stroop: uyumsuz - uyumlu; Go/No-Go parametreleri Go'dan): hücre başına bir satır"""
+    by = [by] if isinstance(by, str) else list(by)
+    stroop = table[table['testType'] == 'stroop'].pivot_table(
+        index=by, columns='condition', values=['mu', 'sigma', 'tau', 'v', 'a', 'ter', 'mean_rt'])
+    if stroop.empty or 'congruent' not in stroop.columns.get_level_values(1) \
+            or 'incongruent' not in stroop.columns.get_level_values(1):
+        return stroop.iloc[:0]
+    effects = stroop.xs('incongruent', axis=1, level=1) - stroop.xs('congruent', axis=1, level=1)
+    return effects.add_suffix('_effect')
+
+
+def print_rt_summary(table, by='session'):
+    """Kohort özeti: koşul başına medyan parametreler ve Stroop etkisinin ayrışması"""
+    print("=" * 60)
+    print("RT DAĞILIM MODELLERİ (ex-Gaussian + EZ-difüzyon)")
+    print("=" * 60)
+    fitted = table[np.isfinite(table['mu'])]
+    print(f"\nHücre: {len(table)} ({len(fitted)} uydurulan, en az {MIN_TRIALS} doğru RT), "
+          f"yakınsayan: {int(fitted['converged'].sum())}")
+
+    print(f"\n{'test':<8}{'koşul':<13}{'hücre':>6}{'μ (ms)':>9}{'σ (ms)':>9}{'τ (ms)':>9}"
+          f"{'v':>8}{'a':>8}{'Ter (ms)':>10}")
+    for (test, condition), group in fitted.groupby(['testType', 'condition']):
+        med = group[['mu', 'sigma', 'tau', 'v', 'a', 'ter']].median()
+        print(f"{test:<8}{condition:<13}{len(group):>6}{med['mu']:9.1f}{med['sigma']:9.1f}{med['tau']:9.1f}"
+              f"{med['v']:8.3f}{med['a']:8.3f}{med['ter']:10.1f}")
+
+    effects = condition_effects(table, by=by)
+    if len(effects):
+        med = effects.median()
+        print(f"\n🎯 Stroop etkisi (uyumsuz - uyumlu, medyan, {len(effects)} katılımcı):")
+        print(f"   Ortalama RT: {med['mean_rt_effect']:.1f} ms = μ {med['mu_effect']:+.1f} ms "
+              f"+ τ {med['tau_effect']:+.1f} ms")
+        print(f"   Sürüklenme hızı: {med['v_effect']:+.3f}, karar dışı süre: {med['ter_effect']:+.1f} ms")
+
+
+def main(argv=None):
+    """Komut satırı: CSV denemeleri → katılımcı × koşul parametre tablosu"""
+    from trial_cleaning import add_cleaning_arguments, clean_from_args
+
+    parser = argparse.ArgumentParser(description='Ex-Gaussian ve EZ-difüzyon RT modelleri (kohort ölçeğinde)')
+    parser.add_argument('--data-dir', default='data', help='app.py CSV klasörü')
+    parser.add_argument('--by', default='session', help='Katılımcı/oturum sütunu (virgülle birden çok)')
+    parser.add_argument('--min-trials', type=int, default=MIN_TRIALS)
+    parser.add_argument('--jobs', type=int, default=1, help='Süreç sayısı (-1: tüm çekirdekler)')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='N sentetik oturumla demo')
+    parser.add_argument('--output', help='Parametre tablosu (.csv)')
+    args = add_cleaning_arguments(parser).parse_args(argv)
+
+    if args.synthetic:
+        import pandas as pd
+
+        from synthetic_data import gonogo_trials, stroop_trials
+
+        n = args.synthetic * 100
+        data = pd.concat([stroop_trials(n, trials_per_session=100, seed=1),
+                          gonogo_trials(n, trials_per_session=100, seed=2)], ignore_index=True)
+        data['session'] = np.tile(np.arange(n) // 100, 2)
+    else:
+        from session_model import load_trials
+
+        data = load_trials(args.data_dir)
+        if data is None:
+            return
+
+    data = clean_from_args(data, args)
+    by = args.by.split(',')
+    table = fit_rt_models(data, by=by, min_trials=args.min_trials,
+                          n_jobs=None if args.jobs == -1 else args.jobs)
+    print_rt_summary(table, by=by)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        table.to_csv(args.output, index=False)
+        print(f"\n✓ Parametre tablosu kaydedildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
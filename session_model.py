@@ -0,0 +1,439 @@
+"""
+Davranışsal + EEG Oturum Modeli
+app.py CSV'lerindeki Stroop ve Go/No-Go denemelerini aynı oturumun EEG kaydındaki uyaran
+olaylarına bağlar; her deneme kendi epoğuyla eşlenir. Eşleme iki yolla yapılır:
+  - 'trigger': her (oturum, tetik kodu) içinde n. deneme ↔ n. olay (sıra anahtarıyla birleştirme)
+  - 'timestamp': uyaran başlangıç zamanı ↔ en yakın olay zamanı (sıralı olay dizisinde
+    searchsorted; tolerans içinde, bire bir)
+İç içe döngü yoktur; her iki yol da sıralı indeks üzerinde O((deneme + olay) log olay) çalışır.
+
+Epoklar oturum başına ayrı (epok, kanal, zaman) bloklarında tutulur (birleştirme kopyası yok);
+deneme tablosunun 'epoch' sütunu tüm bloklar boyunca sürekli numaralanmıştır ve sorgular yalnızca
+seçilen satırları bloklardan toplar (pandas maskesi + dizi indekslemesiyle vektörel):
+    model = SessionModel.build(trials, {'20240101_090000': raw, ...})
+    erp, n = model.erp("correct == False and congruent == True")
+    model.trial_peaks()[['reactionTime', 'P300_latency']].corr()
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+
+# Uyaran tetik kodları: (test türü, koşul) → EEG kaydında uyaran başlangıcında gönderilen kod
+STIMULUS_CODES = {
+    ('stroop', 'congruent'): 11,
+    ('stroop', 'incongruent'): 12,
+    ('gonogo', 'go'): 21,
+    ('gonogo', 'nogo'): 22,
+}
+
+# Tepki verilmeyen No-Go denemesinin süresi (reaction_time_test.html zaman aşımı, ms)
+NOGO_TIMEOUT_MS = 2000
+
+
+def session_id_from_path(path):
+    """app.py dosya adından oturum kimliği: '<test>_<oturum>.csv' → '<oturum>'"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    prefix, sep, rest = name.partition('_')
+    return rest if sep and prefix in {test for test, _ in STIMULUS_CODES} else name
+
+
+def as_bool(values):
+    """CSV'den okunan True/False, 'True'/'False', 1/0 ve boş değerleri bool dizisine çevir"""
+    import pandas as pd
+
+    if np.asarray(values[:0]).dtype == bool:
+        return np.asarray(values)
+    # Farklı değerler az: dönüşüm yalnızca benzersiz değerlerde yapılır (eksik değer: False)
+    codes, uniques = pd.factorize(values if isinstance(values, pd.Series) else np.asarray(values))
+    truth = np.append(np.isin(np.char.lower(np.asarray(uniques).astype(str)), ['true', '1', '1.0']), False)
+    return truth[codes]
+
+
+def stimulus_codes(trials, codes=None):
+    """Denemelerin beklenen uyaran tetik kodları (test türü ve uyum/Go koşuluna göre)"""
+    codes = STIMULUS_CODES if codes is None else codes
+    test = np.asarray(trials['testType']).astype(str)
+    congruent = as_bool(trials['congruent'])
+    is_go = as_bool(trials['isGo'])
+    return np.select(
+        [(test == 'stroop') & congruent, test == 'stroop', (test == 'gonogo') & is_go, test == 'gonogo'],
+        [codes['stroop', 'congruent'], codes['stroop', 'incongruent'],
+         codes['gonogo', 'go'], codes['gonogo', 'nogo']], default=0)
+
+
+def stimulus_onsets(trials):
+    """Uyaran başlangıç zamanları (UTC, datetime64[ns])
+
+    Zaman damgası tepki anında alınır: başlangıç = zaman damgası - tepki süresi; tepki
+    verilmeyen No-Go denemelerinde zaman aşımı süresi çıkarılır.
+    """
+    import pandas as pd
+
+    stamps = pd.to_datetime(trials['timestamp'], utc=True, format='ISO8601')
+    rt = pd.to_numeric(trials['reactionTime'], errors='coerce').to_numpy(dtype=float)
+    lag = np.where(np.isnan(rt), NOGO_TIMEOUT_MS, rt)
+    return stamps.dt.tz_localize(None).to_numpy() - (lag * 1e6).astype('timedelta64[ns]')
+
+
+def _rank_within(keys):
+    """Her elemanın kendi anahtarı içindeki sırası (0, 1, 2, ...; girdi sırası korunur)"""
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+    ranks = np.empty(len(keys), dtype=np.int64)
+    ranks[order] = np.arange(len(keys)) - group_start
+    return ranks
+
+
+def match_by_trigger(trial_codes, event_codes):
+    """Kod içindeki sırayla eşle: koddaki n. deneme ↔ aynı koddaki n. olay
+
+    Denemeler ve olaylar zaman sırasında olmalıdır; kaydedilmemiş bir deneme aynı koddaki sonraki
+    denemelerin kaymasına yol açar (bu durumda zaman damgasıyla eşleme kullanılmalıdır).
+    Dönen değer: deneme başına olay indeksi (-1: yok)
+    """
+    trial_codes = np.asarray(trial_codes, dtype=np.int64)
+    event_codes = np.asarray(event_codes, dtype=np.int64)
+    if len(event_codes) == 0:
+        return np.full(len(trial_codes), -1, dtype=np.int64)
+    # Birleşik anahtar: kod × ölçek + kod içi sıra
+    scale = max(len(trial_codes), len(event_codes)) + 1
+    trial_keys = trial_codes * scale + _rank_within(trial_codes)
+    event_keys = event_codes * scale + _rank_within(event_codes)
+
+    order = np.argsort(event_keys, kind='stable')
+    sorted_keys = event_keys[order]
+    pos = np.minimum(np.searchsorted(sorted_keys, trial_keys), len(sorted_keys) - 1)
+    return np.where(sorted_keys[pos] == trial_keys, order[pos], -1)
+
+
+def match_by_timestamp(trial_times, event_times, tolerance=0.05):
+    """En yakın olay zamanıyla bire bir eşle (saniye; olay zamanları artan sırada)
+
+    Tolerans dışındaki denemeler eşlenmez; iki deneme aynı olaya düşerse en yakını kalır.
+    Dönen değer: deneme başına olay indeksi (-1: yok)
+    """
+    trial_times = np.asarray(trial_times, dtype=float)
+    event_times = np.asarray(event_times, dtype=float)
+    matched = np.full(len(trial_times), -1, dtype=np.int64)
+    if len(event_times) == 0 or len(trial_times) == 0:
+        return matched
+
+    pos = np.searchsorted(event_times, trial_times)
+    left = np.clip(pos - 1, 0, len(event_times) - 1)
+    right = np.clip(pos, 0, len(event_times) - 1)
+    use_right = np.abs(event_times[right] - trial_times) < np.abs(event_times[left] - trial_times)
+    nearest = np.where(use_right, right, left)
+    distance = np.abs(event_times[nearest] - trial_times)
+
+    ok = distance <= tolerance
+    # Bire bir: her olay için en yakın deneme (olay, mesafe) sıralamasında ilk gelen
+    candidates = np.flatnonzero(ok)
+    if len(candidates) == 0:
+        return matched
+    order = candidates[np.lexsort((distance[candidates], nearest[candidates]))]
+    first = np.r_[True, nearest[order][1:] != nearest[order][:-1]]
+    matched[order[first]] = nearest[order[first]]
+    return matched
+
+
+def join_session(trials, events, sfreq, how='trigger', meas_date=None, tolerance=0.05,
+                 clock_offset=0.0, codes=None):
+    """Tek oturumun denemelerini (zaman sırasında) olaylara bağla
+
+    events: (olay, 3) dizisi [örnek (first_samp dahil), önceki, kod]
+    how='timestamp' için meas_date (kaydın başlangıç anı, UTC) gerekir; clock_offset EEG saatinin
+    deney bilgisayarına göre ileri olduğu süredir (s).
+    Dönen değer: deneme başına olay örneği (-1: eşlenmedi)
+    """
+    if how not in ('trigger', 'timestamp'):
+        raise ValueError(f"Bilinmeyen eşleme yöntemi: {how} (trigger/timestamp)")
+    events = np.asarray(events, dtype=np.int64).reshape(-1, 3)
+    trial_codes = stimulus_codes(trials, codes)
+    # Yalnızca uyaran kodlu olaylar (tepki vb. diğer tetikler eşlemeye girmez)
+    events = events[np.isin(events[:, 2], np.unique(trial_codes))]
+    events = events[np.argsort(events[:, 0], kind='stable')]
+    if len(events) == 0:
+        return np.full(len(trial_codes), -1, dtype=np.int64)
+
+    if how == 'trigger':
+        trial_counts, event_counts = (np.unique(c, return_counts=True) for c in (trial_codes, events[:, 2]))
+        if not all(np.array_equal(a, b) for a, b in zip(trial_counts, event_counts)):
+            print(f"Uyarı: deneme ve olay sayıları farklı ({len(trial_codes)} deneme, {len(events)} olay); "
+                  "tetik sırası kayabilir, zaman damgasıyla eşleme önerilir.")
+        idx = match_by_trigger(trial_codes, events[:, 2])
+    else:
+        if meas_date is None:
+            raise ValueError("Zaman damgasıyla eşleme için kaydın meas_date bilgisi gerekir")
+        start = np.datetime64(meas_date.replace(tzinfo=None), 'ns')
+        trial_times = (stimulus_onsets(trials) - start) / np.timedelta64(1, 's')
+        idx = match_by_timestamp(trial_times + clock_offset, events[:, 0] / sfreq, tolerance)
+        # Zaman eşleşmesinde kod da uymalı
+        idx[(idx >= 0) & (events[np.maximum(idx, 0), 2] != trial_codes)] = -1
+    return np.where(idx >= 0, events[np.maximum(idx, 0), 0], -1)
+
+
+class SessionModel:
+    """Tüm oturumların deneme tablosu ve denemelere hizalı epokları
+
+    trials: deneme başına bir satır; 'session', 'onset', 'event_sample' ve 'epoch' (bloklar boyunca
+    sürekli epok numarası, -1: epok yok) sütunları eklenmiştir.
+    blocks: oturum başına (epok, kanal, zaman) dizileri; offsets[i] i. bloğun ilk epok numarasıdır.
+    """
+
+    def __init__(self, trials, blocks, times, ch_names, dtype=np.float32):
+        self.trials = trials
+        self.blocks = list(blocks)
+        self.offsets = np.cumsum([0] + [len(block) for block in self.blocks])
+        self.times = times
+        self.ch_names = list(ch_names)
+        self.dtype = np.dtype(self.blocks[0].dtype if self.blocks else dtype)
+
+    @property
+    def n_epochs(self):
+        return int(self.offsets[-1])
+
+    @property
+    def epochs(self):
+        """Tüm epoklar tek dizide (kopya; sorgular bunun yerine yalnızca seçilen satırları toplar)"""
+        return self.take(np.arange(self.n_epochs))
+
+    def take(self, idx, channels=None):
+        """Epok numaralarındaki epoklar (deneme, kanal, zaman); yalnızca istenen satırlar kopyalanır"""
+        idx = np.asarray(idx, dtype=np.int64)
+        ch = self._channel_index(channels)
+        n_channels = np.arange(len(self.ch_names))[ch].size
+        n_times = 0 if self.times is None else len(self.times)
+        out = np.empty((len(idx), n_channels, n_times), dtype=self.dtype)
+        block_of = np.searchsorted(self.offsets, idx, side='right') - 1
+        for b in np.unique(block_of):
+            sel = block_of == b
+            out[sel] = self.blocks[b][idx[sel] - self.offsets[b]][:, ch]
+        return out
+
+    @classmethod
+    def build(cls, trials, recordings, how='trigger', tmin=-0.2, tmax=0.8, baseline=(None, 0),
+              picks='data', tolerance=0.05, clock_offset=0.0, codes=None,
+              stim_channel='STI 014', dtype=np.float32):
+        """Denemeleri oturum kayıtlarına bağla ve eşlenen her deneme için epok çıkar
+
+        trials: 'session' sütunlu deneme tablosu (load_trials veya yükleyicilerin çıktısı)
+        recordings: {oturum: mne.io.Raw veya FIF yolu}; kaydı olmayan oturumların denemeleri
+        epoksuz kalır. Tüm kayıtlarda seçilen kanallar aynı olmalıdır.
+        """
+        import mne
+
+        from erp_engine import epochs_at
+        from event_index import EventIndex
+        from profiling import stage
+
+        trials = trials.copy()
+        trials['onset'] = stimulus_onsets(trials)
+        trials = trials.sort_values(['session', 'onset'], kind='stable').reset_index(drop=True)
+        trials['event_sample'] = np.int64(-1)
+        trials['epoch'] = np.int64(-1)
+
+        blocks, n_epochs, times, ch_names = [], 0, None, None
+        bounds = np.flatnonzero(np.r_[True, trials['session'].to_numpy()[1:] != trials['session'].to_numpy()[:-1]])
+        for lo, hi in zip(bounds, np.r_[bounds[1:], len(trials)]):
+            session = trials['session'].iat[lo]
+            raw = recordings.get(session)
+            if raw is None:
+                continue
+            if isinstance(raw, str):
+                raw = mne.io.read_raw_fif(raw, preload=True, verbose=False)
+
+            with stage('session_join', how=how):
+                index = EventIndex.from_raw(raw, stim_channel=stim_channel)
+                samples = join_session(trials.iloc[lo:hi], index.events, raw.info['sfreq'], how=how,
+                                       meas_date=raw.info['meas_date'], tolerance=tolerance,
+                                       clock_offset=clock_offset, codes=codes)
+            matched = np.flatnonzero(samples >= 0)
+            with stage('epochs', level='session'):
+                block, valid, info, block_times = epochs_at(raw, samples[matched], tmin=tmin, tmax=tmax,
+                                                            baseline=baseline, picks=picks, dtype=dtype)
+            if ch_names is None:
+                times, ch_names = block_times, info['ch_names']
+            elif info['ch_names'] != ch_names:
+                raise ValueError(f"{session} oturumunun kanalları diğer kayıtlardan farklı")
+
+            rows = lo + matched
+            trials.loc[rows, 'event_sample'] = samples[matched]
+            trials.loc[rows[valid], 'epoch'] = n_epochs + np.arange(valid.sum())
+            blocks.append(block)
+            n_epochs += len(block)
+
+        return cls(trials, blocks, times, ch_names or [], dtype=dtype)
+
+    # --- Sorgular ---
+
+    def select(self, query=None):
+        """Epoğu olan ve sorguya uyan denemeler (pandas query ifadesi veya bool maske)"""
+        rows = self.trials[self.trials['epoch'] >= 0]
+        if query is None:
+            return rows
+        if isinstance(query, str):
+            return rows.query(query)
+        return rows[np.asarray(query)[self.trials['epoch'].to_numpy() >= 0]]
+
+    def _channel_index(self, channels):
+        if channels is None:
+            return slice(None)
+        return [self.ch_names.index(ch) for ch in channels]
+
+    def epochs_for(self, query=None, channels=None):
+        """Sorguya uyan denemelerin epokları (deneme, kanal, zaman)"""
+        return self.take(self.select(query)['epoch'].to_numpy(), channels)
+
+    def erp(self, query=None, by=None, channels=None):
+        """Sorguya uyan denemelerin ERP'si
+
+        by verilirse (örn. 'congruent' veya ['testType', 'correct']) grup başına
+        {grup: ((kanal, zaman) ERP, deneme sayısı)} döner; yoksa (ERP, deneme sayısı).
+        """
+        rows = self.select(query)
+        if by is None:
+            epochs = self.take(rows['epoch'].to_numpy(), channels)
+            return epochs.mean(axis=0, dtype=np.float64), len(epochs)
+        return {key: (self.take(idx, channels).mean(axis=0, dtype=np.float64), len(idx))
+                for key, idx in rows.groupby(by)['epoch'].apply(np.asarray).items()}
+
+    def trial_peaks(self, query=None, windows=None, channels=None, chunk_size=4096):
+        """Deneme başına ERP tepe metrikleri (seçilen kanalların ortalamasında)
+
+        Her pencere için <pencere>_latency, <pencere>_amplitude ve <pencere>_mean sütunları deneme
+        tablosuna eklenmiş olarak döner (örn. tepki süresi ↔ P300 gecikmesi).
+        """
+        from erp_peaks import peak_arrays
+
+        rows = self.select(query).copy()
+        idx = rows['epoch'].to_numpy()
+        columns = {}
+        for start in range(0, len(idx), chunk_size):
+            signal = self.take(idx[start:start + chunk_size], channels).mean(axis=1, dtype=np.float64)
+            metrics = peak_arrays(signal[:, np.newaxis, :], self.times, windows=windows)
+            for w, name in enumerate(metrics['windows']):
+                for key, label in (('peak_latency', 'latency'), ('peak_amplitude', 'amplitude'),
+                                   ('mean_amplitude', 'mean')):
+                    columns.setdefault(f'{name}_{label}', []).append(metrics[key][:, 0, w])
+        for name, parts in columns.items():
+            rows[name] = np.concatenate(parts)
+        return rows
+
+    def summary(self):
+        """Oturum başına deneme, eşlenen olay ve epok sayıları"""
+        grouped = self.trials.groupby('session')
+        return grouped.agg(trials=('epoch', 'size'),
+                           matched=('event_sample', lambda s: int((s >= 0).sum())),
+                           epochs=('epoch', lambda s: int((s >= 0).sum())))
+
+    def __repr__(self):
+        return (f"SessionModel({self.trials['session'].nunique()} oturum, {len(self.trials)} deneme, "
+                f"{self.n_epochs} epok)")
+
+
+def load_trials(data_dir='data', test_types=('stroop', 'gonogo')):
+    """app.py CSV'lerini oturum sütunuyla yükle (analyze_errors.load_test_data ile aynı dosyalar)"""
+    import pandas as pd
+
+    from analyze_errors import load_test_data
+
+    frames = [load_test_data(data_dir, test_type) for test_type in test_types]
+    frames = [f for f in frames if f is not None]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def find_recordings(eeg_dir, sessions):
+    """Oturum kimliğiyle adlandırılmış FIF kayıtları: <eeg_dir>/*<oturum>*.fif"""
+    paths = sorted(glob.glob(os.path.join(eeg_dir, '*.fif')))
+    recordings = {}
+    for session in sessions:
+        matches = [p for p in paths if str(session) in os.path.basename(p)]
+        if matches:
+            recordings[session] = matches[0]
+    return recordings
+
+
+def synthetic_model(n_sessions=4, n_trials=40, how='trigger', seed=0):
+    """Sentetik Stroop/Go-No-Go oturumlarından oturum modeli (demo ve benchmark için)"""
+    import pandas as pd
+
+    from synthetic_data import synthetic_session
+
+    frames, recordings = [], {}
+    for i in range(n_sessions):
+        test_type = 'stroop' if i % 2 == 0 else 'gonogo'
+        session = f'synthetic_{i:04d}'
+        trials, raw = synthetic_session(test_type, n_trials=n_trials, session_id=session, seed=seed + i)
+        trials['session'] = session
+        frames.append(trials)
+        recordings[session] = raw
+    return SessionModel.build(pd.concat(frames, ignore_index=True), recordings, how=how)
+
+
+def print_report(model):
+    """Eşleme özeti ve örnek sorgular"""
+    print("=" * 60)
+    print("DAVRANIŞSAL + EEG OTURUM MODELİ")
+    print("=" * 60)
+    summary = model.summary()
+    print(f"\n{model}")
+    print(f"  - Eşlenen deneme: {int(summary['matched'].sum())}/{int(summary['trials'].sum())}")
+    print(f"  - Epoklu deneme: {int(summary['epochs'].sum())}")
+    if model.n_epochs == 0:
+        return
+
+    peaks = model.trial_peaks()
+    print("\nKoşul başına P300 (kanal ortalaması):")
+    for test_type, rows in peaks.groupby('testType'):
+        condition = 'congruent' if test_type == 'stroop' else 'isGo'
+        for (value, correct), group in rows.groupby([as_bool(rows[condition]), as_bool(rows['correct'])]):
+            print(f"  {test_type:<7} {condition}={value!s:<5} correct={correct!s:<5} n={len(group):>5}  "
+                  f"gecikme {group['P300_latency'].mean() * 1000:6.1f} ms  "
+                  f"genlik {group['P300_amplitude'].mean() * 1e6:6.2f} µV")
+
+    responded = peaks.dropna(subset=['reactionTime'])
+    if len(responded) > 2:
+        r = np.corrcoef(responded['reactionTime'], responded['P300_latency'])[0, 1]
+        print(f"\nTepki süresi ↔ P300 gecikmesi (deneme başına): r = {r:.3f} (n={len(responded)})")
+
+
+def main(argv=None):
+    """Komut satırı: CSV denemeleri + oturum kayıtları → eşleme özeti ve örnek sorgular"""
+    parser = argparse.ArgumentParser(description='Davranışsal denemeleri EEG epoklarıyla eşleyen oturum modeli')
+    parser.add_argument('--data-dir', default='data', help='app.py CSV klasörü')
+    parser.add_argument('--eeg-dir', default=os.path.join('data', 'eeg'),
+                        help='Oturum kimliğini dosya adında taşıyan FIF kayıtları')
+    parser.add_argument('--how', choices=['trigger', 'timestamp'], default='trigger', help='Eşleme yöntemi')
+    parser.add_argument('--tolerance', type=float, default=0.05, help='Zaman eşlemesinde tolerans (s)')
+    parser.add_argument('--clock-offset', type=float, default=0.0,
+                        help='EEG saatinin deney bilgisayarına göre ilerisi (s)')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='N sentetik oturumla demo')
+    parser.add_argument('--query', help='ERP sorgusu, örn. "correct == False and congruent == False"')
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        model = synthetic_model(n_sessions=args.synthetic, how=args.how)
+    else:
+        trials = load_trials(args.data_dir)
+        if trials is None:
+            return
+        recordings = find_recordings(args.eeg_dir, trials['session'].unique())
+        model = SessionModel.build(trials, recordings, how=args.how, tolerance=args.tolerance,
+                                   clock_offset=args.clock_offset)
+    print_report(model)
+
+    if args.query and model.n_epochs:
+        erp, n = model.erp(args.query)
+        peak = np.abs(erp).max(axis=0).argmax()
+        print(f"\nSorgu: {args.query}")
+        print(f"  - {n} deneme; en büyük genlik {model.times[peak] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
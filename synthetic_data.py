@@ -0,0 +1,262 @@
+"""
+Sentetik Veri Üreteçleri
+Benchmark ve denemeler için app.py CSV şemasında Stroop / Go-No-Go denemeleri ve
+Oddball olaylı çok kanallı EEG kayıtları üretir. Tüm üreteçler vektöreldir ve tohumlanabilir.
+"""
+
+import os
+
+import numpy as np
+
+# app.py'nin CSV sütunları (aynı sırada)
+FIELDNAMES = ['timestamp', 'trial', 'testType', 'word', 'color', 'userAnswer',
+              'correct', 'reactionTime', 'isGo', 'stimulusType', 'responded', 'congruent',
+              'hour', 'minute', 'second', 'millisecond', 'errorType']
+
+COLORS = ['red', 'blue', 'green', 'yellow']
+
+
+def _timestamps(n, trials_per_session, rng, start='2024-01-01T09:00:00'):
+    """Oturum başına ardışık deneme zamanları (deneme arası ~1.5 s, oturumlar arası ~1 saat)"""
+    session = np.arange(n) // trials_per_session
+    within = np.arange(n) % trials_per_session
+    offset_ms = (session * 3_600_000 + within * 1500 + rng.integers(0, 500, n)).astype('timedelta64[ms]')
+    return np.datetime64(start, 'ms') + offset_ms
+
+
+def _time_columns(stamps):
+    """timestamp, hour, minute, second, millisecond sütunları"""
+    ms = stamps.astype('int64')
+    return {
+        'timestamp': np.datetime_as_string(stamps, unit='ms'),
+        'hour': (ms // 3_600_000) % 24,
+        'minute': (ms // 60_000) % 60,
+        'second': (ms // 1000) % 60,
+        'millisecond': ms % 1000,
+    }
+
+
+def stroop_trials(n_trials, trials_per_session=20, seed=0, accuracy=0.92, word_error_rate=0.6,
+                  base_rt=620.0, stroop_effect=80.0):
+    """Stroop denemeleri (pandas DataFrame, app.py CSV şeması)
+
+    Uyumsuz denemelerde tepki süresi stroop_effect kadar uzun, hata olasılığı daha yüksektir;
+    hataların word_error_rate oranı kelimenin okunmasından kaynaklanır.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    colors = np.array(COLORS)
+    color = rng.integers(0, len(colors), n_trials)
+    congruent = rng.random(n_trials) < 0.5
+    word = np.where(congruent, color, (color + rng.integers(1, len(colors), n_trials)) % len(colors))
+
+    p_error = np.where(congruent, (1 - accuracy) * 0.5, (1 - accuracy) * 1.5)
+    error = rng.random(n_trials) < p_error
+    word_error = error & ~congruent & (rng.random(n_trials) < word_error_rate)
+    other = (color + rng.integers(1, len(colors), n_trials)) % len(colors)
+    other = np.where(other == word, (other + 1) % len(colors), other)
+    other = np.where(other == color, (other + 1) % len(colors), other)
+    answer = np.where(~error, color, np.where(word_error, word, other))
+
+    # Ex-Gaussian benzeri tepki süreleri
+    rt = (rng.normal(base_rt, 60, n_trials) + rng.exponential(120, n_trials)
+          + np.where(congruent, 0.0, stroop_effect) + np.where(error, 40.0, 0.0))
+
+    error_type = np.where(answer == color, 'correct', np.where(answer == word, 'word_error', 'color_error'))
+    stamps = _timestamps(n_trials, trials_per_session, rng)
+    return pd.DataFrame({
+        'trial': np.arange(n_trials) % trials_per_session + 1,
+        'testType': 'stroop',
+        'word': colors[word],
+        'color': colors[color],
+        'userAnswer': colors[answer],
+        'correct': answer == color,
+        'reactionTime': np.round(np.clip(rt, 150, None)),
+        'isGo': '',
+        'stimulusType': '',
+        'responded': '',
+        'congruent': congruent,
+        **_time_columns(stamps),
+        'errorType': error_type,
+    })[FIELDNAMES]
+
+
+def gonogo_trials(n_trials, trials_per_session=20, seed=0, go_ratio=0.6, hit_rate=0.95,
+                  false_alarm_rate=0.12, base_rt=380.0):
+    """Go/No-Go denemeleri (pandas DataFrame, app.py CSV şeması)"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    is_go = rng.random(n_trials) < go_ratio
+    responded = np.where(is_go, rng.random(n_trials) < hit_rate, rng.random(n_trials) < false_alarm_rate)
+    correct = responded == is_go
+    rt = np.clip(rng.normal(base_rt, 50, n_trials) + rng.exponential(80, n_trials), 120, None)
+    # Yanlış alarmlar daha hızlıdır
+    rt = np.where(~is_go, rt * 0.85, rt)
+
+    stimulus = np.where(is_go, 'green', np.where(rng.random(n_trials) < 0.5, 'red', 'blue'))
+    error_type = np.where(correct, 'correct', np.where(is_go, 'missed_go', 'false_alarm'))
+    stamps = _timestamps(n_trials, trials_per_session, rng)
+    return pd.DataFrame({
+        'trial': np.arange(n_trials) % trials_per_session + 1,
+        'testType': 'gonogo',
+        'word': '',
+        'color': '',
+        'userAnswer': '',
+        'correct': correct,
+        'reactionTime': np.where(responded, np.round(rt), np.nan),
+        'isGo': is_go,
+        'stimulusType': stimulus,
+        'responded': responded,
+        'congruent': '',
+        **_time_columns(stamps),
+        'errorType': error_type,
+    })[FIELDNAMES]
+
+
+def write_session_csvs(trials, data_dir, trials_per_session=20, max_files=None):
+    """Denemeleri app.py gibi oturum başına bir CSV dosyasına yaz
+
+    max_files verilirse oturumlar bu sayıda dosyaya dağıtılır (çok büyük veri için).
+    Dönen değer: yazılan dosya yolları
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    test_type = trials['testType'].iloc[0]
+    session = np.arange(len(trials)) // trials_per_session
+    if max_files is not None:
+        session = session % max_files
+
+    paths = []
+    for sid, group in trials.groupby(session, sort=True):
+        path = os.path.join(data_dir, f'{test_type}_synthetic_{sid:06d}.csv')
+        group.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def trial_payloads(n_trials, test_type='stroop', session_id='bench', seed=0):
+    """app.py /api/save-trial için JSON gövdeleri (tarayıcının gönderdiği biçim)"""
+    generator = stroop_trials if test_type == 'stroop' else gonogo_trials
+    trials = generator(n_trials, seed=seed)
+    columns = ['trial', 'correct', 'reactionTime', 'errorType']
+    if test_type == 'stroop':
+        columns += ['word', 'color', 'userAnswer', 'congruent']
+    else:
+        columns += ['isGo', 'stimulusType', 'responded']
+
+    payloads = []
+    for row in trials[columns + ['timestamp', 'hour', 'minute', 'second', 'millisecond']].itertuples(index=False):
+        record = row._asdict()
+        detailed = {k: int(record.pop(k)) for k in ('hour', 'minute', 'second', 'millisecond')}
+        record = {k: (v.item() if hasattr(v, 'item') else v) for k, v in record.items()}
+        if record['reactionTime'] != record['reactionTime']:  # NaN → null
+            record['reactionTime'] = None
+        payloads.append({**record, 'testType': test_type, 'sessionId': session_id,
+                         'detailedTime': detailed})
+    return payloads
+
+
+def synthetic_raw(n_channels=32, duration=60.0, sfreq=250.0, seed=0, oddball_ratio=0.2,
+                  isi=(0.8, 1.2), p300_amplitude=5e-6, dtype=np.float64):
+    """Oddball olaylı çok kanallı sentetik EEG kaydı (mne.io.RawArray)
+
+    Kanallar 'EEG 001'... biçiminde adlandırılır; 'STI 014' stim kanalında standart (1) ve
+    oddball (2) olayları bulunur. Sinyal: kırmızı + beyaz gürültü, 10 Hz alfa + olaylara kilitli
+    N1/P300 (oddball'da P300 daha büyük).
+    """
+    import mne
+
+    rng = np.random.default_rng(seed)
+    n_times = int(round(duration * sfreq))
+    times = np.arange(n_times) / sfreq
+
+    # Kırmızı (1/f²) gürültü: beyaz gürültünün kümülatif toplamı, uçları sıfıra çekilmiş
+    data = rng.standard_normal((n_channels, n_times)).astype(dtype)
+    data = np.cumsum(data, axis=1, dtype=dtype)
+    data -= np.linspace(0, 1, n_times, dtype=dtype) * data[:, -1:]
+    data *= 2e-6 / np.sqrt(n_times)
+    data += 3e-6 * rng.standard_normal((n_channels, n_times)).astype(dtype)
+    alpha_gain = rng.uniform(2e-6, 8e-6, (n_channels, 1)).astype(dtype)
+    data += alpha_gain * np.sin(2 * np.pi * 10 * times + rng.uniform(0, 2 * np.pi, (n_channels, 1)))
+
+    # Olaylar: rastgele uyaran arası süreler, ilk/son 1 s boş
+    n_events = int(duration / np.mean(isi)) + 1
+    onsets = np.cumsum(rng.uniform(isi[0], isi[1], n_events)) + 1.0
+    onsets = onsets[onsets < duration - 1.5]
+    samples = np.round(onsets * sfreq).astype(int)
+    codes = np.where(rng.random(len(samples)) < oddball_ratio, 2, 1)
+
+    # Olaya kilitli tepki: N1 (~100 ms) ve P300 (~320 ms), parietal ağırlıklı topografi
+    erp_t = np.arange(int(0.8 * sfreq)) / sfreq
+    n1 = -np.exp(-((erp_t - 0.10) / 0.03) ** 2)
+    p3 = np.exp(-((erp_t - 0.32) / 0.07) ** 2)
+    weights = np.linspace(0.3, 1.0, n_channels)[:, None]
+    for code, gain in ((1, 0.3), (2, 1.0)):
+        template = (weights * p300_amplitude * (0.6 * n1 + gain * p3)).astype(dtype)
+        for s in samples[codes == code]:
+            data[:, s:s + len(erp_t)] += template[:, :n_times - s]
+
+    stim = np.zeros((1, n_times), dtype=dtype)
+    stim[0, samples] = codes
+    stim[0, np.minimum(samples + 1, n_times - 1)] = codes  # iki örneklik tetik
+
+    ch_names = [f'EEG {i + 1:03d}' for i in range(n_channels)] + ['STI 014']
+    info = mne.create_info(ch_names, sfreq, ['eeg'] * n_channels + ['stim'])
+    return mne.io.RawArray(np.vstack([data, stim]), info, verbose=False)
+
+
+def synthetic_session(test_type='stroop', n_trials=40, session_id='synthetic', n_channels=8,
+                      sfreq=250.0, isi=2.5, start='2024-01-01T09:00:00', seed=0,
+                      p300_amplitude=6e-6):
+    """Aynı oturumun davranışsal denemeleri ve uyaran tetikli EEG kaydı
+
+    Denemeler app.py CSV şemasındadır; zaman damgası tepki anıdır (tepkisiz No-Go'da zaman aşımı).
+    Kayıtta her uyaran başlangıcında session_model.STIMULUS_CODES kodu bulunur, meas_date oturum
+    başlangıcıdır. P300 gecikmesi denemenin tepki süresiyle birlikte uzar (RT-P300 ilişkisi).
+    Dönen değer: (denemeler DataFrame, mne.io.RawArray)
+    """
+    import datetime
+
+    import mne
+
+    from session_model import NOGO_TIMEOUT_MS, stimulus_codes
+
+    rng = np.random.default_rng(seed)
+    generator = stroop_trials if test_type == 'stroop' else gonogo_trials
+    trials = generator(n_trials, trials_per_session=n_trials, seed=seed)
+
+    # Uyaran başlangıçları (kayıt başından itibaren, ms) ve tepki/zaman aşımı anları
+    onset_ms = np.round(2000 + np.arange(n_trials) * isi * 1000 + rng.uniform(0, 300, n_trials))
+    rt = trials['reactionTime'].to_numpy(dtype=float)
+    response_ms = onset_ms + np.where(np.isnan(rt), NOGO_TIMEOUT_MS, rt)
+    start = np.datetime64(start, 'ms')
+    stamps = start + response_ms.astype('int64').astype('timedelta64[ms]')
+    for column, values in _time_columns(stamps).items():
+        trials[column] = values
+    trials['timestamp'] = np.char.add(trials['timestamp'].to_numpy().astype(str), 'Z')
+
+    n_times = int((onset_ms[-1] / 1000 + 3) * sfreq)
+    data = 3e-6 * rng.standard_normal((n_channels, n_times))
+    samples = np.round(onset_ms / 1000 * sfreq).astype(int)
+    codes = stimulus_codes(trials)
+
+    # Deneme başına P300: gecikme tepki süresiyle (tepkisizse ortalama) kayar
+    erp_t = np.arange(int(0.8 * sfreq)) / sfreq
+    rt_filled = np.where(np.isnan(rt), np.nanmean(rt), rt)
+    latency = np.clip(0.30 + 0.4 * (rt_filled - np.mean(rt_filled)) / 1000, 0.22, 0.48)
+    weights = np.linspace(0.4, 1.0, n_channels)[:, None]
+    for s, lat in zip(samples, latency):
+        wave = np.exp(-((erp_t - lat) / 0.05) ** 2) - 0.4 * np.exp(-((erp_t - 0.10) / 0.03) ** 2)
+        data[:, s:s + len(erp_t)] += weights * p300_amplitude * wave
+
+    stim = np.zeros((1, n_times))
+    stim[0, samples] = codes
+    stim[0, samples + 1] = codes
+
+    ch_names = [f'EEG {i + 1:03d}' for i in range(n_channels)] + ['STI 014']
+    info = mne.create_info(ch_names, sfreq, ['eeg'] * n_channels + ['stim'])
+    raw = mne.io.RawArray(np.vstack([data, stim]), info, verbose=False)
+    meas_date = start.astype('datetime64[us]').astype(datetime.datetime).replace(tzinfo=datetime.timezone.utc)
+    raw.set_meas_date(meas_date)
+    return trials, raw
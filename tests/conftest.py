@@ -0,0 +1,6 @@
+"""pytest ayarları: depo kökündeki düz scriptler test modüllerinden içe aktarılabilsin"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,24 @@
+"""analyze_errors: temizleme işaretleri Go/No-Go SDT sayımlarını ve oranlarını değiştirmemeli"""
+
+import numpy as np
+
+from analyze_errors import gonogo_sdt_table
+from synthetic_data import gonogo_trials
+from trial_cleaning import flag_trials
+
+
+def test_keep_only_affects_rt_measures():
+    data = gonogo_trials(5000, seed=2)
+    full = gonogo_sdt_table(data.copy())
+    flag_trials(data, mad_k=2.0)
+    assert not data['keep'].all()
+
+    flagged = gonogo_sdt_table(data)
+    counts = ['n_trials', 'hits', 'misses', 'false_alarms', 'correct_rejections',
+              'hit_rate', 'fa_rate', 'd_prime', 'criterion', 'accuracy']
+    assert np.array_equal(flagged[counts].to_numpy(), full[counts].to_numpy())
+
+    kept = data[data['keep']]
+    is_hit = kept['isGo'] & kept['correct']
+    assert np.isclose(flagged['hit_rt_mean'].iloc[0], kept.loc[is_hit, 'reactionTime'].mean())
+    assert flagged['n_hit_rt'].iloc[0] == is_hit.sum()
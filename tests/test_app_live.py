@@ -0,0 +1,133 @@
+"""Live per-session aggregates and the /api/live endpoints of app.py"""
+
+import json
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, 'live', app_module.LiveAggregates())
+    return app_module.app.test_client()
+
+
+def stroop_trial(session_id, trial, **fields):
+    payload = {'testType': 'stroop', 'sessionId': session_id, 'trial': trial, 'word': 'KIRMIZI',
+               'color': 'red', 'userAnswer': 'red', 'correct': True, 'reactionTime': 500,
+               'congruent': True, 'errorType': 'correct'}
+    payload.update(fields)
+    return payload
+
+
+def first_event(client):
+    response = client.get('/api/live')
+    try:
+        chunk = next(response.response)
+    finally:
+        response.close()
+    chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+    data = [line[5:] for line in chunk.splitlines() if line.startswith('data:')]
+    return json.loads(data[0])
+
+
+def test_running_means_and_counts(client):
+    trials = [(True, 500, True), (False, 650, True), (False, 700, False), (True, 520, True)]
+    for i, (congruent, rt, correct) in enumerate(trials):
+        response = client.post('/api/save-trial', json=stroop_trial(
+            's1', i + 1, congruent=congruent, reactionTime=rt, correct=correct,
+            errorType='correct' if correct else 'word_reading'))
+        assert response.status_code == 200
+
+    session, = client.get('/api/live/snapshot').get_json()['sessions']
+    assert session['trials'] == 4
+    assert session['accuracy'] == 0.75
+    assert session['rt']['congruent'] == {'meanRt': 510.0, 'n': 2}
+    assert session['rt']['incongruent'] == {'meanRt': 650.0, 'n': 1}
+    assert session['stroopEffect'] == 140.0
+    assert session['errors'] == {'correct': 3, 'word_reading': 1}
+
+
+@pytest.mark.parametrize('bad_rt', ['x', 'NaN', 'inf', -5, [1], {'a': 1}, True])
+def test_malformed_reaction_time_does_not_break_live_view(client, bad_rt):
+    assert client.post('/api/save-trial', json=stroop_trial('bad', 1, reactionTime=bad_rt)).status_code == 200
+    assert client.post('/api/save-trial', json=stroop_trial('bad', 2, reactionTime=600)).status_code == 200
+    assert client.post('/api/save-trial', json=stroop_trial('good', 1, reactionTime=400)).status_code == 200
+
+    snapshot = client.get('/api/live/snapshot')
+    assert snapshot.status_code == 200
+    sessions = {s['sessionId']: s for s in snapshot.get_json()['sessions']}
+    # The malformed trial counts towards trials/accuracy but not the RT mean
+    assert sessions['bad']['trials'] == 2
+    assert sessions['bad']['rt']['congruent'] == {'meanRt': 600.0, 'n': 1}
+    assert sessions['good']['rt']['congruent'] == {'meanRt': 400.0, 'n': 1}
+
+    # The SSE payload is strict JSON (no NaN/Infinity) for every session
+    event = first_event(client)
+    assert {s['sessionId'] for s in event['sessions']} == {'bad', 'good'}
+
+
+def test_csv_and_aggregate_stay_in_step(client, tmp_path):
+    client.post('/api/save-trial', json=stroop_trial('s2', 1, reactionTime='x'))
+    client.post('/api/save-trial', json=stroop_trial('s2', 2))
+    with open(tmp_path / 'stroop_s2.csv', encoding='utf-8') as f:
+        n_rows = sum(1 for _ in f) - 1
+    session, = client.get('/api/live/snapshot').get_json()['sessions']
+    assert session['trials'] == n_rows == 2
+
+
+def test_save_session_replaces_aggregate(client):
+    client.post('/api/save-trial', json=stroop_trial('s3', 1))
+    trials = [stroop_trial('s3', i + 1, reactionTime=rt) for i, rt in enumerate([300, 'NaN', 500])]
+    response = client.post('/api/save-session', json={'testType': 'stroop', 'sessionId': 's3', 'trials': trials})
+    assert response.status_code == 200
+    session, = client.get('/api/live/snapshot').get_json()['sessions']
+    assert session['trials'] == 3
+    assert session['rt']['congruent'] == {'meanRt': 400.0, 'n': 2}
+
+
+def test_idle_sessions_are_resent(client, monkeypatch):
+    client.post('/api/save-trial', json=stroop_trial('s4', 1))
+    live = app_module.live
+    version, sessions = live.snapshot(shown_active=set())
+    assert sessions[0]['active']
+    shown = {('stroop', 's4')}
+    assert live.snapshot(since=version, shown_active=shown)[1] == []
+
+    monkeypatch.setattr(app_module, 'LIVE_ACTIVE_SECONDS', 0)
+    _, sessions = live.snapshot(since=version, shown_active=shown)
+    assert [s['active'] for s in sessions] == [False]
+
+
+def test_snapshot_returns_only_changed_sessions_in_update_order(client):
+    for session_id in ('a', 'b', 'c'):
+        client.post('/api/save-trial', json=stroop_trial(session_id, 1))
+    live = app_module.live
+    version, sessions = live.snapshot()
+    assert [s['sessionId'] for s in sessions] == ['a', 'b', 'c']
+
+    client.post('/api/save-trial', json=stroop_trial('a', 2))
+    client.post('/api/save-trial', json=stroop_trial('b', 2))
+    latest, sessions = live.snapshot(since=version)
+    assert latest == version + 2
+    assert [(s['sessionId'], s['trials']) for s in sessions] == [('a', 2), ('b', 2)]
+    assert live.snapshot(since=latest) == (latest, [])
+
+
+def test_idle_sessions_expire_after_ttl(client, monkeypatch):
+    client.post('/api/save-trial', json=stroop_trial('old', 1))
+    client.post('/api/save-trial', json=stroop_trial('new', 1))
+    live = app_module.live
+    live._sessions[('stroop', 'old')]['lastUpdate'] -= 3600
+
+    monkeypatch.setattr(app_module, 'LIVE_SESSION_TTL_SECONDS', 1800)
+    _, sessions = live.snapshot(shown_active={('stroop', 'old'), ('stroop', 'new')})
+    assert [s['sessionId'] for s in sessions] == ['new']
+    assert list(live._sessions) == [('stroop', 'new')]
+
+    # A new trial brings an evicted session back as a fresh aggregate
+    client.post('/api/save-trial', json=stroop_trial('old', 2))
+    session = next(s for s in live.snapshot()[1] if s['sessionId'] == 'old')
+    assert session['trials'] == 1
@@ -0,0 +1,62 @@
+"""band_stream: blok boyutundan bağımsızlık ve bad_* açıklamalı aralıkların dışlanması"""
+
+import mne
+import numpy as np
+import pytest
+
+from band_stream import BandPowerStream, band_power_timeseries
+from synthetic_data import synthetic_raw
+
+SFREQ = 250.0
+CH_NAMES = ['EEG Fz', 'EEG Cz', 'EEG Pz', 'EEG C3']
+
+
+def signal(seconds=40, bad=None):
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((len(CH_NAMES), int(seconds * SFREQ)))
+    x[0] += 3 * np.sin(2 * np.pi * 6 * np.arange(x.shape[1]) / SFREQ)
+    if bad is not None:
+        x[:, int(bad[0] * SFREQ):int(bad[1] * SFREQ)] = np.nan
+    return x
+
+
+def push_blocks(x, block_seconds, **kwargs):
+    stream = BandPowerStream(SFREQ, CH_NAMES, **kwargs)
+    n = int(block_seconds * SFREQ)
+    parts = [stream.push(x[:, i:i + n]) for i in range(0, x.shape[1], n)]
+    return np.concatenate([p.times for p in parts]), np.concatenate([p.values for p in parts])
+
+
+@pytest.mark.parametrize('step', [1.0, 2.0, 3.0, 5.0])
+@pytest.mark.parametrize('block_seconds', [0.5, 1.3, 7.0])
+@pytest.mark.parametrize('bad', [None, (10.2, 11.0)])
+def test_chunked_push_matches_single_push(step, block_seconds, bad):
+    x = signal(bad=bad)
+    expected = BandPowerStream(SFREQ, CH_NAMES, window=2.0, step=step).push(x)
+    times, values = push_blocks(x, block_seconds, window=2.0, step=step)
+    np.testing.assert_array_equal(times, expected.times)
+    np.testing.assert_allclose(values, expected.values, rtol=1e-5)
+
+
+def test_nan_samples_only_blank_touching_windows():
+    clean = BandPowerStream(SFREQ, CH_NAMES, window=2.0, step=1.0).push(signal())
+    dirty = BandPowerStream(SFREQ, CH_NAMES, window=2.0, step=1.0).push(signal(bad=(10.2, 11.0)))
+    blank = np.isnan(dirty.values).all(axis=(1, 2))
+    # Pencere [t - 1, t + 1) kötü aralığa değiyorsa boş, diğerleri temiz sonuçla aynı
+    touches = (dirty.times - 1.0 < 11.0) & (dirty.times + 1.0 > 10.2)
+    np.testing.assert_array_equal(blank, touches)
+    np.testing.assert_allclose(dirty.values[~blank], clean.values[~blank], rtol=1e-6)
+
+
+def test_bad_annotations_are_rejected():
+    mne.set_log_level('WARNING')
+    raw = synthetic_raw(n_channels=4, duration=30, seed=1)
+    raw.set_annotations(mne.Annotations([12.0], [1.5], ['bad_movement']))
+    series = band_power_timeseries(raw, chunk_seconds=7.0, window=2.0, step=1.0)
+    blank = np.isnan(series.values).all(axis=(1, 2))
+    assert blank.any() and not blank.all()
+    assert np.all(np.abs(series.times[blank] - 12.75) < 2.0)
+
+    kept = band_power_timeseries(raw, chunk_seconds=7.0, window=2.0, step=1.0,
+                                 reject_by_annotation=False)
+    assert not np.isnan(kept.values).any()
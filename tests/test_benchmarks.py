@@ -0,0 +1,26 @@
+"""benchmarks: veri kurulumu hatası yalnızca ilgili ızgara noktasını hatalı işaretler"""
+
+import json
+
+import benchmarks
+
+
+def test_setup_failure_is_recorded_per_benchmark(tmp_path, monkeypatch):
+    def make_data(n_trials):
+        if n_trials > 100:
+            raise MemoryError('çok büyük')
+        return {'n': n_trials}
+
+    def bench_sum(data):
+        return lambda: sum(range(data['n']))
+
+    monkeypatch.setattr(benchmarks, 'GROUPS', {'trials': (make_data, {'sum': bench_sum})})
+    output = tmp_path / 'bench.json'
+    report = benchmarks.run_benchmarks({'trials': [10, 1000, 20]}, repeat=1, output=str(output))
+
+    with open(output, encoding='utf-8') as f:
+        assert json.load(f)['results'] == report['results']
+    by_size = {e['params']['n_trials']: e for e in report['results']}
+    assert set(by_size) == {10, 1000, 20}
+    assert by_size[1000]['error'] == 'MemoryError: çok büyük'
+    assert 'error' not in by_size[10] and 'error' not in by_size[20]
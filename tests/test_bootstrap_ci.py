@@ -0,0 +1,31 @@
+"""bootstrap_ci: aynı tohumla sonuçlar süreç sayısından bağımsız olmalı"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap_ci import bootstrap_stroop
+from synthetic_data import stroop_trials
+
+
+@pytest.fixture(scope='module')
+def trials():
+    data = stroop_trials(3000, seed=1)
+    return data.assign(session=np.arange(len(data)) // 300)
+
+
+@pytest.mark.parametrize('pooled', ['trials', 'sessions'])
+def test_results_do_not_depend_on_n_jobs(trials, pooled):
+    kwargs = dict(n_boot=400, seed=7, pooled=pooled, block_size=50)
+    serial = bootstrap_stroop(trials, n_jobs=1, **kwargs)
+    parallel = bootstrap_stroop(trials, n_jobs=3, **kwargs)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_same_seed_same_result_different_seed_differs(trials):
+    a = bootstrap_stroop(trials, n_boot=200, seed=3)
+    b = bootstrap_stroop(trials, n_boot=200, seed=3)
+    c = bootstrap_stroop(trials, n_boot=200, seed=4)
+    pd.testing.assert_frame_equal(a, b)
+    assert not np.allclose(a['ci_low'], c['ci_low'], equal_nan=True)
+    assert (a['ci_low'] <= a['estimate']).all() and (a['estimate'] <= a['ci_high']).all()
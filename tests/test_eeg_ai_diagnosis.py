@@ -0,0 +1,61 @@
+"""eeg_ai_diagnosis: artımlı eğitimde ölçekleyici güncellemesinden sonra eski ağaçların kararları"""
+
+import copy
+
+import numpy as np
+import pytest
+
+from eeg_ai_diagnosis import EEGDiagnosticAI, FEATURE_NAMES, rescale_forest
+
+
+def batch(rng, n, shift):
+    """Her grupta ortalaması ve yayılımı kayan özellikler (ölçekleyici her grupta değişir)"""
+    X = rng.normal(shift, 1 + shift, (n, len(FEATURE_NAMES))) * np.linspace(1, 50, len(FEATURE_NAMES))
+    y = (X[:, 0] + rng.normal(0, 5, n) > shift).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_old_trees_keep_decisions_after_scaler_update(dtype):
+    rng = np.random.default_rng(0)
+    ai = EEGDiagnosticAI(dtype=dtype)
+    ai.partial_train(*batch(rng, 300, 0.0), trees_per_batch=5)
+    old_trees = [copy.deepcopy(tree) for tree in ai.model.estimators_]
+    old_scaler = copy.deepcopy(ai.scaler)
+
+    ai.partial_train(*batch(rng, 300, 2.0), trees_per_batch=5)
+    assert len(ai.model.estimators_) == 10
+    assert not np.allclose(ai.scaler.mean_, old_scaler.mean_)
+
+    X_test = batch(rng, 2000, 1.0)[0].astype(dtype)
+    for old, new in zip(old_trees, ai.model.estimators_[:5]):
+        np.testing.assert_array_equal(new.apply(ai.scaler.transform(X_test)),
+                                      old.apply(old_scaler.transform(X_test)))
+
+
+def test_rescale_forest_round_trip():
+    rng = np.random.default_rng(1)
+    ai = EEGDiagnosticAI()
+    ai.partial_train(*batch(rng, 200, 0.0), trees_per_batch=3)
+    before = [tree.tree_.threshold.copy() for tree in ai.model.estimators_]
+    mean, scale = ai.scaler.mean_.copy(), ai.scaler.scale_.copy()
+    rescale_forest(ai.model, mean, scale, mean + 3.0, scale * 2.0)
+    rescale_forest(ai.model, mean + 3.0, scale * 2.0, mean, scale)
+    for tree, threshold in zip(ai.model.estimators_, before):
+        np.testing.assert_allclose(tree.tree_.threshold, threshold, rtol=1e-12, atol=1e-12)
+
+
+def test_single_class_batches_wait_and_max_trees_caps_forest():
+    rng = np.random.default_rng(2)
+    ai = EEGDiagnosticAI()
+    X, y = batch(rng, 100, 0.0)
+    result = ai.partial_train(X[y == 1], y[y == 1], trees_per_batch=4)
+    assert result['n_rows'] == 0 and result['n_pending'] == (y == 1).sum()
+    assert not ai.is_trained
+
+    result = ai.partial_train(X[y == 0], y[y == 0], trees_per_batch=4)
+    assert result['n_rows'] == len(X) and result['n_trees'] == 4
+    for shift in (0.5, 1.0, 1.5):
+        result = ai.partial_train(*batch(rng, 100, shift), trees_per_batch=4, max_trees=10)
+    assert result['n_trees'] == 10 and len(ai.model.estimators_) == 10
+    assert result['n_seen'] == 400
@@ -0,0 +1,47 @@
+"""eeg_epoching_erp: verilen olay listesinin kullanılması ve olay indeksi önbelleği"""
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import mne
+import numpy as np
+
+from eeg_epoching_erp import compute_erp_vectorized
+from event_index import get_event_index
+from synthetic_data import synthetic_raw
+
+
+def test_compute_erp_uses_given_events():
+    mne.set_log_level('WARNING')
+    raw = synthetic_raw(n_channels=4, duration=40, seed=2)
+    events = get_event_index(raw).events
+    subset = np.concatenate([events[events[:, 2] == 1][:5], events[events[:, 2] == 2][:3]])
+
+    evoked_standard, evoked_oddball = compute_erp_vectorized(raw, subset)
+    assert (evoked_standard.nave, evoked_oddball.nave) == (5, 3)
+
+    # Olay dizisi kaydırılırsa ERP de kaymış olaylardan hesaplanır
+    shifted = subset.copy()
+    shifted[:, 0] += 25
+    moved, _ = compute_erp_vectorized(raw, shifted)
+    assert not np.allclose(moved.data, evoked_standard.data)
+
+
+def test_event_index_cache_follows_in_place_crop():
+    mne.set_log_level('WARNING')
+    raw = synthetic_raw(n_channels=4, duration=40, seed=2)
+    before = get_event_index(raw)
+    assert get_event_index(raw) is before
+
+    raw.crop(tmin=10.0)
+    after = get_event_index(raw)
+    assert after is not before
+    np.testing.assert_array_equal(after.events, mne.find_events(raw, 'STI 014', min_duration=0.002,
+                                                                verbose=False))
+
+
+def test_significance_helper_is_not_collected_as_a_test():
+    import eeg_epoching_erp
+
+    assert not any(name.startswith('test_') for name in dir(eeg_epoching_erp))
@@ -0,0 +1,136 @@
+"""eeg_pipeline: önbellek isabeti, kısmi geçersizleşme, LRU tahliyesi ve yeniden başlatma"""
+
+import os
+
+import pytest
+
+import eeg_pipeline
+from eeg_pipeline import Pipeline, Step
+
+CALLS = []
+
+
+def read(fname):
+    CALLS.append('read')
+    with open(fname, encoding='utf-8') as f:
+        return f.read()
+
+
+def scale(text, factor=1):
+    CALLS.append('scale')
+    return text * factor
+
+
+def count(text, char='a'):
+    CALLS.append('count')
+    return text.count(char)
+
+
+def combine(scaled, counted, sep='|'):
+    CALLS.append('combine')
+    return f'{scaled}{sep}{counted}'
+
+
+def pipeline(cache_dir, max_bytes=None, factor=2, sep='|'):
+    return Pipeline([
+        Step('read', read),
+        Step('scale', scale, factor=factor),
+        Step('count', count, inputs=('read',), char='a'),
+        Step('combine', combine, inputs=('scale', 'count'), sep=sep),
+    ], cache_dir=str(cache_dir), max_bytes=max_bytes)
+
+
+@pytest.fixture
+def source(tmp_path):
+    CALLS.clear()
+    path = tmp_path / 'input.txt'
+    path.write_text('banana', encoding='utf-8')
+    return str(path)
+
+
+def statuses(p):
+    return {r['step']: r['status'] for r in p.records}
+
+
+def test_second_run_is_served_from_cache(source, tmp_path):
+    p = pipeline(tmp_path / 'cache')
+    assert p.run(source) == {'combine': 'bananabanana|3', 'scale': 'bananabanana', 'count': 3,
+                             'read': 'banana'}
+    assert CALLS == ['read', 'scale', 'count', 'combine']
+
+    CALLS.clear()
+    # Son adım önbellekteyse bağımlılıkları hiç yüklenmez
+    assert p.run(source) == {'combine': 'bananabanana|3'}
+    assert CALLS == [] and statuses(p) == {'combine': 'hit'}
+    assert p.records[0]['bytes'] > 0
+
+
+def test_parameter_change_invalidates_only_downstream_steps(source, tmp_path):
+    p = pipeline(tmp_path / 'cache')
+    p.run(source)
+
+    CALLS.clear()
+    p.set_params('combine', sep='/')
+    assert p.run(source)['combine'] == 'bananabanana/3'
+    assert CALLS == ['combine']
+    assert statuses(p) == {'scale': 'hit', 'count': 'hit', 'combine': 'miss'}
+
+    CALLS.clear()
+    p.set_params('scale', factor=3)
+    p.run(source)
+    # 'count' 'scale'e bağlı değildir: önbellekten gelir, 'read' hiç yüklenmez
+    assert CALLS == ['scale', 'combine']
+    assert statuses(p) == {'read': 'hit', 'scale': 'miss', 'count': 'hit', 'combine': 'miss'}
+
+
+def test_source_change_invalidates_everything(source, tmp_path):
+    p = pipeline(tmp_path / 'cache')
+    p.run(source)
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write('papaya!')
+    CALLS.clear()
+    assert p.run(source)['combine'] == 'papaya!papaya!|3'
+    assert CALLS == ['read', 'scale', 'count', 'combine']
+
+
+def test_new_instance_resumes_from_disk_and_recovers_corrupt_entries(source, tmp_path):
+    pipeline(tmp_path / 'cache').run(source)
+    fresh = pipeline(tmp_path / 'cache')
+    keys = fresh.keys(source)
+    with open(os.path.join(str(tmp_path / 'cache'), f"{keys['combine']}.pkl"), 'wb') as f:
+        f.write(b'\x80truncated')
+
+    CALLS.clear()
+    assert fresh.run(source)['combine'] == 'bananabanana|3'
+    assert CALLS == ['combine']
+    assert statuses(fresh) == {'scale': 'hit', 'count': 'hit', 'combine': 'miss'}
+
+
+def test_lru_eviction_keeps_current_run(source, tmp_path):
+    cache = tmp_path / 'cache'
+    old = pipeline(cache, factor=5)
+    old.run(source)
+    old_keys = set(old.keys(source).values())
+
+    new = pipeline(cache, max_bytes=1, factor=7)
+    new.run(source)
+    remaining = {name[:-4] for name in os.listdir(cache) if name.endswith('.pkl')}
+    # Sınır aşıldı: bu çalıştırmanın çıktıları korunur, yalnızca önceki parametrelerinkiler silinir
+    assert set(new.keys(source).values()) <= remaining
+    assert not (old_keys - set(new.keys(source).values())) & remaining
+
+
+def test_hit_survives_concurrent_eviction(source, tmp_path, monkeypatch):
+    p = pipeline(tmp_path / 'cache')
+    p.run(source)
+
+    def evicted(path, *args, **kwargs):
+        # Başka bir işçinin evict'i dosyayı okuma ile erişim zamanı güncellemesi arasında sildi
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(eeg_pipeline.os, 'utime', evicted)
+    CALLS.clear()
+    assert p.run(source) == {'combine': 'bananabanana|3'}
+    assert CALLS == [] and statuses(p) == {'combine': 'hit'}
+    assert p.records[0]['bytes'] > 0
@@ -0,0 +1,28 @@
+"""erp_batch: dosya yolundan kararlı denek kimlikleri ve başarısız denekte çıkış kodu"""
+
+import os
+
+import mne
+
+from erp_batch import main, subject_name
+from synthetic_data import synthetic_raw
+
+
+def test_subject_id_depends_only_on_own_path(tmp_path):
+    a, b = tmp_path / 'a' / 'sub01_raw.fif', tmp_path / 'b' / 'sub01_raw.fif'
+    assert subject_name(str(a)) != subject_name(str(b))
+    assert subject_name(str(a)).startswith('sub01_raw-')
+    # Aynı adlı bir dosyanın sonradan eklenmesi mevcut kimliği değiştirmez
+    assert subject_name(str(a)) == subject_name(os.path.join(str(tmp_path), 'a', '.', 'sub01_raw.fif'))
+
+
+def test_exit_code_reports_failed_subjects(tmp_path):
+    mne.set_log_level('WARNING')
+    good = tmp_path / 'sub01_raw.fif'
+    synthetic_raw(n_channels=4, duration=30, seed=0).save(good, verbose=False)
+    out = tmp_path / 'out'
+    assert main([str(good), '--output', str(out), '--jobs', '1']) == 0
+
+    broken = tmp_path / 'sub02_raw.fif'
+    broken.write_bytes(b'not a fif file')
+    assert main([str(good), str(broken), '--output', str(out), '--jobs', '1']) == 1
@@ -0,0 +1,89 @@
+"""erp_engine: mne.Epochs ortalaması ve standart hatasıyla denklik, akış tahmini"""
+
+import mne
+import numpy as np
+import pytest
+
+from erp_engine import ODDBALL_EVENTS, StreamingP300, compute_erp_fast, extract_epochs_array
+from event_index import get_event_index
+from synthetic_data import synthetic_raw
+
+
+def recording(projs=True, bad=True):
+    mne.set_log_level('WARNING')
+    raw = synthetic_raw(n_channels=6, duration=40, seed=4)
+    if projs:
+        raw.set_eeg_reference('average', projection=True)
+    if bad:
+        raw.set_annotations(mne.Annotations([10.0, 21.3], [1.2, 0.0], ['bad_blink', 'BAD_jump']))
+    return raw
+
+
+def mne_epochs(raw, events, baseline):
+    return mne.Epochs(raw, events, ODDBALL_EVENTS, tmin=-0.2, tmax=0.8, baseline=baseline, picks='data',
+                      proj=True, reject_by_annotation=True, preload=True, verbose=False)
+
+
+@pytest.mark.parametrize('baseline', [(None, 0), (-0.1, 0.05), None])
+@pytest.mark.parametrize('projs', [True, False])
+@pytest.mark.parametrize('bad', [True, False])
+def test_matches_mne_average_and_sem(baseline, projs, bad):
+    raw = recording(projs=projs, bad=bad)
+    events = get_event_index(raw).events
+    evokeds, accumulator, times = compute_erp_fast(raw, events, ODDBALL_EVENTS, baseline=baseline,
+                                                   chunk_size=7)
+    epochs = mne_epochs(raw, events, baseline)
+    np.testing.assert_allclose(times, epochs.times)
+    if bad:
+        assert len(epochs) < len(events)
+
+    for condition in ODDBALL_EVENTS:
+        expected = epochs[condition]
+        evoked = evokeds[condition]
+        assert evoked.nave == len(expected)
+        assert evoked.ch_names == expected.ch_names
+        np.testing.assert_allclose(evoked.data, expected.average().data, rtol=1e-7, atol=1e-18)
+        np.testing.assert_allclose(accumulator.sem(condition), expected.standard_error().data,
+                                   rtol=1e-5, atol=1e-15)
+
+
+def test_epoch_arrays_match_mne_epochs():
+    raw = recording()
+    events = get_event_index(raw).events
+    arrays, info, _ = extract_epochs_array(raw, events, ODDBALL_EVENTS, dtype=np.float64)
+    epochs = mne_epochs(raw, events, (None, 0))
+    assert info['ch_names'] == epochs.ch_names
+    for condition in ODDBALL_EVENTS:
+        np.testing.assert_allclose(arrays[condition], epochs[condition].get_data(), rtol=1e-7, atol=1e-18)
+
+
+def test_streaming_snapshot_matches_batch_erp():
+    raw = recording(projs=False, bad=False)
+    events = get_event_index(raw).events
+    evokeds, accumulator, times = compute_erp_fast(raw, events, ODDBALL_EVENTS)
+
+    data = raw.get_data(picks='eeg')
+    start = int(round(times[0] * raw.info['sfreq']))
+    stream = StreamingP300(times, len(data), history_size=8)
+    conditions = {code: cond for cond, code in ODDBALL_EVENTS.items()}
+    for sample, _, code in events:
+        stream.update_from_signal(data, sample - raw.first_samp, start, conditions[code])
+
+    snapshot = stream.snapshot()
+    assert snapshot['counts'] == accumulator.counts
+    for condition, evoked in evokeds.items():
+        np.testing.assert_allclose(snapshot['means'][condition], evoked.data, rtol=1e-10, atol=1e-20)
+        np.testing.assert_allclose(snapshot['sems'][condition], accumulator.sem(condition))
+    np.testing.assert_allclose(snapshot['difference'],
+                               evokeds['Oddball Ses'].data - evokeds['Standart Ses'].data, atol=1e-20)
+    assert len(stream.history) == 8
+
+
+@pytest.mark.parametrize('sample', [10, 40 * 250 - 100])
+def test_streaming_rejects_windows_outside_buffer(sample):
+    data = np.zeros((3, 40 * 250))
+    times = np.arange(-50, 201) / 250
+    stream = StreamingP300(times, 3)
+    with pytest.raises(ValueError):
+        stream.update_from_signal(data, sample, -50, 'Standart Ses')
+    assert stream.accumulator.counts == {}
@@ -0,0 +1,36 @@
+"""erp_peaks: pencere bazlı metriklerin naif tek-seri hesapla karşılaştırılması"""
+
+import numpy as np
+import pytest
+
+from erp_peaks import peak_arrays
+
+TIMES = np.arange(-50, 201) / 250
+WINDOWS = {'P300': (0.25, 0.40), 'N1': (0.08, 0.12, 'negative'), 'all': (-1.0, 2.0)}
+
+
+def naive(series, window, fraction=0.5):
+    tmin, tmax = window[:2]
+    sign = -1.0 if len(window) > 2 and window[2] == 'negative' else 1.0
+    idx = np.flatnonzero((TIMES >= tmin) & (TIMES <= tmax))
+    segment = series[idx]
+    peak = idx[np.argmax(sign * segment)]
+    area = np.cumsum(np.clip(sign * segment, 0, None))
+    frac = TIMES[idx[np.flatnonzero(area >= fraction * area[-1])[0]]] if area[-1] > 0 else np.nan
+    return TIMES[peak], series[peak], segment.mean(), frac
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_matches_naive_per_series(dtype):
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((3, 2, 4, len(TIMES))).astype(dtype)
+    data[0, 0, 0] = 0  # alanı sıfır olan seri: kesirli gecikme NaN
+    metrics = peak_arrays(data, TIMES, WINDOWS)
+
+    for pos in np.ndindex(data.shape[:-1]):
+        for w, name in enumerate(metrics['windows']):
+            latency, amplitude, mean, frac = naive(data[pos].astype(np.float64), WINDOWS[name])
+            assert metrics['peak_latency'][pos + (w,)] == latency
+            assert metrics['peak_amplitude'][pos + (w,)] == pytest.approx(amplitude)
+            assert metrics['mean_amplitude'][pos + (w,)] == pytest.approx(mean, rel=1e-5, abs=1e-6)
+            np.testing.assert_equal(metrics['frac_area_latency'][pos + (w,)], frac)
@@ -0,0 +1,76 @@
+"""erp_permutation: scipy/MNE ile denklik, tohum ve işçi sayısından bağımsızlık"""
+
+import mne
+import numpy as np
+from scipy import sparse, stats
+
+from erp_permutation import channel_adjacency, permutation_cluster_test
+
+N_CHANNELS, N_TIMES = 8, 40
+
+
+def chain_adjacency(n=N_CHANNELS):
+    """Kanalların zincir biçiminde komşu olduğu basit düzen"""
+    return sparse.diags([np.ones(n - 1), np.ones(n - 1)], [-1, 1], format='csr').astype(bool)
+
+
+def two_conditions(effect=1.5, seed=0):
+    rng = np.random.default_rng(seed)
+    X_a = rng.standard_normal((30, N_CHANNELS, N_TIMES))
+    X_b = rng.standard_normal((25, N_CHANNELS, N_TIMES))
+    X_a[:, 2:5, 15:25] += effect  # komşu kanallarda ve ardışık anlarda tek bir etki
+    return X_a, X_b
+
+
+def test_observed_t_map_matches_scipy():
+    X_a, X_b = two_conditions()
+    result = permutation_cluster_test(X_a, X_b, chain_adjacency(), n_permutations=10)
+    expected = stats.ttest_ind(X_a, X_b, axis=0).statistic
+    np.testing.assert_allclose(result['t_obs'], expected, rtol=1e-8)
+
+
+def test_observed_clusters_match_mne():
+    X_a, X_b = two_conditions(effect=0.8, seed=1)
+    result = permutation_cluster_test(X_a, X_b, chain_adjacency(), n_permutations=10)
+    t_obs, clusters, _, _ = mne.stats.permutation_cluster_test(
+        [X_a.transpose(0, 2, 1), X_b.transpose(0, 2, 1)], threshold=result['threshold'],
+        stat_fun=mne.stats.ttest_ind_no_p, adjacency=chain_adjacency(), n_permutations=10,
+        tail=0, out_type='mask', verbose=False)
+
+    np.testing.assert_allclose(result['t_obs'], t_obs.T, rtol=1e-8)
+    expected = sorted(round(float(t_obs[mask].sum()), 6) for mask in clusters)
+    assert sorted(np.round(result['cluster_stats'], 6)) == expected
+    assert sorted(int(m.sum()) for m in result['clusters']) == sorted(int(m.sum()) for m in clusters)
+
+
+def test_effect_is_significant_and_null_is_not():
+    X_a, X_b = two_conditions()
+    result = permutation_cluster_test(X_a, X_b, chain_adjacency(), n_permutations=200)
+    best = np.argmax(np.abs(result['cluster_stats']))
+    assert result['cluster_p_values'][best] < 0.01
+    assert result['clusters'][best][2:5, 15:25].all()
+
+    null = permutation_cluster_test(*two_conditions(effect=0.0, seed=3), chain_adjacency(), n_permutations=200)
+    assert np.all(null['cluster_p_values'] > 0.05)
+
+
+def test_seed_reproducible_and_independent_of_workers():
+    X_a, X_b = two_conditions(effect=0.5)
+    kwargs = dict(n_permutations=100, block_size=16, seed=7)
+    serial = permutation_cluster_test(X_a, X_b, chain_adjacency(), n_jobs=1, **kwargs)
+    again = permutation_cluster_test(X_a, X_b, chain_adjacency(), n_jobs=1, **kwargs)
+    parallel = permutation_cluster_test(X_a, X_b, chain_adjacency(), n_jobs=2, **kwargs)
+    np.testing.assert_array_equal(serial['h0'], again['h0'])
+    np.testing.assert_array_equal(serial['h0'], parallel['h0'])
+    np.testing.assert_array_equal(serial['cluster_p_values'], parallel['cluster_p_values'])
+
+    other = permutation_cluster_test(X_a, X_b, chain_adjacency(), n_jobs=1, **{**kwargs, 'seed': 8})
+    assert not np.array_equal(serial['h0'], other['h0'])
+
+
+def test_channel_adjacency_is_cached():
+    info = mne.create_info(['Fz', 'Cz', 'Pz', 'Oz', 'C3', 'C4'], 250.0, 'eeg')
+    info.set_montage('standard_1020')
+    first = channel_adjacency(info)
+    assert channel_adjacency(info) is first
+    assert first.shape == (6, 6)
@@ -0,0 +1,98 @@
+"""feature_store: yeniden açılış, yarım yazımlardan kurtarma ve parça parça okuma"""
+
+import os
+
+import numpy as np
+import pytest
+
+from feature_store import FeatureStore
+
+COLUMNS = ['power_theta', 'power_alpha', 'power_beta']
+
+
+def filled(root, sizes=(5, 3, 7), seed=0):
+    rng = np.random.default_rng(seed)
+    store = FeatureStore(str(root), COLUMNS)
+    blocks = []
+    for i, n in enumerate(sizes):
+        X = rng.standard_normal((n, len(COLUMNS))).astype(np.float32)
+        store.append(f'fp{i}', X, params={'epoch': 2.0}, label=i % 2, subject=f'sub{i}')
+        blocks.append(X)
+    return store, np.concatenate(blocks)
+
+
+def test_reopen_reads_same_rows(tmp_path):
+    store, expected = filled(tmp_path)
+    reopened = FeatureStore(str(tmp_path), COLUMNS)
+    assert len(reopened) == len(expected) == 15
+    np.testing.assert_array_equal(reopened.read(), expected)
+    np.testing.assert_array_equal(reopened.read(['power_beta'], rows=slice(5, 8)), expected[5:8, 2:])
+    assert reopened.lookup('fp1', {'epoch': 2.0})['row_start'] == 5
+    assert reopened.lookup('fp1', {'epoch': 4.0}) is None
+    # Aynı anahtar ikinci kez eklenmez
+    assert reopened.append('fp1', expected[:2], params={'epoch': 2.0})['n_rows'] == 3
+    assert len(reopened) == 15
+
+
+def test_torn_column_write_is_rolled_back(tmp_path):
+    store, expected = filled(tmp_path)
+    # Sütun dosyalarına yazıldı, kayıt tablosu satırı yazılmadan süreç öldü
+    for i in range(2):
+        with open(store._column_path(i), 'ab') as f:
+            f.write(np.ones(4, dtype=np.float32).tobytes())
+
+    recovered = FeatureStore(str(tmp_path), COLUMNS)
+    assert len(recovered) == 15
+    for i in range(len(COLUMNS)):
+        assert os.path.getsize(recovered._column_path(i)) == 15 * 4
+    np.testing.assert_array_equal(recovered.read(), expected)
+
+    X = np.full((2, len(COLUMNS)), 9.0, dtype=np.float32)
+    recovered.append('fp_new', X)
+    np.testing.assert_array_equal(FeatureStore(str(tmp_path), COLUMNS).read()[15:], X)
+
+
+def test_torn_recordings_line_is_dropped(tmp_path):
+    store, expected = filled(tmp_path)
+    with open(store._recordings_path(), 'a', encoding='utf-8') as f:
+        f.write('{"fingerprint": "fp_torn", "row_st')
+
+    recovered = FeatureStore(str(tmp_path), COLUMNS)
+    assert [r['fingerprint'] for r in recovered.recordings] == ['fp0', 'fp1', 'fp2']
+    with open(recovered._recordings_path(), 'rb') as f:
+        assert f.read().endswith(b'\n')
+    np.testing.assert_array_equal(recovered.read(), expected)
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 4, 15, 100])
+def test_iter_chunks_covers_rows_with_meta(tmp_path, chunk_rows):
+    store, expected = filled(tmp_path)
+    chunks = list(store.iter_chunks(columns=['power_alpha', 'power_theta'], chunk_rows=chunk_rows))
+    assert all(len(X) <= chunk_rows for X, _ in chunks)
+    X = np.concatenate([X for X, _ in chunks])
+    np.testing.assert_array_equal(X, expected[:, [1, 0]])
+
+    meta = {k: np.concatenate([m[k] for _, m in chunks]) for k in ('recording', 'label', 'subject')}
+    np.testing.assert_array_equal(meta['recording'], np.repeat([0, 1, 2], [5, 3, 7]))
+    np.testing.assert_array_equal(meta['label'], np.repeat([0, 1, 0], [5, 3, 7]))
+    assert list(meta['subject'][[0, 5, 8]]) == ['sub0', 'sub1', 'sub2']
+
+
+def test_iter_chunks_on_selected_rows(tmp_path):
+    store, expected = filled(tmp_path)
+    rows = store.select_rows([2, 0])
+    chunks = list(store.iter_chunks(rows=np.sort(rows), chunk_rows=4))
+    np.testing.assert_array_equal(np.concatenate([X for X, _ in chunks]), expected[np.sort(rows)])
+    assert set(np.concatenate([m['recording'] for _, m in chunks])) == {0, 2}
+
+
+def test_mismatched_columns_rejected(tmp_path):
+    filled(tmp_path)
+    store = FeatureStore(str(tmp_path), COLUMNS)
+    with pytest.raises(ValueError):
+        store.append('fp_bad', np.zeros((2, 2)))
+    meta_dir = os.path.dirname(store._column_path(0))
+    with open(os.path.join(meta_dir, 'meta.json'), encoding='utf-8') as f:
+        assert 'float32' in f.read()
+    with pytest.raises(ValueError):
+        FeatureStore(str(tmp_path), COLUMNS, dtype=np.float64)
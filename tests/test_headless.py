@@ -0,0 +1,48 @@
+"""headless: paralel analizlerde bağlamın işçilere serileştirilmeden aktarılması"""
+
+import json
+import multiprocessing
+import sys
+
+import pytest
+
+import headless
+
+
+class Unpicklable:
+    """Serileştirilmeye çalışılırsa hata veren bağlam öğesi (büyük ön yüklenmiş kayıt yerine)"""
+
+    def __reduce__(self):
+        raise TypeError('bağlam işçiye serileştirildi')
+
+
+def _size(context):
+    return {'n': context['n'], 'has_blob': isinstance(context['blob'], Unpicklable)}
+
+
+def _fail(context):
+    raise RuntimeError('beklenen hata')
+
+
+HEADLESS_ANALYSES = {'size': _size, 'size_again': _size, 'fail': _fail}
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='bağlam yalnızca fork ile devralınır')
+def test_parallel_workers_inherit_context_without_pickling(tmp_path):
+    # Varsayılan başlatma yöntemi spawn olsa da (macOS/Windows, Python 3.14+ Linux'ta forkserver)
+    # bağlam işçilere gönderilmemeli
+    default = multiprocessing.get_start_method()
+    multiprocessing.set_start_method('spawn', force=True)
+    try:
+        context = {'n': 3, 'blob': Unpicklable()}
+        manifest = headless.run_analyses(__name__, ['size', 'size_again', 'fail'], context, str(tmp_path),
+                                         n_jobs=3)
+    finally:
+        multiprocessing.set_start_method(default, force=True)
+
+    status = {e['analysis']: e['status'] for e in manifest['analyses']}
+    assert status == {'size': 'ok', 'size_again': 'ok', 'fail': 'failed'}
+    with open(tmp_path / 'size.json', encoding='utf-8') as f:
+        assert json.load(f) == {'n': 3, 'has_blob': True}
+    # Ana süreçte bağlama referans kalmaz
+    assert 'context' not in headless._WORKER_STATE
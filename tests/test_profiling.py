@@ -0,0 +1,86 @@
+"""profiling: Prometheus etiket kaçışları, etiket/alan ayrımı ve iş parçacıkları arası tepe bellek"""
+
+import json
+import threading
+
+import pytest
+
+import profiling
+from profiling import stage
+
+
+@pytest.fixture
+def prom():
+    profiling.configure('prom', memory=True)
+    yield
+    profiling.configure(None)
+
+
+@pytest.fixture
+def json_log(tmp_path):
+    path = tmp_path / 'profile.jsonl'
+    profiling.configure('json', output=str(path), memory=True)
+
+    def records():
+        profiling.configure(None)  # akışı kapatır
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    yield records
+    profiling.configure(None)
+
+
+def test_label_values_are_escaped(prom):
+    with stage('load', source='a"b\\c\nd'):
+        pass
+    line = next(l for l in profiling.prometheus_text().splitlines() if l.startswith('cogl_stage_wall_seconds_count'))
+    assert line == 'cogl_stage_wall_seconds_count{stage="load",source="a\\"b\\\\c\\nd"} 1'
+
+
+def test_fields_do_not_split_prometheus_series(prom):
+    for n in (10, 20, 30):
+        with stage('trial_cleaning', fields={'trials': n}):
+            pass
+    assert list(profiling._TOTALS) == [('trial_cleaning', ())]
+    assert profiling._TOTALS[('trial_cleaning', ())]['count'] == 3
+
+
+def test_fields_are_written_to_json_records(json_log):
+    with stage('bootstrap', fields={'trials': 42}, model='exgauss'):
+        pass
+    (record,) = json_log()
+    assert record['fields'] == {'trials': 42}
+    assert record['labels'] == {'model': 'exgauss'}
+
+
+def test_nested_stages_keep_peak(json_log):
+    with stage('outer'):
+        block = bytearray(2_000_000)
+        with stage('inner'):
+            inner = bytearray(1_000_000)
+        del block, inner
+    inner, outer = json_log()
+    assert inner['peak_mb'] >= 1.0
+    assert outer['peak_mb'] >= 3.0
+
+
+def test_overlapping_thread_stages_drop_peak(json_log):
+    entered, release = threading.Event(), threading.Event()
+
+    def worker():
+        with stage('thread_stage'):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    entered.wait(5)
+    with stage('main_stage'):
+        pass
+    release.set()
+    thread.join()
+    with stage('alone'):
+        pass
+
+    peaks = {r['stage']: r['peak_mb'] for r in json_log()}
+    assert peaks['thread_stage'] is None and peaks['main_stage'] is None
+    assert peaks['alone'] is not None
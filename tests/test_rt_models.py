@@ -0,0 +1,107 @@
+"""rt_models: ex-Gaussian uyumlarının scipy.stats.exponnorm ile karşılaştırılması ve EZ-difüzyon"""
+
+import itertools
+
+import numpy as np
+import pytest
+from scipy import optimize, stats
+
+from rt_models import SCALE_BOUNDS, exgauss_loglik, ez_diffusion, fit_exgauss, fit_exgauss_groups
+
+# μ × σ × τ ızgarası (ms); σ/τ = 20'ye kadar (eski biçim τ → 0 yönünde çöküyordu)
+GRID = list(itertools.product((400.0, 650.0), (20.0, 80.0, 200.0), (10.0, 100.0, 300.0)))
+
+
+def exponnorm_loglik(x, mu, sigma, tau):
+    return stats.exponnorm.logpdf(x, tau / sigma, mu, sigma).sum()
+
+
+def simulate(cells, n, seed):
+    rng = np.random.default_rng(seed)
+    x = np.concatenate([rng.normal(mu, sigma, n) + rng.exponential(tau, n) for mu, sigma, tau in cells])
+    return x, np.repeat(np.arange(len(cells)), n)
+
+
+def reference_fit(x, start):
+    """Aynı σ/τ sınırları içinde Nelder-Mead ile exponnorm MLE'si"""
+    lo, hi = np.log(np.array(SCALE_BOUNDS) * x.std())
+
+    def nll(t):
+        if not (lo <= t[1] <= hi and lo <= t[2] <= hi):
+            return 1e300
+        return -exponnorm_loglik(x, t[0], np.exp(t[1]), np.exp(t[2]))
+
+    result = optimize.minimize(nll, start, method='Nelder-Mead',
+                               options={'xatol': 1e-8, 'fatol': 1e-10, 'maxfev': 8000})
+    return -result.fun
+
+
+def _loglik(x, mu, sigma, tau):
+    theta = np.array([[mu, np.log(sigma), np.log(tau)]])
+    return exgauss_loglik(x, np.zeros(len(x), dtype=int), theta)
+
+
+def test_loglik_matches_exponnorm():
+    x = np.linspace(300, 1500, 101)
+    for mu, sigma, tau in GRID:
+        np.testing.assert_allclose(_loglik(x, mu, sigma, tau), stats.exponnorm.logpdf(x, tau / sigma, mu, sigma),
+                                   rtol=1e-9)
+
+
+def test_loglik_is_stable_at_extreme_ratios():
+    # τ ≪ σ: normal(μ + τ, σ) sınırı (σ²/2τ² - d/τ + log Φ(z) biçimi burada çöküyordu)
+    mu, sigma, tau = 500.0, 200.0, 1e-3
+    x = np.linspace(mu - 4 * sigma, mu + 4 * sigma, 101)
+    np.testing.assert_allclose(_loglik(x, mu, sigma, tau), stats.norm.logpdf(x, mu + tau, sigma), rtol=1e-9)
+
+    # σ ≪ τ: μ'nün yeterince üstünde Φ(z) = 1, yoğunluk üstel × exp(σ²/2τ²)
+    mu, sigma, tau = 500.0, 1e-2, 300.0
+    x = np.linspace(mu + 1, mu + 5 * tau, 101)
+    np.testing.assert_allclose(_loglik(x, mu, sigma, tau),
+                               stats.expon.logpdf(x, mu, tau) + sigma ** 2 / (2 * tau ** 2), rtol=1e-9)
+
+
+def test_fits_match_exponnorm_mle_across_grid():
+    x, groups = simulate(GRID, n=150, seed=11)
+    fit = fit_exgauss_groups(x, groups, len(GRID))
+
+    assert fit['converged'].all()
+    for g in range(len(GRID)):
+        xs = x[groups == g]
+        reported = fit['loglik'][g]
+        # Bildirilen log-olabilirlik bildirilen parametrelerde gerçekten geçerli
+        assert reported == pytest.approx(exponnorm_loglik(xs, fit['mu'][g], fit['sigma'][g], fit['tau'][g]),
+                                         rel=1e-9)
+        assert np.isfinite(reported) and reported < 0
+        # Sahte optimum yok: bağımsız uydurma daha iyi bir çözüm bulamaz
+        start = [fit['mu'][g], np.log(fit['sigma'][g]), np.log(fit['tau'][g])]
+        assert reported >= reference_fit(xs, start) - 1e-3
+
+
+def test_small_cells_reach_the_reference_optimum():
+    # Az denemeli gerçekçi hücreler; bir kısmının optimumu σ → 0 ucundadır
+    rng = np.random.default_rng(3)
+    cells = list(zip(rng.uniform(350, 700, 40), rng.uniform(20, 120, 40), rng.uniform(20, 300, 40)))
+    x, groups = simulate(cells, n=15, seed=4)
+    fit = fit_exgauss_groups(x, groups, len(cells))
+
+    assert fit['converged'].all()
+    for g in range(len(cells)):
+        xs = x[groups == g]
+        starts = ([fit['mu'][g], np.log(fit['sigma'][g]), np.log(fit['tau'][g])],
+                  [xs.mean() - 0.5 * xs.std(), np.log(0.7 * xs.std()), np.log(0.7 * xs.std())])
+        assert fit['loglik'][g] >= max(reference_fit(xs, s) for s in starts) - 1e-3
+
+
+def test_parallel_fit_matches_serial():
+    x, groups = simulate(GRID * 12, n=30, seed=5)
+    serial = fit_exgauss(x, groups, len(GRID) * 12, n_jobs=1)
+    parallel = fit_exgauss(x, groups, len(GRID) * 12, n_jobs=2, chunk_groups=50)
+    for key in ('mu', 'sigma', 'tau', 'loglik'):
+        np.testing.assert_allclose(parallel[key], serial[key], rtol=1e-10)
+
+
+def test_ez_diffusion_reference_values():
+    # Wagenmakers ve ark. (2007) örneği: Pc = .802, VRT = .112, MRT = .723
+    v, a, ter = ez_diffusion(0.802, 0.723, 0.112, 100)
+    assert (v, a, ter) == pytest.approx((0.0999, 0.140, 0.300), abs=1e-3)
@@ -0,0 +1,59 @@
+"""session_model: kanal seçimleriyle oturum modelinin kurulması"""
+
+import mne
+import numpy as np
+
+from session_model import SessionModel
+from synthetic_data import synthetic_session
+
+
+def session_with_eog(n_channels=4):
+    """EEG kanallarına ek olarak bir EOG kanalı bulunan sentetik oturum"""
+    mne.set_log_level('WARNING')
+    trials, raw = synthetic_session('stroop', n_trials=12, n_channels=n_channels, seed=3)
+    trials['session'] = 's1'
+    eog = mne.io.RawArray(np.zeros((1, raw.n_times)),
+                          mne.create_info(['EOG 061'], raw.info['sfreq'], ['eog']), verbose=False)
+    eog.set_meas_date(raw.info['meas_date'])
+    raw.add_channels([eog], force_update_info=True)
+    return trials, raw
+
+
+def test_build_with_eeg_picks():
+    trials, raw = session_with_eog()
+    model = SessionModel.build(trials, {'s1': raw}, picks='eeg')
+    assert model.ch_names == [f'EEG {i + 1:03d}' for i in range(4)]
+    assert model.epochs.shape[:2] == ((model.trials['epoch'] >= 0).sum(), 4)
+    assert len(model.epochs) > 0
+
+
+def test_eeg_picks_match_index_and_name_picks():
+    trials, raw = session_with_eog()
+    by_type = SessionModel.build(trials, {'s1': raw}, picks='eeg')
+    by_index = SessionModel.build(trials, {'s1': raw}, picks=mne.pick_types(raw.info, eeg=True))
+    by_name = SessionModel.build(trials, {'s1': raw}, picks=by_type.ch_names)
+    np.testing.assert_array_equal(by_index.epochs, by_type.epochs)
+    np.testing.assert_array_equal(by_name.epochs, by_type.epochs)
+
+
+def test_per_session_blocks_match_concatenated_epochs():
+    from session_model import synthetic_model
+
+    mne.set_log_level('WARNING')
+    model = synthetic_model(n_sessions=3, n_trials=20, seed=5)
+    assert len(model.blocks) == 3
+    reference = np.concatenate(model.blocks)
+    assert model.n_epochs == len(reference) == (model.trials['epoch'] >= 0).sum()
+
+    # Oturum sınırlarını karışık sırayla aşan seçim bloklardan doğru satırları toplar
+    idx = np.random.default_rng(0).permutation(model.n_epochs)[:25]
+    np.testing.assert_array_equal(model.take(idx), reference[idx])
+    channels = model.ch_names[1:3]
+    np.testing.assert_array_equal(model.take(idx, channels), reference[idx][:, 1:3])
+
+    rows = model.select("testType == 'stroop'")
+    np.testing.assert_array_equal(model.epochs_for("testType == 'stroop'"), reference[rows['epoch']])
+    erp, n = model.erp("testType == 'gonogo'", channels=channels)
+    expected = reference[model.select("testType == 'gonogo'")['epoch']][:, 1:3]
+    assert n == len(expected)
+    np.testing.assert_allclose(erp, expected.mean(axis=0, dtype=np.float64))
@@ -0,0 +1,130 @@
+"""spectral: mne/scipy ile denklik, 'bad' aralıkların işlenmesi ve bayt sınırlı plan önbelleği"""
+
+import mne
+import numpy as np
+import pytest
+from scipy import signal
+
+import spectral
+from spectral import compute_psd, get_plan, multitaper_psd, stft_power, welch_psd
+from synthetic_data import synthetic_raw
+
+SFREQ = 250.0
+
+
+def data(n_channels=4, n_times=5000, seed=0):
+    return np.random.default_rng(seed).standard_normal((n_channels, n_times))
+
+
+def assert_close(actual, expected, rtol):
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=rtol * np.abs(expected).max())
+
+
+@pytest.mark.parametrize('n_fft, n_overlap', [(256, 0), (256, 128), (500, 37)])
+def test_welch_matches_mne_and_scipy(n_fft, n_overlap):
+    x = data()
+    psd, freqs = welch_psd(x, SFREQ, fmin=1, fmax=60, n_fft=n_fft, n_overlap=n_overlap)
+    expected, expected_freqs = mne.time_frequency.psd_array_welch(
+        x, SFREQ, fmin=1, fmax=60, n_fft=n_fft, n_overlap=n_overlap, verbose=False)
+    np.testing.assert_allclose(freqs, expected_freqs)
+    assert_close(psd, expected, 1e-10)
+
+    scipy_freqs, scipy_psd = signal.welch(x, SFREQ, window='hamming', nperseg=n_fft, noverlap=n_overlap)
+    band = (scipy_freqs >= 1) & (scipy_freqs <= 60)
+    assert_close(psd, scipy_psd[:, band], 1e-10)
+
+
+def test_welch_float32_close_to_float64():
+    x = data()
+    psd64, _ = welch_psd(x, SFREQ, n_fft=256)
+    psd32, _ = welch_psd(x, SFREQ, n_fft=256, dtype=np.float32)
+    assert psd32.dtype == np.float32
+    assert_close(psd32, psd64, 1e-5)
+
+
+@pytest.mark.parametrize('bandwidth', [None, 2.0])
+@pytest.mark.parametrize('n_times', [2000, 2501])
+def test_multitaper_matches_mne(bandwidth, n_times):
+    x = data(n_times=n_times)
+    psd, freqs = multitaper_psd(x, SFREQ, fmin=0.5, fmax=40, bandwidth=bandwidth)
+    expected, expected_freqs = mne.time_frequency.psd_array_multitaper(
+        x, SFREQ, fmin=0.5, fmax=40, bandwidth=bandwidth, adaptive=False, normalization='length',
+        verbose=False)
+    np.testing.assert_allclose(freqs, expected_freqs)
+    assert_close(psd, expected, 1e-10)
+
+
+def test_stft_matches_scipy_spectrogram():
+    x = data()
+    power, freqs, times = stft_power(x, SFREQ, n_fft=128, step=32)
+    f, t, expected = signal.spectrogram(x, SFREQ, window='hann', nperseg=128, noverlap=96,
+                                        detrend='constant', scaling='density', mode='psd')
+    np.testing.assert_allclose(freqs, f)
+    np.testing.assert_allclose(times, t)
+    assert_close(power, expected, 1e-10)
+
+
+@pytest.fixture
+def raw_with_bads():
+    mne.set_log_level('WARNING')
+    raw = synthetic_raw(n_channels=6, duration=60, seed=5)
+    raw.set_annotations(mne.Annotations([10.0, 25.0, 40.0], [2.5, 3.9, 1.0],
+                                        ['bad_blink', 'BAD_move', 'bad_jump']))
+    return raw
+
+
+def test_welch_skips_bad_spans_like_mne(raw_with_bads):
+    kwargs = dict(fmin=0.5, fmax=40, n_fft=512, n_overlap=128)
+    psd = compute_psd(raw_with_bads, **kwargs)
+    expected = raw_with_bads.compute_psd(method='welch', reject_by_annotation=True, **kwargs)
+    assert psd.ch_names == expected.ch_names
+    np.testing.assert_allclose(psd.freqs, expected.freqs)
+    assert_close(psd.get_data(), expected.get_data(), 1e-10)
+
+    # Bad aralıklar gerçekten dışlanır: bozuk veri sonucu değiştirmez
+    raw_with_bads._data[:6, int(10.5 * SFREQ):int(12 * SFREQ)] += 1.0
+    assert_close(compute_psd(raw_with_bads, **kwargs).get_data(), expected.get_data(), 1e-10)
+
+
+def test_welch_skips_spans_shorter_than_n_fft():
+    x = data(n_times=4000)
+    x[:, 1000:1400] = np.nan
+    x[:, 1500:2000] = np.nan  # aradaki 100 örneklik iyi bölüm n_fft'den kısa
+    psd, _ = welch_psd(x, SFREQ, n_fft=256)
+    y = x.copy()
+    y[:, 1400:1500] = np.nan
+    assert_close(psd, welch_psd(y, SFREQ, n_fft=256)[0], 1e-12)
+
+
+def test_welch_without_usable_span_raises():
+    x = data(n_times=1000)
+    x[:, 200:900] = np.nan
+    with pytest.raises(ValueError):
+        welch_psd(x, SFREQ, n_fft=256)
+
+
+def test_multitaper_concatenates_good_spans(raw_with_bads):
+    psd = compute_psd(raw_with_bads, method='multitaper', fmin=1, fmax=30)
+    good = raw_with_bads.get_data(picks='eeg', reject_by_annotation='omit')
+    expected, _ = mne.time_frequency.psd_array_multitaper(good, SFREQ, fmin=1, fmax=30, adaptive=False,
+                                                          normalization='length', verbose=False)
+    assert_close(psd.data, expected, 1e-10)
+
+
+def test_plan_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(spectral, 'PLAN_CACHE_BYTES', 200_000)
+    monkeypatch.setattr(spectral, '_PLAN_CACHE', type(spectral._PLAN_CACHE)())
+
+    small = get_plan('welch', 256, SFREQ)
+    assert get_plan('welch', 256, SFREQ) is small
+
+    # Sinyal uzunluğundaki multitaper planı sınırdan büyük: önbelleğe alınmaz, küçük planı atmaz
+    big = get_plan('multitaper', 20000, SFREQ)
+    assert big.nbytes > spectral.PLAN_CACHE_BYTES
+    assert get_plan('multitaper', 20000, SFREQ) is not big
+    assert get_plan('welch', 256, SFREQ) is small
+
+    for n_fft in range(1000, 6000, 500):
+        get_plan('welch', n_fft, SFREQ)
+    assert sum(p.nbytes for p in spectral._PLAN_CACHE.values()) <= spectral.PLAN_CACHE_BYTES
+    assert get_plan('welch', 256, SFREQ) is not small  # en eski plan atıldı
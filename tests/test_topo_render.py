@@ -0,0 +1,81 @@
+"""topo_render: interpolasyon önbelleği, tampon yeniden kullanımı ve çok kareli çizim"""
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import mne
+import numpy as np
+
+from topo_render import TopoRenderer, _INTERP_CACHE, plot_topomap_row
+
+CH_NAMES = ['Fp1', 'Fp2', 'F3', 'F4', 'Fz', 'C3', 'C4', 'Cz', 'P3', 'P4', 'Pz', 'O1', 'O2']
+
+
+def info():
+    info = mne.create_info(CH_NAMES, 250.0, 'eeg')
+    info.set_montage('standard_1020')
+    return info
+
+
+def evoked(seed=0):
+    rng = np.random.default_rng(seed)
+    return mne.EvokedArray(1e-6 * rng.standard_normal((len(CH_NAMES), 101)), info(), tmin=-0.1,
+                           verbose=False)
+
+
+def test_interpolation_is_cached_per_montage():
+    _INTERP_CACHE.clear()
+    first = TopoRenderer(info(), resolution=32)
+    second = TopoRenderer(info(), resolution=32)
+    assert len(_INTERP_CACHE) == 1
+    assert second.W is first.W and second.mask is first.mask
+    # Farklı çözünürlük veya kanal düzeni ayrı girdi oluşturur
+    TopoRenderer(info(), resolution=48)
+    TopoRenderer(mne.pick_info(info(), list(range(10))), resolution=32)
+    assert len(_INTERP_CACHE) == 3
+
+
+def test_render_reuses_buffer_and_matches_matrix_product():
+    renderer = TopoRenderer(info(), resolution=32)
+    values = np.random.default_rng(1).standard_normal(len(CH_NAMES))
+    image = renderer.render(values)
+    assert image is renderer.image
+    expected = renderer.W @ values
+    np.testing.assert_allclose(image.ravel()[renderer.mask], expected[renderer.mask])
+    assert np.isnan(image.ravel()[~renderer.mask]).all()
+
+    again = renderer.render(values.astype(np.float32))
+    assert again is image
+    np.testing.assert_allclose(again.ravel()[renderer.mask], expected[renderer.mask], atol=1e-6)
+
+
+def test_frames_match_single_renders():
+    renderer = TopoRenderer(info(), resolution=32)
+    data = np.random.default_rng(2).standard_normal((len(CH_NAMES), 5))
+    frames = renderer.render_frames(data)
+    for i in range(data.shape[1]):
+        np.testing.assert_allclose(frames[i], renderer.render(data[:, i]), equal_nan=True)
+
+    out = np.full_like(frames, np.nan)
+    assert renderer.render_frames(data, out=out) is out
+
+
+def test_evoked_frames_pick_nearest_samples():
+    renderer = TopoRenderer(info(), resolution=32)
+    ev = evoked()
+    frames, frame_times = renderer.evoked_frames(ev, np.array([0.0, 0.101, 0.3, 10.0]))
+    np.testing.assert_allclose(frame_times, [0.0, 0.1, 0.3, 0.3])
+    np.testing.assert_allclose(frames[1], renderer.render(ev.data[:, 50]), equal_nan=True)
+
+
+def test_row_colour_limits_come_from_sensor_values():
+    import matplotlib.pyplot as plt
+
+    renderer = TopoRenderer(info(), resolution=32)
+    ev = evoked()
+    fig = plot_topomap_row(renderer, ev, [0.0, 0.1, 0.2], 'test')
+    image = fig.axes[0].images[0]
+    vlim = np.abs(ev.data[:, [25, 50, 75]]).max() * 1e6
+    np.testing.assert_allclose(image.get_clim(), (-vlim, vlim))
+    plt.close(fig)
@@ -0,0 +1,98 @@
+"""trial_cleaning: vektörel işaretlerin satır satır Python referansıyla karşılaştırılması"""
+
+import math
+import statistics
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_data import gonogo_trials, stroop_trials
+from trial_cleaning import MAD_SCALE, RULES, cleaning_summary, flag_trials
+
+
+def trial_table(seed=0):
+    """Oturumlu Stroop + Go/No-Go denemeleri; erken, dikkat kopması ve aykırı tepkiler eklenmiş"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for test_type, make in (('stroop', stroop_trials), ('gonogo', gonogo_trials)):
+        frame = make(240, trials_per_session=40, seed=seed)
+        frame['session'] = [f'{test_type}_{i // 40}' for i in range(len(frame))]
+        frames.append(frame)
+    data = pd.concat(frames, ignore_index=True)
+    rt = data['reactionTime'].to_numpy(dtype=float)
+    has_rt = np.flatnonzero(np.isfinite(rt))
+    for values in ([90.0, 120.0, 149.0], [2500.0, 4000.0], [1400.0, 1600.0, 1800.0]):
+        rt[rng.choice(has_rt, 6)] = rng.choice(values, 6)
+    data['reactionTime'] = rt
+    # Az denemeli hücre: MAD kuralı uygulanmaz
+    data.loc[data.index[:5], 'session'] = 'short'
+    return data
+
+
+def reference_flags(data, anticipation_ms=150.0, lapse_ms=2000.0, mad_k=3.0, sd_k=None, min_trials=8):
+    """Aynı kuralların satır başına (yavaş) tanımı"""
+    from rt_models import condition_index
+
+    condition = condition_index(data)
+    rows = []
+    for i, (session, rt) in enumerate(zip(data['session'], data['reactionTime'])):
+        has_rt = rt is not None and math.isfinite(rt) and rt > 0
+        rows.append({'cell': (session, int(condition[i])), 'rt': rt, 'has_rt': has_rt,
+                     'anticipation': has_rt and anticipation_ms is not None and rt < anticipation_ms,
+                     'lapse': has_rt and lapse_ms is not None and rt > lapse_ms})
+    reference = {}
+    for row in rows:
+        if row['has_rt'] and not row['anticipation'] and not row['lapse']:
+            reference.setdefault(row['cell'], []).append(row['rt'])
+
+    flags = {rule: [] for rule in RULES}
+    for row in rows:
+        cell = reference.get(row['cell'], [])
+        checked = row['has_rt'] and len(cell) >= min_trials
+        mad = sd = False
+        if checked and mad_k is not None:
+            median = statistics.median(cell)
+            limit = mad_k * MAD_SCALE * statistics.median([abs(x - median) for x in cell])
+            mad = limit > 0 and abs(row['rt'] - median) > limit
+        if checked and sd_k is not None:
+            mean, spread = statistics.mean(cell), statistics.stdev(cell)
+            sd = spread > 0 and abs(row['rt'] - mean) > sd_k * spread
+        for rule, value in (('anticipation', row['anticipation']), ('lapse', row['lapse']),
+                            ('mad', mad), ('sd', sd)):
+            flags[rule].append(bool(value))
+    return {rule: np.array(values) for rule, values in flags.items()}
+
+
+@pytest.mark.parametrize('rules', [
+    {},
+    {'mad_k': 2.5, 'sd_k': 2.0},
+    {'mad_k': None, 'sd_k': 2.5, 'min_trials': 20},
+    {'anticipation_ms': None, 'lapse_ms': None},
+])
+def test_flags_match_per_row_reference(rules):
+    data = trial_table()
+    before = data.copy()
+    result = flag_trials(data, **rules)
+    assert result is data
+    pd.testing.assert_frame_equal(data[before.columns], before)
+
+    expected = reference_flags(before, **rules)
+    for rule in RULES:
+        np.testing.assert_array_equal(data[f'flag_{rule}'].to_numpy(), expected[rule], err_msg=rule)
+    keep = ~np.any([expected[rule] for rule in RULES], axis=0)
+    np.testing.assert_array_equal(data['keep'].to_numpy(), keep)
+    for rule in ('anticipation', 'lapse'):
+        assert data[f'flag_{rule}'].any() == (rules.get(f'{rule}_ms', 0) is not None)
+    if rules.get('mad_k', 3.0) is not None:
+        assert data['flag_mad'].any()
+        assert not data.loc[data['session'] == 'short', 'flag_mad'].any()
+
+
+def test_summary_counts_each_rule_and_total():
+    data = flag_trials(trial_table(seed=1), sd_k=2.0)
+    summary = cleaning_summary(data).set_index('rule')
+    for rule in RULES:
+        assert summary.loc[rule, 'n_flagged'] == data[f'flag_{rule}'].sum()
+    assert summary.loc['total', 'n_flagged'] == (~data['keep']).sum()
+    assert summary.loc['total', 'percent'] == pytest.approx((~data['keep']).mean() * 100)
@@ -0,0 +1,83 @@
+"""trial_history: kaydırmalı vektörel metriklerin düz pandas groupby().shift() tanımlarıyla karşılaştırılması"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_data import gonogo_trials, stroop_trials
+from trial_history import sequential_effects
+
+
+def trial_table(seed=0, keep=False):
+    """Karışık satır sıralı, oturumlu Stroop + Go/No-Go denemeleri"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for test_type, make in (('stroop', stroop_trials), ('gonogo', gonogo_trials)):
+        frame = make(300, trials_per_session=60, seed=seed, **({'accuracy': 0.8} if test_type == 'stroop' else {}))
+        frame['session'] = [f's{i // 60}' for i in range(len(frame))]
+        frames.append(frame)
+    data = pd.concat(frames, ignore_index=True)
+    if keep:
+        data['keep'] = rng.random(len(data)) > 0.1
+    return data.iloc[rng.permutation(len(data))].reset_index(drop=True)
+
+
+def reference_effects(data, lags=(1, 2, 3)):
+    """Aynı metriklerin pandas üzerinde doğrudan tanımı"""
+    frame = data.sort_values(['session', 'testType', 'trial'], kind='stable').copy()
+    frame['correct'] = frame['correct'].astype(bool)
+    frame['congruent'] = frame['congruent'].map({True: True, False: False}).fillna(False).astype(bool)
+    if 'keep' not in frame:
+        frame['keep'] = True
+    groups = frame.groupby(['session', 'testType'], sort=False)
+    for column in ('correct', 'congruent', 'reactionTime', 'keep'):
+        frame[f'prev_{column}'] = groups[column].shift(1)
+        frame[f'next_{column}'] = groups[column].shift(-1)
+
+    rows = []
+    for (session, test_type), g in frame.groupby(['session', 'testType'], sort=False):
+        row = {'session': session, 'testType': test_type, 'n_trials': len(g), 'n_errors': int((~g['correct']).sum())}
+        measured = g[g['reactionTime'].notna() & g['keep'] & g['correct']]
+        seq = measured[(measured['prev_correct'] == True) & (test_type == 'stroop')]  # noqa: E712
+        for name, prev, cur in (('cC', True, True), ('iC', False, True), ('cI', True, False), ('iI', False, False)):
+            row[name] = seq.loc[(seq['prev_congruent'] == prev) & (seq['congruent'] == cur), 'reactionTime'].mean()
+        row['cse'] = (row['cI'] - row['cC']) - (row['iI'] - row['iC'])
+        row['pes'] = (measured.loc[measured['prev_correct'] == False, 'reactionTime'].mean()  # noqa: E712
+                      - measured.loc[measured['prev_correct'] == True, 'reactionTime'].mean())  # noqa: E712
+        triplet = g[~g['correct'] & (g['prev_correct'] == True) & (g['next_correct'] == True)  # noqa: E712
+                    & g['prev_reactionTime'].notna() & g['next_reactionTime'].notna()
+                    & (g['prev_keep'] == True) & (g['next_keep'] == True)]  # noqa: E712
+        row['pes_robust'] = (triplet['next_reactionTime'] - triplet['prev_reactionTime']).mean()
+
+        rt = g['reactionTime'].where(g['keep'])
+        dev = rt - rt.mean()
+        variance = (dev ** 2).mean()
+        for k in lags:
+            row[f'rt_ac{k}'] = (dev * dev.shift(k)).mean() / variance
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize('keep', [False, True])
+def test_matches_grouped_pandas_shift(keep):
+    data = trial_table(keep=keep)
+    result = sequential_effects(data)
+    expected = reference_effects(data)
+    key = ['session', 'testType']
+    result = result.sort_values(key).reset_index(drop=True)
+    expected = expected.sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result[key], expected[key])
+    for column in expected.columns.drop(key):
+        np.testing.assert_allclose(result[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-9, equal_nan=True, err_msg=column)
+    stroop = result[result['testType'] == 'stroop']
+    assert stroop['cse'].notna().all() and result['pes_robust'].notna().any()
+
+
+def test_row_order_does_not_change_result():
+    data = trial_table(seed=3)
+    shuffled = data.sample(frac=1.0, random_state=7).reset_index(drop=True)
+    key = ['session', 'testType']
+    a = sequential_effects(data).sort_values(key).reset_index(drop=True)
+    b = sequential_effects(shuffled).sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(a, b)
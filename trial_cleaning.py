@@ -0,0 +1,161 @@
+"""
+Deneme Temizleme (Aykırı Değer ve Erken Tepki Filtreleri)
+Stroop/Go-No-Go analizlerinden önce çalışan, yapılandırılabilir deneme düzeyi ön aşama.
+
+Kurallar (yalnızca tepki süresi olan denemelere uygulanır; tepkisiz No-Go denemeleri işaretlenmez):
+    anticipation  RT < anticipation_ms (erken/tahmini tepki, varsayılan 150 ms)
+    lapse         RT > lapse_ms (dikkat kopması, varsayılan 2000 ms = No-Go zaman aşımı)
+    mad           oturum × koşul hücresinde |RT - medyan| > mad_k × 1.4826 × MAD
+    sd            oturum × koşul hücresinde |RT - ortalama| > sd_k × SD (varsayılan kapalı)
+
+Hücre eşikleri sabit kurallardan geçen denemelerden hesaplanır; min_trials'tan az denemeli
+hücrelerde MAD/SD kuralı uygulanmaz. Eşikler grup kodları üzerinde toplu (pandas groupby /
+np.bincount) hesaplanır, satır başına Python döngüsü yoktur. Sonuç tabloya flag_* ve keep
+sütunları olarak eklenir (tablo kopyalanmaz).
+
+Hedef: 10M denemede ≥ 2.5M deneme/s (tek çekirdek; benchmarks.py 'trial_cleaning').
+
+Kullanım:
+    flag_trials(data)                      # flag_* ve keep sütunları eklenir
+    print_cleaning_summary(data)
+    stats = calculate_stroop_effect(data[data['keep']])
+"""
+
+import numpy as np
+
+# Varsayılan kurallar (None: kural kapalı)
+DEFAULT_RULES = {
+    'anticipation_ms': 150.0,
+    'lapse_ms': 2000.0,
+    'mad_k': 3.0,
+    'sd_k': None,
+    'min_trials': 8,
+}
+
+RULES = ('anticipation', 'lapse', 'mad', 'sd')
+
+# MAD → normal dağılımda standart sapma ölçeği
+MAD_SCALE = 1.4826
+
+
+def group_codes(columns, n_rows):
+    """Sütunların birleşik grup kodu (0..G-1) ve grup sayısı; her sütun bir kez çarpanlara ayrılır"""
+    import pandas as pd
+
+    codes, n_groups = np.zeros(n_rows, dtype=np.int64), 1
+    for values in columns:
+        column, uniques = pd.factorize(values, use_na_sentinel=False)
+        codes = codes * max(len(uniques), 1) + column
+        n_groups *= max(len(uniques), 1)
+    # Olası kombinasyon sayısı satır sayısını aşarsa yalnızca görülen kombinasyonlar numaralanır
+    if n_groups > max(n_rows, 1):
+        codes, uniques = pd.factorize(codes)
+        n_groups = len(uniques)
+    return codes, n_groups
+
+
+def group_median(values, codes, n_groups):
+    """Grup başına medyan (boş grup: NaN)"""
+    import pandas as pd
+
+    medians = pd.Series(values).groupby(codes).median()
+    out = np.full(n_groups, np.nan)
+    out[medians.index.to_numpy()] = medians.to_numpy()
+    return out
+
+
+def flag_trials(data, by='session', per_condition=True, anticipation_ms=DEFAULT_RULES['anticipation_ms'],
+                lapse_ms=DEFAULT_RULES['lapse_ms'], mad_k=DEFAULT_RULES['mad_k'], sd_k=DEFAULT_RULES['sd_k'],
+                min_trials=DEFAULT_RULES['min_trials']):
+    """Kurallara göre flag_<kural> ve keep sütunlarını tabloya ekle (yerinde) ve tabloyu döndür
+
+    by: eşiklerin hesaplandığı oturum/katılımcı sütun(lar)ı (tabloda yoksa tüm veri tek oturum)
+    per_condition: eşikler ayrıca test türü ve koşula (uyumlu/uyumsuz, Go/No-Go) göre ayrılır
+    """
+    import pandas as pd
+
+    from profiling import stage
+
+    with stage('trial_cleaning', fields={'trials': len(data)}):
+        rt = pd.to_numeric(data['reactionTime'], errors='coerce').to_numpy(dtype=np.float64)
+        has_rt = np.isfinite(rt) & (rt > 0)
+        flags = {rule: np.zeros(len(data), dtype=bool) for rule in RULES}
+        if anticipation_ms is not None:
+            flags['anticipation'] = has_rt & (rt < anticipation_ms)
+        if lapse_ms is not None:
+            flags['lapse'] = has_rt & (rt > lapse_ms)
+
+        if mad_k is not None or sd_k is not None:
+            keys = [by] if isinstance(by, str) else list(by)
+            columns = [data[key] for key in keys if key in data.columns]
+            if per_condition:
+                from rt_models import condition_index
+
+                columns.append(condition_index(data))
+            codes, n_groups = group_codes(columns, len(data))
+
+            # Eşikler sabit kurallardan geçen denemelerden
+            ref = has_rt & ~flags['anticipation'] & ~flags['lapse']
+            x, g = rt[ref], codes[ref]
+            n = np.bincount(g, minlength=n_groups)
+            enough = (n >= min_trials)[codes] & has_rt
+            if mad_k is not None:
+                median = group_median(x, g, n_groups)
+                mad = MAD_SCALE * group_median(np.abs(x - median[g]), g, n_groups)
+                limit = mad_k * mad
+                with np.errstate(invalid='ignore'):
+                    flags['mad'] = enough & (np.abs(rt - median[codes]) > limit[codes]) & (limit[codes] > 0)
+            if sd_k is not None:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    mean = np.bincount(g, x, n_groups) / n
+                    sd = np.sqrt(np.bincount(g, (x - mean[g]) ** 2, n_groups) / (n - 1))
+                    flags['sd'] = enough & (np.abs(rt - mean[codes]) > sd_k * sd[codes]) & (sd[codes] > 0)
+
+        keep = np.ones(len(data), dtype=bool)
+        for rule in RULES:
+            data[f'flag_{rule}'] = flags[rule]
+            keep &= ~flags[rule]
+        data['keep'] = keep
+    return data
+
+
+def cleaning_summary(data):
+    """Kural başına işaretlenen deneme sayısı ve oranı (bir deneme birden çok kurala takılabilir)"""
+    import pandas as pd
+
+    n = len(data)
+    rows = [{'rule': rule, 'n_flagged': int(data[f'flag_{rule}'].sum())} for rule in RULES]
+    rows.append({'rule': 'total', 'n_flagged': int(n - data['keep'].sum())})
+    summary = pd.DataFrame(rows)
+    summary['percent'] = summary['n_flagged'] / n * 100 if n else 0.0
+    return summary
+
+
+def print_cleaning_summary(data):
+    """Temizleme özetini yazdır"""
+    summary = cleaning_summary(data)
+    print(f"\n🧹 Deneme temizleme ({len(data)} deneme):")
+    for row in summary.itertuples():
+        label = 'Toplam çıkarılan' if row.rule == 'total' else row.rule
+        print(f"   {label:<18}{row.n_flagged:>10} ({row.percent:.2f}%)")
+
+
+def add_cleaning_arguments(parser):
+    """Analiz scriptlerinin komut satırına temizleme seçeneklerini ekle"""
+    parser.add_argument('--no-clean', action='store_true', help='Deneme temizlemeyi atla')
+    parser.add_argument('--anticipation-ms', type=float, default=DEFAULT_RULES['anticipation_ms'])
+    parser.add_argument('--lapse-ms', type=float, default=DEFAULT_RULES['lapse_ms'])
+    parser.add_argument('--mad-k', type=float, default=DEFAULT_RULES['mad_k'],
+                        help='Oturum içi MAD eşiği (0: kapalı)')
+    parser.add_argument('--sd-k', type=float, default=0, help='Oturum içi SD eşiği (0: kapalı)')
+    return parser
+
+
+def clean_from_args(data, args):
+    """Komut satırı seçenekleriyle temizle, özeti yazdır ve tutulan denemeleri döndür"""
+    if data is None or len(data) == 0 or args.no_clean:
+        return data
+    flag_trials(data, anticipation_ms=args.anticipation_ms, lapse_ms=args.lapse_ms,
+                mad_k=args.mad_k or None, sd_k=args.sd_k or None)
+    print_cleaning_summary(data)
+    return data[data['keep']]
@@ -0,0 +1,162 @@
+"""
+Deneme Geçmişi (Ardışıklık) Etkileri
+Oturum başına uyum-ardışıklık (Gratton) etkisi, hata sonrası yavaşlama ve RT otokorelasyonu.
+
+Denemeler bir kez (oturum, test türü, deneme no) sırasına dizilir; önceki denemenin değerleri
+grup içi kaydırmayla (aynı oturumda değilse eksik) alınır. Tüm oturumların metrikleri bu sıralı
+sütunlar üzerinde np.bincount ile tek geçişte hesaplanır, denemeler üzerinde Python döngüsü yoktur.
+
+Temizleme (trial_cleaning) sonrası 'keep' sütunu varsa çıkarılan denemeler ölçüm denemesi olarak
+kullanılmaz ama sonraki denemenin geçmişinde yer alır (sıra bozulmaz).
+
+Metrikler (RT'ler doğru cevaplardan, ms):
+    cC, iC, cI, iI   önceki (küçük harf) × şimdiki (büyük harf) koşul: c = uyumlu, i = uyumsuz
+    cse              Gratton etkisi: (cI - cC) - (iI - iC); önceki ve şimdiki deneme doğru olmalı
+    pes              hatadan sonraki doğru RT - doğrudan sonraki doğru RT
+    pes_robust       hatanın iki yanı doğru olan üçlülerde RT(hata + 1) - RT(hata - 1)
+    rt_ac<k>         gecikme k'da RT otokorelasyonu (oturum ortalamasından sapmalar)
+"""
+
+import argparse
+
+import numpy as np
+
+# Varsayılan otokorelasyon gecikmeleri
+AC_LAGS = (1, 2, 3)
+
+
+def order_trials(data, by='session'):
+    """(grup kodu, sıralama indeksi, grup sayısı): gruplar (by + testType) içinde deneme no sırası"""
+    import pandas as pd
+
+    from trial_cleaning import group_codes
+
+    keys = [by] if isinstance(by, str) else list(by)
+    keys = [key for key in keys if key in data.columns] + ['testType']
+    codes, n_groups = group_codes([data[key] for key in keys], len(data))
+    trial = pd.to_numeric(data['trial'], errors='coerce').to_numpy(dtype=np.float64) \
+        if 'trial' in data.columns else np.zeros(len(data))
+    # Deneme no eksikse dosya (satır) sırası korunur
+    order = np.lexsort((np.arange(len(data)), np.nan_to_num(trial, nan=np.inf), codes))
+    return codes, order, n_groups
+
+
+def grouped_shift(values, codes, k=1, fill=np.nan):
+    """Sıralı dizide grup içi k adım geri kaydırma (pandas groupby().shift(k) karşılığı)"""
+    shifted = np.full(len(values), fill, dtype=np.result_type(values, type(fill)))
+    if k < len(values):
+        same = codes[k:] == codes[:-k]
+        shifted[k:][same] = values[:-k][same]
+    return shifted
+
+
+def sequential_effects(data, by='session', lags=AC_LAGS):
+    """Grup (oturum × test türü) başına ardışıklık metrikleri tablosu"""
+    import pandas as pd
+
+    from session_model import as_bool
+
+    codes, order, n_groups = order_trials(data, by=by)
+    g = codes[order]
+    rt = pd.to_numeric(data['reactionTime'], errors='coerce').to_numpy(dtype=np.float64)[order]
+    correct = as_bool(data['correct'])[order].astype(np.float64)
+    congruent = as_bool(data['congruent'])[order].astype(np.float64)
+    is_stroop = (np.asarray(data['testType']) == 'stroop')[order]
+    keep = as_bool(data['keep'])[order] if 'keep' in data.columns else np.ones(len(data), dtype=bool)
+
+    prev_correct = grouped_shift(correct, g, 1)
+    next_correct = grouped_shift(correct[::-1], g[::-1], 1)[::-1]
+    prev_congruent = grouped_shift(congruent, g, 1)
+    prev_rt = grouped_shift(rt, g, 1)
+    next_rt = grouped_shift(rt[::-1], g[::-1], 1)[::-1]
+
+    valid_rt = np.isfinite(rt) & keep
+    measured = valid_rt & (correct == 1)
+    rt0 = np.nan_to_num(rt)
+
+    def mean(mask):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.bincount(g, np.where(mask, rt0, 0.0), n_groups) / np.bincount(g, mask, n_groups)
+
+    table = {'n_trials': np.bincount(g, minlength=n_groups),
+             'n_errors': np.bincount(g, correct == 0, n_groups)}
+
+    # Gratton: önceki ve şimdiki deneme doğru, yalnızca Stroop
+    seq = measured & (prev_correct == 1) & is_stroop
+    for name, prev, cur in (('cC', 1, 1), ('iC', 0, 1), ('cI', 1, 0), ('iI', 0, 0)):
+        table[name] = mean(seq & (prev_congruent == prev) & (congruent == cur))
+    table['cse'] = (table['cI'] - table['cC']) - (table['iI'] - table['iC'])
+
+    # Hata sonrası yavaşlama
+    table['pes'] = mean(measured & (prev_correct == 0)) - mean(measured & (prev_correct == 1))
+    # Sağlam sürüm: hata + 1 ve hata - 1 doğru denemeleri (hatanın kendisi referans noktası)
+    # Komşu denemeler ölçüm denemesidir: temizlemede çıkarılanlar (keep=False) kullanılmaz
+    prev_keep = grouped_shift(keep, g, 1, fill=False)
+    next_keep = grouped_shift(keep[::-1], g[::-1], 1, fill=False)[::-1]
+    triplet = (correct == 0) & (prev_correct == 1) & (next_correct == 1) & np.isfinite(prev_rt) \
+        & np.isfinite(next_rt) & prev_keep & next_keep
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table['pes_robust'] = np.bincount(g, np.where(triplet, next_rt - prev_rt, 0.0), n_groups) \
+            / np.bincount(g, triplet, n_groups)
+
+    # RT otokorelasyonu: grup ortalamasından sapmalar, yalnızca aynı gruptaki çiftler
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centre = np.bincount(g, np.where(valid_rt, rt0, 0.0), n_groups) / np.bincount(g, valid_rt, n_groups)
+        dev = np.where(valid_rt, rt0 - centre[g], np.nan)
+        variance = np.bincount(g, np.nan_to_num(dev) ** 2, n_groups) / np.bincount(g, valid_rt, n_groups)
+        for k in lags:
+            lagged = grouped_shift(dev, g, k)
+            pair = np.isfinite(dev) & np.isfinite(lagged)
+            table[f'rt_ac{k}'] = np.bincount(g, np.where(pair, dev * lagged, 0.0), n_groups) \
+                / np.bincount(g, pair, n_groups) / variance
+
+    result = pd.DataFrame(table)
+    present = result['n_trials'].to_numpy() > 0
+    keys = [by] if isinstance(by, str) else list(by)
+    keys = [key for key in keys if key in data.columns] + ['testType']
+    _, first = np.unique(codes, return_index=True)
+    labels = data[keys].iloc[first].reset_index(drop=True)
+    return pd.concat([labels, result[present].reset_index(drop=True)], axis=1)
+
+
+def print_sequential_summary(table):
+    """Test türü başına oturum medyanları"""
+    print("\n" + "=" * 60)
+    print("DENEME GEÇMİŞİ ETKİLERİ (oturum medyanları)")
+    print("=" * 60)
+    ac_columns = [c for c in table.columns if c.startswith('rt_ac')]
+    for test_type, group in table.groupby('testType'):
+        med = group.median(numeric_only=True)
+        print(f"\n📊 {str(test_type).upper()} ({len(group)} oturum):")
+        if test_type == 'stroop':
+            print(f"   Uyumlu sonrası Stroop etkisi: {(group['cI'] - group['cC']).median():.1f} ms, "
+                  f"uyumsuz sonrası: {(group['iI'] - group['iC']).median():.1f} ms")
+            print(f"   Gratton (uyum-ardışıklık) etkisi: {med['cse']:.1f} ms")
+        print(f"   Hata sonrası yavaşlama: {med['pes']:.1f} ms (sağlam: {med['pes_robust']:.1f} ms)")
+        print("   RT otokorelasyonu: " + ", ".join(f"lag {c[5:]}: {med[c]:.3f}" for c in ac_columns))
+
+
+def main(argv=None):
+    """Komut satırı: tüm oturumlar için ardışıklık etkileri"""
+    from session_model import load_trials
+    from trial_cleaning import add_cleaning_arguments, clean_from_args
+
+    parser = argparse.ArgumentParser(description='Gratton, hata sonrası yavaşlama ve RT otokorelasyonu')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--output', help='Oturum başına tablo (.csv)')
+    args = add_cleaning_arguments(parser).parse_args(argv)
+
+    data = load_trials(args.data_dir)
+    if data is None:
+        return
+    # Temizleme yalnızca işaretler; çıkarılan denemeler geçmiş olarak kalır
+    clean_from_args(data, args)
+    table = sequential_effects(data)
+    print_sequential_summary(table)
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"\n✓ Tablo kaydedildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()